@@ -27,6 +27,48 @@ const OopisOS_Kernel = {
         }
     },
 
+    // Sends several syscalls across the bridge in one crossing. Each request is
+    // { module, function, args, kwargs }. Resolves to an array of parsed result
+    // objects, one per request and in the same order. stopOnError and
+    // concurrent cannot be combined: the kernel rejects such a batch.
+    async syscallBatch(requests, { stopOnError = false, concurrent = false } = {}) {
+        if (!this.isReady || !this.kernel) {
+            if (this._initPromise) {
+                try { await this._initPromise; } catch (_) { /* ignore */ }
+            }
+        }
+        const failAll = (message) => requests.map(() => ({ "success": false, "error": message }));
+        if (!this.isReady || !this.kernel) {
+            return failAll("Error: Python kernel is not ready for syscall.");
+        }
+        try {
+            const batch = {
+                requests: requests.map(({ module, function: func, args = [], kwargs = {} }) => ({ module, "function": func, args, kwargs })),
+                stop_on_error: stopOnError,
+                concurrent
+            };
+            const result = JSON.parse(await this.kernel.syscall_batch(JSON.stringify(batch)));
+            return result.success ? result.results : failAll(result.error);
+        } catch (error) {
+            return failAll(`Syscall bridge error: ${error.message}`);
+        }
+    },
+
+    // Unpacks dist/kernel_bundle.zip (sources, precompiled bytecode and the
+    // bundle manifest) into the Pyodide filesystem in one operation.
+    // Resolves to false when no bundle has been built.
+    async _unpackKernelBundle() {
+        try {
+            const response = await fetch('./dist/kernel_bundle.zip');
+            if (!response.ok) return false;
+            this.pyodide.unpackArchive(await response.arrayBuffer(), 'zip', { extractDir: '/' });
+            return true;
+        } catch (error) {
+            console.warn("Kernel bundle unavailable, loading sources individually:", error);
+            return false;
+        }
+    },
+
     async initialize(dependencies) {
         this.dependencies = dependencies;
         const { OutputManager, Config } = this.dependencies;
@@ -63,15 +105,30 @@ const OopisOS_Kernel = {
                 '/core/audit.py': './core/audit.py',
                 '/core/ai_manager.py': './core/ai_manager.py',
                 '/core/time_utils.py': './core/time_utils.py',
+                '/core/scripting.py': './core/scripting.py',
+                '/core/jobs.py': './core/jobs.py',
+                '/core/globbing.py': './core/globbing.py',
+                '/core/profiler.py': './core/profiler.py',
+                '/core/tracing.py': './core/tracing.py',
+                '/core/log_segments.py': './core/log_segments.py',
+                '/core/heredocs.py': './core/heredocs.py',
+                '/core/pipeline_fusion.py': './core/pipeline_fusion.py',
+                '/core/command_manifest.py': './core/command_manifest.py',
+                '/core/commands_manifest.json': './core/commands_manifest.json',
+                '/core/completion.py': './core/completion.py',
+                '/core/transactions.py': './core/transactions.py',
+                '/core/llm_cache.py': './core/llm_cache.py',
                 '/core/commands/gemini.py': './core/commands/gemini.py',
                 '/core/commands/chidi.py': './core/commands/chidi.py',
                 '/core/commands/remix.py': './core/commands/remix.py',
                 '/core/commands/sudo.py': './core/commands/sudo.py',
                 '/core/commands/su.py': './core/commands/su.py',
                 '/core/commands/visudo.py': './core/commands/visudo.py',
+                '/core/commands/audit.py': './core/commands/audit.py',
                 '/core/commands/useradd.py': './core/commands/useradd.py',
                 '/core/commands/usermod.py': './core/commands/usermod.py',
                 '/core/commands/passwd.py': './core/commands/passwd.py',
+                '/core/commands/perf.py': './core/commands/perf.py',
                 '/core/commands/removeuser.py': './core/commands/removeuser.py',
                 '/core/commands/groupadd.py': './core/commands/groupadd.py',
                 '/core/commands/groupdel.py': './core/commands/groupdel.py',
@@ -103,6 +160,9 @@ const OopisOS_Kernel = {
                 '/core/commands/delay.py': './core/commands/delay.py',
                 '/core/commands/rmdir.py': './core/commands/rmdir.py',
                 '/core/commands/tail.py': './core/commands/tail.py',
+                '/core/commands/test.py': './core/commands/test.py',
+                '/core/commands/time.py': './core/commands/time.py',
+                '/core/commands/trace.py': './core/commands/trace.py',
                 '/core/commands/diff.py': './core/commands/diff.py',
                 '/core/commands/beep.py': './core/commands/beep.py',
                 '/core/commands/play.py': './core/commands/play.py',
@@ -187,14 +247,13 @@ const OopisOS_Kernel = {
                 '/core/apps/gemini_chat.py': null, // Add this line
             };
 
-            for (const [pyPath, jsPath] of Object.entries(filesToLoad)) {
-                if (jsPath) {
-                    let code;
-                    // Browser: Use the original fetch method.
-                    code = await (await fetch(jsPath)).text();
+            // Prefer the single-archive bundle (tools/build_kernel_bundle.py); without
+            // one, fetch the sources individually, all at once rather than in turn.
+            if (!(await this._unpackKernelBundle())) {
+                const sources = await Promise.all(Object.entries(filesToLoad).map(async ([pyPath, jsPath]) =>
+                    [pyPath, jsPath ? await (await fetch(jsPath)).text() : '']));
+                for (const [pyPath, code] of sources) {
                     this.pyodide.FS.writeFile(pyPath, code, { encoding: 'utf8' });
-                } else {
-                    this.pyodide.FS.writeFile(pyPath, '', { encoding: 'utf8' });
                 }
             }
 
@@ -237,6 +296,17 @@ const OopisOS_Kernel = {
         return await this.kernel.execute_command(commandString, jsContextJson, stdinContent);
     },
 
+    // Flushes what the kernel buffers in memory (the audit log). Synchronous,
+    // so that it can run from a pagehide handler.
+    shutdown() {
+        if (!this.isReady || !this.kernel) return;
+        try {
+            this.kernel.shutdown();
+        } catch (error) {
+            console.error("JS Bridge: kernel shutdown hook failed.", error);
+        }
+    },
+
     async saveFileSystemToDB(fsJsonString) {
         const { StorageHAL } = OopisOS_Kernel.dependencies;
         try {
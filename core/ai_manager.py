@@ -5,6 +5,9 @@ import re
 import shlex
 import pyodide.http as pyodide_http
 from asyncio import TimeoutError
+from llm_cache import llm_cache, request_key
+from session import current_session
+from tracing import traced
 
 class AIManager:
     """
@@ -72,7 +75,7 @@ ls [-l, -a, -R], cd, cat, grep [-i, -v, -n, -R], find [path] -name [pattern] -ty
 
         planner_conversation = history + [{"role": "user", "parts": [{"text": planner_prompt}]}]
 
-        planner_result = await self._call_llm_api(provider, model, planner_conversation, options.get("apiKey"), self.PLANNER_SYSTEM_PROMPT)
+        planner_result = await self._call_llm_api(provider, model, planner_conversation, options.get("apiKey"), self.PLANNER_SYSTEM_PROMPT, options.get("useCache", True))
 
         if not planner_result["success"]:
             return {"success": False, "error": f"Planner stage failed: {planner_result.get('error')}"}
@@ -114,7 +117,7 @@ ls [-l, -a, -R], cd, cat, grep [-i, -v, -n, -R], find [path] -name [pattern] -ty
             executed_commands_output += f"--- Output of '{command_str}' ---\n{output}\n\n"
 
         synthesizer_prompt = f'Original user question: "{prompt}"\n\nContext from file system:\n{executed_commands_output}'
-        synthesizer_result = await self._call_llm_api(provider, model, [{"role": "user", "parts": [{"text": synthesizer_prompt}]}], options.get("apiKey"), self.SYNTHESIZER_SYSTEM_PROMPT)
+        synthesizer_result = await self._call_llm_api(provider, model, [{"role": "user", "parts": [{"text": synthesizer_prompt}]}], options.get("apiKey"), self.SYNTHESIZER_SYSTEM_PROMPT, options.get("useCache", True))
 
         if not synthesizer_result["success"]:
             return {"success": False, "error": f"Synthesizer stage failed: {synthesizer_result.get('error')}"}
@@ -125,14 +128,28 @@ ls [-l, -a, -R], cd, cat, grep [-i, -v, -n, -R], find [path] -name [pattern] -ty
 
         return {"success": True, "data": final_answer}
 
-    async def continue_chat_conversation(self, prompt, history, provider, model, api_key):
+    async def continue_chat_conversation(self, prompt, history, provider, model, api_key, use_cache=True):
         """
         Continues a chat conversation without the agentic search/planning steps.
         """
         conversation = history + [{"role": "user", "parts": [{"text": prompt}]}]
-        return await self._call_llm_api(provider, model, conversation, api_key, self.CHAT_SYSTEM_PROMPT)
+        return await self._call_llm_api(provider, model, conversation, api_key, self.CHAT_SYSTEM_PROMPT, use_cache)
 
-    async def _call_llm_api(self, provider, model, conversation, api_key, system_prompt=None):
+    @traced('ai.llm_call', lambda self, provider, model, conversation, *args, **kwargs: {
+        "provider": provider, "model": model, "turns": len(conversation)})
+    async def _call_llm_api(self, provider, model, conversation, api_key, system_prompt=None, use_cache=True):
+        """
+        Sends a conversation to the provider and returns {"success", "answer"}.
+        Answers are cached per user (see llm_cache), for the user of the
+        session the call runs in; use_cache=False always asks the provider.
+        """
+        provider_config = self.provider_config.get(provider) or {}
+        key = request_key(provider, model or provider_config.get("defaultModel"), system_prompt, conversation)
+        return await llm_cache.get_or_fetch(
+            key, lambda: self._fetch_llm_response(provider, model, conversation, api_key, system_prompt),
+            current_session().user_context, use_cache)
+
+    async def _fetch_llm_response(self, provider, model, conversation, api_key, system_prompt=None):
         provider_config = self.provider_config.get(provider)
 
         if not provider_config:
@@ -202,7 +219,7 @@ ls [-l, -a, -R], cd, cat, grep [-i, -v, -n, -R], find [path] -name [pattern] -ty
                 return {"success": False, "error": f"Could not connect to Ollama. Is it running locally on http://localhost:11434? Details: {repr(e)}"}
             return {"success": False, "error": f"Network error: Could not reach {url}. Details: {repr(e)}"}
 
-    async def perform_remix(self, path1, content1, path2, content2, provider, model, api_key):
+    async def perform_remix(self, path1, content1, path2, content2, provider, model, api_key, use_cache=True):
         """
         Synthesizes a new article from two source documents using an LLM.
         """
@@ -218,7 +235,7 @@ ls [-l, -a, -R], cd, cat, grep [-i, -v, -n, -R], find [path] -name [pattern] -ty
 
         conversation = [{"role": "user", "parts": [{"text": user_prompt}]}]
 
-        result = await self._call_llm_api(provider, model, conversation, api_key, self.REMIX_SYSTEM_PROMPT)
+        result = await self._call_llm_api(provider, model, conversation, api_key, self.REMIX_SYSTEM_PROMPT, use_cache)
 
         if result.get("success"):
             final_article = re.sub(r'(?<!\n)\n(?!\n)', '\n\n', result.get("answer", ""))
@@ -226,7 +243,7 @@ ls [-l, -a, -R], cd, cat, grep [-i, -v, -n, -R], find [path] -name [pattern] -ty
         else:
             return result
 
-    async def perform_storyboard(self, files, mode, is_summary, question, provider, model, api_key):
+    async def perform_storyboard(self, files, mode, is_summary, question, provider, model, api_key, use_cache=True):
         """
         Generates a narrative summary of a collection of files.
         """
@@ -246,26 +263,26 @@ ls [-l, -a, -R], cd, cat, grep [-i, -v, -n, -R], find [path] -name [pattern] -ty
         full_prompt = f"{user_prompt}\\n\\nFILE CONTEXT:\\n{file_context_string[:15000]}" # Truncate for safety
 
         conversation = [{"role": "user", "parts": [{"text": full_prompt}]}]
-        result = await self._call_llm_api(provider, model, conversation, api_key, STORYBOARD_SYSTEM_PROMPT)
+        result = await self._call_llm_api(provider, model, conversation, api_key, STORYBOARD_SYSTEM_PROMPT, use_cache)
 
         if result.get("success"):
             return {"success": True, "data": result.get("answer", "No summary generated.")}
         else:
             return result
 
-    async def perform_forge(self, description, provider, model, api_key):
+    async def perform_forge(self, description, provider, model, api_key, use_cache=True):
         """
         Generates file content from a description using an LLM.
         """
         conversation = [{"role": "user", "parts": [{"text": description}]}]
-        result = await self._call_llm_api(provider, model, conversation, api_key, self.FORGE_SYSTEM_PROMPT)
+        result = await self._call_llm_api(provider, model, conversation, api_key, self.FORGE_SYSTEM_PROMPT, use_cache)
 
         if result.get("success"):
             return {"success": True, "data": result.get("answer", "")}
         else:
             return result
 
-    async def perform_chidi_analysis(self, files_context, analysis_type, question=None, provider="ollama", model=None, api_key=None):
+    async def perform_chidi_analysis(self, files_context, analysis_type, question=None, provider="ollama", model=None, api_key=None, use_cache=True):
         """
         Performs a specific analysis (summarize, study, ask) on a set of files.
         """
@@ -284,7 +301,7 @@ ls [-l, -a, -R], cd, cat, grep [-i, -v, -n, -R], find [path] -name [pattern] -ty
             full_prompt = f"{user_prompt}"
 
         conversation = [{"role": "user", "parts": [{"text": full_prompt}]}]
-        result = await self._call_llm_api(provider, model, conversation, api_key, CHIDI_SYSTEM_PROMPT)
+        result = await self._call_llm_api(provider, model, conversation, api_key, CHIDI_SYSTEM_PROMPT, use_cache)
 
         if result.get("success"):
             return {"success": True, "data": result.get("answer", "No analysis generated.")}
@@ -1,26 +1,22 @@
 # gem/core/apps/top.py
 
-def get_process_list(jobs):
+from jobs import job_manager
+from profiler import profiler
+
+def get_process_list(jobs=None):
     """
-    Gathers and formats the list of active processes (jobs).
-    The 'jobs' dictionary is passed from the CommandExecutor's context.
+    Gathers the list of active processes (jobs) from the kernel's job table,
+    including the CPU time and output bytes each job has used so far.
+    The 'jobs' argument is accepted for older callers and ignored.
     """
-    if not jobs:
-        return []
-
-    processes = []
-    # The jobs object from JS is a PyProxy dict-like object
-    for pid, job_details in jobs.items():
-        processes.append({
-            "pid": pid,
-            "user": job_details.get('user', 'system'),
-            "status": job_details.get('status', 'RUNNING')[0].upper(), # Get first letter and capitalize
-            "command": job_details.get('command', '')
-        })
+    return job_manager.get_process_list()
 
-    # Sort by PID for consistent ordering
-    processes.sort(key=lambda p: int(p['pid']))
-    return processes
+def get_recent_commands(limit=10):
+    """
+    Returns the newest entries of the profiler's ring buffer. It is only
+    filled while profiling is on ('perf on') or for lines run under 'time'.
+    """
+    return profiler.recent(limit)
 
 # We don't need a full class here since the logic is stateless.
-# The kernel will import and call this function directly.
\ No newline at end of file
+# The kernel will import and call this function directly.
@@ -1,61 +1,213 @@
 # gem/core/audit.py
 
-import os
-from datetime import datetime
-from filesystem import fs_manager
+import re
+import time
+from bisect import bisect_left, bisect_right
+from datetime import datetime, timedelta, timezone
+from log_segments import RotatingLog
 
 LOG_PATH = "/var/log/audit.log"
+# Records are written out once this many are buffered, or when one has waited FLUSH_INTERVAL_SECONDS.
+FLUSH_BATCH_SIZE = 32
+FLUSH_INTERVAL_SECONDS = 30
+# A segment is rotated before it grows past this size (in characters, as the VFS counts file sizes).
+SEGMENT_MAX_SIZE = 64 * 1024
+# Rotated segments kept: audit.log.1 (newest) to audit.log.N (oldest).
+RETAINED_SEGMENTS = 4
+# The query index keeps about this many of the newest records.
+MAX_INDEXED_RECORDS = 50000
+RELATIVE_TIME = re.compile(r'^(\d+)([smhdw])$')
+TIME_UNITS = {'s': 'seconds', 'm': 'minutes', 'h': 'hours', 'd': 'days', 'w': 'weeks'}
+# Before records ended in a real newline, they were joined by a literal backslash-n.
+LEGACY_SEPARATOR = re.compile(r'\\n(?=\d{4}-\d{2}-\d{2}T)')
+
+
+def _epoch(timestamp):
+    """Seconds since the epoch for a log timestamp such as 2026-01-01T12:00:00.000000Z."""
+    return datetime.fromisoformat(timestamp.rstrip('Z')).replace(tzinfo=timezone.utc).timestamp()
+
+
+def parse_time(text, now=None):
+    """
+    Seconds since the epoch for a query bound: an ISO date or date-time (UTC),
+    or a duration before now such as 90s, 15m, 2h, 7d or 1w. Raises ValueError.
+    """
+    match = RELATIVE_TIME.match(text.strip())
+    if match:
+        now = time.time() if now is None else now
+        return now - timedelta(**{TIME_UNITS[match.group(2)]: int(match.group(1))}).total_seconds()
+    return _epoch(text.strip())
+
+
+class AuditIndex:
+    """
+    Records of the audit log indexed for queries. Records are numbered in
+    the order they were logged; 'times' holds their timestamps in the same
+    order (kept non-decreasing), so a time range is found with bisect. The
+    per-actor and per-action posting lists hold record numbers in ascending
+    order. Past 'capacity' records the oldest are dropped, a quarter of the
+    capacity at a time.
+    """
+    def __init__(self, capacity=MAX_INDEXED_RECORDS):
+        self.capacity = capacity
+        self.base = 0
+        self.records = []
+        self.times = []
+        self.by_actor = {}
+        self.by_action = {}
+
+    def __len__(self):
+        return len(self.records)
+
+    def add(self, timestamp, epoch, actor, action, details):
+        number = self.base + len(self.records)
+        self.records.append((timestamp, actor, action, details))
+        # A clock stepping back must not unsort the array that time ranges bisect.
+        self.times.append(max(epoch, self.times[-1]) if self.times else epoch)
+        self.by_actor.setdefault(actor, []).append(number)
+        self.by_action.setdefault(action, []).append(number)
+        if len(self.records) > self.capacity + self.capacity // 4:
+            self._trim()
+
+    def _trim(self):
+        drop = len(self.records) - self.capacity
+        del self.records[:drop]
+        del self.times[:drop]
+        self.base += drop
+        for postings in (self.by_actor, self.by_action):
+            for key in list(postings):
+                numbers = postings[key]
+                cut = bisect_left(numbers, self.base)
+                if cut == len(numbers):
+                    del postings[key]
+                elif cut:
+                    del numbers[:cut]
+
+    def search(self, actor=None, action=None, since=None, until=None, text=None):
+        """The numbers of the matching records, newest first."""
+        lo = self.base + (bisect_left(self.times, since) if since is not None else 0)
+        hi = self.base + (bisect_right(self.times, until) if until is not None else len(self.times))
+        postings = [index.get(key, []) for index, key in ((self.by_actor, actor), (self.by_action, action))
+                    if key is not None]
+        if postings:
+            # Walk the shorter posting list and check the other filter on each record.
+            numbers = min(postings, key=len)
+            candidates = numbers[bisect_left(numbers, lo):bisect_left(numbers, hi)]
+        else:
+            candidates = range(lo, hi)
+        needle = text.lower() if text else None
+        matches = []
+        for number in reversed(candidates):
+            _, record_actor, record_action, details = self.records[number - self.base]
+            if actor is not None and record_actor != actor:
+                continue
+            if action is not None and record_action != action:
+                continue
+            if needle and needle not in f"{record_actor} {record_action} {details}".lower():
+                continue
+            matches.append(number)
+        return matches
+
+    def get(self, number):
+        timestamp, actor, action, details = self.records[number - self.base]
+        return {"timestamp": timestamp, "actor": actor, "action": action, "details": details}
 
 class AuditManager:
-    """Manages the system audit log, now entirely in Python."""
-
-    def _ensure_log_file_exists(self, user_context):
-        """Ensures the log file and its parent directories exist with root ownership."""
-        log_dir = os.path.dirname(LOG_PATH)
-        if not fs_manager.get_node(log_dir):
-            try:
-                # Create /var if it doesn't exist
-                if not fs_manager.get_node("/var"):
-                    fs_manager.create_directory("/var", {"name": "root", "group": "root"})
-                # Create /var/log
-                fs_manager.create_directory(log_dir, {"name": "root", "group": "root"})
-            except Exception as e:
-                # If we can't create the dir, we can't log.
-                print(f"AuditManager Critical: Could not create log directory {log_dir}: {e}")
-                return False
-
-        if not fs_manager.get_node(LOG_PATH):
-            try:
-                # Create the log file itself as root
-                fs_manager.write_file(LOG_PATH, "", {"name": "root", "group": "root"})
-                # Set permissions so only root can read/write
-                fs_manager.chmod(LOG_PATH, "640")
-            except Exception as e:
-                print(f"AuditManager Critical: Could not create log file {LOG_PATH}: {e}")
-                return False
-        return True
+    """
+    Manages the system audit log. log() only appends the formatted record to
+    an in-memory buffer; flush() writes the buffer to /var/log/audit.log in
+    one VFS save. The log is a RotatingLog: root-only, and rotated to
+    audit.log.1 (and .1 to .2, and so on) as it fills up. The kernel's
+    shutdown hook flushes whatever is still buffered.
+
+    Every record is also added to an AuditIndex for 'audit query'. The index
+    is seeded from the log segments on first use, so it covers earlier
+    sessions as far back as the retained segments go.
+    """
+    def __init__(self):
+        self.batch_size = FLUSH_BATCH_SIZE
+        self.flush_interval = FLUSH_INTERVAL_SECONDS
+        self.segments = RotatingLog(LOG_PATH, SEGMENT_MAX_SIZE, RETAINED_SEGMENTS)
+        self._buffer = []
+        self._buffered_since = None
+        self._index = None
+
+    def configure(self, batch_size=None, flush_interval=None, segment_max_size=None, retained_segments=None):
+        """Adjusts batching, rotation and retention. Values left as None keep their setting."""
+        settings = {"batch_size": batch_size, "flush_interval": flush_interval,
+                    "segment_max_size": segment_max_size, "retained_segments": retained_segments}
+        for name, value in settings.items():
+            if value is None:
+                continue
+            if int(value) < (0 if name in ("flush_interval", "retained_segments") else 1):
+                return {"success": False, "error": f"Invalid audit setting {name}: {value}"}
+            target = self.segments if name in ("segment_max_size", "retained_segments") else self
+            setattr(target, name, int(value))
+        return {"success": True}
+
+    def _load_index(self):
+        """The query index, built from the log segments (oldest first) on the first call."""
+        if self._index is not None:
+            return self._index
+        self._index = AuditIndex()
+        for content in self.segments.contents():
+            for line in content.splitlines():
+                for entry in LEGACY_SEPARATOR.split(line.removesuffix("\\n")):
+                    fields = entry.split(" | ", 3)
+                    if len(fields) != 4:
+                        continue
+                    try:
+                        epoch = _epoch(fields[0])
+                    except ValueError:
+                        continue
+                    self._index.add(fields[0], epoch, fields[1].removeprefix("USER: "),
+                                    fields[2].removeprefix("ACTION: "), fields[3].removeprefix("DETAILS: "))
+        return self._index
 
     def log(self, actor, action, details, user_context):
         """
-        The primary method for logging an event. It directly appends to the log file.
+        The primary method for logging an event. The record is buffered and
+        written out with the next flush, and indexed for queries right away.
         """
-        if not self._ensure_log_file_exists(user_context):
-            return {"success": False, "error": "Failed to ensure log file exists."}
+        index = self._load_index()
+        logged_at = datetime.now(timezone.utc)
+        timestamp = logged_at.replace(tzinfo=None).isoformat() + "Z"
+        details = str(details).replace("\n", "\\n")
+        self._buffer.append(f"{timestamp} | USER: {actor} | ACTION: {action} | DETAILS: {details}\n")
+        index.add(timestamp, logged_at.timestamp(), str(actor), str(action), details)
+        now = time.monotonic()
+        if self._buffered_since is None:
+            self._buffered_since = now
+        if len(self._buffer) >= self.batch_size or now - self._buffered_since >= self.flush_interval:
+            return self.flush()
+        return {"success": True}
 
+    def flush(self):
+        """Writes the buffered records to the log, rotating segments as they fill up."""
+        if not self._buffer:
+            return {"success": True, "flushed": 0}
         try:
-            timestamp = datetime.utcnow().isoformat() + "Z"
-            log_entry = f"{timestamp} | USER: {actor} | ACTION: {action} | DETAILS: {details}\\n"
-
-            # Append to the log file
-            log_node = fs_manager.get_node(LOG_PATH)
-            current_content = log_node.get('content', '')
-            new_content = current_content + log_entry
-
-            # Write back as root to maintain ownership
-            fs_manager.write_file(LOG_PATH, new_content, {"name": "root", "group": "root"})
-            return {"success": True}
+            self.segments.append(self._buffer)
         except Exception as e:
             return {"success": False, "error": f"Failed to write to audit log: {repr(e)}"}
+        flushed = len(self._buffer)
+        self._buffer = []
+        self._buffered_since = None
+        return {"success": True, "flushed": flushed}
+
+    def query(self, actor=None, action=None, since=None, until=None, text=None, limit=20, page=1):
+        """
+        Finds records by actor, action, time range (seconds since the epoch,
+        inclusive) and free text, newest first, and returns one page of them.
+        """
+        matches = self._load_index().search(actor, action, since, until, text)
+        limit, page = max(1, int(limit)), max(1, int(page))
+        start = (page - 1) * limit
+        return {
+            "success": True, "total": len(matches), "page": page,
+            "pages": (len(matches) + limit - 1) // limit,
+            "records": [self._index.get(number) for number in matches[start:start + limit]]
+        }
 
 # Instantiate a singleton for the kernel
-audit_manager = AuditManager()
\ No newline at end of file
+audit_manager = AuditManager()
@@ -0,0 +1,48 @@
+# gem/core/command_manifest.py
+
+import json
+import os
+
+MANIFEST_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'commands_manifest.json')
+
+
+class CommandManifest:
+    """
+    Read-only view of commands_manifest.json, which tools/build_command_manifest.py
+    generates from the command modules. It holds each command's flag
+    definitions, metadata, whether run() is async, and its help and man
+    text, so that parsing, permission checks, 'help' and 'man' can answer
+    without importing the module. An entry's 'help' or 'man' is null when
+    the module has none, and absent when its text depends on the arguments.
+    For commands missing from the manifest (or a missing manifest) lookups
+    return None, and callers fall back to importing the module.
+    """
+    def __init__(self, path=MANIFEST_PATH):
+        self.path = path
+        self._entries = None
+
+    def load(self):
+        try:
+            with open(self.path) as manifest_file:
+                self._entries = json.load(manifest_file).get('commands', {})
+        except (OSError, ValueError):
+            self._entries = {}
+        return self._entries
+
+    def get(self, command_name):
+        """The command's manifest entry, or None when the manifest does not know it."""
+        entries = self._entries if self._entries is not None else self.load()
+        return entries.get(command_name)
+
+    def flag_definitions(self, command_name):
+        entry = self.get(command_name)
+        if entry is None:
+            return None
+        return {'flags': entry['flags'], 'metadata': entry['metadata']}
+
+    def is_async(self, command_name):
+        entry = self.get(command_name)
+        return None if entry is None else entry['async']
+
+# Instantiate a singleton for the kernel
+command_manifest = CommandManifest()
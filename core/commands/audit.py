@@ -0,0 +1,119 @@
+# gem/core/commands/audit.py
+
+import json
+from audit import audit_manager, parse_time, LOG_PATH
+
+def define_flags():
+    """Declares the flags that the audit command accepts."""
+    return {
+        'flags': [
+            {'name': 'actor', 'short': 'u', 'long': 'actor', 'takes_value': True},
+            {'name': 'action', 'short': 'a', 'long': 'action', 'takes_value': True},
+            {'name': 'since', 'long': 'since', 'takes_value': True},
+            {'name': 'until', 'long': 'until', 'takes_value': True},
+            {'name': 'text', 'short': 't', 'long': 'text', 'takes_value': True},
+            {'name': 'limit', 'short': 'n', 'long': 'limit', 'takes_value': True},
+            {'name': 'page', 'short': 'p', 'long': 'page', 'takes_value': True},
+            {'name': 'json', 'long': 'json', 'takes_value': False},
+        ],
+        'metadata': {
+            'root_required': True
+        }
+    }
+
+def _usage_error(message, suggestion="Try 'audit query [--actor USER] [--action ACTION] [--since TIME] [--text TEXT]'."):
+    return {"success": False, "error": {"message": f"audit: {message}", "suggestion": suggestion}}
+
+def run(args, flags, user_context, **kwargs):
+    """
+    Searches the audit log through its in-memory index, or flushes it.
+    """
+    action = args[0] if args else "query"
+    if len(args) > 1 or action not in ("query", "flush"):
+        return _usage_error(f"invalid usage: {' '.join(args)}")
+
+    if action == "flush":
+        flushed = audit_manager.flush()
+        if not flushed["success"]:
+            return _usage_error(flushed["error"], "Check that /var/log is writable by root.")
+        return f"audit: {flushed['flushed']} record(s) written to {LOG_PATH}"
+
+    bounds = {}
+    for name in ("since", "until"):
+        if flags.get(name) is not None:
+            try:
+                bounds[name] = parse_time(flags[name])
+            except ValueError:
+                return _usage_error(f"invalid time for --{name}: '{flags[name]}'",
+                                    "Use an ISO date or time (2026-01-31, 2026-01-31T09:30) or a duration such as 15m, 2h or 7d.")
+    try:
+        limit, page = int(flags.get('limit') or 20), int(flags.get('page') or 1)
+    except ValueError:
+        return _usage_error("--limit and --page take a number")
+    if limit < 1 or page < 1:
+        return _usage_error("--limit and --page must be at least 1")
+
+    result = audit_manager.query(actor=flags.get('actor'), action=flags.get('action'),
+                                 since=bounds.get('since'), until=bounds.get('until'),
+                                 text=flags.get('text'), limit=limit, page=page)
+    del result["success"]
+    if flags.get('json'):
+        return json.dumps(result, indent=2)
+    if not result["records"]:
+        return "audit: no matching records" if not result["total"] else \
+            f"audit: page {page} is past the last page ({result['pages']})"
+
+    lines = [f"{record['timestamp']} | USER: {record['actor']} | ACTION: {record['action']} | DETAILS: {record['details']}"
+             for record in result["records"]]
+    first = (page - 1) * limit + 1
+    lines.append(f"-- records {first}-{first + len(result['records']) - 1} of {result['total']}, "
+                 f"page {page} of {result['pages']} (newest first) --")
+    return "\n".join(lines)
+
+def man(args, flags, user_context, **kwargs):
+    return """
+NAME
+    audit - search the system audit log
+
+SYNOPSIS
+    audit [query] [-u USER] [-a ACTION] [--since TIME] [--until TIME]
+                  [-t TEXT] [-n LIMIT] [-p PAGE] [--json]
+    audit flush
+
+DESCRIPTION
+    Security-relevant events (sudo, passwd, useradd, groupadd, reset, ...)
+    are recorded in /var/log/audit.log and its rotated segments. 'audit
+    query' searches them through an index the kernel keeps in memory,
+    newest first, one page at a time. The index includes records that are
+    still buffered and not yet written to the log file. Only root may use
+    this command.
+
+    query   Search the log (default). Filters combine; with none, every
+            record matches.
+    flush   Write buffered records to /var/log/audit.log now.
+
+OPTIONS
+    -u, --actor=USER
+        Only records logged for USER.
+    -a, --action=ACTION
+        Only records with this action, e.g. SUDO_FAILURE.
+    --since=TIME, --until=TIME
+        Only records from this time range (inclusive, UTC). TIME is an
+        ISO date or date-time, or a duration ago such as 30s, 15m, 2h,
+        7d or 1w.
+    -t, --text=TEXT
+        Only records containing TEXT (case-insensitive).
+    -n, --limit=LIMIT
+        Records per page (default 20).
+    -p, --page=PAGE
+        Page to show (default 1).
+    --json
+        Print the page as JSON: total, page, pages and the records.
+
+EXAMPLES
+    audit query --action SUDO_FAILURE --since 1d
+    audit query -u alice -t passwd --json
+"""
+
+def help(args, flags, user_context, **kwargs):
+    return "Usage: audit [query] [-u USER] [-a ACTION] [--since TIME] [--until TIME] [-t TEXT] [-n N] [-p N] [--json] | audit flush"
@@ -1,16 +1,19 @@
 # gem/core/commands/bg.py
 
-def run(args, flags, user_context, jobs=None, **kwargs):
+from jobs import job_manager
+
+def run(args, flags, user_context, **kwargs):
     """
-    Signals the front end to resume one or more stopped jobs in the background.
+    Resumes one or more stopped jobs in the background.
     """
     job_ids_to_resume = []
 
     if not args:
         # If no args, find the most recently stopped job
-        if not jobs:
+        live_jobs = job_manager.live_jobs()
+        if not live_jobs:
             return {"success": False, "error": "bg: no current job"}
-        stopped_jobs = [int(jid) for jid, details in jobs.items() if details.get('status') == 'paused']
+        stopped_jobs = [job.id for job in live_jobs if job.status == 'paused']
         if not stopped_jobs:
             return {"success": False, "error": "bg: no stopped jobs"}
         job_ids_to_resume.append(max(stopped_jobs))
@@ -34,18 +37,13 @@ def run(args, flags, user_context, jobs=None, **kwargs):
             if job_id is not None:
                 job_ids_to_resume.append(job_id)
 
-    effects = []
+    user = user_context.get('name')
     for job_id in job_ids_to_resume:
-        effects.append({
-            "effect": "signal_job",
-            "job_id": job_id,
-            "signal": "CONT" # Continue signal
-        })
+        signal_result = job_manager.signal(job_id, "CONT", user)
+        if not signal_result.get("success"):
+            return {"success": False, "error": f"bg: {signal_result.get('error')}"}
 
-    # Return multiple effects if multiple jobs were specified
-    if len(effects) == 1:
-        return effects[0]
-    return {"effects": effects}
+    return ""
 
 
 def man(args, flags, user_context, **kwargs):
@@ -1,8 +1,12 @@
 # gem/core/commands/fg.py
 
-def run(args, flags, user_context, jobs=None, **kwargs):
+import asyncio
+
+from jobs import job_manager
+
+async def run(args, flags, user_context, **kwargs):
     """
-    Signals the front end to bring a job to the foreground.
+    Resumes a job and waits for it to finish, returning the output it produced.
     """
     if len(args) > 1:
         return {
@@ -34,17 +38,32 @@ def run(args, flags, user_context, jobs=None, **kwargs):
                 }
             }
     else:
-        if not jobs:
+        live_jobs = job_manager.live_jobs()
+        if not live_jobs:
             return {"success": False, "error": {"message": "fg: no current jobs", "suggestion": "Run 'jobs' to see a list of background jobs."}}
-        job_id = max(map(int, jobs.keys())) if jobs else None
+        job_id = max(job.id for job in live_jobs) if live_jobs else None
         if job_id is None:
             return {"success": False, "error": {"message": "fg: no current jobs", "suggestion": "There are no background jobs to bring to the foreground."}}
 
-    return {
-        "effect": "signal_job",
-        "job_id": job_id,
-        "signal": "CONT" # Continue signal
-    }
+    job = job_manager.get(job_id)
+    if not job or not job.is_alive:
+        return {"success": False, "error": {"message": f"fg: %{job_id}: no such job", "suggestion": "Run 'jobs' to see a list of background jobs."}}
+
+    signal_result = job_manager.signal(job.id, "CONT", user_context.get('name'))
+    if not signal_result.get("success"):
+        return {"success": False, "error": {"message": f"fg: {signal_result.get('error')}", "suggestion": "You can only bring your own jobs to the foreground."}}
+    try:
+        await job.wait()
+    except asyncio.CancelledError:
+        # Interrupting the foreground command interrupts the job, as Ctrl-C would.
+        job_manager.signal(job.id, "INT")
+        raise
+    job_manager.reap(job.id)
+
+    output = "\n".join([job.command] + job.output_lines)
+    if job.exit_status != 0:
+        return {"success": False, "output": output, "error": f"fg: job {job.id} {job.state_label().lower()}"}
+    return output
 
 def man(args, flags, user_context, **kwargs):
     return """
@@ -55,7 +74,12 @@ SYNOPSIS
     fg [%job_id]
 
 DESCRIPTION
-    Resumes a stopped or background job and brings it to the foreground, giving it control of the terminal. If no job_id is specified, the most recently backgrounded or stopped job is used.
+    Resumes a stopped or background job and brings it to the foreground: the
+    terminal waits for the job to finish and then shows the output it
+    produced. If no job_id is specified, the most recently backgrounded or
+    stopped job is used. Interrupting fg sends INT to the job; if the job is
+    stopped instead, fg returns and the job stays in the job table. Only the
+    user who started a job, or root, may bring it to the foreground.
 
 OPTIONS
     This command takes no options.
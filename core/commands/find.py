@@ -3,6 +3,10 @@ import os
 import fnmatch
 import re
 from filesystem import fs_manager
+from executor import command_executor
+
+# Upper bound on the paths handed to a single `-exec ... {} +` invocation.
+MAX_EXEC_BATCH = 1024
 
 def _parse_expression(args):
     """
@@ -39,14 +43,22 @@ def _parse_expression(args):
             i += 1
         elif token == '-exec':
             command_parts = []
+            batched = False
             i += 1
             while i < len(args):
                 if args[i] == ';':
                     break
+                if args[i] == '+' and command_parts and command_parts[-1] == '{}':
+                    batched = True
+                    break
                 command_parts.append(args[i])
                 i += 1
             if not command_parts: raise ValueError("missing argument to `-exec`")
-            actions.append({'type': 'exec', 'command': command_parts})
+            if i >= len(args): raise ValueError("missing terminating `;` or `+` for `-exec`")
+            if batched:
+                # `{} +` collects many paths into one invocation.
+                command_parts = command_parts[:-1]
+            actions.append({'type': 'exec', 'command': command_parts, 'batched': batched})
             i += 1
         elif token == '-delete':
             actions.append({'type': 'delete'})
@@ -59,7 +71,7 @@ def _parse_expression(args):
 
     return predicate_groups, actions
 
-def run(args, flags, user_context, **kwargs):
+async def run(args, flags, user_context, **kwargs):
     """
     Searches for files in a directory hierarchy with advanced expressions.
     """
@@ -93,8 +105,20 @@ def run(args, flags, user_context, **kwargs):
             }
         }
 
-    output_lines = []
-    commands_to_exec = []
+    # Output entries are plain lines or the index of a command in argv_list,
+    # so command output lands where the match was found.
+    output_entries = []
+    argv_list = []
+    pending_batches = {}
+
+    def queue_command(argv):
+        output_entries.append(len(argv_list))
+        argv_list.append(argv)
+
+    def flush_batch(action_index):
+        batch = pending_batches.pop(action_index, None)
+        if batch:
+            queue_command(actions[action_index]['command'] + batch)
 
     def traverse(current_path):
         node = fs_manager.get_node(current_path)
@@ -106,36 +130,59 @@ def run(args, flags, user_context, **kwargs):
         ) if any(predicate_groups) else True
 
         if matches:
-            for action in actions:
+            for action_index, action in enumerate(actions):
                 if action['type'] == 'print':
-                    output_lines.append(current_path)
+                    output_entries.append(current_path)
                 elif action['type'] == 'delete':
                     try:
                         fs_manager.remove(current_path, recursive=(node.get('type') == 'directory'))
                     except Exception as e:
-                        output_lines.append(f"find: cannot delete '{current_path}': {e}")
+                        output_entries.append(f"find: cannot delete '{current_path}': {e}")
+                elif action['type'] == 'exec' and action['batched']:
+                    batch = pending_batches.setdefault(action_index, [])
+                    batch.append(current_path)
+                    if len(batch) >= MAX_EXEC_BATCH:
+                        flush_batch(action_index)
                 elif action['type'] == 'exec':
-                    cmd_str = ' '.join([
-                        part.replace('{}', current_path) for part in action['command']
-                    ])
-                    commands_to_exec.append(cmd_str)
+                    queue_command([part.replace('{}', current_path) for part in action['command']])
 
         if node.get('type') == 'directory':
             for child_name in sorted(node.get('children', {}).keys()):
                 child_path = fs_manager.get_absolute_path(os.path.join(current_path, child_name))
                 traverse(child_path)
 
-    for start_path in paths:
-        traverse(fs_manager.get_absolute_path(start_path))
-
-    if commands_to_exec:
-        return {
-            "effect": "execute_commands",
-            "commands": commands_to_exec,
-            "output": "\\n".join(output_lines)
+    with fs_manager.batch_saves():
+        for start_path in paths:
+            traverse(fs_manager.get_absolute_path(start_path))
+        for action_index in list(pending_batches):
+            flush_batch(action_index)
+
+        results = await command_executor.run_argv_list(argv_list) if argv_list else []
+
+    output_lines, effects, errors = [], [], []
+    for entry in output_entries:
+        if isinstance(entry, str):
+            output_lines.append(entry)
+            continue
+        result = results[entry]
+        if result.get('effect'):
+            effects.append(result)
+        effects.extend(result.get('effects', []))
+        if result.get('output') and not result.get('effect'):
+            output_lines.append(str(result['output']))
+        if not result.get('success'):
+            error = result.get('error')
+            errors.append(error.get('message') if isinstance(error, dict) else str(error))
+
+    response = {"success": not errors, "output": "\n".join(output_lines)}
+    if errors:
+        response["error"] = {
+            "message": "\n".join(errors),
+            "suggestion": "One or more '-exec' commands failed."
         }
-
-    return "\\n".join(output_lines)
+    if effects:
+        response["effects"] = effects
+    return response
 
 def man(args, flags, user_context, **kwargs):
     return """
@@ -167,11 +214,16 @@ OPTIONS
     -exec <cmd> {} ;
         Execute command on found file. The '{}' is replaced by the current file path. The command must end with a ';'. This is an action.
 
+    -exec <cmd> {} +
+        Like '-exec ... ;', but many found paths are appended to a single
+        invocation of the command (up to 1024 per invocation).
+
 EXAMPLES
     find . -name "*.log"
     find /home -type d
     find . -name "*.tmp" -delete
     find . -name "*.txt" -exec cat {} ;
+    find / -name "*.md" -exec wc -l {} +
 """
 
 def help(args, flags, user_context, **kwargs):
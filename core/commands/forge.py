@@ -9,6 +9,7 @@ def define_flags():
         'flags': [
             {'name': 'provider', 'short': 'p', 'long': 'provider', 'takes_value': True},
             {'name': 'model', 'short': 'm', 'long': 'model', 'takes_value': True},
+            {'name': 'no-cache', 'long': 'no-cache', 'takes_value': False},
         ],
         'metadata': {}
     }
@@ -38,7 +39,7 @@ async def run(args, flags, user_context, api_key=None, ai_manager=None, **kwargs
     provider = flags.get("provider") or "ollama"
     model = flags.get("model")
 
-    result = await ai_manager.perform_forge(description, provider, model, api_key)
+    result = await ai_manager.perform_forge(description, provider, model, api_key, use_cache=not flags.get('no-cache'))
 
     if not result.get("success"):
         return {
@@ -91,6 +92,9 @@ OPTIONS
         Specify the AI provider to use (e.g., 'gemini', 'ollama'). Defaults to 'ollama'.
     -m, --model <name>
         Specify the exact model name to use for the chosen provider.
+    --no-cache
+        Ask the provider even if an identical request was answered before.
+        Answers are otherwise reused from ~/.cache/llm_responses.json.
 
 EXAMPLES
     forge "a simple python flask server" server.py
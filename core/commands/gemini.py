@@ -10,6 +10,7 @@ def define_flags():
             {'name': 'chat', 'short': 'c', 'long': 'chat', 'takes_value': False},
             {'name': 'provider', 'short': 'p', 'long': 'provider', 'takes_value': True},
             {'name': 'model', 'short': 'm', 'long': 'model', 'takes_value': True},
+            {'name': 'no-cache', 'long': 'no-cache', 'takes_value': False},
             {'name': 'chat-internal', 'long': 'chat-internal', 'takes_value': True, 'hidden': True},
         ],
         'metadata': {}
@@ -49,7 +50,8 @@ async def run(args, flags, user_context, stdin_data=None, api_key=None, ai_manag
             history,
             provider,
             model,
-            api_key
+            api_key,
+            use_cache=not flags.get('no-cache')
         )
         if result["success"]:
             return result.get("answer") # Return the raw string output
@@ -67,7 +69,8 @@ async def run(args, flags, user_context, stdin_data=None, api_key=None, ai_manag
 
     user_prompt = " ".join(args)
 
-    result = await ai_manager.perform_agentic_search(user_prompt, [], provider, model, {"apiKey": api_key})
+    result = await ai_manager.perform_agentic_search(user_prompt, [], provider, model,
+                                                   {"apiKey": api_key, "useCache": not flags.get('no-cache')})
 
     if result["success"]:
         return {
@@ -106,6 +109,10 @@ OPTIONS
     -m, --model <name>
         Specify the exact model name to use for the chosen provider.
 
+    --no-cache
+        Ask the provider even if an identical request was answered before.
+        Answers are otherwise reused from ~/.cache/llm_responses.json.
+
 EXAMPLES
     gemini "summarize all the .txt files in my home directory"
     gemini -c
@@ -15,15 +15,9 @@ def run(args, flags, user_context, stdin_data=None, **kwargs):
             }
         }
 
-    all_groups = group_manager.get_all_groups()
-    user_specific_groups = []
-    for group, details in all_groups.items():
-        if target_user in details.get('members', []):
-            user_specific_groups.append(group)
-
     primary_group = all_users.get(target_user, {}).get('primaryGroup')
 
-    group_set = set(user_specific_groups)
+    group_set = set(group_manager.get_groups_for_user(target_user))
     if primary_group:
         group_set.add(primary_group)
 
@@ -1,6 +1,7 @@
 # gem/core/commands/help.py
 
 from importlib import import_module
+from command_manifest import command_manifest
 
 def run(args, flags, user_context, stdin_data=None, commands=None, **kwargs):
     """
@@ -8,6 +9,17 @@ def run(args, flags, user_context, stdin_data=None, commands=None, **kwargs):
     """
     if args:
         cmd_name = args[0]
+        entry = command_manifest.get(cmd_name)
+        if entry is not None and 'help' in entry:
+            if entry['help'] is not None:
+                return entry['help']
+            return {
+                "success": False,
+                "error": {
+                    "message": f"help: no help entry for {cmd_name}",
+                    "suggestion": f"For more detailed information, try 'man {cmd_name}'."
+                }
+            }
         try:
             command_module = import_module(f"commands.{cmd_name}")
             help_func = getattr(command_module, 'help', None)
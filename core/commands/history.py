@@ -7,20 +7,21 @@ def define_flags():
     return {
         'flags': [
             {'name': 'clear', 'short': 'c', 'long': 'clear', 'takes_value': False},
+            {'name': 'search', 'short': 's', 'long': 'search', 'takes_value': True},
         ],
         'metadata': {}
     }
 
 def run(args, flags, user_context, **kwargs):
     """
-    Handles displaying and clearing the command history.
+    Handles displaying, searching and clearing the command history.
     """
     if args:
         return {
             "success": False,
             "error": {
                 "message": "history: command takes no arguments",
-                "suggestion": "Try 'history' or 'history -c'."
+                "suggestion": "Try 'history', 'history -s TERM' or 'history -c'."
             }
         }
 
@@ -28,13 +29,17 @@ def run(args, flags, user_context, **kwargs):
         history_manager.clear_history()
         return ""
 
-    history = history_manager.get_full_history()
-    if not history:
+    if flags.get('search') is not None:
+        matches = history_manager.search(flags['search'])
+        entries = [(sequence + 1, cmd) for sequence, cmd in reversed(matches)]
+    else:
+        entries = history_manager.get_numbered()
+    if not entries:
         return ""
 
     output = []
-    for i, cmd in enumerate(history):
-        output.append(f"  {str(i + 1).rjust(4)}  {cmd}")
+    for number, cmd in entries:
+        output.append(f"  {str(number).rjust(4)}  {cmd}")
 
     return "\n".join(output)
 
@@ -44,19 +49,25 @@ NAME
     history - display command history
 
 SYNOPSIS
-    history [-c]
+    history [-c | -s TERM]
 
 DESCRIPTION
-    Displays the command history list with line numbers.
+    Displays the command history list with line numbers. The history
+    keeps the last 20000 commands; entries keep their numbers as older
+    ones are dropped.
 
 OPTIONS
     -c, --clear
         Clear the history list by deleting all entries.
+    -s, --search=TERM
+        Show only the commands containing TERM, ignoring case. Faster
+        than 'history | grep', as it uses the history's word index.
 
 EXAMPLES
     history
+    history -s "git commit"
     history -c
 """
 
 def help(args, flags, user_context, **kwargs):
-    return "Usage: history [-c]"
\ No newline at end of file
+    return "Usage: history [-c | -s TERM]"
\ No newline at end of file
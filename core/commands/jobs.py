@@ -1,9 +1,20 @@
 # gem/core/commands/jobs.py
 
-def run(args, flags, user_context, jobs=None, **kwargs):
+from jobs import job_manager
+
+def define_flags():
+    """Declares the flags that the jobs command accepts."""
+    return {
+        'flags': [
+            {'name': 'long', 'short': 'l', 'long': 'long', 'takes_value': False},
+        ],
+        'metadata': {}
+    }
+
+def run(args, flags, user_context, **kwargs):
     """
-    Lists active background jobs for the current session.
-    The 'jobs' dictionary is passed from the JS CommandExecutor.
+    Lists the kernel's background jobs. Finished jobs are reported once,
+    with their exit status, and then removed from the table.
     """
     if args:
         return {
@@ -14,20 +25,14 @@ def run(args, flags, user_context, jobs=None, **kwargs):
             }
         }
 
-    if not jobs:
-        return ""
-
     output_lines = []
-    for job_id, job_details in sorted(jobs.items()):
-        status = job_details.get('status', 'running')
-        if status == 'paused':
-            status = 'Stopped'
-        else:
-            status = 'Running'
-        command = job_details.get('command', '')
-        output_lines.append(f"[{job_id}]  {status.ljust(8)}  {command}")
+    for job in job_manager.report():
+        line = f"[{job.id}]  {job.state_label().ljust(10)}  {job.command}"
+        if flags.get('long'):
+            line = f"[{job.id}]  {job.state_label().ljust(10)}  {job.cpu_time:7.2f}s  {str(job.output_bytes).rjust(7)}B  {job.command}"
+        output_lines.append(line)
 
-    return "\\n".join(output_lines)
+    return "\n".join(output_lines)
 
 def man(args, flags, user_context, **kwargs):
     return """
@@ -35,17 +40,21 @@ NAME
     jobs - display status of jobs in the current session
 
 SYNOPSIS
-    jobs
+    jobs [-l]
 
 DESCRIPTION
-    Lists the background jobs that were started from the current terminal, along with their status (Running, Stopped) and command.
+    Lists the background jobs that were started with '&', along with their
+    status (Running, Stopped) and command. Jobs that have finished since the
+    last listing are shown once as Done, Exit N, Terminated or Killed.
 
 OPTIONS
-    This command takes no options.
+    -l, --long
+          Also show the CPU time used and the bytes of output produced.
 
 EXAMPLES
     jobs
+    jobs -l
 """
 
 def help(args, flags, user_context, **kwargs):
-    return "Usage: jobs"
\ No newline at end of file
+    return "Usage: jobs [-l]"
\ No newline at end of file
@@ -1,5 +1,7 @@
 # gem/core/commands/kill.py
 
+from jobs import job_manager
+
 def define_flags():
     """Declares the flags that the kill command accepts."""
     return {
@@ -11,7 +13,7 @@ def define_flags():
 
 def run(args, flags, user_context, **kwargs):
     """
-    Sends a signal to one or more specified jobs or processes.
+    Sends a signal to one or more specified jobs or processes in the kernel's job table.
     """
     if not args:
         return {
@@ -38,7 +40,7 @@ def run(args, flags, user_context, **kwargs):
             }
         }
 
-    effects = []
+    job_ids = []
     for pid_arg in pid_args:
         job_id = None
         if pid_arg.startswith('%'):
@@ -51,14 +53,21 @@ def run(args, flags, user_context, **kwargs):
                 job_id = int(pid_arg)
             except ValueError:
                 return {"success": False, "error": {"message": f"kill: invalid pid: {pid_arg}", "suggestion": "Process IDs must be numbers."}}
+        job_ids.append(job_id)
 
-        effects.append({
-            "effect": "signal_job",
-            "job_id": job_id,
-            "signal": signal
-        })
+    user = user_context.get('name')
+    for job_id in job_ids:
+        signal_result = job_manager.signal(job_id, signal, user)
+        if not signal_result.get("success"):
+            return {
+                "success": False,
+                "error": {
+                    "message": f"kill: {signal_result.get('error')}",
+                    "suggestion": "Run 'jobs' or 'ps' to see the running jobs."
+                }
+            }
 
-    return {"effects": effects}
+    return ""
 
 
 def man(args, flags, user_context, **kwargs):
@@ -72,10 +81,11 @@ SYNOPSIS
 
 DESCRIPTION
     The kill utility sends a signal to the specified processes or jobs. If no signal is specified, the TERM signal is sent, which requests a clean termination.
+    Only the user who started a job, or root, may signal it.
 
 OPTIONS
     -s, --signal <sigspec>
-        Specify the signal to be sent. Common signals include TERM, KILL, and STOP.
+        Specify the signal to be sent. Common signals include TERM, KILL, STOP and CONT.
 
 EXAMPLES
     kill %1
@@ -1,5 +1,6 @@
 # gem/core/commands/man.py
 from importlib import import_module
+from command_manifest import command_manifest
 
 def run(args, flags, user_context, **kwargs):
     """
@@ -16,6 +17,10 @@ def run(args, flags, user_context, **kwargs):
 
     cmd_name = args[0]
 
+    entry = command_manifest.get(cmd_name)
+    if entry is not None and entry.get('man') is not None:
+        return {"effect": "page_output", "content": entry['man'], "mode": "less"}
+
     try:
         command_module = import_module(f"commands.{cmd_name}")
         man_func = getattr(command_module, 'man', None)
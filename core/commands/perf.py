@@ -0,0 +1,99 @@
+# gem/core/commands/perf.py
+
+import json
+from profiler import profiler
+
+def define_flags():
+    """Declares the flags that the perf command accepts."""
+    return {
+        'flags': [
+            {'name': 'json', 'long': 'json', 'takes_value': False},
+        ],
+        'metadata': {}
+    }
+
+def _format_summary(summary):
+    totals = summary["totals"]
+    lines = [
+        f" Performance counter stats ({totals['lines']} command lines, profiling {'on' if profiler.enabled else 'off'}):",
+        "",
+        f"  {'COMMAND':<12} {'CALLS':>6} {'FAIL':>5} {'TOTAL ms':>10} {'AVG ms':>9} {'MAX ms':>9} {'IN B':>9} {'OUT B':>9} {'GET_NODE':>9} {'SAVES':>6}"
+    ]
+    ranked = sorted(summary["commands"].items(), key=lambda item: item[1]["wall_ms"], reverse=True)
+    for name, stats in ranked:
+        lines.append(
+            f"  {name:<12} {stats['calls']:>6} {stats['failures']:>5} {stats['wall_ms']:>10.2f} "
+            f"{stats['wall_ms'] / stats['calls']:>9.3f} {stats['max_ms']:>9.3f} {stats['bytes_in']:>9} "
+            f"{stats['bytes_out']:>9} {stats['get_node']:>9} {stats['save_state']:>6}"
+        )
+    lines.extend([
+        "",
+        f"  {totals['total_ms']:12.2f} ms wall time",
+        f"  {totals['parse_ms']:12.2f} ms expanding and parsing",
+        f"  {summary['counters']['get_node']:12} get_node calls",
+        f"  {summary['counters']['save_state']:12} filesystem saves"
+    ])
+    return "\n".join(lines)
+
+def run(args, flags, user_context, **kwargs):
+    """
+    Controls the kernel profiler and prints a summary of what it recorded.
+    """
+    action = args[0] if args else "stat"
+    if len(args) > 1 or action not in ("on", "off", "reset", "stat"):
+        return {
+            "success": False,
+            "error": {
+                "message": f"perf: invalid usage: {' '.join(args)}",
+                "suggestion": "Try 'perf on', 'perf off', 'perf reset' or 'perf stat'."
+            }
+        }
+
+    if action == "on":
+        profiler.enable()
+        return "perf: profiling enabled"
+    if action == "off":
+        profiler.disable()
+        return "perf: profiling disabled"
+    if action == "reset":
+        profiler.reset()
+        return "perf: counters and history cleared"
+
+    summary = profiler.summarize()
+    if flags.get('json'):
+        return json.dumps(summary, indent=2)
+    return _format_summary(summary)
+
+def man(args, flags, user_context, **kwargs):
+    return """
+NAME
+    perf - profile command execution in the kernel
+
+SYNOPSIS
+    perf on | off | reset
+    perf [stat] [--json]
+
+DESCRIPTION
+    While profiling is on, every command line is timed and kept in a ring
+    buffer of the last 256 lines: total and parse time, and per pipeline
+    stage the wall time, bytes in and out, and the number of filesystem
+    lookups and saves. 'top' shows the most recent entries. Profiling is
+    off by default and costs next to nothing while off.
+
+    on      Start recording.
+    off     Stop recording (the history is kept).
+    reset   Clear the counters and the history.
+    stat    Summarize the history per command, slowest first (default).
+
+OPTIONS
+    --json
+          Print the 'stat' summary as JSON.
+
+EXAMPLES
+    perf on
+    perf stat
+    perf stat --json
+"""
+
+def help(args, flags, user_context, **kwargs):
+    return "Usage: perf on | off | reset | stat [--json]"
@@ -1,8 +1,10 @@
 # gem/core/commands/post_message.py
 
+from jobs import job_manager
+
 def run(args, flags, user_context, **kwargs):
     """
-    Returns an effect to post a message to a specific job.
+    Posts a message to the queue of a running background job.
     """
     if len(args) != 2:
         return {
@@ -26,11 +28,15 @@ def run(args, flags, user_context, **kwargs):
 
     message = args[1]
 
-    return {
-        "effect": "post_message",
-        "job_id": job_id,
-        "message": message
-    }
+    if not job_manager.post_message(job_id, message):
+        return {
+            "success": False,
+            "error": {
+                "message": f"post_message: no such job: {job_id}",
+                "suggestion": "Run 'jobs' to see the running jobs."
+            }
+        }
+    return ""
 
 def man(args, flags, user_context, **kwargs):
     return """
@@ -1,6 +1,12 @@
 # /core/commands/ps.py
 
-def run(args, flags, user_context, jobs=None, **kwargs):
+from jobs import job_manager
+
+def _format_cpu_time(seconds):
+    seconds = int(seconds)
+    return f"{seconds // 3600:02d}:{(seconds % 3600) // 60:02d}:{seconds % 60:02d}"
+
+def run(args, flags, user_context, **kwargs):
     if args:
         return {
             "success": False,
@@ -10,24 +16,20 @@ def run(args, flags, user_context, jobs=None, **kwargs):
             }
         }
 
-    if not jobs:
-        jobs = {}
-
-    output = ["  PID STAT TTY          TIME CMD"]
-    sorted_pids = sorted(jobs.keys(), key=int)
+    output = ["  PID STAT TTY          TIME    OUTPUT CMD"]
 
-    for pid in sorted_pids:
-        job_details = jobs[pid]
-        pid_str = str(pid).rjust(5)
-        status = 'T' if job_details.get('status') == 'paused' else 'R'
+    for process in job_manager.get_process_list():
+        pid_str = str(process['pid']).rjust(5)
+        status = process['status']
         tty_str = "tty1".ljust(12)
-        time_str = "00:00:00".rjust(8)
-        cmd_str = job_details.get("command", "")
+        time_str = _format_cpu_time(process['cpu_time']).rjust(8)
+        bytes_str = str(process['output_bytes']).rjust(9)
+        cmd_str = process['command']
 
         if len(cmd_str) > 50:
             cmd_str = cmd_str[:47] + "..."
 
-        output.append(f"{pid_str} {status.ljust(4)} {tty_str}{time_str} {cmd_str}")
+        output.append(f"{pid_str} {status.ljust(4)} {tty_str}{time_str} {bytes_str} {cmd_str}")
 
     return "\n".join(output)
 
@@ -41,7 +43,8 @@ SYNOPSIS
 
 DESCRIPTION
     ps displays information about a selection of the active processes,
-    including background jobs and their current status (e.g., Running, Stopped).
+    including background jobs and their current status (e.g., Running, Stopped),
+    the CPU time they have used and the bytes of output they have produced.
 
 OPTIONS
     This command takes no options.
@@ -1,7 +1,9 @@
 # gem/core/commands/read_messages.py
 
+from jobs import job_manager
+
 def run(args, flags, user_context, **kwargs):
-    """ Returns an effect to read messages for a specific job. """
+    """ Reads (and clears) the pending messages of a specific job. """
     if len(args) != 1:
         return {
             "success": False,
@@ -22,10 +24,7 @@ def run(args, flags, user_context, **kwargs):
             }
         }
 
-    return {
-        "effect": "read_messages",
-        "job_id": job_id
-    }
+    return " ".join(job_manager.read_messages(job_id))
 
 def man(args, flags, user_context, **kwargs):
     return """
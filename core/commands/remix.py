@@ -8,6 +8,7 @@ def define_flags():
         'flags': [
             {'name': 'provider', 'short': 'p', 'long': 'provider', 'takes_value': True},
             {'name': 'model', 'short': 'm', 'long': 'model', 'takes_value': True},
+            {'name': 'no-cache', 'long': 'no-cache', 'takes_value': False},
         ],
         'metadata': {}
     }
@@ -67,7 +68,8 @@ async def run(args, flags, user_context, stdin_data=None, api_key=None, ai_manag
     provider = flags.get("provider") or "ollama"
     model = flags.get("model")
 
-    result = await ai_manager.perform_remix(path1, content1, path2, content2, provider, model, api_key)
+    result = await ai_manager.perform_remix(path1, content1, path2, content2, provider, model, api_key,
+                                            use_cache=not flags.get('no-cache'))
 
     if result["success"]:
         return {
@@ -84,7 +86,7 @@ NAME
     remix - Synthesizes a new article from two source documents using AI.
 
 SYNOPSIS
-    remix [-p provider] [-m model] <file1> <file2>
+    remix [-p provider] [-m model] [--no-cache] <file1> <file2>
 
 DESCRIPTION
     The remix command uses an AI to read two source files, understand the
@@ -96,6 +98,9 @@ OPTIONS
         Specify the AI provider (e.g., 'gemini', 'ollama'). Defaults to 'ollama'.
     -m, --model <name>
         Specify the exact model name to use for the chosen provider.
+    --no-cache
+        Ask the provider even if an identical request was answered before.
+        Answers are otherwise reused from ~/.cache/llm_responses.json.
 
 EXAMPLES
     remix document_a.txt document_b.txt
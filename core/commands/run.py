@@ -1,8 +1,10 @@
 # gemini/core/commands/run.py
 
 from filesystem import fs_manager
+from executor import command_executor
+from scripting import script_manager
 
-def run(args, flags, user_context, **kwargs):
+async def run(args, flags, user_context, **kwargs):
     if not args:
         return {
             "success": False,
@@ -32,57 +34,13 @@ def run(args, flags, user_context, **kwargs):
 
     script_node = validation_result.get("node")
     script_content = script_node.get('content', '')
-    lines = script_content.splitlines()
-
-    commands_to_execute = []
-    i = 0
-    while i < len(lines):
-        line = lines[i]
-        stripped_line = line.strip()
-
-        if not stripped_line or stripped_line.startswith('#'):
-            i += 1
-            continue
-
-        line_parts = stripped_line.split()
-        cmd = line_parts[0] if line_parts else ""
-        num_parts = len(line_parts)
-        password_lines_needed = 0
-
-        if cmd == 'useradd' and num_parts == 2:
-            password_lines_needed = 2
-        elif cmd == 'sudo':
-            password_lines_needed = 1
-        elif cmd in ['su', 'login'] and num_parts < 3:
-            password_lines_needed = 1
-
-        if password_lines_needed > 0:
-            password_pipe = []
-            lookahead_index = i + 1
-            lines_consumed = 0
-
-            while lookahead_index < len(lines) and len(password_pipe) < password_lines_needed:
-                next_line = lines[lookahead_index]
-                lines_consumed += 1
-                if next_line.strip() and not next_line.strip().startswith('#'):
-                    password_pipe.append(next_line)
-                lookahead_index += 1
-
-            command_obj = {
-                "command": line,
-                "password_pipe": password_pipe if len(password_pipe) == password_lines_needed else None
-            }
-            commands_to_execute.append(command_obj)
-            i += 1 + lines_consumed
-        else:
-            commands_to_execute.append({"command": line})
-            i += 1
-
-    return {
-        "effect": "execute_script",
-        "lines": commands_to_execute,
-        "args": script_args
-    }
+
+    return await script_manager.start(
+        script_content,
+        script_path,
+        script_args,
+        command_executor.get_context_json()
+    )
 
 def man(args, flags, user_context, **kwargs):
     return """
@@ -95,10 +53,18 @@ SYNOPSIS
 DESCRIPTION
     The run command reads and executes commands from a file in the current
     shell environment. It is useful for automating tasks. Script arguments
-    can be accessed within the script using $1, $2, etc. It also supports
-    non-interactive password setting for commands like 'useradd' or 'sudo'
-    by placing the required password(s) on the line(s) immediately following
-    the command.
+    can be accessed within the script using $1, $2, etc., along with $#
+    (argument count), $@ (all arguments) and $? (status of the last command).
+
+    Scripts are interpreted inside the kernel and support control flow:
+    if/elif/else/fi, while/until ... do ... done, for VAR in WORDS; do ...
+    done, functions ('name() { ... }'), break, continue, return and exit.
+    Use 'test' or '[ ... ]' for conditions. Outside of conditions, the
+    script stops at the first command that fails.
+
+    It also supports non-interactive password setting for commands like
+    'useradd' or 'sudo' by placing the required password(s) on the line(s)
+    immediately following the command.
 
 OPTIONS
     This command takes no options.
@@ -106,6 +72,11 @@ OPTIONS
 EXAMPLES
     run my_setup_script.sh
     run backup.sh "my_project"
+
+    A script using control flow:
+        for f in *.txt; do
+            if [ -s $f ]; then echo "$f has content"; fi
+        done
 """
 
 def help(args, flags, user_context, **kwargs):
@@ -2,6 +2,7 @@
 
 import shlex
 from session import env_manager
+from tracing import tracer
 
 def run(args, flags, user_context, stdin_data=None):
     if not args:
@@ -9,6 +10,15 @@ def run(args, flags, user_context, stdin_data=None):
         output = [f"{key}={value}" for key, value in sorted(all_vars.items())]
         return "\n".join(output)
 
+    # 'set -x' / 'set +x' switch kernel tracing on and off.
+    if args == ['-x'] or args == ['+x']:
+        if args[0] == '-x':
+            tracer.enable()
+        else:
+            tracer.disable()
+            tracer.flush()
+        return ""
+
     arg_string = " ".join(args)
     if '=' in arg_string:
         try:
@@ -68,20 +78,30 @@ NAME
 
 SYNOPSIS
     set [variable[=value]]
+    set -x | +x
 
 DESCRIPTION
     Set or display environment variables. When run without arguments, it displays
     a list of all current environment variables. When a variable and value
     are provided, it sets or updates the variable.
 
+    Setting PIPELINE_FUSION=off makes the shell run every pipeline stage as
+    written instead of replacing common chains such as
+    'sort | uniq -c | sort -nr | head' with equivalent single-pass versions.
+
+    'set -x' turns on kernel tracing (see 'trace') and 'set +x' turns it
+    off again, writing the recorded spans to /var/log/trace.jsonl.
+
 OPTIONS
-    This command takes no options.
+    -x    Enable tracing.
+    +x    Disable tracing and flush the recorded spans.
 
 EXAMPLES
     set
     set MY_VAR="hello world"
     set PROMPT_STYLE="simple"
+    set PIPELINE_FUSION=off
 """
 
 def help(args, flags, user_context, stdin_data=None):
-    return "Usage: set [variable[=value]]"
\ No newline at end of file
+    return "Usage: set [variable[=value]] | set -x | set +x"
\ No newline at end of file
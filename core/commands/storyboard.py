@@ -14,6 +14,7 @@ def define_flags():
             {'name': 'ask', 'long': 'ask', 'takes_value': True},
             {'name': 'provider', 'long': 'provider', 'takes_value': True},
             {'name': 'model', 'long': 'model', 'takes_value': True},
+            {'name': 'no-cache', 'long': 'no-cache', 'takes_value': False},
         ],
         'metadata': {}
     }
@@ -90,7 +91,8 @@ async def run(args, flags, user_context, stdin_data=None, ai_manager=None, api_k
         question=flags.get('ask'),
         provider=flags.get('provider', 'ollama'),
         model=flags.get('model'),
-        api_key=api_key
+        api_key=api_key,
+        use_cache=not flags.get('no-cache')
     )
 
     if result.get("success"):
@@ -128,6 +130,9 @@ OPTIONS
         Specify the AI provider (e.g., 'gemini', 'ollama'). Defaults to 'ollama'.
     --model <name>
         Specify the exact model name to use for the chosen provider.
+    --no-cache
+        Ask the provider even if an identical request was answered before.
+        Answers are otherwise reused from ~/.cache/llm_responses.json.
 
 EXAMPLES
     storyboard /home/guest/my_project
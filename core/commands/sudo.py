@@ -25,8 +25,9 @@ def run(args, flags, user_context, user_groups=None, stdin_data=None, **kwargs):
 
     groups_for_user = user_groups.get(username, []) if user_groups else []
     command_name = command_to_run_parts[0]
+    decision = sudo_manager.authorize(username, groups_for_user, command_name, command_to_run_parts[1:])
 
-    if not sudo_manager.can_user_run_command(username, groups_for_user, command_name):
+    if not decision["allowed"]:
         audit_manager.log(username, 'SUDO_FAILURE', f"Reason: Not in sudoers for '{command_name}'", user_context)
         return {
             "success": False,
@@ -40,7 +41,8 @@ def run(args, flags, user_context, user_groups=None, stdin_data=None, **kwargs):
     return {
         "effect": "sudo_exec",
         "command": full_command_str,
-        "password": stdin_data
+        "password": stdin_data,
+        "nopasswd": decision["nopasswd"]
     }
 
 def man(args, flags, user_context, **kwargs):
@@ -54,7 +56,10 @@ SYNOPSIS
 DESCRIPTION
     sudo allows a permitted user to execute a command as the superuser (root),
     as specified by the security policy in the /etc/sudoers file. The user
-    will be prompted for their own password to authenticate.
+    will be prompted for their own password to authenticate, unless the
+    rule that allows the command is tagged NOPASSWD. After a successful
+    authentication, sudo does not ask again for 'timestamp_timeout' minutes
+    (set with 'Defaults timestamp_timeout=N' in /etc/sudoers).
 
 OPTIONS
     This command takes no options.
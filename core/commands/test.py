@@ -0,0 +1,119 @@
+# gem/core/commands/test.py
+
+from filesystem import fs_manager
+
+UNARY_FILE_OPERATORS = {
+    '-e': lambda node: node is not None,
+    '-f': lambda node: node is not None and node.get('type') == 'file',
+    '-d': lambda node: node is not None and node.get('type') == 'directory',
+    '-L': lambda node: node is not None and node.get('type') == 'symlink',
+    '-s': lambda node: node is not None and node.get('type') == 'file' and len(node.get('content', '')) > 0,
+}
+
+INTEGER_OPERATORS = {
+    '-eq': lambda a, b: a == b,
+    '-ne': lambda a, b: a != b,
+    '-lt': lambda a, b: a < b,
+    '-le': lambda a, b: a <= b,
+    '-gt': lambda a, b: a > b,
+    '-ge': lambda a, b: a >= b,
+}
+
+def _evaluate(tokens):
+    """Evaluates a test expression, raising ValueError on malformed input."""
+    if not tokens:
+        return False
+
+    if tokens[0] == '!':
+        return not _evaluate(tokens[1:])
+
+    for joiner in ('-o', '-a'):
+        if joiner in tokens:
+            index = tokens.index(joiner)
+            left, right = tokens[:index], tokens[index + 1:]
+            if joiner == '-o':
+                return _evaluate(left) or _evaluate(right)
+            return _evaluate(left) and _evaluate(right)
+
+    if len(tokens) == 1:
+        return tokens[0] != ""
+
+    if len(tokens) == 2:
+        operator, operand = tokens
+        if operator == '-z':
+            return operand == ""
+        if operator == '-n':
+            return operand != ""
+        if operator in UNARY_FILE_OPERATORS:
+            node = fs_manager.get_node(operand, resolve_symlink=(operator != '-L'))
+            return UNARY_FILE_OPERATORS[operator](node)
+        raise ValueError(f"unknown unary operator '{operator}'")
+
+    if len(tokens) == 3:
+        left, operator, right = tokens
+        if operator in ('=', '=='):
+            return left == right
+        if operator == '!=':
+            return left != right
+        if operator in INTEGER_OPERATORS:
+            try:
+                return INTEGER_OPERATORS[operator](int(left), int(right))
+            except ValueError:
+                raise ValueError(f"integer expression expected: '{left}' {operator} '{right}'")
+        raise ValueError(f"unknown binary operator '{operator}'")
+
+    raise ValueError("too many arguments")
+
+def run(args, flags, user_context, **kwargs):
+    """
+    Evaluates a conditional expression. A true expression succeeds with no
+    output; a false one fails quietly so it can drive '&&', '||' and script
+    control flow.
+    """
+    try:
+        if _evaluate(list(args)):
+            return ""
+        return {"success": False, "output": ""}
+    except ValueError as e:
+        return {
+            "success": False,
+            "error": {
+                "message": f"test: {e}",
+                "suggestion": "See 'man test' for the supported expressions."
+            }
+        }
+
+def man(args, flags, user_context, **kwargs):
+    return """
+NAME
+    test, [ - evaluate a conditional expression
+
+SYNOPSIS
+    test EXPRESSION
+    [ EXPRESSION ]
+
+DESCRIPTION
+    Exits successfully if EXPRESSION is true and fails silently if it is
+    false, which makes it the condition of choice for 'if' and 'while' in
+    scripts and for '&&' / '||' chains on the command line.
+
+OPTIONS
+    -e FILE, -f FILE, -d FILE, -L FILE, -s FILE
+          FILE exists / is a regular file / is a directory / is a symbolic
+          link / is a non-empty file.
+    -z STRING, -n STRING
+          STRING is empty / non-empty.
+    S1 = S2, S1 != S2
+          The strings are equal / not equal.
+    N1 -eq N2, -ne, -lt, -le, -gt, -ge
+          Integer comparisons.
+    ! EXPR, EXPR -a EXPR, EXPR -o EXPR
+          Negation, logical AND and logical OR.
+
+EXAMPLES
+    [ -f notes.txt ] && cat notes.txt
+    test "$USER" = root || echo "not root"
+"""
+
+def help(args, flags, user_context, **kwargs):
+    return "Usage: test EXPRESSION | [ EXPRESSION ]"
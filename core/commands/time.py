@@ -0,0 +1,58 @@
+# gem/core/commands/time.py
+
+from executor import command_executor
+from profiler import profiler, format_record
+
+async def run(args, flags, user_context, stdin_data=None, **kwargs):
+    """
+    Runs a command and reports how long it took. At the start of a command
+    line, 'time' is handled by the executor and covers the whole pipeline;
+    this entry point handles 'time' reached elsewhere (mid-pipeline, xargs).
+    """
+    if not args:
+        return {
+            "success": False,
+            "error": {
+                "message": "time: missing command",
+                "suggestion": "Try 'time ls -l' or 'time cat file | sort'."
+            }
+        }
+
+    record, token = profiler.begin(" ".join(args), force=True)
+    try:
+        result = await command_executor.run_argv(args, stdin_data)
+    finally:
+        if record:
+            profiler.end(record, token)
+
+    if record:
+        report = format_record(record)
+        result["output"] = f"{result['output']}\n{report}" if result.get("output") else report
+    return result
+
+def man(args, flags, user_context, **kwargs):
+    return """
+NAME
+    time - run a command line and report where the time went
+
+SYNOPSIS
+    time COMMAND [ARGS...] [| COMMAND...]
+
+DESCRIPTION
+    Runs the given command line (including pipes, '&&' and redirection)
+    and appends a timing report to its output: the total wall time, the
+    time spent expanding and parsing the line, and for every pipeline stage
+    its wall time, bytes read and written, and the number of filesystem
+    lookups (get_node) and saves it caused. The run is also added to the
+    profiler's history shown by 'perf stat' and 'top'.
+
+OPTIONS
+    This command takes no options.
+
+EXAMPLES
+    time ls -R /
+    time cat /var/log/audit.log | grep SUDO | wc -l
+"""
+
+def help(args, flags, user_context, **kwargs):
+    return "Usage: time COMMAND [ARGS...] [| COMMAND...]"
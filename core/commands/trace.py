@@ -0,0 +1,93 @@
+# gem/core/commands/trace.py
+
+from tracing import tracer, build_flame_report, TRACE_PATH
+
+def define_flags():
+    """Declares the flags that the trace command accepts."""
+    return {
+        'flags': [],
+        'metadata': {
+            'root_required': True
+        }
+    }
+
+def run(args, flags, user_context, **kwargs):
+    """
+    Controls kernel tracing and summarizes the spans recorded in the trace file.
+    """
+    action = args[0] if args else "status"
+    if len(args) > 1 or action not in ("on", "off", "flush", "clear", "report", "status"):
+        return {
+            "success": False,
+            "error": {
+                "message": f"trace: invalid usage: {' '.join(args)}",
+                "suggestion": "Try 'trace on', 'trace off', 'trace flush', 'trace clear' or 'trace report'."
+            }
+        }
+
+    if action == "on":
+        tracer.enable()
+        return f"trace: tracing enabled, spans go to {TRACE_PATH}"
+    if action == "clear":
+        tracer.clear()
+        return "trace: buffer and trace file cleared"
+    if action == "status":
+        return (f"trace: tracing {'on' if tracer.enabled else 'off'}, "
+                f"{len(tracer.buffer)} span(s) buffered, {tracer.dropped} dropped")
+
+    # 'off', 'flush' and 'report' all write out what is buffered first.
+    if action == "off":
+        tracer.disable()
+    flushed = tracer.flush()
+    if not flushed["success"]:
+        return {
+            "success": False,
+            "error": {"message": f"trace: {flushed['error']}", "suggestion": "Check that /var/log is writable by root."}
+        }
+    if action == "off":
+        return f"trace: tracing disabled, {flushed['written']} span(s) flushed"
+    if action == "flush":
+        return f"trace: {flushed['written']} span(s) written to {TRACE_PATH}"
+
+    spans = tracer.load()
+    if not spans:
+        return f"trace: no spans recorded in {TRACE_PATH}"
+    return build_flame_report(spans)
+
+def man(args, flags, user_context, **kwargs):
+    return """
+NAME
+    trace - record structured trace spans of kernel activity
+
+SYNOPSIS
+    trace on | off | flush | clear | report | status
+
+DESCRIPTION
+    While tracing is on, the kernel records nested spans for every syscall,
+    command line (parsing and each command run), filesystem write, save,
+    rename and removal, and every LLM request. Each span has a name, a
+    start time, a duration and attributes. Spans are kept in memory and
+    appended to /var/log/trace.jsonl as JSON lines, one span per line, for
+    offline analysis. The file is owned by root and not readable by other
+    users. Once it reaches 256 KB it is rotated to trace.jsonl.1, and so on
+    up to trace.jsonl.4; older segments are deleted. 'set -x' and 'set +x'
+    turn tracing on and off as well. Only root may use this command.
+
+    on      Start tracing.
+    off     Stop tracing and flush the buffered spans.
+    flush   Write the buffered spans to the trace file now.
+    clear   Drop the buffered spans, empty the trace file and delete its
+            rotated segments.
+    report  Flush, then fold every span in the trace files into a call tree
+            and print it flame-graph style: total time, number of calls and
+            share of the traced time per node, heaviest first.
+    status  Show whether tracing is on and how many spans are buffered (default).
+
+EXAMPLES
+    trace on
+    find / -name "*.md" | wc -l
+    trace report
+"""
+
+def help(args, flags, user_context, **kwargs):
+    return "Usage: trace on | off | flush | clear | report | status"
@@ -1,21 +1,82 @@
 # gem/core/commands/useradd.py
 
-from users import user_manager
+import time
+from users import user_manager, parse_user_batch
 from filesystem import fs_manager
 from groups import group_manager
 from audit import audit_manager
+from transactions import transaction_manager
 
 def define_flags():
     """Declares the flags that the useradd command accepts."""
     return {
-        'flags': [],
+        'flags': [
+            {'name': 'batch', 'long': 'batch', 'takes_value': True},
+        ],
         'metadata': {
             'root_required': True
         }
     }
 
 
-def run(args, flags, user_context, stdin_data=None, **kwargs):
+async def _run_batch(path, user_context):
+    """Creates every account listed in a CSV or JSON file (see UserManager.bulk_register)."""
+    actor = user_context.get('name')
+    node = fs_manager.get_node(path)
+    if not node or node.get('type') != 'file':
+        return {"success": False, "error": {"message": f"useradd: {path}: No such file", "suggestion": "Give the path of a CSV or JSON batch file."}}
+    if not fs_manager.has_permission(path, user_context, 'read'):
+        return {"success": False, "error": {"message": f"useradd: {path}: Permission denied", "suggestion": "Check the permissions of the batch file."}}
+
+    audit_manager.log(actor, 'USERADD_BATCH_ATTEMPT', f"Attempting to add users from '{path}'", user_context)
+    try:
+        users, groups = parse_user_batch(node.get('content', ''))
+    except ValueError as e:
+        audit_manager.log(actor, 'USERADD_BATCH_FAILURE', f"Reason: {e}", user_context)
+        return {"success": False, "error": {"message": f"useradd: {path}: {e}", "suggestion": "See 'man useradd' for the batch file formats."}}
+    if not users and not groups:
+        return {"success": False, "error": {"message": f"useradd: {path}: no users in batch", "suggestion": "See 'man useradd' for the batch file formats."}}
+
+    report = [f"useradd: {len(users)} user(s) and {len(groups)} extra group(s) read from {path}"]
+    step = max(1, len(users) // 10)
+    started = time.perf_counter()
+
+    def progress(stage, done, total):
+        if done % step == 0 or done == total:
+            report.append(f"  hashed {done}/{total} passwords ({time.perf_counter() - started:.2f}s)")
+
+    result = await user_manager.bulk_register(users, groups, progress=progress)
+    if not result["success"]:
+        audit_manager.log(actor, 'USERADD_BATCH_FAILURE', f"Reason: {result['error']}", user_context)
+        shown = result["errors"][:20]
+        more = len(result["errors"]) - len(shown)
+        details = "\n".join(shown + ([f"... and {more} more"] if more > 0 else []))
+        return {"success": False, "error": {"message": f"useradd: {result['error']}" + (f"\n{details}" if details else ""),
+                                            "suggestion": "Fix the listed entries and run the batch again." if shown else
+                                                          "An internal error occurred. No user, group or directory was created."}}
+
+    for entry in users:
+        audit_manager.log(actor, 'USERADD_SUCCESS', f"Successfully added user '{entry['username']}' (batch)", user_context)
+    summary = result["summary"]
+    audit_manager.log(actor, 'USERADD_BATCH_SUCCESS', f"Added {summary['users']} users from '{path}'", user_context)
+    report.append(f"useradd: created {summary['users']} user(s), {summary['homes']} home director(ies), "
+                  f"{summary['groups']} group(s) and {summary['memberships']} membership(s) "
+                  f"in {summary['seconds']:.2f}s")
+    return {
+        "success": True,
+        "output": "\n".join(report),
+        "effect": "sync_user_and_group_state",
+        "users": user_manager.get_all_users(),
+        "groups": group_manager.get_all_groups()
+    }
+
+
+async def run(args, flags, user_context, stdin_data=None, **kwargs):
+    if flags.get('batch'):
+        if args:
+            return {"success": False, "error": {"message": "useradd: --batch takes no username operand", "suggestion": "Try 'useradd --batch <file>'."}}
+        return await _run_batch(flags['batch'], user_context)
+
     if not args:
         return {
             "success": False,
@@ -73,31 +134,35 @@ def run(args, flags, user_context, stdin_data=None, **kwargs):
                     }
                 }
 
-            if not group_manager.group_exists(username):
-                if not group_manager.create_group(username):
-                    error_msg = f"useradd: failed to create group '{username}'"
-                    audit_manager.log(actor, 'USERADD_FAILURE', f"Reason: {error_msg}", user_context)
-                    return {"success": False, "error": {"message": error_msg, "suggestion": "An internal error occurred."}}
-
-            group_manager.add_user_to_group(username, username)
-            registration_result = user_manager.register_user(username, password, username)
-
-            if registration_result["success"]:
-                home_path = f"/home/{username}"
-                fs_manager.create_directory(home_path, {"name": "root", "group": "root"})
-                fs_manager.chown(home_path, username)
-                fs_manager.chgrp(home_path, username)
-                audit_manager.log(actor, 'USERADD_SUCCESS', f"Successfully added user '{username}'", user_context)
-                return {
-                    "success": True,
-                    "output": f"User '{username}' registered. Home directory created at /home/{username}.",
-                    "effect": "sync_user_and_group_state",
-                    "users": user_manager.get_all_users(),
-                    "groups": group_manager.get_all_groups()
-                }
-            else:
-                audit_manager.log(actor, 'USERADD_FAILURE', f"Reason: {registration_result.get('error')}", user_context)
-                return {"success": False, "error": {"message": registration_result.get('error'), "suggestion": "An internal error occurred during user registration."}}
+            try:
+                # The group, account and home directory are created together or not at all.
+                with transaction_manager.transaction():
+                    if not group_manager.group_exists(username):
+                        if not group_manager.create_group(username):
+                            raise RuntimeError(f"useradd: failed to create group '{username}'")
+
+                    group_manager.add_user_to_group(username, username)
+                    registration_result = user_manager.register_user(username, password, username)
+                    if not registration_result["success"]:
+                        raise RuntimeError(registration_result.get('error'))
+
+                    home_path = f"/home/{username}"
+                    fs_manager.create_directory(home_path, {"name": "root", "group": "root"})
+                    fs_manager.chown(home_path, username)
+                    fs_manager.chgrp(home_path, username)
+            except (RuntimeError, OSError) as e:
+                error_msg = str(e)
+                audit_manager.log(actor, 'USERADD_FAILURE', f"Reason: {error_msg}", user_context)
+                return {"success": False, "error": {"message": error_msg, "suggestion": "An internal error occurred. No user, group or directory was created."}}
+
+            audit_manager.log(actor, 'USERADD_SUCCESS', f"Successfully added user '{username}'", user_context)
+            return {
+                "success": True,
+                "output": f"User '{username}' registered. Home directory created at /home/{username}.",
+                "effect": "sync_user_and_group_state",
+                "users": user_manager.get_all_users(),
+                "groups": group_manager.get_all_groups()
+            }
         except IndexError:
             error_msg = "useradd: malformed password lines from stdin"
             audit_manager.log(actor, 'USERADD_FAILURE', f"Reason: {error_msg} for user '{username}'", user_context)
@@ -119,6 +184,7 @@ NAME
 
 SYNOPSIS
     useradd [username]
+    useradd --batch FILE
 
 DESCRIPTION
     Creates a new user account with the specified username. This command
@@ -127,11 +193,26 @@ DESCRIPTION
     password. This command requires root privileges.
 
 OPTIONS
-    This command takes no options.
+    --batch=FILE
+        Create every account listed in FILE, a CSV or JSON file. The whole
+        file is checked first; if any entry is invalid, the problems are
+        listed and nothing is created. Otherwise all users, groups,
+        memberships and home directories are created together and saved
+        once, and a summary is printed. Passwords are hashed before
+        anything is created, while other sessions keep running; a progress
+        line with the time taken so far is added for every tenth of them.
+
+        CSV: one user per row, 'username,password[,groups]', with groups
+        separated by ';'. A header row and '#' comments are allowed.
+
+        JSON: a list of {"username", "password", "groups"} objects, or an
+        object with that list as "users" and an optional "groups" object
+        mapping group names to members (new or existing users).
 
 EXAMPLES
     sudo useradd jerry
+    sudo useradd --batch /home/root/class.csv
 """
 
 def help(args, flags, user_context, **kwargs):
-    return "Usage: useradd <username>"
\ No newline at end of file
+    return "Usage: useradd <username> | useradd --batch <file>"
\ No newline at end of file
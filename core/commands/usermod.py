@@ -50,6 +50,8 @@ def run(args, flags, user_context, **kwargs):
                 }
             }
         if group_manager.add_user_to_group(username, group_to_add):
+            # Group membership decides sudo rights, so earlier authentications no longer stand.
+            user_manager.invalidate_tickets(username)
             return {
                 "success": True,
                 "output": f"Added user '{username}' to group '{group_to_add}'.",
@@ -70,6 +72,7 @@ def run(args, flags, user_context, **kwargs):
             }
 
         user_manager.get_user(username)['primaryGroup'] = primary_group_to_set
+        user_manager.invalidate_tickets(username)
         return {"success": True, "output": f"Set primary group for '{username}' to '{primary_group_to_set}'."}
 
     return {
@@ -1,59 +1,110 @@
 # gem/core/commands/xargs.py
 
 import shlex
+from executor import command_executor
 
 def define_flags():
     """Declares the flags that the xargs command accepts."""
     return {
         'flags': [
             {'name': 'replace-str', 'short': 'I', 'long': 'replace-str', 'takes_value': True},
+            {'name': 'max-args', 'short': 'n', 'long': 'max-args', 'takes_value': True},
+            {'name': 'max-lines', 'short': 'L', 'long': 'max-lines', 'takes_value': True},
+            {'name': 'max-procs', 'short': 'P', 'long': 'max-procs', 'takes_value': True},
         ],
         'metadata': {}
     }
 
 
-def run(args, flags, user_context, stdin_data=None, **kwargs):
+def _split_items(text):
+    """Splits input by whitespace, respecting quotes."""
+    try:
+        return shlex.split(text)
+    except ValueError:
+        # Fallback for simple whitespace-separated lists if shlex fails.
+        return text.split()
+
+
+def _positive_int(flags, name):
+    value = flags.get(name)
+    if value is None:
+        return None
+    number = int(value)
+    if number < 1:
+        raise ValueError
+    return number
+
+
+async def run(args, flags, user_context, stdin_data=None, **kwargs):
     if stdin_data is None:
         return ""
 
     command_to_run_parts = args if args else ['echo']
     replace_str = flags.get('replace-str')
 
-    # Correctly determine how to split the input
+    try:
+        max_args = _positive_int(flags, 'max-args')
+        max_lines = _positive_int(flags, 'max-lines')
+        max_procs = _positive_int(flags, 'max-procs') or 1
+    except ValueError:
+        return {
+            "success": False,
+            "error": {
+                "message": "xargs: -n, -L and -P take a positive integer",
+                "suggestion": "Try 'xargs -n 10 <command>'."
+            }
+        }
+
+    lines = [line for line in stdin_data.splitlines() if line.strip()]
+    argv_list = []
+
     if replace_str:
         # With -I, process line by line, preserving spaces in each line.
-        input_items = [line for line in stdin_data.splitlines() if line.strip()]
+        # Each line produces its own command.
+        for item in lines:
+            argv_list.append([part.replace(replace_str, item) for part in command_to_run_parts])
+    elif max_lines:
+        for i in range(0, len(lines), max_lines):
+            batch = []
+            for line in lines[i:i + max_lines]:
+                batch.extend(_split_items(line))
+            argv_list.append(command_to_run_parts + batch)
     else:
-        # Without -I, split by whitespace, respecting quotes.
-        try:
-            input_items = shlex.split(stdin_data)
-        except ValueError:
-            # Fallback for simple newline-separated lists if shlex fails.
-            input_items = [line for line in stdin_data.splitlines() if line.strip()]
-
-    if not input_items:
+        input_items = _split_items(stdin_data)
+        if max_args:
+            for i in range(0, len(input_items), max_args):
+                argv_list.append(command_to_run_parts + input_items[i:i + max_args])
+        elif input_items:
+            # Without batching flags, all items go to a single command.
+            argv_list.append(command_to_run_parts + input_items)
+
+    if not argv_list:
         return ""
 
-    new_commands = []
-
-    if replace_str:
-        for item in input_items:
-            # When -I is used, we process each item to generate a new command.
-            # The item is the full line from stdin.
-            substituted_parts = [
-                part.replace(replace_str, item) for part in command_to_run_parts
-            ]
-            new_commands.append(" ".join(shlex.quote(p) for p in substituted_parts))
-    else:
-        # When no -I, append all items as separate arguments to a single command.
-        full_command_parts = command_to_run_parts + input_items
-        new_commands.append(" ".join(shlex.quote(p) for p in full_command_parts))
-
-
-    return {
-        "effect": "execute_commands",
-        "commands": new_commands
-    }
+    results = await command_executor.run_argv_list(argv_list, max_procs=max_procs)
+
+    outputs, effects, errors = [], [], []
+    for argv, result in zip(argv_list, results):
+        if result.get('effect'):
+            effects.append(result)
+        effects.extend(result.get('effects', []))
+        if result.get('output') and not result.get('effect'):
+            outputs.append(str(result['output']))
+        if not result.get('success'):
+            error = result.get('error')
+            message = error.get('message') if isinstance(error, dict) else error
+            if message:
+                errors.append(message)
+
+    response = {"success": not errors, "output": "\n".join(outputs)}
+    if errors:
+        response["error"] = {
+            "message": "\n".join(errors),
+            "suggestion": f"{len(errors)} of {len(argv_list)} invocations of '{command_to_run_parts[0]}' failed."
+        }
+    if effects:
+        response["effects"] = effects
+    return response
 
 
 def man(args, flags, user_context, **kwargs):
@@ -62,11 +113,15 @@ NAME
     xargs - build and execute command lines from standard input
 
 SYNOPSIS
-    [command] | xargs [-I replace-str] [utility [argument ...]]
+    [command] | xargs [-I replace-str] [-n max-args] [-L max-lines] [-P max-procs]
+                      [utility [argument ...]]
 
 DESCRIPTION
     The xargs utility reads space or newline delimited strings from standard
     input and executes the specified utility with the strings as arguments.
+    By default all strings are passed to a single invocation of the utility.
+    Commands run directly inside the kernel, and any filesystem changes they
+    make are saved once, when xargs finishes.
 
 OPTIONS
     -I replace-str
@@ -74,10 +129,22 @@ OPTIONS
           with names read from standard input. This executes the utility
           once for each input line.
 
+    -n max-args
+          Use at most max-args strings per invocation of the utility.
+
+    -L max-lines
+          Use the strings from at most max-lines input lines per invocation.
+
+    -P max-procs
+          Run up to max-procs invocations at a time. Only utilities that
+          run asynchronously (e.g. network or AI commands) actually overlap;
+          others still run one after another.
+
 EXAMPLES
     ls | xargs rm
     find . -name "*.tmp" | xargs -I {} rm {}
+    ls *.md | xargs -n 2 -P 4 remix
 """
 
 def help(args, flags, user_context, **kwargs):
-    return "Usage: [command] | xargs [-I repl] [utility [argument ...]]"
\ No newline at end of file
+    return "Usage: [command] | xargs [-I repl] [-n max-args] [-L max-lines] [-P max-procs] [utility [argument ...]]"
\ No newline at end of file
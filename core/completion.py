@@ -0,0 +1,292 @@
+# gem/core/completion.py
+
+import json
+import os
+import re
+from bisect import bisect_left
+from executor import command_executor
+from filesystem import fs_manager
+from session import env_manager, alias_manager
+from groups import group_manager
+from users import user_manager
+
+MAX_CANDIDATES = 200
+# Sorts after any character a name can continue with, closing a prefix range.
+PREFIX_RANGE_END = '\U0010ffff'
+WORD_BREAKS = ' \t|;&<>'
+COMMAND_SEPARATORS = ('|', ';', '&')
+USER_COMMANDS = ('su', 'chown', 'usermod', 'removeuser', 'groups', 'passwd', 'login')
+GROUP_COMMANDS = ('chgrp',)
+COMMAND_COMMANDS = ('help', 'man', 'alias', 'unalias')
+MAX_DIRECTORY_INDEXES = 64
+VARIABLE_REFERENCE = re.compile(r'\$(\{?)([A-Za-z_][A-Za-z0-9_]*)?$')
+
+
+class PrefixTrie:
+    """
+    Command names and aliases by prefix. Each node is a dict from the next
+    character to the child node; the key '' marks the end of a word.
+    """
+    def __init__(self, words=()):
+        self.root = {}
+        self.size = 0
+        for word in words:
+            self.insert(word)
+
+    def insert(self, word):
+        node = self.root
+        for ch in word:
+            node = node.setdefault(ch, {})
+        if '' not in node:
+            node[''] = True
+            self.size += 1
+
+    def walk(self, node, text):
+        """The node reached by following 'text' down from 'node', or None."""
+        for ch in text:
+            node = node.get(ch)
+            if node is None:
+                return None
+        return node
+
+    def words(self, node, prefix, limit=None):
+        """Every word below 'node' (which 'prefix' leads to), in sorted order."""
+        found, stack = [], [(node, prefix)]
+        while stack and (limit is None or len(found) < limit):
+            node, word = stack.pop()
+            if '' in node:
+                found.append(word)
+            # Pushed in reverse so the smallest character comes off the stack first.
+            stack.extend((node[ch], word + ch) for ch in sorted(node, reverse=True) if ch)
+        return found
+
+    def count(self, node):
+        total, stack = 0, [node]
+        while stack:
+            node = stack.pop()
+            total += '' in node
+            stack.extend(child for ch, child in node.items() if ch)
+        return total
+
+    def common_extension(self, node):
+        """The characters every word below 'node' continues with."""
+        extension = ''
+        while len(node) == 1 and '' not in node:
+            ch, node = next(iter(node.items()))
+            extension += ch
+        return extension
+
+
+class SortedNames:
+    """
+    A sorted list of names searched by prefix with bisect: the names that
+    start with a prefix form one contiguous range, and the longest prefix
+    they share is the one shared by the first and last name in it.
+    """
+    def __init__(self, names, source=None, signature=None):
+        self.names = sorted(names)
+        self.source = source
+        self.signature = signature
+
+    def search(self, prefix, lo=0, hi=None):
+        """The (lo, hi) range of names starting with 'prefix', searching only within lo:hi."""
+        hi = len(self.names) if hi is None else hi
+        lo = bisect_left(self.names, prefix, lo, hi)
+        return lo, bisect_left(self.names, prefix + PREFIX_RANGE_END, lo, hi)
+
+    def common_prefix(self, lo, hi):
+        return os.path.commonprefix([self.names[lo], self.names[hi - 1]]) if hi > lo else ''
+
+
+def _word_at(line, cursor):
+    """
+    Finds the word being completed: returns (start, quote) where line[start:cursor]
+    is the word and quote is the quote character it opens with, if any.
+    """
+    start, quote = 0, None
+    i = 0
+    while i < cursor:
+        ch = line[i]
+        if quote:
+            if ch == quote:
+                quote = None
+        elif ch == '\\':
+            i += 1
+        elif ch in ('"', "'") and i == start:
+            quote = ch
+        elif ch in WORD_BREAKS:
+            start = i + 1
+        i += 1
+    word = line[start:cursor]
+    return start, (word[0] if word[:1] in ('"', "'") else None)
+
+
+def _segment_words(line, start):
+    """The words of the current command (after the last |, ; or &) before position 'start'."""
+    segment = line[:start]
+    for separator in COMMAND_SEPARATORS:
+        segment = segment.rsplit(separator, 1)[-1]
+    return [word.strip('"\'') for word in segment.split()]
+
+
+class CompletionManager:
+    """
+    Answers tab completion in the kernel, so the terminal needs one syscall
+    per Tab instead of listing directories over the bridge. Command names
+    and aliases live in a prefix trie; every directory, environment and
+    user/group listing gets a sorted name index searched with bisect. The
+    indexes are rebuilt only when their source changes (a directory's
+    children are keyed by its node and mtime).
+
+    Completion is incremental: when the word being completed extends the
+    one completed last (the next keystroke, or Tab after the common prefix
+    was inserted) and the index is unchanged, the search resumes from the
+    previous trie node or bisect range instead of starting over.
+    """
+    def __init__(self):
+        self.external_commands = set()
+        self._command_trie = None
+        self._command_signature = None
+        self._indexes = {}
+        self._directory_indexes = {}
+        self._last = None
+
+    def set_external_commands(self, command_names):
+        """Commands the terminal runs itself (installed packages), completed alongside the kernel's."""
+        native = command_names.to_py() if hasattr(command_names, 'to_py') else command_names
+        self.external_commands = set(native)
+        return True
+
+    def reset(self):
+        self._last = None
+        return True
+
+    def _commands(self):
+        aliases = alias_manager.get_all_aliases()
+        signature = (len(command_executor.commands), len(command_executor.js_native_commands),
+                     frozenset(self.external_commands), frozenset(aliases))
+        if signature != self._command_signature:
+            self._command_trie = PrefixTrie(
+                set(command_executor.commands) | command_executor.js_native_commands | self.external_commands | set(aliases))
+            self._command_signature = signature
+        return self._command_trie
+
+    def _names(self, kind, names):
+        """The cached SortedNames for a small listing (environment, users, groups), rebuilt when it changes."""
+        index = self._indexes.get(kind)
+        signature = frozenset(names)
+        if index is None or index.signature != signature:
+            index = self._indexes[kind] = SortedNames(signature, signature=signature)
+        return index
+
+    def _directory(self, path, user_context):
+        """The name index of a readable directory, or None."""
+        validation = fs_manager.validate_path(path, user_context, json.dumps(
+            {"expectedType": "directory", "permissions": ["read", "execute"]}))
+        if not validation.get("success"):
+            return None
+        node = validation["node"]
+        children = node.get('children', {})
+        index = self._directory_indexes.get(path)
+        if index is None or index.source is not node or index.signature != (node.get('mtime'), len(children)):
+            if len(self._directory_indexes) >= MAX_DIRECTORY_INDEXES:
+                self._directory_indexes.clear()
+            index = self._directory_indexes[path] = SortedNames(children, source=node,
+                                                               signature=(node.get('mtime'), len(children)))
+        return index
+
+    def _search_trie(self, trie, prefix):
+        last = self._last
+        if last and last['index'] is trie and prefix.startswith(last['prefix']):
+            node = trie.walk(last['state'], prefix[len(last['prefix']):]) if last['state'] is not None else None
+        else:
+            node = trie.walk(trie.root, prefix)
+        self._last = {'index': trie, 'prefix': prefix, 'state': node}
+        if node is None:
+            return [], 0, prefix
+        return trie.words(node, prefix, MAX_CANDIDATES), trie.count(node), prefix + trie.common_extension(node)
+
+    def _search_names(self, index, prefix):
+        last = self._last
+        if last and last['index'] is index and prefix.startswith(last['prefix']):
+            lo, hi = index.search(prefix, *last['state'])
+        else:
+            lo, hi = index.search(prefix)
+        self._last = {'index': index, 'prefix': prefix, 'state': (lo, hi)}
+        return index.names[lo:min(hi, lo + MAX_CANDIDATES)], hi - lo, index.common_prefix(lo, hi) or prefix
+
+    def _complete_path(self, word, cwd, user_context):
+        directory_text, _, name_prefix = word.rpartition('/')
+        if word.startswith('/'):
+            directory_text += '/'
+        elif directory_text:
+            directory_text += '/'
+        lookup = directory_text
+        if lookup == '~' or lookup.startswith('~/'):
+            lookup = env_manager.get('HOME') + lookup[1:]
+        directory_path = os.path.normpath(os.path.join(cwd, lookup)) if lookup else cwd
+        index = self._directory(directory_path, user_context)
+        if index is None:
+            self._last = None
+            return [], 0, word, []
+        names, total, common = self._search_names(index, name_prefix)
+        children = index.source.get('children', {})
+        directories = []
+        for name in names:
+            child = children.get(name, {})
+            if child.get('type') == 'symlink':
+                child = fs_manager.get_node(os.path.join(directory_path, name)) or {}
+            if child.get('type') == 'directory':
+                directories.append(directory_text + name)
+        return [directory_text + name for name in names], total, directory_text + common, directories
+
+    def complete(self, line, cursor=None, user_context=None, cwd=None):
+        """
+        Completes the word that ends at 'cursor' in 'line'. The word is a
+        command name at the start of a command, an environment variable
+        after '$', a user or group name for the commands that take one,
+        and a path otherwise. Returns the candidates (at most MAX_CANDIDATES
+        of 'total', sorted), those that are directories, and the longest
+        prefix all candidates share, each as the full text of the word.
+        """
+        cursor = len(line) if cursor is None else min(int(cursor), len(line))
+        user_context = user_context.to_py() if hasattr(user_context, 'to_py') else (user_context or {'name': 'Guest'})
+        cwd = cwd or fs_manager.current_path
+        start, quote = _word_at(line, cursor)
+        word = line[start + (1 if quote else 0):cursor]
+        words_before = _segment_words(line, start)
+        directories = []
+
+        reference = VARIABLE_REFERENCE.search(word)
+        if reference:
+            kind = 'variables'
+            head = word[:reference.start()] + '$' + reference.group(1)
+            closing = '}' if reference.group(1) else ''
+            names, total, common = self._search_names(self._names(kind, env_manager.get_all()), reference.group(2) or '')
+            candidates = [head + name + closing for name in names]
+            common = head + common
+        elif not words_before or words_before == ['sudo']:
+            kind = 'commands'
+            candidates, total, common = self._search_trie(self._commands(), word)
+        elif words_before[0] in COMMAND_COMMANDS and '/' not in word:
+            kind = 'commands'
+            candidates, total, common = self._search_trie(self._commands(), word)
+        elif words_before[0] in GROUP_COMMANDS or (words_before[0] == 'usermod' and '-aG' in words_before):
+            kind = 'groups'
+            candidates, total, common = self._search_names(self._names(kind, group_manager.get_all_groups()), word)
+        elif words_before[0] in USER_COMMANDS:
+            kind = 'users'
+            candidates, total, common = self._search_names(self._names(kind, user_manager.get_all_users()), word)
+        else:
+            kind = 'paths'
+            candidates, total, common, directories = self._complete_path(word, cwd, user_context)
+
+        return {
+            "success": True, "type": kind,
+            "word_start": start, "word_end": cursor, "quote": quote,
+            "candidates": candidates, "directories": directories,
+            "total": total, "common_prefix": common if len(common) >= len(word) else word
+        }
+
+# Instantiate a singleton for the kernel
+completion_manager = CompletionManager()
@@ -4,19 +4,110 @@ from importlib import import_module
 from filesystem import fs_manager
 from users import user_manager
 from groups import group_manager
-from session import alias_manager, env_manager
+from session import alias_manager, env_manager, SessionAttribute, current_session, use_session
 import inspect
 import os
 import re
-import fnmatch
 import asyncio
+import time
 import traceback
+from jobs import job_manager
+from globbing import glob_engine, has_magic
+from profiler import profiler, format_record
+from tracing import tracer
+from heredocs import split_heredocs
+from pipeline_fusion import pipeline_optimizer
+from command_manifest import command_manifest
+
+# Commands that only read state. Substitutions made up of nothing but these
+# can safely be evaluated concurrently.
+READ_ONLY_COMMANDS = {
+    'base64', 'cat', 'cksum', 'comm', 'cut', 'date', 'df', 'diff', 'du', 'echo',
+    'expr', 'grep', 'groups', 'head', 'listusers', 'ls', 'nl', 'printf', 'pwd',
+    'shuf', 'sort', 'tail', 'test', 'tr', 'tree', 'uniq', 'uptime', 'wc', 'who', 'whoami'
+}
+SHELL_OPERATORS = {'|', '&&', '||', '&', '>', '>>', '<', '<<', '<<<'}
+REDIRECTION_OPERATORS = {'>', '>>', '<', '<<', '<<<'}
+
+
+class ShellOperator(str):
+    """An operator token written unquoted, as opposed to a quoted word such as "<" that only spells one."""
+
+
+def _word_token(chars, quoted):
+    token = ''.join(chars)
+    return ShellOperator(token) if not quoted and token in SHELL_OPERATORS else token
+
+
+def split_words(text):
+    """
+    Splits text into words the way shlex.split() does (POSIX quoting and
+    backslash escapes), but returns each unquoted token in SHELL_OPERATORS
+    as a ShellOperator, so that the parser can tell `echo "<"` from `cat < f`.
+    Raises ValueError on an unclosed quote or a trailing backslash.
+    """
+    words, word, quoted, in_word = [], [], False, False
+    i, length = 0, len(text)
+    while i < length:
+        ch = text[i]
+        if ch in ' \t\r\n':
+            if in_word:
+                words.append(_word_token(word, quoted))
+                word, quoted, in_word = [], False, False
+            i += 1
+            continue
+        in_word = True
+        if ch == '\\':
+            if i + 1 >= length:
+                raise ValueError("No escaped character")
+            word.append(text[i + 1])
+            quoted, i = True, i + 2
+        elif ch == "'":
+            end = text.find("'", i + 1)
+            if end < 0:
+                raise ValueError("No closing quotation")
+            word.append(text[i + 1:end])
+            quoted, i = True, end + 1
+        elif ch == '"':
+            quoted, i = True, i + 1
+            while True:
+                if i >= length:
+                    raise ValueError("No closing quotation")
+                ch = text[i]
+                if ch == '"':
+                    i += 1
+                    break
+                # Inside double quotes a backslash only escapes a quote or another backslash.
+                if ch == '\\' and i + 1 < length and text[i + 1] in '"\\':
+                    word.append(text[i + 1])
+                    i += 2
+                else:
+                    word.append(ch)
+                    i += 1
+        else:
+            word.append(ch)
+            i += 1
+    if in_word:
+        words.append(_word_token(word, quoted))
+    return words
 
 class CommandExecutor:
+    # The context of the command being run belongs to the current session
+    # (see session.Session), so interleaved sessions do not see each other's.
+    user_context = SessionAttribute('user_context')
+    users = SessionAttribute('users')
+    user_groups = SessionAttribute('user_groups')
+    config = SessionAttribute('config')
+    groups = SessionAttribute('groups')
+    jobs = SessionAttribute('jobs')
+    api_key = SessionAttribute('api_key')
+    session_start_time = SessionAttribute('session_start_time')
+    session_stack = SessionAttribute('session_stack')
+
     def __init__(self):
         self.fs_manager = fs_manager
         self.commands = self._discover_commands()
-        self.user_context = {"name": "Guest"}
+        self.set_context(None, None, None, None, None, None, None, None, None)
         self._flag_def_cache = {}
         self.ai_manager = None
         self.js_native_commands = set()
@@ -28,6 +119,14 @@ class CommandExecutor:
         self.js_native_commands = set(command_list)
 
     def _discover_commands(self):
+        # A kernel unpacked from the bundle built by tools/build_kernel_bundle.py
+        # lists its commands in the bundle manifest.
+        manifest_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'bundle_manifest.json')
+        try:
+            with open(manifest_path) as manifest_file:
+                return sorted(json.load(manifest_file)['commands'])
+        except (OSError, ValueError, KeyError):
+            pass
         try:
             command_dir = '/core/commands'
             py_files = [f for f in os.listdir(command_dir) if f.endswith('.py') and not f.startswith('__')]
@@ -51,9 +150,22 @@ class CommandExecutor:
         self.session_start_time = session_start_time
         self.session_stack = session_stack
 
+    def get_context_json(self):
+        """Serializes the active execution context in the same shape JS sends to execute()."""
+        return json.dumps({
+            "current_path": self.fs_manager.current_path, "user_context": self.user_context,
+            "users": self.users, "user_groups": self.user_groups, "config": self.config,
+            "groups": self.groups, "jobs": self.jobs, "api_key": self.api_key,
+            "session_start_time": self.session_start_time, "session_stack": self.session_stack
+        })
+
     def _get_command_flag_definitions(self, command_name):
         if command_name in self._flag_def_cache:
             return self._flag_def_cache[command_name]
+        definitions = command_manifest.flag_definitions(command_name)
+        if definitions is not None:
+            self._flag_def_cache[command_name] = definitions
+            return definitions
         try:
             command_module = import_module(f"commands.{command_name}")
             define_func = getattr(command_module, 'define_flags', None)
@@ -66,7 +178,14 @@ class CommandExecutor:
         self._flag_def_cache[command_name] = {}
         return {}
 
-    def _parts_to_segment(self, segment_parts):
+    def _expand_glob(self, part):
+        """Expands a single wildcard argument against the filesystem, or returns it unchanged."""
+        if not has_magic(part):
+            return [part]
+        matches = glob_engine.expand(part)
+        return matches if matches else [part] # No match, pass the glob pattern literally
+
+    def _parts_to_segment(self, segment_parts, expand_globs=True):
         if not segment_parts:
             return None
 
@@ -76,25 +195,13 @@ class CommandExecutor:
         # Wildcard Expansion (Globbing)
         expanded_parts = []
         for part in raw_args_and_flags:
-            if '*' in part or '?' in part or ('[' in part and ']' in part):
-                path_prefix, pattern_part = os.path.split(part)
-                if not path_prefix: path_prefix = '.'
-
-                search_dir_abs = self.fs_manager.get_absolute_path(path_prefix)
-                dir_node = self.fs_manager.get_node(search_dir_abs)
-
-                if dir_node and dir_node.get('type') == 'directory':
-                    children_names = dir_node.get('children', {}).keys()
-                    matches = fnmatch.filter(children_names, pattern_part)
-                    if matches:
-                        for name in sorted(matches):
-                            expanded_parts.append(os.path.join(path_prefix, name) if path_prefix != '.' else name)
-                    else:
-                        expanded_parts.append(part) # No match, pass the glob pattern literally
-                else:
-                    expanded_parts.append(part)
-            else:
-                expanded_parts.append(part)
+            expanded_parts.extend(self._expand_glob(part) if expand_globs else [part])
+
+        # `[ EXPR ]` is the bracket spelling of `test EXPR`.
+        if command_name == '[':
+            if not expanded_parts or expanded_parts[-1] != ']':
+                raise ValueError("Syntax error: missing closing ']'.")
+            command_name, expanded_parts = 'test', expanded_parts[:-1]
 
         parts_to_process = [command_name] + expanded_parts
         raw_definitions = self._get_command_flag_definitions(command_name)
@@ -194,41 +301,44 @@ class CommandExecutor:
                         return [f"{prefix}{chr(i)}{suffix}" for i in range(start_ord, end_ord + step, step)]
         return [segment]
 
-    async def _preprocess_command_string(self, command_string, js_context_json):
+    def _expand_brace_tokens(self, command_string):
         # Brace Expansion (quote-aware)
-        if '{' in command_string and '}' in command_string:
-            def _split_preserving_quotes(s):
-                tokens, buf = [], []
-                in_single, in_double = False, False
-                i = 0
-                while i < len(s):
-                    ch = s[i]
-                    if ch == "'" and not in_double:
-                        in_single = not in_single
-                        buf.append(ch)
-                    elif ch == '"' and not in_single:
-                        in_double = not in_double
-                        buf.append(ch)
-                    elif ch.isspace() and not in_single and not in_double:
-                        if buf:
-                            tokens.append(''.join(buf))
-                            buf = []
-                    else:
-                        buf.append(ch)
-                    i += 1
-                if buf:
-                    tokens.append(''.join(buf))
-                return tokens
-            expanded_parts = []
-            for part in _split_preserving_quotes(command_string):
-                is_quoted = (len(part) >= 2 and ((part[0] == part[-1] == "'") or (part[0] == part[-1] == '"')))
-                if is_quoted:
-                    # Do not expand braces inside quoted strings
-                    expanded_parts.append(part)
+        if not ('{' in command_string and '}' in command_string):
+            return command_string
+
+        def _split_preserving_quotes(s):
+            tokens, buf = [], []
+            in_single, in_double = False, False
+            i = 0
+            while i < len(s):
+                ch = s[i]
+                if ch == "'" and not in_double:
+                    in_single = not in_single
+                    buf.append(ch)
+                elif ch == '"' and not in_single:
+                    in_double = not in_double
+                    buf.append(ch)
+                elif ch.isspace() and not in_single and not in_double:
+                    if buf:
+                        tokens.append(''.join(buf))
+                        buf = []
                 else:
-                    expanded_parts.extend(self._expand_braces(part))
-            command_string = ' '.join(expanded_parts)
+                    buf.append(ch)
+                i += 1
+            if buf:
+                tokens.append(''.join(buf))
+            return tokens
+        expanded_parts = []
+        for part in _split_preserving_quotes(command_string):
+            is_quoted = (len(part) >= 2 and ((part[0] == part[-1] == "'") or (part[0] == part[-1] == '"')))
+            if is_quoted:
+                # Do not expand braces inside quoted strings
+                expanded_parts.append(part)
+            else:
+                expanded_parts.extend(self._expand_braces(part))
+        return ' '.join(expanded_parts)
 
+    def _resolve_alias(self, command_string):
         # Alias Resolution
         try:
             parts = shlex.split(command_string)
@@ -242,53 +352,213 @@ class CommandExecutor:
             if alias_value:
                 remaining_args = ' '.join(parts[1:])
                 command_string = f"{alias_value} {remaining_args}".strip()
+        return command_string
 
-        # Environment Variable Expansion
+    def _expand_variable_references(self, text):
         def replace_var(match):
             var_name = match.group(1) or match.group(2)
             return env_manager.get(var_name) or ""
+        return re.sub(r'\$([a-zA-Z_][a-zA-Z0-9_]*)|\$\{([a-zA-Z_][a-zA-Z0-9_]*)\}', replace_var, text)
 
+    def _expand_variables(self, command_string):
+        # Environment Variable Expansion
         parts = command_string.split("'")
         result_parts = []
         for i, part in enumerate(parts):
             if i % 2 == 0:
-                expanded_part = re.sub(r'\$([a-zA-Z_][a-zA-Z0-9_]*)|\$\{([a-zA-Z_][a-zA-Z0-9_]*)\}', replace_var, part)
-                result_parts.append(expanded_part)
+                result_parts.append(self._expand_variable_references(part))
             else:
                 result_parts.append(part)
-        command_string = "'".join(result_parts)
+        return "'".join(result_parts)
+
+    def _parse_substitution(self, text, open_index):
+        """
+        Parses the `$(` at open_index up to its matching `)`, collecting the
+        substitutions nested inside it on the way, so the text is scanned once.
+        Returns None when the substitution is never closed.
+        """
+        children, depth, quote = [], 1, None
+        pos = open_index + 2
+        while pos < len(text):
+            ch = text[pos]
+            if quote == "'":
+                if ch == "'": quote = None
+            elif ch == '\\':
+                pos += 2
+                continue
+            elif ch == '"':
+                quote = None if quote == '"' else '"'
+            elif ch == "'" and quote is None:
+                quote = "'"
+            elif text.startswith('$(', pos):
+                child = self._parse_substitution(text, pos)
+                if child is None: return None
+                children.append(child)
+                pos = child['end']
+                continue
+            elif ch == '(' and quote is None:
+                depth += 1
+            elif ch == ')' and quote is None:
+                depth -= 1
+                if depth == 0:
+                    return {'start': open_index, 'end': pos + 1, 'children': children}
+            pos += 1
+        return None
+
+    def _parse_substitutions(self, text):
+        """Builds the tree of `$( ... )` substitutions in text (top level first, nested as children)."""
+        nodes, search_from = [], 0
+        while True:
+            open_index = text.find('$(', search_from)
+            if open_index == -1: return nodes
+            node = self._parse_substitution(text, open_index)
+            if node is None: return nodes # Unterminated: leave the rest literal
+            nodes.append(node)
+            search_from = node['end']
+
+    def _is_side_effect_free(self, text, node):
+        """True when a substitution (and everything nested in it) only runs read-only commands."""
+        body = text[node['start'] + 2:node['end'] - 1]
+        if re.search(r'[;&>]', body):
+            return False
+        for stage in body.split('|'):
+            try:
+                words = shlex.split(stage)
+            except ValueError:
+                return False
+            if not words or words[0] not in READ_ONLY_COMMANDS or alias_manager.get_alias(words[0]):
+                return False
+        return all(self._is_side_effect_free(text, child) for child in node['children'])
+
+    async def _evaluate_substitution(self, text, node, js_context_json):
+        command_text = await self._splice_substitutions(text, node['start'] + 2, node['end'] - 1, node['children'], js_context_json)
+        sub_result = json.loads(await self.execute(command_text, js_context_json))
+        if not sub_result.get("success"):
+            raise ValueError(f"Command substitution failed: {sub_result.get('error')}")
+        # Shell-like behavior: strip trailing newlines; replace embedded newlines with spaces
+        output = str(sub_result.get("output", ""))
+        # Normalize Windows CRLF and Unix LF
+        output = output.replace('\r\n', '\n').replace('\r', '\n')
+        # Remove trailing newlines, then replace remaining newlines with spaces
+        return output.rstrip('\n').replace('\n', ' ')
+
+    async def _evaluate_substitutions(self, text, nodes, js_context_json):
+        """
+        Evaluates sibling substitutions in order. Runs of side-effect-free
+        ones are gathered concurrently; anything that might write runs alone,
+        so its effects are seen by the substitutions after it.
+        """
+        outputs, pending = [], []
+
+        async def flush():
+            if pending:
+                outputs.extend(await asyncio.gather(*(self._evaluate_substitution(text, n, js_context_json) for n in pending)))
+                pending.clear()
+
+        for node in nodes:
+            if self._is_side_effect_free(text, node):
+                pending.append(node)
+                continue
+            await flush()
+            outputs.append(await self._evaluate_substitution(text, node, js_context_json))
+        await flush()
+        return outputs
+
+    async def _splice_substitutions(self, text, start, end, nodes, js_context_json):
+        """Returns text[start:end] with every substitution in nodes replaced by its output, in a single pass."""
+        outputs = await self._evaluate_substitutions(text, nodes, js_context_json)
+        pieces, cursor = [], start
+        for node, output in zip(nodes, outputs):
+            pieces.append(text[cursor:node['start']])
+            # If substitution occurs immediately after '=', treat as a single assignment value by quoting
+            if node['start'] > 0 and text[node['start'] - 1] == '=':
+                # Escape any double quotes in the output
+                safe_output = output.replace('"', '\\"')
+                pieces.append(f'"{safe_output}"')
+            else:
+                pieces.append(output)
+            cursor = node['end']
+        pieces.append(text[cursor:end])
+        return ''.join(pieces)
 
+    async def _substitute_commands(self, command_string, js_context_json):
         # Command Substitution
-        pattern = re.compile(r'\$\((.*?)\)', re.DOTALL)
-        match = pattern.search(command_string)
-        while match:
-            sub_command = match.group(1)
-            sub_result_json = await self.execute(sub_command, js_context_json)
-            sub_result = json.loads(sub_result_json)
-            if sub_result.get("success"):
-                # Shell-like behavior: strip trailing newlines; replace embedded newlines with spaces
-                output = str(sub_result.get("output", ""))
-                # Normalize Windows CRLF and Unix LF
-                output = output.replace('\r\n', '\n').replace('\r', '\n')
-                # Remove trailing newlines
-                output = output.rstrip('\n')
-                # Replace remaining newlines with spaces
-                output = output.replace('\n', ' ')
-                # If substitution occurs immediately after '=', treat as a single assignment value by quoting
-                before_idx = match.start() - 1
-                if before_idx >= 0 and command_string[before_idx] == '=':
-                    # Escape any double quotes in the output
-                    safe_output = output.replace('"', '\\"')
-                    replacement = f'"{safe_output}"'
-                else:
-                    replacement = output
-                command_string = command_string[:match.start()] + replacement + command_string[match.end():]
+        nodes = self._parse_substitutions(command_string)
+        if not nodes:
+            return command_string
+        return await self._splice_substitutions(command_string, 0, len(command_string), nodes, js_context_json)
+
+    async def _preprocess_command_string(self, command_string, js_context_json):
+        command_string = self._expand_brace_tokens(command_string)
+        command_string = self._resolve_alias(command_string)
+        command_string = self._expand_variables(command_string)
+        return await self._substitute_commands(command_string, js_context_json)
+
+    async def _expand_heredocs(self, heredocs, js_context_json):
+        """Expands variables and command substitutions in the bodies whose delimiter was not quoted."""
+        for heredoc in heredocs:
+            if heredoc["expand"]:
+                body = self._expand_variable_references(heredoc["content"])
+                heredoc["content"] = await self._substitute_commands(body, js_context_json)
+        return [heredoc["content"] for heredoc in heredocs]
+
+    async def expand_words(self, text, js_context_json):
+        """
+        Expands a word list the way command arguments are expanded (braces,
+        variables, command substitution, wildcards) and returns the words.
+        Aliases are not applied, since the words are not a command.
+        """
+        text = self._expand_brace_tokens(text)
+        text = self._expand_variables(text)
+        text = await self._substitute_commands(text, js_context_json)
+        try:
+            words = shlex.split(text)
+        except ValueError as e:
+            raise ValueError(f"Syntax error in word list: '{text}' -> {e}")
+        expanded = []
+        for word in words:
+            expanded.extend(self._expand_glob(word))
+        return expanded
+
+    def _split_stages(self, command_parts, heredocs):
+        """
+        Splits one sub-command's words at its unquoted pipes into stages of
+        {'words', 'redirection', 'input_redirection'}, taking each stage's
+        redirections out of its words. 'redirection' is where the stage's
+        output goes; 'input_redirection' is what it reads instead of the
+        previous stage's output: a file ('<'), a here-string ('<<<') or a
+        here-document ('<<', already cut out of the line by split_heredocs).
+        """
+        stages = [{'words': [], 'redirection': None, 'input_redirection': None}]
+        i = 0
+        while i < len(command_parts):
+            part = command_parts[i]
+            stage = stages[-1]
+            if isinstance(part, ShellOperator) and part == '|':
+                stages.append({'words': [], 'redirection': None, 'input_redirection': None})
+                i += 1
+                continue
+            if not (isinstance(part, ShellOperator) and part in REDIRECTION_OPERATORS):
+                stage['words'].append(part)
+                i += 1
+                continue
+            if i + 1 >= len(command_parts) or isinstance(command_parts[i + 1], ShellOperator):
+                raise ValueError(f"Syntax error: no file for redirection operator '{part}'.")
+            target = command_parts[i + 1]
+            if part == '<':
+                stage['input_redirection'] = {'type': 'file', 'file': target}
+            elif part == '<<<':
+                stage['input_redirection'] = {'type': 'string', 'content': target}
+            elif part == '<<':
+                if not target.isdigit() or int(target) >= len(heredocs):
+                    raise ValueError("Syntax error: here-document without a body.")
+                stage['input_redirection'] = {'type': 'string', 'content': heredocs[int(target)]}
             else:
-                raise ValueError(f"Command substitution failed: {sub_result.get('error')}")
-            match = pattern.search(command_string)
-        return command_string
+                stage['redirection'] = {'type': 'append' if part == '>>' else 'overwrite', 'file': target}
+            i += 2
+        return stages
 
-    def _parse_command_string(self, command_string):
+    def _parse_command_string(self, command_string, heredocs=()):
         # Use a negative lookbehind `(?<!\\)` to avoid splitting on escaped semicolons (`\;`),
         # while still respecting quoted strings. This is the key fix.
         commands_raw = re.split(r'''(?<!\\);(?=(?:[^'"]|'[^']*'|"[^"]*")*$)''', command_string)
@@ -302,24 +572,27 @@ class CommandExecutor:
                 continue
 
             try:
-                parts = shlex.split(command)
+                parts = split_words(command)
             except ValueError as e:
                 raise ValueError(f"Syntax error in command: '{command}' -> {e}")
 
             if not parts:
                 continue
 
-            sub_commands, last_op_index = [], 0
+            # 'operator' is what follows a sub-command ('&' backgrounds it);
+            # 'condition' is the '&&' / '||' that precedes it and decides whether it runs.
+            sub_commands, last_op_index, condition = [], 0, None
             for i, part in enumerate(parts):
-                if part in ['&&', '||', '&']:
-                    sub_commands.append({'command_parts': parts[last_op_index:i], 'operator': part})
+                if isinstance(part, ShellOperator) and part in ['&&', '||', '&']:
+                    sub_commands.append({'command_parts': parts[last_op_index:i], 'operator': part, 'condition': condition})
+                    condition = part if part != '&' else None
                     last_op_index = i + 1
 
             # Only add the remaining parts if there are any.
             # This prevents an empty sub-command when the line ends with an operator.
             remaining_parts = parts[last_op_index:]
             if remaining_parts:
-                sub_commands.append({'command_parts': remaining_parts, 'operator': None})
+                sub_commands.append({'command_parts': remaining_parts, 'operator': None, 'condition': condition})
 
             for sub_cmd in sub_commands:
                 command_parts = sub_cmd['command_parts']
@@ -327,129 +600,144 @@ class CommandExecutor:
                     if sub_cmd['operator']: raise ValueError(f"Syntax error: missing command before '{sub_cmd['operator']}'")
                     continue
 
-                redirection, i = None, 0
-                while i < len(command_parts):
-                    part = command_parts[i]
-                    if part in ['>', '>>', '<']:
-                        if i + 1 >= len(command_parts): raise ValueError(f"Syntax error: no file for redirection operator '{part}'.")
-                        filename = command_parts[i+1]
-                        if part != '<': redirection = {'type': 'append' if part == '>>' else 'overwrite', 'file': filename}
-                        command_parts.pop(i)
-                        command_parts.pop(i)
-                        continue
-                    i += 1
-
-                segments, current_segment_parts = [], []
-                for part in command_parts:
-                    if part == '|':
-                        segment = self._parts_to_segment(current_segment_parts)
-                        if not segment: raise ValueError("Syntax error: invalid null command.")
+                stages = self._split_stages(command_parts, heredocs)
+                segments = []
+                for index, stage in enumerate(stages):
+                    segment = self._parts_to_segment(stage['words'])
+                    has_redirections = stage['redirection'] or stage['input_redirection']
+                    if segment:
+                        if stage['redirection']: segment['redirection'] = stage['redirection']
+                        if stage['input_redirection']: segment['input_redirection'] = stage['input_redirection']
                         segments.append(segment)
-                        current_segment_parts = []
-                    else:
-                        current_segment_parts.append(part)
-
-                final_segment = self._parts_to_segment(current_segment_parts)
-                if final_segment: segments.append(final_segment)
+                    elif index < len(stages) - 1 or (has_redirections and len(stages) > 1):
+                        raise ValueError("Syntax error: invalid null command.")
 
+                # A line of nothing but redirections ('> file') runs no command;
+                # its redirections are kept on the pipeline and only open their files.
+                bare = stages[0] if not segments and len(stages) == 1 else None
                 is_background = sub_cmd['operator'] == '&'
-                if segments or redirection:
-                    command_sequence.append({'segments': segments, 'operator': sub_cmd['operator'], 'redirection': redirection, 'is_background': is_background})
+                if segments or (bare and (bare['redirection'] or bare['input_redirection'])):
+                    command_sequence.append({
+                        'segments': segments, 'operator': sub_cmd['operator'], 'condition': sub_cmd['condition'],
+                        'redirection': bare['redirection'] if bare else None,
+                        'input_redirection': bare['input_redirection'] if bare else None,
+                        'is_background': is_background,
+                        'text': " ".join(p if isinstance(p, ShellOperator) else shlex.quote(p) for p in command_parts)
+                    })
 
         return command_sequence
 
 
-    async def execute(self, command_string, js_context_json, stdin_data=None):
-        try:
-            context = json.loads(js_context_json)
-            if 'users' in context: user_manager.load_users(context['users'])
-            if 'groups' in context: group_manager.load_groups(context['groups'])
-            fs_manager.set_context(current_path=context.get("current_path", "/"), user_groups=context.get("user_groups"))
-            self.set_context(
-                user_context=context.get("user_context"), users=context.get("users"),
-                user_groups=context.get("user_groups"), config=context.get("config"),
-                groups=context.get("groups"), jobs=context.get("jobs"), api_key=context.get("api_key"),
-                session_start_time=context.get("session_start_time"), session_stack=context.get("session_stack")
-            )
-            processed_command_string = await self._preprocess_command_string(command_string, js_context_json)
-            # Standalone variable assignment(s) handling (e.g., VAR=value [VAR2=value ...])
-            try:
-                assign_parts = shlex.split(processed_command_string)
-            except ValueError as e:
-                raise ValueError(f"Syntax error in command: {e}")
-            def is_assignment_token(tok):
-                return bool(re.match(r'^[A-Za-z_][A-Za-z0-9_]*=', tok))
-            if assign_parts and all(is_assignment_token(tok) for tok in assign_parts):
-                for tok in assign_parts:
-                    name, value = tok.split('=', 1)
-                    env_manager.set(name, value)
-                return json.dumps({"success": True, "output": ""})
+    def _load_context(self, js_context_json):
+        context = json.loads(js_context_json)
+        if 'users' in context: user_manager.load_users(context['users'])
+        if 'groups' in context: group_manager.load_groups(context['groups'])
+        fs_manager.set_context(current_path=context.get("current_path", "/"), user_groups=context.get("user_groups"))
+        self.set_context(
+            user_context=context.get("user_context"), users=context.get("users"),
+            user_groups=context.get("user_groups"), config=context.get("config"),
+            groups=context.get("groups"), jobs=context.get("jobs"), api_key=context.get("api_key"),
+            session_start_time=context.get("session_start_time"), session_stack=context.get("session_stack")
+        )
 
-            command_sequence = self._parse_command_string(processed_command_string)
+    async def execute(self, command_string, js_context_json, stdin_data=None, session=None):
+        """
+        Runs a command line and returns its result as JSON. With a session,
+        the line runs in that session (its directory, identity, environment
+        and aliases) instead of the current one.
+        """
+        if session is not None:
+            with use_session(session):
+                return await self.execute(command_string, js_context_json, stdin_data)
+        # A leading `time` keyword profiles the whole command line that follows it.
+        timed_match = re.match(r'^\s*time(\s+|$)', command_string)
+        if timed_match and not command_string[timed_match.end():].strip():
+            timed_match = None
+        if timed_match:
+            command_string = command_string[timed_match.end():]
+
+        record, token = profiler.begin(command_string, force=bool(timed_match))
+        if record is None:
+            with tracer.span("execute", command=command_string):
+                return await self._execute_line(command_string, js_context_json, stdin_data)
+        try:
+            with tracer.span("execute", command=command_string):
+                result_json = await self._execute_line(command_string, js_context_json, stdin_data)
+        finally:
+            profiler.end(record, token)
+        if not timed_match:
+            return result_json
+
+        result = json.loads(result_json)
+        report = format_record(record)
+        result["output"] = f"{result['output']}\n{report}" if result.get("output") else report
+        return json.dumps(result)
+
+    async def _execute_line(self, command_string, js_context_json, stdin_data=None):
+        try:
+            self._load_context(js_context_json)
+            record = profiler.current_record() if profiler.enabled else None
+            parse_started = time.perf_counter() if record else None
+            with tracer.span("parse"):
+                command_string, heredocs = split_heredocs(command_string)
+                heredoc_bodies = await self._expand_heredocs(heredocs, js_context_json)
+                processed_command_string = await self._preprocess_command_string(command_string, js_context_json)
+                # Standalone variable assignment(s) handling (e.g., VAR=value [VAR2=value ...])
+                try:
+                    assign_parts = shlex.split(processed_command_string)
+                except ValueError as e:
+                    raise ValueError(f"Syntax error in command: {e}")
+                def is_assignment_token(tok):
+                    return bool(re.match(r'^[A-Za-z_][A-Za-z0-9_]*=', tok))
+                if assign_parts and all(is_assignment_token(tok) for tok in assign_parts):
+                    for tok in assign_parts:
+                        name, value = tok.split('=', 1)
+                        env_manager.set(name, value)
+                    return json.dumps({"success": True, "output": ""})
+
+                command_sequence = self._parse_command_string(processed_command_string, heredoc_bodies)
+            if record:
+                record["parse_ms"] += (time.perf_counter() - parse_started) * 1000
 
             if not command_sequence: return json.dumps({"success": True, "output": ""})
 
             last_result_obj = {"success": True, "output": ""}
             collected_effects = []
+            job_notices = []
 
             for pipeline in command_sequence:
-                if pipeline.get('operator') == '&&' and not last_result_obj.get("success"): continue
-                if pipeline.get('operator') == '||' and last_result_obj.get("success"): continue
+                if pipeline.get('condition') == '&&' and not last_result_obj.get("success"): continue
+                if pipeline.get('condition') == '||' and last_result_obj.get("success"): continue
 
                 # If a command has both redirection AND is backgrounded, we treat it as a
                 # synchronous file-writing operation, NOT a true background job.
                 # This ensures the file exists before the next command in a script runs.
-                is_synchronous_background_write = pipeline.get('is_background') and pipeline.get('redirection')
+                is_synchronous_background_write = pipeline.get('is_background') and (
+                    pipeline.get('redirection') or any(segment.get('redirection') for segment in pipeline['segments']))
                 if pipeline.get('is_background') and not is_synchronous_background_write:
-                    # This block now ONLY handles TRUE background jobs (no redirection).
-                    first_segment = pipeline['segments'][0] if pipeline.get('segments') else None
-                    if not first_segment:
+                    if not pipeline.get('segments'):
                         last_result_obj = {"success": False, "error": "Syntax error: invalid null command for background job."}
                         continue
-
-                    command_parts = [first_segment['command']] + first_segment['args']
-                    bg_result = {
-                        "effect": 'background_job',
-                        "command_string": " ".join(shlex.quote(p) for p in command_parts)
-                    }
-                    collected_effects.append(bg_result)
-                    last_result_obj = {"success": True}
+                    job = self._spawn_background_job(pipeline)
+                    job_notices.append(f"[{job.id}] {job.command}")
+                    last_result_obj = {"success": True, "output": ""}
                     continue
 
                 # Everything else (including our synchronous_background_write) is executed here.
-                pipeline_input = stdin_data
-                for i, segment in enumerate(pipeline['segments']):
-                    result_or_promise = await self._execute_segment(segment, pipeline_input)
-                    result_json = result_or_promise
-                    last_result_obj = json.loads(result_json)
-
-                    is_last_in_pipe = (i == len(pipeline['segments']) - 1)
-                    if (last_result_obj.get('effect') == 'page_output' and not is_last_in_pipe):
-                        # This is a pager, but its output is being piped. Act like `cat`.
-                        # Overwrite the result object to just pass the content through.
-                        last_result_obj = {
-                            "success": True,
-                            "output": last_result_obj.get("content", "")
-                        }
-
-                    if isinstance(last_result_obj, dict) and last_result_obj.get('effect'):
-                        collected_effects.append(last_result_obj)
-                    if not last_result_obj.get("success"): break
-                    pipeline_input = last_result_obj.get("output")
-
-                if last_result_obj.get("success") and pipeline['redirection']:
-                    file_path = pipeline['redirection']['file']
-                    content_to_write = last_result_obj.get("output", "")
-                    if pipeline['redirection']['type'] == 'append':
-                        try:
-                            existing_node = self.fs_manager.get_node(file_path)
-                            if existing_node: content_to_write = existing_node.get('content', '') + "\n" + content_to_write
-                        except FileNotFoundError: pass
-                    self.fs_manager.write_file(file_path, content_to_write, self.user_context)
-                    last_result_obj['output'] = ""
+                last_result_obj, pipeline_effects = await self._run_pipeline(pipeline, stdin_data)
+                collected_effects.extend(pipeline_effects)
+
+            if job_notices:
+                trailing_output = last_result_obj.get("output")
+                last_result_obj["output"] = "\n".join(job_notices + ([str(trailing_output)] if trailing_output else []))
 
             if collected_effects:
-                response_obj = {k: v for k, v in last_result_obj.items() if k != 'effect'}
+                # When the last command was itself an effect, its fields belong to
+                # that effect (already in the list) rather than to the response.
+                if last_result_obj.get('effect'):
+                    response_obj = {"success": last_result_obj.get("success", True)}
+                else:
+                    response_obj = dict(last_result_obj)
                 response_obj['effects'] = collected_effects
                 return json.dumps(response_obj)
 
@@ -458,7 +746,189 @@ class CommandExecutor:
             tb_str = traceback.format_exc()
             return json.dumps({"success": False, "error": f"Execution Error: {str(e)}\n{tb_str}"})
 
+    async def run_argv(self, argv, stdin_data=None):
+        """
+        Runs a single command from an already-split argument vector in the
+        current context and returns its result dictionary. Used by commands
+        that launch other commands (xargs, find -exec) so that each launch
+        skips the shell's parsing and expansion and the JS round-trip.
+        """
+        segment = self._parts_to_segment(list(argv), expand_globs=False)
+        record = profiler.current_record() if profiler.enabled else None
+        if record:
+            profile_started = profiler.segment_start()
+        result = json.loads(await self._execute_segment(segment, stdin_data))
+        if record:
+            profiler.segment_end(record, segment['command'], profile_started, stdin_data, result)
+        return result
+
+    async def run_argv_list(self, argv_list, max_procs=1):
+        """
+        Runs several argument vectors and returns their results in order.
+        With max_procs > 1, commands whose run() is async overlap, at most
+        max_procs at a time. Filesystem saves are coalesced into one.
+        """
+        with self.fs_manager.batch_saves():
+            if max_procs > 1 and all(self.is_async_command(argv[0]) for argv in argv_list):
+                semaphore = asyncio.Semaphore(max_procs)
+
+                async def run_bounded(argv):
+                    async with semaphore:
+                        return await self.run_argv(argv)
+
+                return list(await asyncio.gather(*(run_bounded(argv) for argv in argv_list)))
+            return [await self.run_argv(argv) for argv in argv_list]
+
+    def is_async_command(self, command_name):
+        """True when the command's run() is a coroutine and can overlap with others."""
+        if command_name not in self.commands:
+            return False
+        is_async = command_manifest.is_async(command_name)
+        if is_async is not None:
+            return is_async
+        try:
+            command_module = import_module(f"commands.{command_name}")
+        except ImportError:
+            return False
+        return inspect.iscoroutinefunction(getattr(command_module, 'run', None))
+
+    async def _run_pipeline(self, pipeline, stdin_data, job=None):
+        """
+        Runs the segments of one pipeline, feeding each stage's output to the
+        next and applying each stage's own redirections: an input redirection
+        replaces what the stage would read, and an output redirection sends
+        its output to the file, leaving the next stage nothing to read.
+        Returns the last stage's result and the effects collected along the
+        way. When run for a background job, the job gets a chance to yield
+        (or stay stopped) before every stage and is charged for the time each
+        stage takes.
+        """
+        last_result_obj = {"success": True, "output": ""}
+        collected_effects = []
+        if not pipeline['segments']:
+            return self._apply_bare_redirections(pipeline), collected_effects
+        pipeline_input = stdin_data
+        stages = pipeline_optimizer.plan(pipeline['segments'])
+        for i, segment in enumerate(stages):
+            if segment.get('input_redirection'):
+                pipeline_input, error = self._read_input_redirection(segment['input_redirection'])
+                if error:
+                    last_result_obj = {"success": False, "error": error}
+                    break
+            if job:
+                await job.checkpoint()
+                started = time.process_time()
+            record = profiler.current_record() if profiler.enabled else None
+            if record:
+                profile_started = profiler.segment_start()
+            result_or_promise = await self._execute_segment(segment, pipeline_input)
+            if job:
+                job.add_cpu_time(time.process_time() - started)
+            result_json = result_or_promise
+            last_result_obj = json.loads(result_json)
+            if record:
+                profiler.segment_end(record, segment['command'], profile_started, pipeline_input, last_result_obj)
+
+            is_last_in_pipe = (i == len(stages) - 1)
+            if (last_result_obj.get('effect') == 'page_output' and not is_last_in_pipe):
+                # This is a pager, but its output is being piped. Act like `cat`.
+                # Overwrite the result object to just pass the content through.
+                last_result_obj = {
+                    "success": True,
+                    "output": last_result_obj.get("content", "")
+                }
+
+            if isinstance(last_result_obj, dict) and last_result_obj.get('effect'):
+                collected_effects.append(last_result_obj)
+            if not last_result_obj.get("success"): break
+            pipeline_input = last_result_obj.get("output")
+            if segment.get('redirection'):
+                self._write_redirection(segment['redirection'], last_result_obj.get("output", ""))
+                last_result_obj['output'] = ""
+                pipeline_input = ""
+        return last_result_obj, collected_effects
+
+    def _write_redirection(self, redirection, content_to_write):
+        file_path = redirection['file']
+        if redirection['type'] == 'append':
+            try:
+                existing_node = self.fs_manager.get_node(file_path)
+                if existing_node: content_to_write = existing_node.get('content', '') + "\n" + content_to_write
+            except FileNotFoundError: pass
+        self.fs_manager.write_file(file_path, content_to_write, self.user_context)
+
+    def _apply_bare_redirections(self, pipeline):
+        """Opens the files of a line that is only redirections: reads the input, creates or truncates the output."""
+        if pipeline.get('input_redirection'):
+            _, error = self._read_input_redirection(pipeline['input_redirection'])
+            if error:
+                return {"success": False, "error": error}
+        redirection = pipeline.get('redirection')
+        # '>> file' alone leaves an existing file as it is.
+        if redirection and not (redirection['type'] == 'append' and self.fs_manager.get_node(redirection['file'])):
+            self._write_redirection(redirection, "")
+        return {"success": True, "output": ""}
+
+    def _read_input_redirection(self, input_redirection):
+        """
+        Resolves a pipeline's input redirection to the first stage's stdin.
+        A file's content string is handed over as is, so '< file' costs no
+        copy and no extra 'cat' stage. Returns (stdin_data, error).
+        """
+        if input_redirection['type'] == 'string':
+            return input_redirection['content'], None
+        path = input_redirection['file']
+        node = self.fs_manager.get_node(path)
+        if not node:
+            return None, {"message": f"{path}: No such file or directory", "suggestion": "Check the path of the input redirection."}
+        if node.get('type') != 'file':
+            return None, {"message": f"{path}: Is a directory", "suggestion": "Input can only be redirected from a file."}
+        if not self.fs_manager.has_permission(path, self.user_context, 'read'):
+            return None, {"message": f"{path}: Permission denied", "suggestion": "You need read permission on the file."}
+        return node.get('content', ''), None
+
+    def _spawn_background_job(self, pipeline):
+        """
+        Hands a pipeline to the job manager. The job runs in a fork of the
+        session it was started from, so foreground commands started in the
+        meantime neither see nor change its directory, identity or variables.
+        """
+        command_string = pipeline['text']
+        job_session = current_session().fork(f"job: {command_string}")
+
+        async def run_job(job):
+            profiler.detach()
+            with use_session(job_session):
+                result, effects = await self._run_pipeline(pipeline, None, job=job)
+            for effect in effects:
+                if effect.get('effect') == 'delay':
+                    await job.sleep(effect.get('milliseconds', 0) / 1000)
+                elif effect.get('effect') == 'page_output':
+                    job.record_output(effect.get('content', ''))
+                else:
+                    job.record_output(f"{effect.get('effect')}: cannot run in the background")
+                    return 1
+            if result.get('success'):
+                job.record_output(result.get('output'))
+                return 0
+            error = result.get('error')
+            job.record_output(error.get('message') if isinstance(error, dict) else error)
+            return 1
+
+        return job_manager.spawn(command_string, self.user_context.get('name', 'Guest'), run_job)
+
     async def _execute_segment(self, segment, stdin_data):
+        if segment.get('fused'):
+            with tracer.span(f"command {segment['command']}", fused=True):
+                return await segment['fused'].run(self, stdin_data)
+        if tracer.enabled:
+            with tracer.span(f"command {segment['command']}", args=len(segment['args'])) as span:
+                result = await self._execute_segment_untraced(segment, stdin_data)
+                span.set(output_bytes=len(result))
+                return result
+        return await self._execute_segment_untraced(segment, stdin_data)
+
+    async def _execute_segment_untraced(self, segment, stdin_data):
         command_name = segment['command']
 
         definitions = self._get_command_flag_definitions(command_name)
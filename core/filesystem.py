@@ -1,11 +1,29 @@
 # gem/core/filesystem.py
 
+import contextvars
 import json
+from contextlib import contextmanager
 from datetime import datetime
 import os
 import re
+from groups import group_manager
+from profiler import profiler
+from session import SessionAttribute
+from transactions import transaction_manager
+from tracing import traced
+
+def _describe_path(fs, path, *args, **kwargs):
+    return {"path": path}
+
+# The batch_saves block open in the current task, if any: {"open": bool, "pending": bool}.
+# Tasks started inside the block share it; other sessions and jobs save as usual.
+_save_batch = contextvars.ContextVar('filesystem_save_batch', default=None)
 
 class FileSystemManager:
+    # The working directory and group table belong to the current session.
+    current_path = SessionAttribute('cwd')
+    user_groups = SessionAttribute('user_groups')
+
     def __init__(self):
         self.fs_data = {}
         self.current_path = "/"
@@ -16,12 +34,52 @@ class FileSystemManager:
     def set_save_function(self, func):
         self.save_function = func
 
+    @traced('fs.save')
     def _save_state(self):
+        if profiler.enabled: profiler.count('save_state')
+        batch = _save_batch.get()
+        if batch is not None and batch["open"]:
+            batch["pending"] = True
+            return
         if self.save_function:
             self.save_function(json.dumps(self.get_fs_data()))
         else:
             print("CRITICAL: Filesystem save function not provided.")
 
+    def _remember(self, mapping, *keys):
+        """
+        Journals mapping[key] for the open transaction, if any: a rollback
+        puts the old values back and then saves the filesystem once.
+        """
+        if transaction_manager.active:
+            transaction_manager.record_once('fs.save', self._save_state)
+            transaction_manager.remember(mapping, *keys)
+
+    @contextmanager
+    def batch_saves(self):
+        """
+        Coalesces every save requested inside the block into a single save
+        when the outermost block exits. Used by commands that run many
+        other commands, such as 'xargs' and 'find -exec'. Only saves made by
+        the task that opened the block, and tasks it starts inside it, are
+        held back. The save still happens if the block is left by an
+        exception or a cancellation.
+        """
+        outer = _save_batch.get()
+        if outer is not None and outer["open"]:
+            yield
+            return
+        batch = {"open": True, "pending": False}
+        token = _save_batch.set(batch)
+        try:
+            yield
+        finally:
+            # A task started inside the block may outlive it; its later saves must not wait for a closed batch.
+            batch["open"] = False
+            _save_batch.reset(token)
+            if batch["pending"]:
+                self._save_state()
+
 
     def set_context(self, current_path, user_groups=None):
         self.current_path = current_path if current_path else "/"
@@ -39,6 +97,7 @@ class FileSystemManager:
 
 
     def _initialize_default_filesystem(self):
+        self._remember(self.__dict__, 'fs_data')
         now_iso = datetime.utcnow().isoformat() + "Z"
         self.fs_data = {
             "/": {
@@ -73,6 +132,7 @@ class FileSystemManager:
         self._save_state()
 
     def get_node(self, path, resolve_symlink=True, visited_links=None):
+        if profiler.enabled: profiler.count('get_node')
         if visited_links is None:
             visited_links = set()
 
@@ -168,6 +228,7 @@ class FileSystemManager:
 
     def load_state_from_json(self, json_string):
         try:
+            self._remember(self.__dict__, 'fs_data')
             self.fs_data = json.loads(json_string)
             return True
         except json.JSONDecodeError:
@@ -180,6 +241,7 @@ class FileSystemManager:
     def save_state_to_json(self):
         return json.dumps(self.fs_data)
 
+    @traced('fs.write_file', _describe_path)
     def write_file(self, path, content, user_context):
         abs_path = self.get_absolute_path(path)
         parent_path = os.path.dirname(abs_path)
@@ -208,9 +270,11 @@ class FileSystemManager:
                 raise PermissionError(f"Permission denied to create file in '{parent_path}'")
 
         now_iso = datetime.utcnow().isoformat() + "Z"
+        self._remember(parent_node, 'mtime')
         if existing_node:
             if existing_node.get('type') != 'file':
                 raise IsADirectoryError(f"Cannot write to '{path}': It is a directory.")
+            self._remember(existing_node, 'content', 'mtime')
             existing_node['content'] = content
             existing_node['mtime'] = now_iso
         else:
@@ -224,11 +288,13 @@ class FileSystemManager:
                 "type": "file", "content": content, "owner": str(user_context.get('name', 'guest')),
                 "group": str(new_file_group), "mode": new_file_mode, "mtime": now_iso
             }
+            self._remember(parent_node['children'], file_name)
             parent_node['children'][file_name] = new_file
 
         parent_node['mtime'] = now_iso
         self._save_state()
 
+    @traced('fs.create_directory', _describe_path)
     def create_directory(self, path, user_context, parents=False):
         abs_path = self.get_absolute_path(path)
         if self.get_node(abs_path):
@@ -256,6 +322,8 @@ class FileSystemManager:
                     "type": "directory", "children": {}, "owner": str(user_context.get('name', 'guest')),
                     "group": str(user_context.get('group', 'guest')), "mode": 0o755, "mtime": now_iso
                 }
+                self._remember(current_node['children'], part)
+                self._remember(current_node, 'mtime')
                 current_node['children'][part] = new_dir
                 current_node['mtime'] = now_iso
 
@@ -275,12 +343,14 @@ class FileSystemManager:
         if not node:
             raise FileNotFoundError(f"Cannot access '{path}': No such file or directory")
 
+        self._remember(node, 'mode', 'mtime')
         node['mode'] = int(mode_str, 8)
         node['mtime'] = datetime.utcnow().isoformat() + "Z"
         self._save_state()
 
     def _recursive_chown(self, node, new_owner):
         now_iso = datetime.utcnow().isoformat() + "Z"
+        self._remember(node, 'owner', 'mtime')
         node['owner'] = new_owner
         node['mtime'] = now_iso
         if node.get('type') == 'directory' and node.get('children'):
@@ -295,6 +365,7 @@ class FileSystemManager:
         if recursive and node.get('type') == 'directory':
             self._recursive_chown(node, new_owner)
         else:
+            self._remember(node, 'owner', 'mtime')
             node['owner'] = new_owner
             node['mtime'] = datetime.utcnow().isoformat() + "Z"
 
@@ -302,6 +373,7 @@ class FileSystemManager:
 
     def _recursive_chgrp(self, node, new_group):
         now_iso = datetime.utcnow().isoformat() + "Z"
+        self._remember(node, 'group', 'mtime')
         node['group'] = new_group
         node['mtime'] = now_iso
         if node.get('type') == 'directory' and node.get('children'):
@@ -316,6 +388,7 @@ class FileSystemManager:
         if recursive and node.get('type') == 'directory':
             self._recursive_chgrp(node, new_group)
         else:
+            self._remember(node, 'group', 'mtime')
             node['group'] = new_group
             node['mtime'] = datetime.utcnow().isoformat() + "Z"
 
@@ -343,10 +416,13 @@ class FileSystemManager:
             "mtime": now_iso
         }
 
+        self._remember(parent_node['children'], link_name)
+        self._remember(parent_node, 'mtime')
         parent_node['children'][link_name] = symlink_node
         parent_node['mtime'] = now_iso
         self._save_state()
 
+    @traced('fs.rename_node', lambda fs, old_path, new_path: {"path": old_path, "target": new_path})
     def rename_node(self, old_path, new_path):
         abs_old_path = self.get_absolute_path(old_path)
         abs_new_path = self.get_absolute_path(new_path)
@@ -378,6 +454,11 @@ class FileSystemManager:
 
         now_iso = datetime.utcnow().isoformat() + "Z"
         node_to_move = old_parent_node['children'][old_name]
+        self._remember(old_parent_node['children'], old_name)
+        self._remember(new_parent_node['children'], new_name)
+        self._remember(node_to_move, 'mtime')
+        self._remember(old_parent_node, 'mtime')
+        self._remember(new_parent_node, 'mtime')
         del old_parent_node['children'][old_name]
         node_to_move['mtime'] = now_iso
         new_parent_node['children'][new_name] = node_to_move
@@ -386,6 +467,7 @@ class FileSystemManager:
             new_parent_node['mtime'] = now_iso
         self._save_state()
 
+    @traced('fs.remove', _describe_path)
     def remove(self, path, recursive=False):
         abs_path = self.get_absolute_path(path)
         if abs_path == '/':
@@ -402,6 +484,9 @@ class FileSystemManager:
         if child_node.get('type') == 'directory' and child_node.get('children') and not recursive:
             raise IsADirectoryError(f"Cannot remove '{path}': Directory not empty.")
 
+        # The removed subtree is kept by the journal as is, so undoing this is O(1).
+        self._remember(parent_node['children'], node_name)
+        self._remember(parent_node, 'mtime')
         del parent_node['children'][node_name]
         parent_node['mtime'] = datetime.utcnow().isoformat() + "Z"
         self._save_state()
@@ -426,8 +511,8 @@ class FileSystemManager:
         if node.get('owner') == user_context.get('name'):
             return (owner_perms & required_perm) == required_perm
 
-        user_groups = self.user_groups.get(user_context.get('name', ''), [])
-        if node.get('group') in user_groups:
+        group = node.get('group')
+        if group == user_context.get('group') or group_manager.is_member(user_context.get('name', ''), group):
             return (group_perms & required_perm) == required_perm
 
         return (other_perms & required_perm) == required_perm
@@ -492,4 +577,6 @@ class FileSystemManager:
         return {"success": True, "node": final_node, "resolvedPath": abs_path}
 
 
-fs_manager = FileSystemManager()
\ No newline at end of file
+fs_manager = FileSystemManager()
+# Saves made during a transaction, or while rolling one back, become one save at its end.
+transaction_manager.add_scope(fs_manager.batch_saves)
\ No newline at end of file
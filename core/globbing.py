@@ -0,0 +1,143 @@
+# gem/core/globbing.py
+
+import fnmatch
+import os
+import re
+from functools import lru_cache
+from filesystem import fs_manager
+
+
+def has_magic(text):
+    """True when text contains wildcard syntax that should be expanded."""
+    return '*' in text or '?' in text or ('[' in text and ']' in text)
+
+
+@lru_cache(maxsize=512)
+def compile_component(component):
+    """Translates one path component to a compiled regex matcher, once per distinct pattern."""
+    return re.compile(fnmatch.translate(component)).match
+
+
+class GlobEngine:
+    """
+    Expands shell wildcards against the in-memory filesystem tree.
+
+    Patterns are matched one path component at a time: literal components
+    are looked up directly in a directory's children (so they prune the
+    walk instead of scanning it), wildcard components use a cached compiled
+    regex, and '**' matches zero or more directories (see _recursive_step).
+    Names starting with a dot are only matched by components that themselves
+    start with a dot.
+    """
+    def __init__(self, fs):
+        self.fs_manager = fs
+
+    @staticmethod
+    def _join(display, name):
+        if not display:
+            return name
+        return display + name if display.endswith('/') else f"{display}/{name}"
+
+    @staticmethod
+    def _child_path(abs_path, name):
+        return abs_path + name if abs_path == '/' else f"{abs_path}/{name}"
+
+    def _directory_children(self, abs_path, node):
+        if node and node.get('type') == 'symlink':
+            node = self.fs_manager.get_node(abs_path)
+        if node and node.get('type') == 'directory':
+            return node.get('children', {})
+        return None
+
+    def _literal_step(self, state, component):
+        display, abs_path, node = state
+        if component == '.':
+            return (self._join(display, '.'), abs_path, node)
+        if component == '..':
+            parent_path = os.path.dirname(abs_path) or '/'
+            return (self._join(display, '..'), parent_path, self.fs_manager.get_node(parent_path))
+        children = self._directory_children(abs_path, node)
+        if children is None or component not in children:
+            return None
+        child_path = self._child_path(abs_path, component)
+        return (self._join(display, component), child_path, children[component])
+
+    def _wildcard_step(self, state, component, results):
+        display, abs_path, node = state
+        children = self._directory_children(abs_path, node)
+        if not children:
+            return
+        match = compile_component(component)
+        allow_hidden = component.startswith('.')
+        for name, child in children.items():
+            if name.startswith('.') and not allow_hidden:
+                continue
+            if match(name):
+                results.append((self._join(display, name), self._child_path(abs_path, name), child))
+
+    def _recursive_step(self, state, include_files, results):
+        """
+        '**', which matches zero or more directories, as bash's globstar does.
+        Followed by more components, it yields the directory itself and every
+        directory below it. As the last component, it yields everything below
+        the directory, and the directory itself with a trailing slash ('d/**'
+        gives 'd/' first) unless it is the current directory. Symlinks are
+        not followed.
+        """
+        display, abs_path, node = state
+        if not include_files:
+            results.append(state)
+        elif display and self._directory_children(abs_path, node) is not None:
+            results.append((self._join(display, ''), abs_path, node))
+        stack = [state]
+        while stack:
+            display, abs_path, node = stack.pop()
+            children = node.get('children', {}) if node and node.get('type') == 'directory' else {}
+            for name, child in children.items():
+                if name.startswith('.'):
+                    continue
+                child_state = (self._join(display, name), self._child_path(abs_path, name), child)
+                if child.get('type') == 'directory':
+                    results.append(child_state)
+                    stack.append(child_state)
+                elif include_files:
+                    results.append(child_state)
+
+    def expand(self, pattern):
+        """Returns the sorted paths matching pattern, or an empty list when nothing matches."""
+        is_absolute = pattern.startswith('/')
+        components = [component for component in pattern.split('/') if component]
+        # '**/**' matches no more than '**' does.
+        components = [component for index, component in enumerate(components)
+                      if not (component == '**' and index and components[index - 1] == '**')]
+        if not components:
+            return []
+
+        start_path = '/' if is_absolute else self.fs_manager.current_path
+        states = [('/' if is_absolute else '', start_path, self.fs_manager.get_node(start_path))]
+
+        for index, component in enumerate(components):
+            is_last = index == len(components) - 1
+            next_states = []
+            if component == '**':
+                for state in states:
+                    self._recursive_step(state, is_last, next_states)
+            elif not has_magic(component):
+                for state in states:
+                    next_state = self._literal_step(state, component)
+                    if next_state:
+                        next_states.append(next_state)
+            else:
+                for state in states:
+                    self._wildcard_step(state, component, next_states)
+            states = next_states
+            if not states:
+                return []
+
+        if pattern.endswith('/'):
+            states = [state for state in states if self._directory_children(state[1], state[2]) is not None]
+            return sorted({self._join(display, '') for display, _, _ in states})
+        return sorted({display for display, _, _ in states})
+
+# Instantiate a singleton for the kernel
+glob_engine = GlobEngine(fs_manager)
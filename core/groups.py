@@ -1,66 +1,150 @@
 # gem/core/groups.py
 
+from transactions import transaction_manager
+
 class GroupManager:
-    """Manages user groups and their memberships."""
+    """
+    Manages user groups and their memberships. Each group's members are
+    kept as a set, alongside a reverse index from every user to the set
+    of groups they belong to, so membership checks (including the
+    filesystem's group permission check) are single lookups. Every
+    mutation updates both sides together, and load_groups rebuilds them.
+    Inside a transaction each mutation journals its inverse.
+    """
     def __init__(self):
-        self.groups = {}
+        self._members = {}
+        self._memberships = {}
+        self._view = None
+
+    @property
+    def groups(self):
+        """The groups as stored and sent to JavaScript: {name: {"members": [...]}}."""
+        if self._view is None:
+            self._view = {name: {"members": sorted(members)} for name, members in self._members.items()}
+        return self._view
+
+    @groups.setter
+    def groups(self, groups_dict):
+        self._rebuild(groups_dict)
+
+    def _rebuild(self, groups_dict):
+        transaction_manager.record(self._restore_state(self._members, self._memberships))
+        self._members, self._memberships, self._view = {}, {}, None
+        for group_name, details in (groups_dict or {}).items():
+            self._members[group_name] = set()
+            for username in (details or {}).get("members", []):
+                self._link(username, group_name)
+
+    def _restore_state(self, members, memberships):
+        def restore():
+            self._members, self._memberships, self._view = members, memberships, None
+        return restore
+
+    def _invalidate_view(self):
+        self._view = None
+
+    def _journal_group(self, group_name):
+        """Journals the group's entry (its member set, or its absence) for a rollback."""
+        if transaction_manager.active:
+            transaction_manager.record(self._invalidate_view)
+            transaction_manager.remember(self._members, group_name)
+
+    def _journal_link(self, username, group_name, linked):
+        """Journals the inverse of linking (or unlinking) a user and a group."""
+        if transaction_manager.active:
+            def undo():
+                (self._unlink if linked else self._link)(username, group_name)
+                self._invalidate_view()
+            transaction_manager.record(undo)
+
+    def _link(self, username, group_name):
+        self._members[group_name].add(username)
+        self._memberships.setdefault(username, set()).add(group_name)
+
+    def _unlink(self, username, group_name):
+        self._members[group_name].discard(username)
+        user_groups = self._memberships.get(username)
+        if user_groups is not None:
+            user_groups.discard(group_name)
+            if not user_groups:
+                del self._memberships[username]
 
     def initialize_defaults(self):
         """Initializes the default groups if they don't exist."""
-        if not self.groups:
-            self.groups = {
+        if not self._members:
+            self.load_groups({
                 "root": {"members": ["root"]},
                 "Guest": {"members": ["Guest"]},
                 "towncrier": {"members": []}
-            }
+            })
 
     def get_all_groups(self):
         """Returns the entire groups dictionary."""
         return self.groups
 
     def load_groups(self, groups_dict):
-        """Loads groups from a dictionary, typically from storage."""
+        """Loads groups from a dictionary, typically from storage, and rebuilds the membership index."""
         # [MODIFIED] Convert the incoming JsProxy to a native Python dictionary
-        self.groups = groups_dict.to_py() if hasattr(groups_dict, 'to_py') else groups_dict
+        self._rebuild(groups_dict.to_py() if hasattr(groups_dict, 'to_py') else groups_dict)
         # Ensure default groups are present after loading
-        if "root" not in self.groups:
-            self.groups["root"] = {"members": ["root"]}
-        if "Guest" not in self.groups:
-            self.groups["Guest"] = {"members": ["Guest"]}
+        for default in ("root", "Guest"):
+            if default not in self._members:
+                self._members[default] = set()
+                self._link(default, default)
 
     def group_exists(self, group_name):
         """Checks if a group exists."""
-        return group_name in self.groups
+        return group_name in self._members
+
+    def is_member(self, username, group_name):
+        """Checks if a user is listed as a member of a group."""
+        return group_name in self._memberships.get(username, ())
+
+    def get_groups_for_user(self, username):
+        """The set of groups that list the user as a member (not counting their primary group)."""
+        return frozenset(self._memberships.get(username, ()))
 
     def create_group(self, group_name):
         """Creates a new, empty group."""
         if self.group_exists(group_name):
             return False
-        self.groups[group_name] = {"members": []}
+        self._journal_group(group_name)
+        self._members[group_name] = set()
+        self._view = None
         return True
 
     def delete_group(self, group_name):
         """Deletes a group."""
         if self.group_exists(group_name):
-            del self.groups[group_name]
+            for username in list(self._members[group_name]):
+                self._journal_link(username, group_name, linked=False)
+                self._unlink(username, group_name)
+            # Journaled after the members, so a rollback restores the group before relinking them.
+            self._journal_group(group_name)
+            del self._members[group_name]
+            self._view = None
             return True
         return False
 
     def add_user_to_group(self, username, group_name):
         """Adds a user to a group if they are not already a member."""
-        if self.group_exists(group_name) and username not in self.groups[group_name]["members"]:
-            self.groups[group_name]["members"].append(username)
+        if self.group_exists(group_name) and not self.is_member(username, group_name):
+            self._journal_link(username, group_name, linked=True)
+            self._link(username, group_name)
+            self._view = None
             return True
         return False
 
     def remove_user_from_all_groups(self, username):
         """Removes a user from all groups they are a member of."""
-        changed = False
-        for group_name in self.groups:
-            if username in self.groups[group_name]["members"]:
-                self.groups[group_name]["members"].remove(username)
-                changed = True
-        return changed
+        user_groups = self._memberships.get(username)
+        if not user_groups:
+            return False
+        for group_name in list(user_groups):
+            self._journal_link(username, group_name, linked=False)
+            self._unlink(username, group_name)
+        self._view = None
+        return True
 
 # Instantiate a singleton that will be exposed to JavaScript
-group_manager = GroupManager()
\ No newline at end of file
+group_manager = GroupManager()
@@ -0,0 +1,98 @@
+# gem/core/heredocs.py
+
+import re
+
+# '<<WORD', '<<-WORD', "<<'WORD'" or '<<"WORD"' (a quoted word turns expansion off).
+HEREDOC_OPERATOR = re.compile(r"""<<(-?)[ \t]*(?:'([^']*)'|"([^"]*)"|([A-Za-z0-9_.-]+))""")
+
+
+def find_heredoc_operators(line):
+    """
+    Returns the here-document operators on one line, outside of quotes, as
+    (start, end, delimiter, strip_tabs, expand) tuples in order. '<<<'
+    here-strings are not here-documents and are skipped.
+    """
+    operators = []
+    in_single = in_double = False
+    i = 0
+    while i < len(line):
+        ch = line[i]
+        if ch == '\\' and not in_single:
+            i += 2
+            continue
+        if ch == "'" and not in_double:
+            in_single = not in_single
+        elif ch == '"' and not in_single:
+            in_double = not in_double
+        elif ch == '<' and not in_single and not in_double:
+            run_end = i
+            while run_end < len(line) and line[run_end] == '<':
+                run_end += 1
+            if run_end - i == 2:
+                match = HEREDOC_OPERATOR.match(line, i)
+                if match:
+                    quoted_word = match.group(2) if match.group(2) is not None else match.group(3)
+                    delimiter = quoted_word if quoted_word is not None else match.group(4)
+                    operators.append((i, match.end(), delimiter, bool(match.group(1)), quoted_word is None))
+                    i = match.end()
+                    continue
+            i = run_end
+            continue
+        i += 1
+    return operators
+
+
+def take_heredoc_bodies(operators, lines, start):
+    """
+    Reads the bodies for 'operators' from lines[start:], one body per
+    operator, each ending at a line holding just its delimiter. Returns
+    (bodies, next_line_index), or raises ValueError when a delimiter is
+    never found.
+    """
+    bodies, index = [], start
+    for _, _, delimiter, strip_tabs, _ in operators:
+        body = []
+        while True:
+            if index >= len(lines):
+                raise ValueError(f"Syntax error: here-document delimited by end of input (wanted '{delimiter}')")
+            line = lines[index]
+            index += 1
+            if strip_tabs:
+                line = line.lstrip('\t')
+            if line == delimiter:
+                break
+            body.append(line)
+        bodies.append("\n".join(body))
+    return bodies, index
+
+
+def split_heredocs(command_string):
+    """
+    Pulls the here-document bodies out of a multi-line command string.
+    Each '<<WORD' operator is replaced by '<< N', N indexing the returned
+    list of {"content", "expand"} bodies, and the remaining command lines
+    are joined with ';'. Strings without here-documents come back unchanged.
+    """
+    if '<<' not in command_string:
+        return command_string, []
+    lines = command_string.split('\n')
+    command_lines, heredocs = [], []
+    index = 0
+    while index < len(lines):
+        line = lines[index]
+        index += 1
+        operators = find_heredoc_operators(line)
+        if not operators:
+            command_lines.append(line)
+            continue
+        bodies, index = take_heredoc_bodies(operators, lines, index)
+        pieces, cursor = [], 0
+        for (start, end, _, _, expand), body in zip(operators, bodies):
+            pieces.append(f"{line[cursor:start]} << {len(heredocs)} ")
+            heredocs.append({"content": body, "expand": expand})
+            cursor = end
+        pieces.append(line[cursor:])
+        command_lines.append("".join(pieces))
+    if not heredocs:
+        return command_string, []
+    return "; ".join(line for line in command_lines if line.strip()), heredocs
@@ -0,0 +1,198 @@
+# gem/core/jobs.py
+
+import asyncio
+import time
+from datetime import datetime, timezone
+
+MAX_JOB_OUTPUT_LINES = 500
+SLEEP_SLICE_SECONDS = 0.05
+TERMINATING_SIGNALS = {'TERM': 143, 'KILL': 137, 'INT': 130, 'HUP': 129}
+STOP_SIGNALS = {'STOP', 'TSTP'}
+
+
+class Job:
+    """A backgrounded pipeline running as an asyncio task inside the kernel."""
+    def __init__(self, job_id, command, user):
+        self.id = job_id
+        self.command = command
+        self.user = user
+        self.status = 'running'
+        self.start_time = datetime.now(timezone.utc).isoformat()
+        self.cpu_time = 0.0
+        self.output_bytes = 0
+        self.output_lines = []
+        self.exit_status = None
+        self.term_signal = None
+        self.messages = []
+        self.task = None
+        self._running = asyncio.Event()
+        self._running.set()
+
+    @property
+    def is_alive(self):
+        return self.status in ('running', 'paused')
+
+    async def checkpoint(self):
+        """
+        Cooperative yield point between pipeline stages. Lets other tasks run
+        and blocks here for as long as the job is stopped.
+        """
+        await asyncio.sleep(0)
+        await self._running.wait()
+
+    async def sleep(self, seconds):
+        """Sleeps in small slices so that STOP pauses the clock and KILL lands promptly."""
+        remaining = seconds
+        while remaining > 0:
+            await self._running.wait()
+            started = time.monotonic()
+            await asyncio.sleep(min(SLEEP_SLICE_SECONDS, remaining))
+            remaining -= time.monotonic() - started
+
+    async def wait(self):
+        """
+        Waits until the job finishes or is stopped. Cancelling the wait (an
+        interrupt of whoever is waiting) leaves the job itself untouched.
+        """
+        while self.status == 'running':
+            await asyncio.wait({self.task}, timeout=SLEEP_SLICE_SECONDS)
+
+    def add_cpu_time(self, seconds):
+        self.cpu_time += max(0.0, seconds)
+
+    def record_output(self, text):
+        if not text:
+            return
+        text = str(text)
+        self.output_bytes += len(text.encode('utf-8'))
+        self.output_lines.extend(text.split('\n'))
+        if len(self.output_lines) > MAX_JOB_OUTPUT_LINES:
+            del self.output_lines[:-MAX_JOB_OUTPUT_LINES]
+
+    def state_label(self):
+        if self.status == 'running':
+            return 'Running'
+        if self.status == 'paused':
+            return 'Stopped'
+        if self.term_signal:
+            return 'Killed' if self.term_signal == 'KILL' else 'Terminated'
+        return 'Done' if self.exit_status == 0 else f'Exit {self.exit_status}'
+
+    def to_dict(self):
+        return {
+            "id": self.id, "command": self.command, "user": self.user,
+            "status": self.status, "start_time": self.start_time,
+            "cpu_time": round(self.cpu_time, 4), "output_bytes": self.output_bytes,
+            "exit_status": self.exit_status
+        }
+
+
+class JobManager:
+    """The kernel's job table: spawns, signals, accounts for and reaps background jobs."""
+    def __init__(self):
+        self.jobs = {}
+        self._next_id = 1
+
+    def spawn(self, command, user, runner):
+        """
+        Starts runner(job) as a background task. The runner is a coroutine
+        function that returns the job's exit status.
+        """
+        job = Job(self._next_id, command, user)
+        self._next_id += 1
+        self.jobs[job.id] = job
+        job.task = asyncio.ensure_future(self._supervise(job, runner))
+        return job
+
+    async def _supervise(self, job, runner):
+        try:
+            status = await runner(job)
+            job.exit_status = status if isinstance(status, int) else 0
+        except asyncio.CancelledError:
+            signal = job.term_signal or 'TERM'
+            job.term_signal = signal
+            job.exit_status = TERMINATING_SIGNALS.get(signal, 143)
+        except Exception as e:
+            job.record_output(f"[{job.id}] {job.command}: {repr(e)}")
+            job.exit_status = 1
+        finally:
+            job.status = 'done'
+            job._running.set()
+
+    def get(self, job_id):
+        try:
+            return self.jobs.get(int(job_id))
+        except (TypeError, ValueError):
+            return None
+
+    @staticmethod
+    def may_signal(job, user):
+        """Only the job's owner and root may signal it; user None is the kernel itself."""
+        return user is None or user == 'root' or job.user == user
+
+    def signal(self, job_id, signal, user=None):
+        """Delivers TERM/KILL/INT/HUP, STOP/TSTP or CONT to a job on behalf of 'user'."""
+        job = self.get(job_id)
+        if not job or not job.is_alive:
+            return {"success": False, "error": f"Job {job_id} not found."}
+        if not self.may_signal(job, user):
+            return {"success": False, "error": f"({job_id}) - Operation not permitted"}
+        signal = signal.upper()
+        if signal.startswith('SIG'):
+            signal = signal[3:]
+        if signal in TERMINATING_SIGNALS:
+            job.term_signal = signal
+            job._running.set()
+            job.task.cancel()
+        elif signal in STOP_SIGNALS:
+            job.status = 'paused'
+            job._running.clear()
+        elif signal == 'CONT':
+            job.status = 'running'
+            job._running.set()
+        else:
+            return {"success": False, "error": f"Invalid signal '{signal}'."}
+        return {"success": True, "output": ""}
+
+    def live_jobs(self):
+        return [job for _, job in sorted(self.jobs.items()) if job.is_alive]
+
+    def report(self):
+        """Returns every job for display, then forgets the ones that have finished."""
+        jobs = [job for _, job in sorted(self.jobs.items())]
+        for job in jobs:
+            if not job.is_alive:
+                del self.jobs[job.id]
+        return jobs
+
+    def reap(self, job_id):
+        """Forgets a finished job without waiting for it to be reported by 'jobs'."""
+        job = self.get(job_id)
+        if job and not job.is_alive:
+            del self.jobs[job.id]
+
+    def post_message(self, job_id, message):
+        job = self.get(job_id)
+        if not job or not job.is_alive:
+            return False
+        job.messages.append(message)
+        return True
+
+    def read_messages(self, job_id):
+        job = self.get(job_id)
+        if not job:
+            return []
+        messages, job.messages = job.messages, []
+        return messages
+
+    def get_process_list(self):
+        """Rows for ps/top, one per live job."""
+        return [{
+            "pid": job.id, "user": job.user,
+            "status": 'T' if job.status == 'paused' else 'R',
+            "command": job.command, "cpu_time": round(job.cpu_time, 4),
+            "output_bytes": job.output_bytes, "start_time": job.start_time
+        } for job in self.live_jobs()]
+
+# Instantiate a singleton for the kernel
+job_manager = JobManager()
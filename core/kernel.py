@@ -5,44 +5,96 @@ from filesystem import fs_manager
 from session import env_manager, history_manager, alias_manager, session_manager
 from groups import group_manager
 from users import user_manager
-from sudo import SudoManager
-from ai_manager import AIManager
-from apps.editor import editor_manager
-from apps.paint import paint_manager
-from apps.adventure import adventure_manager
-from apps import top as top_app
-from apps import log as log_app
-from apps import basic as basic_app
-from audit import audit_manager
+from sudo import sudo_manager
+from scripting import script_manager
+from jobs import job_manager
+from tracing import tracer
+from command_manifest import command_manifest
+from completion import completion_manager
+from importlib import import_module
 import json
 import traceback
 import inspect
 import asyncio
 
+
+class LazyModule:
+    """
+    Stands in for a kernel module that is only imported on first use. The
+    first attribute lookup (the dispatcher's getattr, or a command calling
+    a method) runs the loader; later lookups go straight to the result.
+    """
+    def __init__(self, loader):
+        self._loader = loader
+        self._target = None
+
+    @property
+    def is_loaded(self):
+        return self._target is not None
+
+    def resolve(self):
+        if self._target is None:
+            self._target = self._loader()
+        return self._target
+
+    def __getattr__(self, name):
+        return getattr(self.resolve(), name)
+
+
+def _load_attribute(module_name, attribute=None):
+    """A loader for LazyModule: imports module_name and returns it, or one of its attributes."""
+    def loader():
+        module = import_module(module_name)
+        return getattr(module, attribute) if attribute else module
+    return loader
+
+
+def _load_ai_manager():
+    from ai_manager import AIManager
+    return AIManager(fs_manager, command_executor)
+
+
 # --- Module Initialization ---
-sudo_manager = SudoManager(fs_manager)
-ai_manager = AIManager(fs_manager, command_executor)
+# The AI manager (and with it pyodide.http), the apps and the audit log are
+# imported by the first syscall or command that uses them, not at boot.
+command_manifest.load()
+ai_manager = LazyModule(_load_ai_manager)
 command_executor.set_ai_manager(ai_manager)
+audit_manager = LazyModule(_load_attribute("audit", "audit_manager"))
+basic_app = LazyModule(_load_attribute("apps.basic"))
 
 MODULE_DISPATCHER = {
     "executor": command_executor, "filesystem": fs_manager, "session": session_manager,
     "env": env_manager, "history": history_manager, "alias": alias_manager,
     "groups": group_manager, "users": user_manager, "sudo": sudo_manager, "ai": ai_manager,
-    "editor": editor_manager, "paint": paint_manager,
-    "adventure": adventure_manager, "top": top_app, "log": log_app, "basic": basic_app, "audit": audit_manager
+    "editor": LazyModule(_load_attribute("apps.editor", "editor_manager")),
+    "paint": LazyModule(_load_attribute("apps.paint", "paint_manager")),
+    "adventure": LazyModule(_load_attribute("apps.adventure", "adventure_manager")),
+    "top": LazyModule(_load_attribute("apps.top")), "log": LazyModule(_load_attribute("apps.log")),
+    "basic": basic_app, "audit": audit_manager,
+    "script": script_manager, "jobs": job_manager, "completion": completion_manager
 }
 
 def initialize_kernel(save_function):
     fs_manager.set_save_function(save_function)
 
-async def syscall_handler(request_json):
+def shutdown():
     """
-    The single, now ASYNC, entry point for all calls from the JavaScript frontend.
+    Writes out state the kernel buffers in memory (the audit log) before the
+    page unloads. Safe to call repeatedly; modules never loaded have nothing to write.
+    """
+    if audit_manager.is_loaded:
+        audit_manager.flush()
+    return True
+
+async def _dispatch_request(request):
+    """
+    Resolves a single {module, function, args, kwargs} request against the
+    MODULE_DISPATCHER and returns the normalized result as a dictionary.
     """
+    module_name = request.get("module")
+    function_name = request.get("function")
     try:
-        request = json.loads(request_json)
-        module_name = request.get("module")
-        function_name = request.get("function")
         args = request.get("args", [])
         kwargs = request.get("kwargs", {})
 
@@ -61,19 +113,87 @@ async def syscall_handler(request_json):
             result = await result
 
         if isinstance(result, dict) and 'success' in result:
-            return json.dumps(result)
+            return result
         if isinstance(result, str):
             try:
-                json.loads(result)
-                return result
+                return json.loads(result)
             except json.JSONDecodeError: pass
-        return json.dumps({"success": True, "data": result})
+        return {"success": True, "data": result}
 
     except Exception as e:
-        return json.dumps({
+        return {
             "success": False,
             "error": f"Kernel Dispatch Error in {module_name}.{function_name}: {repr(e)}",
             "traceback": traceback.format_exc()
+        }
+
+async def syscall_handler(request_json):
+    """
+    The single, now ASYNC, entry point for all calls from the JavaScript frontend.
+    """
+    try:
+        request = json.loads(request_json)
+    except Exception as e:
+        return json.dumps({
+            "success": False,
+            "error": f"Kernel Dispatch Error: malformed request: {repr(e)}",
+            "traceback": traceback.format_exc()
+        })
+    if not tracer.enabled:
+        return json.dumps(await _dispatch_request(request))
+    with tracer.span(f"syscall {request.get('module')}.{request.get('function')}") as span:
+        result = await _dispatch_request(request)
+        span.set(success=bool(result.get("success", True)) if isinstance(result, dict) else True)
+        return json.dumps(result)
+
+async def syscall_batch(batch_json):
+    """
+    Runs an ordered list of syscall requests in a single JS->Python crossing.
+
+    Accepts either a bare list of requests or an object of the form
+    {"requests": [...], "stop_on_error": bool, "concurrent": bool}.
+    Returns {"success": True, "results": [...]} with one result per request,
+    in request order. With stop_on_error, requests after the first failure
+    are not run and are reported as skipped. With concurrent, async handlers
+    are awaited together; synchronous handlers still run in request order.
+    The two cannot be combined: requests awaited together have all started
+    before any of them fails, so such a batch is rejected with an error
+    result and none of its requests run.
+    """
+    try:
+        batch = json.loads(batch_json)
+        if isinstance(batch, list):
+            batch = {"requests": batch}
+        requests = batch.get("requests", [])
+        stop_on_error = batch.get("stop_on_error", False)
+        concurrent = batch.get("concurrent", False)
+
+        if concurrent and stop_on_error:
+            return json.dumps({
+                "success": False,
+                "error": "Kernel Batch Error: stop_on_error cannot be combined with concurrent; send the batch in order instead."
+            })
+        if concurrent:
+            results = list(await asyncio.gather(*(_dispatch_request(req) for req in requests)))
+        else:
+            results = []
+            for index, req in enumerate(requests):
+                result = await _dispatch_request(req)
+                results.append(result)
+                if stop_on_error and isinstance(result, dict) and not result.get("success", True):
+                    for skipped in requests[index + 1:]:
+                        results.append({
+                            "success": False, "skipped": True,
+                            "error": f"Skipped {skipped.get('module')}.{skipped.get('function')}: an earlier request in the batch failed."
+                        })
+                    break
+
+        return json.dumps({"success": True, "results": results})
+    except Exception as e:
+        return json.dumps({
+            "success": False,
+            "error": f"Kernel Batch Error: {repr(e)}",
+            "traceback": traceback.format_exc()
         })
 
 async def execute_command(command_string: str, js_context_json: str, stdin_data: str = None) -> str:
@@ -183,9 +303,8 @@ def adventure_process_command(command):
     req = {"module": "adventure", "function": "process_command", "args": [command]}
     return asyncio.ensure_future(syscall_handler(json.dumps(req)))
 
-def top_get_process_list(jobs):
-    py_jobs = jobs.to_py() if hasattr(jobs, 'to_py') else jobs
-    req = {"module": "top", "function": "get_process_list", "args": [py_jobs]}
+def top_get_process_list(jobs=None):
+    req = {"module": "top", "function": "get_process_list", "args": []}
     return asyncio.ensure_future(syscall_handler(json.dumps(req)))
 
 def log_ensure_dir(js_context_json):
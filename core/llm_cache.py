@@ -0,0 +1,174 @@
+# gem/core/llm_cache.py
+
+import asyncio
+import hashlib
+import json
+import time
+from collections import OrderedDict
+from filesystem import fs_manager
+
+# Kept per user, under their home directory.
+CACHE_FILE = ".cache/llm_responses.json"
+CACHE_FORMAT_VERSION = 1
+DEFAULT_CAPACITY = 200
+DEFAULT_TTL_SECONDS = 7 * 24 * 60 * 60
+
+
+def _normalize_text(text):
+    """Text with line endings unified and trailing whitespace removed, the differences that do not change an answer."""
+    lines = str(text).replace('\r\n', '\n').replace('\r', '\n').strip().split('\n')
+    return '\n'.join(line.rstrip() for line in lines)
+
+
+def request_key(provider, model, system_prompt, conversation):
+    """
+    The cache key of an LLM request: a SHA-256 of the provider, model,
+    system prompt and conversation (each turn's role and text parts), after
+    normalizing whitespace. The API key is not part of it.
+    """
+    turns = [[str(turn.get('role', '')).lower(), [_normalize_text(part.get('text', '')) for part in turn.get('parts', [])]]
+             for turn in conversation]
+    material = json.dumps([provider, model or '', _normalize_text(system_prompt or ''), turns],
+                          separators=(',', ':'), ensure_ascii=False)
+    return hashlib.sha256(material.encode('utf-8')).hexdigest()
+
+
+class LLMResponseCache:
+    """
+    Caches LLM answers by request_key(), per user. Each user's entries are
+    kept in least-recently-used order, up to 'capacity' of them, and expire
+    'ttl' seconds after they were fetched. They are saved to ~/.cache/
+    llm_responses.json (mode 600) whenever one is added, so they survive a
+    reload; deleting or editing that file is noticed on the next lookup.
+
+    Concurrent lookups of a key that is being fetched for the same user wait
+    for that fetch instead of starting their own; another user's identical
+    request, which may use a different API key, is fetched separately. Only
+    successful answers are stored.
+    """
+    def __init__(self, capacity=DEFAULT_CAPACITY, ttl=DEFAULT_TTL_SECONDS):
+        self.enabled = True
+        self.capacity = capacity
+        self.ttl = ttl
+        self.stats = {"hits": 0, "misses": 0, "coalesced": 0}
+        self._entries = {}
+        # The file content each user's entries were loaded from or saved as.
+        self._sources = {}
+        self._in_flight = {}
+
+    def configure(self, enabled=None, capacity=None, ttl=None):
+        """Turns the cache on or off and sets its size and lifetime. Values left as None keep their setting."""
+        if capacity is not None and int(capacity) < 1:
+            return {"success": False, "error": f"Invalid LLM cache capacity: {capacity}"}
+        if ttl is not None and float(ttl) <= 0:
+            return {"success": False, "error": f"Invalid LLM cache TTL: {ttl}"}
+        if enabled is not None:
+            self.enabled = bool(enabled)
+        if capacity is not None:
+            self.capacity = int(capacity)
+            for username in self._entries:
+                self._evict(self._entries[username])
+        if ttl is not None:
+            self.ttl = float(ttl)
+        return {"success": True}
+
+    def _path(self, username):
+        return f"/home/{username}/{CACHE_FILE}"
+
+    def _file_content(self, username):
+        node = fs_manager.get_node(self._path(username))
+        return node.get('content') if node and node.get('type') == 'file' else None
+
+    def _user_entries(self, username):
+        """The user's entries, read again from their cache file if it changed since we last saw it."""
+        content = self._file_content(username)
+        if username in self._entries and content is self._sources.get(username):
+            return self._entries[username]
+        entries = OrderedDict()
+        try:
+            data = json.loads(content) if content else {}
+        except json.JSONDecodeError:
+            data = {}
+        if isinstance(data, dict) and data.get("version") == CACHE_FORMAT_VERSION:
+            now = time.time()
+            for key, entry in data.get("entries", []):
+                if now - entry.get("stored", 0) < self.ttl:
+                    entries[key] = entry
+        self._evict(entries)
+        self._entries[username] = entries
+        self._sources[username] = content
+        return entries
+
+    def _evict(self, entries):
+        while len(entries) > self.capacity:
+            entries.popitem(last=False)
+
+    def _save(self, username, user_context):
+        """Writes the user's entries (least recently used first) to their cache file, if they have a home."""
+        if not fs_manager.get_node(f"/home/{username}"):
+            return
+        content = json.dumps({"version": CACHE_FORMAT_VERSION, "entries": list(self._entries[username].items())})
+        path = self._path(username)
+        is_new = self._sources.get(username) is None
+        try:
+            fs_manager.write_file(path, content, user_context)
+            if is_new:
+                fs_manager.chmod(path, "600")
+        except (OSError, ValueError) as e:
+            print(f"LLMResponseCache: could not save {path}: {e}")
+            return
+        self._sources[username] = self._file_content(username)
+
+    def _store(self, username, user_context, key, answer):
+        entries = self._user_entries(username)
+        if key in entries and entries[key]["answer"] == answer:
+            # Another caller waiting on the same fetch has stored it already.
+            return
+        entries[key] = {"answer": answer, "stored": time.time()}
+        entries.move_to_end(key)
+        self._evict(entries)
+        self._save(username, user_context)
+
+    async def get_or_fetch(self, key, fetch, user_context, use_cache=True):
+        """
+        Returns the cached result for key (marked "cached": True), or awaits
+        fetch() for it and stores a successful answer. With use_cache False,
+        or while the cache is disabled, fetch() is always called.
+        """
+        if not (self.enabled and use_cache):
+            return await fetch()
+        username = (user_context or {}).get('name', 'Guest')
+        entries = self._user_entries(username)
+        entry = entries.get(key)
+        if entry is not None:
+            if time.time() - entry["stored"] < self.ttl:
+                entries.move_to_end(key)
+                self.stats["hits"] += 1
+                return {"success": True, "answer": entry["answer"], "cached": True}
+            del entries[key]
+
+        flight = (username, key)
+        pending = self._in_flight.get(flight)
+        if pending is None:
+            self.stats["misses"] += 1
+            pending = asyncio.ensure_future(fetch())
+            self._in_flight[flight] = pending
+            pending.add_done_callback(lambda _: self._in_flight.pop(flight, None))
+        else:
+            self.stats["coalesced"] += 1
+        # A caller giving up must not cancel the fetch that others are waiting on.
+        result = dict(await asyncio.shield(pending))
+        if result.get("success") and result.get("answer"):
+            self._store(username, user_context, key, result["answer"])
+        return result
+
+    def clear(self, username):
+        """Forgets the user's cached answers and removes their cache file."""
+        self._entries.pop(username, None)
+        self._sources.pop(username, None)
+        if fs_manager.get_node(self._path(username)):
+            fs_manager.remove(self._path(username))
+        return True
+
+# Instantiate a singleton for the kernel
+llm_cache = LLMResponseCache()
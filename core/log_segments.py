@@ -0,0 +1,94 @@
+# gem/core/log_segments.py
+
+import os
+
+ROOT_CONTEXT = {"name": "root", "group": "root"}
+
+
+def _fs_manager():
+    # Imported on use: filesystem imports tracing, which keeps its spans in a RotatingLog.
+    from filesystem import fs_manager
+    return fs_manager
+
+
+class RotatingLog:
+    """
+    An append-only log file in the VFS, kept in segments. When appending a
+    line would take the file past segment_max_size (in characters, as the
+    VFS counts file sizes), it is first rotated to PATH.1, .1 to .2 and so
+    on, keeping retained_segments rotated segments (PATH.1 newest) and
+    deleting older ones, so an append never copies more than one segment.
+    Every segment is owned by root:root with mode 640; the audit log and the
+    trace file both record what other users did.
+    """
+    def __init__(self, path, segment_max_size, retained_segments):
+        self.path = path
+        self.segment_max_size = segment_max_size
+        self.retained_segments = retained_segments
+
+    def segment_path(self, number):
+        return f"{self.path}.{number}" if number else self.path
+
+    def ensure(self):
+        """Creates the file and its directories as root if missing, and returns its node."""
+        fs_manager = _fs_manager()
+        directory = os.path.dirname(self.path)
+        if not fs_manager.get_node(directory):
+            fs_manager.create_directory(directory, ROOT_CONTEXT, parents=True)
+        node = fs_manager.get_node(self.path)
+        if not node:
+            fs_manager.write_file(self.path, "", ROOT_CONTEXT)
+            node = fs_manager.get_node(self.path)
+        # Files written before the logs were made private are fixed up too.
+        if node.get('owner') != "root" or node.get('group') != "root":
+            fs_manager.chown(self.path, "root")
+            fs_manager.chgrp(self.path, "root")
+        if node.get('mode') != 0o640:
+            fs_manager.chmod(self.path, "640")
+        return node
+
+    def rotate(self):
+        """Shifts PATH to PATH.1, .1 to .2 and so on, dropping segments past retained_segments."""
+        fs_manager = _fs_manager()
+        for number in range(self.retained_segments, -1, -1):
+            path = self.segment_path(number)
+            if not fs_manager.get_node(path):
+                continue
+            if number == self.retained_segments:
+                fs_manager.remove(path)
+            else:
+                fs_manager.rename_node(path, self.segment_path(number + 1))
+
+    def append(self, lines):
+        """Appends the lines (each ending in a newline), rotating as segments fill up, in one save."""
+        fs_manager = _fs_manager()
+        with fs_manager.batch_saves():
+            content = self.ensure().get('content', '')
+            parts, size = [content], len(content)
+            for line in lines:
+                if size and size + len(line) > self.segment_max_size:
+                    fs_manager.write_file(self.path, "".join(parts), ROOT_CONTEXT)
+                    self.rotate()
+                    self.ensure()
+                    parts, size = [], 0
+                parts.append(line)
+                size += len(line)
+            fs_manager.write_file(self.path, "".join(parts), ROOT_CONTEXT)
+
+    def contents(self):
+        """The content of each existing segment, oldest first."""
+        fs_manager = _fs_manager()
+        for number in range(self.retained_segments, -1, -1):
+            node = fs_manager.get_node(self.segment_path(number))
+            if node and node.get('type') == 'file':
+                yield node.get('content', '')
+
+    def clear(self):
+        """Deletes the rotated segments and empties the current one."""
+        fs_manager = _fs_manager()
+        with fs_manager.batch_saves():
+            for number in range(1, self.retained_segments + 1):
+                if fs_manager.get_node(self.segment_path(number)):
+                    fs_manager.remove(self.segment_path(number))
+            if fs_manager.get_node(self.path):
+                fs_manager.write_file(self.path, "", ROOT_CONTEXT)
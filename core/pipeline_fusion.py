@@ -0,0 +1,222 @@
+# gem/core/pipeline_fusion.py
+
+import heapq
+import json
+import re
+from collections import Counter
+from importlib import import_module
+from filesystem import fs_manager
+from session import env_manager
+
+# Setting this environment variable to 'off' (or '0') runs every stage as written.
+FUSION_SWITCH = "PIPELINE_FUSION"
+DEFAULT_HEAD_LINES = 10
+
+
+def _is_plain(segment, command, flag_names=(), arg_count=0):
+    """True when segment runs 'command' with exactly arg_count arguments and only the given flags."""
+    return (segment['command'] == command and len(segment['args']) == arg_count
+            and set(segment['flags']) <= set(flag_names))
+
+
+def _readable_file_content(path, user_context):
+    """The content 'cat path' would print, or None when cat would report an error instead."""
+    node = fs_manager.get_node(path)
+    if not node or node.get('type') != 'file' or not fs_manager.has_permission(path, user_context, 'read'):
+        return None
+    return node.get('content', '')
+
+
+def _redirects_inside(chain):
+    """True when a stage of chain reads from or writes to somewhere other than the pipe joining it to its neighbours."""
+    return (any(segment.get('input_redirection') for segment in chain[1:])
+            or any(segment.get('redirection') for segment in chain[:-1]))
+
+
+def _head_limit(segment):
+    """The line count of a fusable 'head' stage, or None when head would reject it."""
+    value = segment['flags'].get('lines')
+    if value is None:
+        return DEFAULT_HEAD_LINES
+    try:
+        limit = int(value)
+    except (TypeError, ValueError):
+        return None
+    return limit if limit >= 0 else None
+
+
+def top_counts(stdin_data, limit=None):
+    """
+    'sort | uniq -c | sort -nr [| head -n limit]' in one pass: counts the
+    lines with a Counter and picks the most frequent ones with a heap
+    instead of sorting, joining and splitting the whole input three times.
+    Ties come out in ascending line order, as the stable reverse sort leaves them.
+    """
+    if not stdin_data:
+        return ""
+    counts = Counter(stdin_data.splitlines())
+    if len(counts) == 1 and '' in counts:
+        # The first sort joins its lines, and a trailing empty line does not
+        # survive being split again by uniq, so one empty line goes missing.
+        counts[''] -= 1
+        if not counts['']:
+            return ""
+    key = lambda item: (-item[1], item[0])
+    ranked = heapq.nsmallest(limit, counts.items(), key=key) if limit is not None else sorted(counts.items(), key=key)
+    return "\n".join(f"{str(count).rjust(7)} {line}" for line, count in ranked)
+
+
+def count_matches(content, pattern, invert=False):
+    """
+    'grep PATTERN | wc -l' without building grep's output: the number of
+    lines wc would count in it.
+    """
+    if not content:
+        return 0
+    matches, last_match = 0, None
+    for line in content.splitlines():
+        if bool(pattern.search(line)) != invert:
+            matches += 1
+            last_match = line
+    # An empty last match leaves a trailing newline that wc's splitlines() drops.
+    return matches - 1 if last_match == '' else matches
+
+
+class FusedStage:
+    """
+    Several pipeline stages replaced by a single-pass function. The function
+    returns the last stage's output, or None when some stage would have
+    failed; the original stages then run as written so that errors are
+    reported exactly as before.
+    """
+    def __init__(self, segments, function):
+        self.segments = segments
+        self.function = function
+        self.name = "|".join(segment['command'] for segment in segments)
+
+    def as_segment(self):
+        """The fused stage as a segment, reading the first stage's input redirection and writing the last one's output."""
+        segment = {'command': self.name, 'args': [], 'flags': {}, 'fused': self}
+        for key, stage in (('input_redirection', self.segments[0]), ('redirection', self.segments[-1])):
+            if stage.get(key):
+                segment[key] = stage[key]
+        return segment
+
+    async def run(self, executor, stdin_data):
+        output = self.function(stdin_data, executor.user_context)
+        if output is not None:
+            return json.dumps({"success": True, "output": output})
+        result_json = json.dumps({"success": True, "output": ""})
+        for segment in self.segments:
+            result_json = await executor._execute_segment(segment, stdin_data)
+            result = json.loads(result_json)
+            if not result.get("success"):
+                break
+            stdin_data = result.get("output")
+        return result_json
+
+
+class PipelineOptimizer:
+    """
+    Rewrites parsed pipelines before they run, replacing common
+    text-processing chains with fused stages that give byte-identical output:
+
+        sort | uniq -c | sort -nr [| head [-n N]]   Counter-based top-k
+        [cat FILE |] grep [-i] [-v] PATTERN [FILE] | wc -l
+                                                    count-only grep
+        cat FILE | grep ... PATTERN                 grep reads the file directly
+
+    Chains that do not match exactly (other flags, file arguments, a
+    redirection between two of their stages) are left alone.
+    """
+    def is_enabled(self):
+        return env_manager.get(FUSION_SWITCH).lower() not in ("off", "0", "false", "no")
+
+    def _top_k(self, segments, i):
+        chain = segments[i:i + 4]
+        if len(chain) < 3:
+            return None
+        if not (_is_plain(chain[0], 'sort') and chain[0]['flags'] == {}
+                and _is_plain(chain[1], 'uniq', ('count',)) and chain[1]['flags'].get('count')
+                and _is_plain(chain[2], 'sort', ('numeric-sort', 'reverse'))
+                and chain[2]['flags'].get('numeric-sort') and chain[2]['flags'].get('reverse')):
+            return None
+        limit = None
+        if len(chain) == 4 and _is_plain(chain[3], 'head', ('lines',)):
+            limit = _head_limit(chain[3])
+        if limit is None:
+            chain = chain[:3]
+        return FusedStage(chain, lambda stdin_data, user_context: top_counts(stdin_data, limit))
+
+    def _grep_count(self, segments, i):
+        source_path = None
+        if segments[i]['command'] == 'cat':
+            if not _is_plain(segments[i], 'cat', arg_count=1) or segments[i]['args'][0] == '-':
+                return None
+            source_path, i = segments[i]['args'][0], i + 1
+        chain = segments[i:i + 2]
+        if len(chain) < 2 or chain[0]['command'] != 'grep' or not (
+                _is_plain(chain[1], 'wc', ('lines',)) and chain[1]['flags'].get('lines')):
+            return None
+        grep = chain[0]
+        if not set(grep['flags']) <= {'ignore-case', 'invert-match'} or not 1 <= len(grep['args']) <= (1 if source_path else 2):
+            return None
+        try:
+            pattern = re.compile(grep['args'][0], re.IGNORECASE if grep['flags'].get('ignore-case') else 0)
+        except re.error:
+            return None
+        grep_path = grep['args'][1] if len(grep['args']) == 2 else None
+        invert = bool(grep['flags'].get('invert-match'))
+
+        def fused(stdin_data, user_context):
+            # grep prefers stdin over its file argument; cat ignores stdin.
+            if source_path:
+                content = _readable_file_content(source_path, user_context)
+            elif stdin_data is not None or not grep_path:
+                content = stdin_data
+            else:
+                node = fs_manager.get_node(grep_path)
+                content = node.get('content', '') if node and node.get('type') != 'directory' else None
+            if content is None:
+                return None
+            return str(count_matches(content, pattern, invert)).rjust(7)
+
+        return FusedStage(([segments[i - 1]] if source_path else []) + chain, fused)
+
+    def _file_grep(self, segments, i):
+        chain = segments[i:i + 2]
+        if len(chain) < 2 or not _is_plain(chain[0], 'cat', arg_count=1) or chain[0]['args'][0] == '-':
+            return None
+        grep = chain[1]
+        if grep['command'] != 'grep' or len(grep['args']) != 1:
+            return None
+        path = chain[0]['args'][0]
+
+        def fused(stdin_data, user_context):
+            content = _readable_file_content(path, user_context)
+            if content is None:
+                return None
+            result = import_module("commands.grep").run(grep['args'], grep['flags'], user_context, stdin_data=content)
+            return result if isinstance(result, str) else None
+
+        return FusedStage(chain, fused)
+
+    def plan(self, segments):
+        """Returns the segments to run, with fusable chains replaced by fused segments."""
+        if len(segments) < 2 or not self.is_enabled():
+            return segments
+        planned, i = [], 0
+        while i < len(segments):
+            fused = self._top_k(segments, i) or self._grep_count(segments, i) or self._file_grep(segments, i)
+            if fused and _redirects_inside(fused.segments):
+                fused = None
+            if fused:
+                planned.append(fused.as_segment())
+                i += len(fused.segments)
+            else:
+                planned.append(segments[i])
+                i += 1
+        return planned
+
+# Instantiate a singleton for the kernel
+pipeline_optimizer = PipelineOptimizer()
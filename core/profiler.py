@@ -0,0 +1,133 @@
+# gem/core/profiler.py
+
+import contextvars
+import time
+from collections import deque
+
+RING_BUFFER_SIZE = 256
+COUNTERS = ('get_node', 'save_state')
+
+# The record of the command line being profiled in the current task. Nested
+# executions (command substitutions, xargs, find -exec) add their segments to it.
+_current_record = contextvars.ContextVar('profiler_current_record', default=None)
+
+
+class Profiler:
+    """
+    Optional instrumentation for CommandExecutor. While enabled, every
+    command line is recorded (wall time, parse time, and per-segment wall
+    time, bytes in/out and filesystem call counts) into a ring buffer that
+    'perf stat' summarizes and 'top' displays. While disabled, the hooks
+    reduce to a single attribute check.
+    """
+    def __init__(self):
+        self.enabled = False
+        self.counters = dict.fromkeys(COUNTERS, 0)
+        self.records = deque(maxlen=RING_BUFFER_SIZE)
+
+    def enable(self):
+        self.enabled = True
+
+    def disable(self):
+        self.enabled = False
+
+    def reset(self):
+        self.counters = dict.fromkeys(COUNTERS, 0)
+        self.records.clear()
+
+    def count(self, counter):
+        """Bumps a call counter. Callers check 'enabled' first so that disabled profiling costs nothing."""
+        self.counters[counter] += 1
+
+    def current_record(self):
+        return _current_record.get()
+
+    def detach(self):
+        """Stops the current task from adding to the record it inherited (used by background jobs)."""
+        _current_record.set(None)
+
+    def begin(self, command_string, force=False):
+        """
+        Starts recording a top-level command line. Returns (record, token),
+        or (None, None) when profiling is off or a record is already open.
+        'force' records even while disabled, as the 'time' builtin does.
+        """
+        if not (self.enabled or force) or _current_record.get() is not None:
+            return None, None
+        record = {
+            "command": command_string, "started_at": time.time(),
+            "parse_ms": 0.0, "total_ms": 0.0, "segments": [],
+            "_start": time.perf_counter(), "_forced": force and not self.enabled
+        }
+        if record["_forced"]:
+            self.enabled = True
+        return record, _current_record.set(record)
+
+    def end(self, record, token):
+        """Closes a record opened by begin() and stores it in the ring buffer."""
+        _current_record.reset(token)
+        record["total_ms"] = (time.perf_counter() - record.pop("_start")) * 1000
+        if record.pop("_forced"):
+            self.enabled = False
+        self.records.append(record)
+        return record
+
+    def segment_start(self):
+        return time.perf_counter(), dict(self.counters)
+
+    def segment_end(self, record, command_name, started, stdin_data, result):
+        start_time, counters_before = started
+        record["segments"].append({
+            "command": command_name,
+            "wall_ms": (time.perf_counter() - start_time) * 1000,
+            "bytes_in": len(stdin_data.encode('utf-8')) if isinstance(stdin_data, str) else 0,
+            "bytes_out": len(str(result.get("output") or "").encode('utf-8')),
+            "success": bool(result.get("success")),
+            **{name: self.counters[name] - counters_before[name] for name in COUNTERS}
+        })
+
+    def recent(self, limit=20):
+        """The newest records first, trimmed for display."""
+        return [{
+            "command": record["command"], "total_ms": round(record["total_ms"], 3),
+            "parse_ms": round(record["parse_ms"], 3), "segments": len(record["segments"]),
+            "started_at": record["started_at"]
+        } for record in list(self.records)[-limit:][::-1]]
+
+    def summarize(self):
+        """Aggregates the ring buffer per command name, 'perf stat' style."""
+        per_command = {}
+        totals = {"lines": len(self.records), "total_ms": 0.0, "parse_ms": 0.0}
+        for record in self.records:
+            totals["total_ms"] += record["total_ms"]
+            totals["parse_ms"] += record["parse_ms"]
+            for segment in record["segments"]:
+                stats = per_command.setdefault(segment["command"], {
+                    "calls": 0, "failures": 0, "wall_ms": 0.0, "max_ms": 0.0,
+                    "bytes_in": 0, "bytes_out": 0, **dict.fromkeys(COUNTERS, 0)
+                })
+                stats["calls"] += 1
+                stats["failures"] += 0 if segment["success"] else 1
+                stats["wall_ms"] += segment["wall_ms"]
+                stats["max_ms"] = max(stats["max_ms"], segment["wall_ms"])
+                for key in ("bytes_in", "bytes_out") + COUNTERS:
+                    stats[key] += segment[key]
+        return {"totals": totals, "commands": per_command, "counters": dict(self.counters)}
+
+
+def format_record(record):
+    """Renders one record the way the 'time' builtin prints it."""
+    lines = [
+        f"real\t{record['total_ms'] / 1000:.3f}s",
+        f"parse\t{record['parse_ms'] / 1000:.3f}s"
+    ]
+    for segment in record["segments"]:
+        lines.append(
+            f"  {segment['command']:<12} {segment['wall_ms']:9.3f} ms  "
+            f"in {segment['bytes_in']}B  out {segment['bytes_out']}B  "
+            f"get_node {segment['get_node']}  saves {segment['save_state']}"
+        )
+    return "\n".join(lines)
+
+# Instantiate a singleton for the kernel
+profiler = Profiler()
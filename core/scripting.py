@@ -0,0 +1,527 @@
+# gem/core/scripting.py
+
+import asyncio
+import hashlib
+import json
+import re
+import shlex
+from collections import OrderedDict
+from session import current_session, env_manager, use_session
+from heredocs import find_heredoc_operators, take_heredoc_bodies
+
+BLOCK_KEYWORDS = {'then', 'elif', 'else', 'fi', 'do', 'done', '}'}
+FUNCTION_HEADER = re.compile(r'^(?:function\s+([A-Za-z_][A-Za-z0-9_]*)\s*(?:\(\s*\))?|([A-Za-z_][A-Za-z0-9_]*)\s*\(\s*\))\s*(\{)?\s*(.*)$')
+POSITIONAL_REF = re.compile(r'\$(\?|#|@|\d|\{\d+\})')
+MAX_COMPILED_SCRIPTS = 32
+
+# Effects the interpreter can absorb without handing control back to JS.
+# `change_directory` is applied to the script's own context and still
+# forwarded so the terminal ends up in the same directory.
+DEFERRED_EFFECTS = {'change_directory'}
+
+
+def _split_unquoted_semicolons(line):
+    """Splits a line on ';' outside of quotes, leaving escaped '\\;' intact."""
+    segments, buf = [], []
+    in_single = in_double = False
+    i = 0
+    while i < len(line):
+        ch = line[i]
+        if ch == '\\' and i + 1 < len(line) and not in_single:
+            buf.append(line[i:i + 2])
+            i += 2
+            continue
+        if ch == "'" and not in_double:
+            in_single = not in_single
+        elif ch == '"' and not in_single:
+            in_double = not in_double
+        elif ch == ';' and not in_single and not in_double:
+            segments.append(''.join(buf))
+            buf = []
+            i += 1
+            continue
+        buf.append(ch)
+        i += 1
+    segments.append(''.join(buf))
+    return [seg.strip() for seg in segments if seg.strip()]
+
+
+def _password_lines_needed(command_text):
+    """Mirrors the 'run' lookahead rules for commands that read passwords from the next lines."""
+    line_parts = command_text.split()
+    cmd = line_parts[0] if line_parts else ""
+    if cmd == 'useradd' and len(line_parts) == 2:
+        return 2
+    if cmd == 'sudo':
+        return 1
+    if cmd in ['su', 'login'] and len(line_parts) < 3:
+        return 1
+    return 0
+
+
+def _tokenize(content):
+    """
+    Turns script text into a flat list of (keyword, text, line_number) tokens.
+    Keyword is None for plain commands. Lines that feed a password pipe and
+    here-document bodies are attached to the command that consumes them.
+    """
+    lines = content.splitlines()
+    tokens = []
+    i = 0
+    while i < len(lines):
+        line_number = i + 1
+        stripped_line = lines[i].strip()
+        i += 1
+        if not stripped_line or stripped_line.startswith('#'):
+            continue
+
+        segments = _split_unquoted_semicolons(stripped_line)
+        for index, segment in enumerate(segments):
+            while segment:
+                word, _, rest = segment.partition(' ')
+                rest = rest.strip()
+                header = FUNCTION_HEADER.match(segment)
+                if word in ('if', 'elif', 'while', 'until', 'for'):
+                    tokens.append((word, rest, line_number))
+                    segment = ""
+                elif word in BLOCK_KEYWORDS or word == '{':
+                    tokens.append((word, '', line_number))
+                    segment = rest
+                elif word in ('break', 'continue', 'return', 'exit'):
+                    tokens.append((word, rest, line_number))
+                    segment = ""
+                elif header and (header.group(1) or header.group(3)):
+                    tokens.append(('function', header.group(1) or header.group(2), line_number))
+                    if header.group(3):
+                        tokens.append(('{', '', line_number))
+                    segment = header.group(4).strip()
+                else:
+                    password_pipe = None
+                    is_last_on_line = index == len(segments) - 1
+                    needed = _password_lines_needed(segment) if is_last_on_line else 0
+                    if needed:
+                        password_pipe = []
+                        while i < len(lines) and len(password_pipe) < needed:
+                            next_line = lines[i]
+                            if next_line.strip() and not next_line.strip().startswith('#'):
+                                password_pipe.append(next_line)
+                            i += 1
+                        if len(password_pipe) != needed:
+                            password_pipe = None
+                    heredoc_operators = find_heredoc_operators(segment) if is_last_on_line else []
+                    if heredoc_operators:
+                        # The bodies travel with the command; the executor cuts them out again.
+                        body_start = i
+                        try:
+                            _, i = take_heredoc_bodies(heredoc_operators, lines, i)
+                        except ValueError:
+                            i = len(lines)
+                        segment = "\n".join([segment] + lines[body_start:i])
+                    tokens.append((None, segment, line_number, password_pipe))
+                    segment = ""
+    return tokens
+
+
+class _Parser:
+    """Recursive-descent parser from tokens to a list of statement dictionaries."""
+    def __init__(self, tokens):
+        self.tokens = tokens
+        self.pos = 0
+
+    def _peek(self):
+        return self.tokens[self.pos] if self.pos < len(self.tokens) else None
+
+    def _expect(self, keyword):
+        token = self._peek()
+        if not token or token[0] != keyword:
+            found = f"'{token[0] or token[1]}' on line {token[2]}" if token else "end of script"
+            raise ValueError(f"Syntax error: expected '{keyword}' but found {found}.")
+        self.pos += 1
+        return token
+
+    def parse_block(self, terminators):
+        block = []
+        while True:
+            token = self._peek()
+            if token is None:
+                if terminators:
+                    raise ValueError(f"Syntax error: unexpected end of script (expected {' or '.join(sorted(terminators))}).")
+                return block
+            keyword = token[0]
+            if keyword in terminators:
+                return block
+            if keyword in BLOCK_KEYWORDS or keyword == '{':
+                raise ValueError(f"Syntax error: unexpected '{keyword}' on line {token[2]}.")
+            self.pos += 1
+            block.append(self._parse_statement(token))
+
+    def _parse_condition(self, token, terminator):
+        condition = []
+        if token[1]:
+            condition.append({'type': 'command', 'text': token[1], 'line': token[2], 'stdin': None})
+        condition.extend(self.parse_block({terminator}))
+        if not condition:
+            raise ValueError(f"Syntax error: missing condition after '{token[0]}' on line {token[2]}.")
+        self._expect(terminator)
+        return condition
+
+    def _parse_statement(self, token):
+        keyword, text, line = token[0], token[1], token[2]
+        if keyword is None:
+            return {'type': 'command', 'text': text, 'line': line, 'stdin': token[3]}
+
+        if keyword == 'if':
+            branches = []
+            condition = self._parse_condition(token, 'then')
+            while True:
+                body = self.parse_block({'elif', 'else', 'fi'})
+                branches.append((condition, body))
+                next_token = self._peek()
+                self.pos += 1
+                if next_token[0] == 'elif':
+                    condition = self._parse_condition(next_token, 'then')
+                    continue
+                else_body = []
+                if next_token[0] == 'else':
+                    else_body = self.parse_block({'fi'})
+                    self._expect('fi')
+                return {'type': 'if', 'branches': branches, 'else': else_body, 'line': line}
+
+        if keyword in ('while', 'until'):
+            condition = self._parse_condition(token, 'do')
+            body = self.parse_block({'done'})
+            self._expect('done')
+            return {'type': 'while', 'until': keyword == 'until', 'condition': condition, 'body': body, 'line': line}
+
+        if keyword == 'for':
+            match = re.match(r'^([A-Za-z_][A-Za-z0-9_]*)(?:\s+in\b\s*(.*))?$', text)
+            if not match:
+                raise ValueError(f"Syntax error: malformed 'for' on line {line}.")
+            self._expect('do')
+            body = self.parse_block({'done'})
+            self._expect('done')
+            words = match.group(2) if match.group(2) is not None else '$@'
+            return {'type': 'for', 'var': match.group(1), 'words': words, 'body': body, 'line': line}
+
+        if keyword == 'function':
+            self._expect('{')
+            body = self.parse_block({'}'})
+            self._expect('}')
+            return {'type': 'function', 'name': text, 'body': body, 'line': line}
+
+        if keyword in ('break', 'continue', 'return', 'exit'):
+            return {'type': keyword, 'arg': text, 'line': line}
+
+        raise ValueError(f"Syntax error: unexpected '{keyword}' on line {line}.")
+
+
+def compile_script(content):
+    """Parses script text into a program (a list of statement dictionaries)."""
+    return _Parser(_tokenize(content)).parse_block(set())
+
+
+class _LoopControl(Exception):
+    def __init__(self, kind, levels):
+        self.kind = kind
+        self.levels = levels
+
+class _FunctionReturn(Exception):
+    def __init__(self, status):
+        self.status = status
+
+class _ScriptExit(Exception):
+    def __init__(self, status):
+        self.status = status
+
+class _ScriptFailure(Exception):
+    def __init__(self, error):
+        self.error = error
+
+
+class ScriptRun:
+    """A single execution of a compiled script, able to pause while JS performs effects."""
+    def __init__(self, manager, script_id, program, script_path, script_args, js_context_json):
+        self.manager = manager
+        self.script_id = script_id
+        self.program = program
+        self.script_path = script_path
+        self.positional = list(script_args)
+        self.functions = {}
+        # The script runs in its own session, forked from the caller's, so
+        # commands typed while it is paused do not move its directory.
+        self.session = current_session().fork(f"script: {script_path}")
+        self.last_status = 0
+        self.output_chunks = []
+        self.pending_effects = []
+        self._load_context(js_context_json)
+        self._step_future = None
+        self._resume_future = None
+        self.task = None
+
+    def _load_context(self, js_context_json):
+        self.context = json.loads(js_context_json)
+        self.context_json = js_context_json
+
+    def _set_current_path(self, path):
+        self.context['current_path'] = path
+        self.context_json = json.dumps(self.context)
+
+    def _expand_positional(self, text):
+        """Replaces $?, $#, $@ and $N outside of single quotes."""
+        if '$' not in text:
+            return text
+
+        def replace(match):
+            ref = match.group(1).strip('{}')
+            if ref == '?':
+                return str(self.last_status)
+            if ref == '#':
+                return str(len(self.positional))
+            if ref == '@':
+                return ' '.join(shlex.quote(arg) for arg in self.positional)
+            index = int(ref)
+            if index == 0:
+                return self.script_path
+            return self.positional[index - 1] if index <= len(self.positional) else ""
+
+        parts = text.split("'")
+        for i in range(0, len(parts), 2):
+            parts[i] = POSITIONAL_REF.sub(replace, parts[i])
+        return "'".join(parts)
+
+    def _make_step(self, error=None, finished=False):
+        step = {
+            "success": True,
+            "effect": "script_step",
+            "script_id": None if finished else self.script_id,
+            "output": "\n".join(self.output_chunks),
+            "effects": self.pending_effects
+        }
+        if error:
+            step["error"] = error
+        self.output_chunks = []
+        self.pending_effects = []
+        return step
+
+    async def _yield_to_frontend(self):
+        """Hands accumulated output and effects to JS and waits for it to resume us."""
+        self._resume_future = asyncio.get_event_loop().create_future()
+        self._step_future.set_result(self._make_step())
+        self._load_context(await self._resume_future)
+
+    async def _run_command(self, node, errexit):
+        from executor import command_executor
+
+        text = self._expand_positional(node['text'])
+        first_word = text.split(None, 1)[0] if text.split() else ""
+        if first_word in self.functions:
+            words = await command_executor.expand_words(text, self.context_json)
+            return await self._call_function(first_word, words[1:], errexit)
+
+        stdin_data = "\n".join(node['stdin']) if node.get('stdin') else None
+        result = json.loads(await command_executor.execute(text, self.context_json, stdin_data))
+
+        effects = result.get('effects') or ([result] if result.get('effect') else [])
+        needs_frontend = False
+        for effect in effects:
+            if effect.get('effect') == 'page_output':
+                self.output_chunks.append(effect.get('content', ''))
+                continue
+            if effect.get('effect') == 'change_directory':
+                self._set_current_path(effect.get('path'))
+            if effect.get('effect') not in DEFERRED_EFFECTS:
+                needs_frontend = True
+            self.pending_effects.append(effect)
+
+        success = result.get('success', False)
+        if success and result.get('output') and not result.get('effect'):
+            self.output_chunks.append(str(result['output']))
+        self.last_status = 0 if success else 1
+
+        if needs_frontend:
+            await self._yield_to_frontend()
+
+        if not success and errexit:
+            if result.get('output'):
+                self.output_chunks.append(str(result['output']))
+            error = result.get('error')
+            if error is None:
+                error_message, suggestion = f"exited with status {self.last_status}", None
+            elif isinstance(error, dict):
+                error_message, suggestion = error.get('message', ''), error.get('suggestion')
+            else:
+                error_message, suggestion = str(error), None
+            raise _ScriptFailure({
+                "message": f"run: error on line {node['line']}: {node['text']}\n{error_message}",
+                "suggestion": suggestion
+            })
+        return self.last_status
+
+    async def _call_function(self, name, args, errexit):
+        saved_positional = self.positional
+        self.positional = list(args)
+        try:
+            await self._run_block(self.functions[name], errexit)
+        except _FunctionReturn as ret:
+            self.last_status = ret.status
+        finally:
+            self.positional = saved_positional
+        return self.last_status
+
+    async def _run_condition(self, condition):
+        await self._run_block(condition, errexit=False)
+        return self.last_status == 0
+
+    def _int_arg(self, node, default):
+        text = self._expand_positional(node['arg']).strip()
+        if not text:
+            return default
+        try:
+            return int(text)
+        except ValueError:
+            raise _ScriptFailure({"message": f"run: line {node['line']}: {node['type']}: numeric argument required", "suggestion": None})
+
+    async def _run_block(self, block, errexit=True):
+        from executor import command_executor
+
+        for node in block:
+            node_type = node['type']
+            if node_type == 'command':
+                await self._run_command(node, errexit)
+            elif node_type == 'if':
+                for condition, body in node['branches']:
+                    if await self._run_condition(condition):
+                        await self._run_block(body, errexit)
+                        break
+                else:
+                    self.last_status = 0
+                    await self._run_block(node['else'], errexit)
+            elif node_type == 'while':
+                while (await self._run_condition(node['condition'])) != node['until']:
+                    try:
+                        await self._run_block(node['body'], errexit)
+                    except _LoopControl as control:
+                        if control.levels > 1:
+                            control.levels -= 1
+                            raise
+                        if control.kind == 'break':
+                            break
+                self.last_status = 0
+            elif node_type == 'for':
+                words = await command_executor.expand_words(self._expand_positional(node['words']), self.context_json)
+                for word in words:
+                    env_manager.set(node['var'], word)
+                    try:
+                        await self._run_block(node['body'], errexit)
+                    except _LoopControl as control:
+                        if control.levels > 1:
+                            control.levels -= 1
+                            raise
+                        if control.kind == 'break':
+                            break
+            elif node_type == 'function':
+                self.functions[node['name']] = node['body']
+            elif node_type in ('break', 'continue'):
+                raise _LoopControl(node_type, self._int_arg(node, 1))
+            elif node_type == 'return':
+                raise _FunctionReturn(self._int_arg(node, self.last_status))
+            elif node_type == 'exit':
+                raise _ScriptExit(self._int_arg(node, self.last_status))
+
+    async def run(self):
+        """Runs the program to completion, resolving the pending step with the final result."""
+        with use_session(self.session):
+            await self._run_program()
+
+    async def _run_program(self):
+        env_manager.push()
+        error = None
+        try:
+            await self._run_block(self.program)
+        except _ScriptExit as exit_request:
+            self.last_status = exit_request.status
+        except _ScriptFailure as failure:
+            error = failure.error
+        except (_LoopControl, _FunctionReturn):
+            error = {"message": "run: 'break', 'continue' or 'return' used outside of a loop or function", "suggestion": None}
+        except Exception as e:
+            error = {"message": f"run: {e}", "suggestion": None}
+        finally:
+            env_manager.pop()
+            self.manager._finish(self.script_id)
+        if error is None and self.last_status != 0:
+            error = {"message": f"run: script exited with status {self.last_status}", "suggestion": None}
+        self._step_future.set_result(self._make_step(error=error, finished=True))
+
+
+class ScriptManager:
+    """Compiles scripts (cached by content hash) and runs them inside the kernel."""
+    def __init__(self):
+        self._compiled = OrderedDict()
+        self._runs = {}
+        self._next_id = 1
+
+    def compile(self, content):
+        """Returns the parsed program for the script text, reusing cached parses."""
+        key = hashlib.sha256(content.encode('utf-8')).hexdigest()
+        program = self._compiled.get(key)
+        if program is not None:
+            self._compiled.move_to_end(key)
+            return program
+        program = compile_script(content)
+        self._compiled[key] = program
+        if len(self._compiled) > MAX_COMPILED_SCRIPTS:
+            self._compiled.popitem(last=False)
+        return program
+
+    def _finish(self, script_id):
+        self._runs.pop(script_id, None)
+
+    async def _advance(self, script_run, resume_context_json=None):
+        script_run._step_future = asyncio.get_event_loop().create_future()
+        if resume_context_json is None:
+            script_run.task = asyncio.ensure_future(script_run.run())
+        else:
+            script_run._resume_future.set_result(resume_context_json)
+        return await script_run._step_future
+
+    async def start(self, content, script_path, script_args, js_context_json):
+        """
+        Runs a script until it finishes or needs the frontend. A script that
+        finishes without frontend effects returns a plain output result, so it
+        can be piped; otherwise a 'script_step' effect is returned and JS calls
+        resume() after performing the step's effects.
+        """
+        try:
+            program = self.compile(content)
+        except ValueError as e:
+            return {"success": False, "error": {"message": f"run: {script_path}: {e}", "suggestion": "Check the script for unbalanced if/fi, do/done or { } blocks."}}
+
+        script_id = self._next_id
+        self._next_id += 1
+        script_run = ScriptRun(self, script_id, program, script_path, script_args, js_context_json)
+        self._runs[script_id] = script_run
+        step = await self._advance(script_run)
+
+        if step["script_id"] is None and not step["effects"]:
+            if step.get("error"):
+                return {"success": False, "output": step["output"], "error": step["error"]}
+            return {"success": True, "output": step["output"]}
+        return step
+
+    async def resume(self, script_id, js_context_json):
+        """Continues a paused script with the (possibly changed) frontend context."""
+        script_run = self._runs.get(script_id)
+        if not script_run:
+            return {"success": False, "error": f"run: no paused script with id {script_id}"}
+        return await self._advance(script_run, js_context_json)
+
+    def cancel(self, script_id):
+        """Abandons a paused script, e.g. when the frontend could not perform its effects."""
+        script_run = self._runs.pop(script_id, None)
+        if script_run and script_run.task and not script_run.task.done():
+            script_run.task.cancel()
+        return script_run is not None
+
+# Instantiate a singleton for the kernel
+script_manager = ScriptManager()
@@ -1,79 +1,271 @@
 # gem/core/session.py
 
+import contextvars
 import json
+import re
+from collections import ChainMap, deque
+from contextlib import contextmanager
+
+HISTORY_CAPACITY = 20000
+HISTORY_TOKEN = re.compile(r'\w+')
+# Marks a variable unset in a layer that hides a lower layer's value.
+_UNSET = object()
+# The session the running task belongs to; None means the default session.
+_current_session = contextvars.ContextVar('current_session', default=None)
 
 class EnvironmentManager:
-    """Manages shell environment variables."""
+    """
+    Manages shell environment variables as a stack of layers in a
+    ChainMap: push() adds an empty layer and pop() drops it, and writes go
+    to the top layer. Unsetting a variable that a lower layer defines
+    leaves a tombstone (_UNSET) in the top layer. Reads go through a
+    flattened dict of the visible variables, kept up to date in place:
+    each pushed layer remembers the prior value of every variable it
+    changed, and pop() puts those back. Push and pop therefore cost
+    nothing for the variables a layer did not touch.
+    """
     def __init__(self):
-        self.env_stack = [{}]
+        self.env_stack = ChainMap({})
+        self._flat = {}
+        self._undo = []
 
     def initialize_defaults(self, user_context):
         """Initializes the default environment variables for a user."""
         username = user_context.get('name', 'Guest')
-        self.env_stack = [{
+        self.env_stack = ChainMap({
             "USER": username,
             "HOME": f"/home/{username}",
             "HOST": "SamwiseOS",
             "PATH": "/bin:/usr/bin",
             "PS1": "\\u@\\h:\\w\\$ "
-        }]
+        })
+        self._flat = dict(self.env_stack.maps[0])
+        self._undo = []
 
-    def _get_active_env(self):
-        return self.env_stack[-1]
+    def _remember(self, var_name):
+        """Records the visible value of var_name before the top pushed layer first changes it."""
+        if self._undo and var_name not in self._undo[-1]:
+            self._undo[-1][var_name] = self._flat.get(var_name, _UNSET)
 
     def push(self):
-        self.env_stack.append(self._get_active_env().copy())
+        self.env_stack = self.env_stack.new_child()
+        self._undo.append({})
 
     def pop(self):
-        if len(self.env_stack) > 1:
-            self.env_stack.pop()
+        if len(self.env_stack.maps) > 1:
+            self.env_stack = self.env_stack.parents
+            for var_name, value in self._undo.pop().items():
+                if value is _UNSET:
+                    self._flat.pop(var_name, None)
+                else:
+                    self._flat[var_name] = value
 
     def get(self, var_name):
-        return self._get_active_env().get(var_name, "")
+        return self._flat.get(var_name, "")
 
     def set(self, var_name, value):
-        self._get_active_env()[var_name] = value
+        self._remember(var_name)
+        self.env_stack[var_name] = value
+        self._flat[var_name] = value
         return True
 
     def unset(self, var_name):
-        if var_name in self._get_active_env():
-            del self._get_active_env()[var_name]
+        self._remember(var_name)
+        if len(self.env_stack.maps) > 1 and var_name in self.env_stack.parents:
+            self.env_stack[var_name] = _UNSET
+        else:
+            self.env_stack.maps[0].pop(var_name, None)
+        self._flat.pop(var_name, None)
         return True
 
     def get_all(self):
-        return self._get_active_env()
+        return self._flat
 
     def load(self, vars_dict):
-        native_dict = vars_dict.to_py() if hasattr(vars_dict, 'to_py') else vars_dict
-        self.env_stack[-1] = native_dict.copy()
+        """Replaces the visible variables with vars_dict, hiding any that only lower layers define."""
+        native_dict = vars_dict.to_py() if hasattr(vars_dict, 'to_py') else dict(vars_dict)
+        for var_name in set(self._flat) | set(native_dict):
+            self._remember(var_name)
+        self._flat = dict(native_dict)
+        if len(self.env_stack.maps) > 1:
+            for var_name in self.env_stack.parents:
+                native_dict.setdefault(var_name, _UNSET)
+        self.env_stack.maps[0] = native_dict
 
 class HistoryManager:
-    """Manages command history."""
-    def __init__(self):
-        self.command_history = []
-        self.max_history_size = 50
+    """
+    Manages command history: a ring buffer of up to max_history_size
+    commands, so adding and evicting are O(1), with an inverted index from
+    each lowercase word to the entries that contain it. Entries are numbered
+    by sequence (1 for the first command since the history was cleared);
+    positions count from the oldest retained entry.
+
+    History is persisted separately from the session state, as deltas:
+    take_delta() returns the commands added since the last call, and
+    load_deltas() replays them.
+    """
+    def __init__(self, max_history_size=HISTORY_CAPACITY):
+        self.max_history_size = max_history_size
+        self._reset()
+        self._pending = []
+        self._pending_base = False
+
+    def _reset(self):
+        self._ring = [None] * self.max_history_size
+        self._first = 0
+        self._next = 0
+        self._postings = {}
+        self._vocabulary_version = 0
+        self._word_matches = None
+
+    def __len__(self):
+        return self._next - self._first
+
+    def _entry(self, sequence):
+        return self._ring[sequence % self.max_history_size]
+
+    def _append(self, command):
+        if len(self) == self.max_history_size:
+            self._evict()
+        self._ring[self._next % self.max_history_size] = command
+        for token in set(HISTORY_TOKEN.findall(command.lower())):
+            if token not in self._postings:
+                self._postings[token] = deque()
+                self._vocabulary_version += 1
+            self._postings[token].append(self._next)
+        self._next += 1
+
+    def _evict(self):
+        command = self._entry(self._first)
+        for token in set(HISTORY_TOKEN.findall(command.lower())):
+            postings = self._postings[token]
+            postings.popleft()
+            if not postings:
+                del self._postings[token]
+                self._vocabulary_version += 1
+        self._ring[self._first % self.max_history_size] = None
+        self._first += 1
 
     def add(self, command):
+        """Appends a command unless it repeats the last one. Returns the history length."""
         trimmed = command.strip()
-        if trimmed and (not self.command_history or self.command_history[-1] != trimmed):
-            self.command_history.append(trimmed)
-            if len(self.command_history) > self.max_history_size:
-                self.command_history.pop(0)
-        return True
+        if trimmed and (not len(self) or self._entry(self._next - 1) != trimmed):
+            self._append(trimmed)
+            if not self._pending_base:
+                self._pending.append(trimmed)
+                if len(self._pending) > self.max_history_size:
+                    # More was added than the history holds: store it whole instead.
+                    self._pending, self._pending_base = [], True
+        return len(self)
+
+    def get_length(self):
+        return len(self)
+
+    def get_entry(self, position):
+        """The command at 'position' (0 is the oldest retained), or None."""
+        if not 0 <= position < len(self):
+            return None
+        return self._entry(self._first + position)
 
     def get_full_history(self):
-        return self.command_history
+        return [self._entry(sequence) for sequence in range(self._first, self._next)]
+
+    def get_numbered(self):
+        """(number, command) pairs for every retained entry, oldest first."""
+        return [(sequence + 1, self._entry(sequence)) for sequence in range(self._first, self._next)]
 
     def clear_history(self):
-        self.command_history = []
+        self._reset()
+        self._pending, self._pending_base = [], True
         return True
 
     def set_history(self, new_history):
-        self.command_history = list(new_history)
-        if len(self.command_history) > self.max_history_size:
-            self.command_history = self.command_history[-self.max_history_size:]
+        self._reset()
+        for command in list(new_history)[-self.max_history_size:]:
+            self._append(command)
+        self._pending, self._pending_base = [], True
         return True
 
+    def _words_containing(self, token):
+        """
+        The indexed words containing 'token'. While the vocabulary is
+        unchanged (as between the keystrokes of a reverse search), a token
+        that extends the previous one is looked up among its matches only.
+        """
+        previous = self._word_matches
+        if previous and previous[0] == self._vocabulary_version and previous[1] in token:
+            words = previous[2]
+        else:
+            words = self._postings
+        matches = [word for word in words if token in word]
+        self._word_matches = (self._vocabulary_version, token, matches)
+        return matches
+
+    def _candidates(self, query):
+        """
+        Sequence numbers, newest first, of the entries that can contain
+        'query': those with a word containing its longest word. Queries
+        without words cannot be narrowed and return every entry.
+        """
+        tokens = HISTORY_TOKEN.findall(query)
+        if not tokens:
+            return range(self._next - 1, self._first - 1, -1)
+        candidates = set()
+        for word in self._words_containing(max(tokens, key=len)):
+            candidates.update(self._postings[word])
+        return sorted(candidates, reverse=True)
+
+    def search(self, query, before=None, limit=None):
+        """
+        The entries containing 'query' (ignoring case), newest first, as
+        (sequence, command) pairs. 'before' restricts the search to the
+        entries older than that position.
+        """
+        query = query.lower()
+        stop = self._next if before is None else self._first + max(0, min(before, len(self)))
+        found = []
+        for sequence in self._candidates(query):
+            if sequence >= stop:
+                continue
+            command = self._entry(sequence)
+            if query in command.lower():
+                found.append((sequence, command))
+                if limit is not None and len(found) >= limit:
+                    break
+        return found
+
+    def search_latest(self, query, before=None):
+        """The newest entry containing 'query' before position 'before', as {"position", "command"}, or None."""
+        found = self.search(query, before, limit=1)
+        if not found:
+            return None
+        sequence, command = found[0]
+        return {"position": sequence - self._first, "command": command}
+
+    def take_delta(self):
+        """
+        The history changes since the last call, for appending to storage:
+        {"base": True} with the whole history when the stored history must
+        be replaced (after a clear or a reload), otherwise the commands to
+        append.
+        """
+        entries = self.get_full_history() if self._pending_base else self._pending
+        delta = {"base": self._pending_base, "entries": entries}
+        self._pending, self._pending_base = [], False
+        return delta
+
+    def load_deltas(self, deltas):
+        """Rebuilds the history by replaying stored deltas in order. The result counts as persisted."""
+        native = deltas.to_py() if hasattr(deltas, 'to_py') else deltas
+        self._reset()
+        for delta in native:
+            if delta.get("base"):
+                self._reset()
+            for command in delta.get("entries", []):
+                self._append(command)
+        self._pending, self._pending_base = [], False
+        return len(self)
+
 class AliasManager:
     """Manages command aliases."""
     def __init__(self):
@@ -140,7 +332,6 @@ class SessionManager:
     def get_session_state_for_saving(self):
         """Gathers all session data into a single dictionary for saving."""
         return json.dumps({
-            "commandHistory": history_manager.get_full_history(),
             "environmentVariables": env_manager.get_all(),
             "aliases": alias_manager.get_all_aliases()
         })
@@ -148,11 +339,16 @@ class SessionManager:
     def load_session_state(self, state_json):
         """
         Takes a JSON string of session state from the JS side
-        and loads it into the appropriate Python managers.
+        and loads it into the appropriate Python managers. History comes
+        as the stored deltas ('historyDeltas'); a 'commandHistory' list
+        from a state saved before deltas existed is loaded as a new base.
         """
         try:
             state = json.loads(state_json)
-            history_manager.set_history(state.get("commandHistory", []))
+            if state.get("historyDeltas"):
+                history_manager.load_deltas(state["historyDeltas"])
+            else:
+                history_manager.set_history(state.get("commandHistory", []))
             env_manager.load(state.get("environmentVariables", {}))
             alias_manager.load_aliases(state.get("aliases", {}))
             return True
@@ -162,8 +358,97 @@ class SessionManager:
             alias_manager.load_aliases({})
             return False
 
-# Instantiate singletons that will be exposed to JavaScript
-env_manager = EnvironmentManager()
-history_manager = HistoryManager()
-alias_manager = AliasManager()
+class Session:
+    """
+    The state of one shell session: its working directory and identity,
+    the rest of the context the frontend sent with its last command, and
+    its environment, history and aliases.
+
+    The session a piece of code runs in is held in a context variable, so
+    it follows asyncio tasks: a task started inside use_session(s) keeps
+    seeing s however other tasks interleave with it. Code outside any
+    use_session() block runs in default_session, which is what the terminal
+    uses. Managers keep per-session values as SessionAttribute descriptors,
+    and env_manager, history_manager and alias_manager stand for the current
+    session's own managers.
+    """
+    def __init__(self, name, env=None, history=None, aliases=None):
+        self.name = name
+        self.cwd = "/"
+        self.user_context = {"name": "Guest"}
+        self.user_groups = {}
+        self.users = {}
+        self.groups = {}
+        self.config = {}
+        self.jobs = {}
+        self.api_key = None
+        self.session_start_time = None
+        self.session_stack = None
+        self.env = env if env is not None else EnvironmentManager()
+        self.history = history if history is not None else HistoryManager()
+        self.aliases = aliases if aliases is not None else AliasManager()
+
+    def fork(self, name):
+        """
+        A child session, as for a subshell: the same directory, identity and
+        history, and copies of the environment and aliases, so changes made
+        in the child stay there.
+        """
+        child = Session(name, history=self.history)
+        for field, value in vars(self).items():
+            if field not in ('name', 'env', 'history', 'aliases'):
+                setattr(child, field, value)
+        child.user_context = dict(self.user_context or {})
+        child.env.load(dict(self.env.get_all()))
+        child.aliases.load_aliases(self.aliases.get_all_aliases())
+        return child
+
+def current_session():
+    """The session of the running task."""
+    return _current_session.get() or default_session
+
+@contextmanager
+def use_session(session):
+    """Runs the block, and any task it starts, in the given session."""
+    token = _current_session.set(session)
+    try:
+        yield session
+    finally:
+        _current_session.reset(token)
+
+class SessionAttribute:
+    """
+    A manager attribute stored on the current session, so the manager reads
+    and writes self.current_path (say) as before while each session keeps
+    its own value.
+    """
+    def __init__(self, field):
+        self.field = field
+
+    def __get__(self, instance, owner=None):
+        if instance is None:
+            return self
+        return getattr(current_session(), self.field)
+
+    def __set__(self, instance, value):
+        setattr(current_session(), self.field, value)
+
+class _SessionComponent:
+    """Forwards to one of the current session's managers (its env, history or aliases)."""
+    def __init__(self, field):
+        object.__setattr__(self, '_field', field)
+
+    def __getattr__(self, name):
+        return getattr(getattr(current_session(), self._field), name)
+
+    def __setattr__(self, name, value):
+        setattr(getattr(current_session(), self._field), name, value)
+
+default_session = Session("default")
+
+# Instantiate singletons that will be exposed to JavaScript. Each one is the
+# current session's manager, which outside use_session() is the default session's.
+env_manager = _SessionComponent('env')
+history_manager = _SessionComponent('history')
+alias_manager = _SessionComponent('aliases')
 session_manager = SessionManager()
\ No newline at end of file
@@ -1,86 +1,217 @@
 # gem/core/sudo.py
+import fnmatch
+import os
+import re
+from functools import lru_cache
 from filesystem import fs_manager
+from users import user_manager
+
+# "ALL=" or "host=" before the commands, and the "(runas)" list after it.
+HOST_SPEC = re.compile(r'^[^\s=(]+\s*=\s*')
+RUNAS_SPEC = re.compile(r'^\([^)]*\)\s*')
+TAG_SPEC = re.compile(r'^(NOPASSWD|PASSWD|NOEXEC|EXEC|SETENV|NOSETENV)\s*:\s*')
+GLOB_CHARACTERS = re.compile(r'[*?\[]')
+
+
+@lru_cache(maxsize=1024)
+def _pattern(text):
+    """A compiled fnmatch pattern, or None for text without wildcards (compared as is)."""
+    return re.compile(fnmatch.translate(text)) if GLOB_CHARACTERS.search(text) else None
+
+
+class Rule:
+    """
+    One command in a sudoers entry: the command name (a glob, or ALL), an
+    optional argument pattern, and whether it needs a password. 'order' is
+    its (line, position) in the file; when several rules match, the last
+    one wins.
+    """
+    __slots__ = ('order', 'command', 'command_pattern', 'args', 'args_pattern', 'nopasswd')
+
+    def __init__(self, order, command, args, nopasswd):
+        self.order = order
+        self.command = command
+        self.command_pattern = _pattern(command) if command != 'ALL' else None
+        # No argument list allows any arguments; "" allows none.
+        self.args = None if not args else ('' if args == ['""'] else ' '.join(args))
+        self.args_pattern = _pattern(self.args) if self.args else None
+        self.nopasswd = nopasswd
+
+    def matches_command(self, command_name):
+        if self.command == 'ALL':
+            return True
+        if self.command_pattern is not None:
+            return bool(self.command_pattern.match(command_name))
+        return self.command == command_name
+
+    def matches_args(self, args_text):
+        if self.args is None:
+            return True
+        if self.args_pattern is not None:
+            return bool(self.args_pattern.match(args_text))
+        return self.args == args_text
+
+
+class RuleSet:
+    """The rules of one user or %group: exact command names in a dict, globs and ALL in a list."""
+    def __init__(self):
+        self.exact = {}
+        self.wildcard = []
+
+    def add(self, rule):
+        if rule.command != 'ALL' and rule.command_pattern is None:
+            self.exact.setdefault(rule.command, []).append(rule)
+        else:
+            self.wildcard.append(rule)
+
+    def last_match(self, command_name, args_text):
+        """The matching rule that comes last in the file, or None."""
+        best = None
+        for rule in reversed(self.exact.get(command_name, ())):
+            if rule.matches_args(args_text):
+                best = rule
+                break
+        for rule in reversed(self.wildcard):
+            if best is not None and rule.order < best.order:
+                break
+            if rule.matches_command(command_name) and rule.matches_args(args_text):
+                best = rule
+                break
+        return best
+
+
+class SudoersPolicy:
+    """
+    /etc/sudoers compiled once: rule sets per user and per %group, and the
+    Defaults that sudo honours here (timestamp_timeout, in minutes).
+
+        Defaults timestamp_timeout=5
+        alice ALL=(ALL) NOPASSWD: ls, cat /var/log/*
+        %wheel ALL=(ALL:ALL) ALL
+        bob ls,cat
+
+    The host and runas lists are accepted and ignored. Commands are matched
+    by name (a path matches by its last component) and may use glob
+    patterns; words after a command are a glob over its arguments, and ""
+    means no arguments. Tags such as NOPASSWD: apply to the commands after
+    them on the same line.
+    """
+    def __init__(self, content=''):
+        self.users = {}
+        self.groups = {}
+        self.timestamp_timeout = None
+        for order, line in enumerate(content.splitlines()):
+            self._compile_line(order, line.strip())
+
+    def _compile_line(self, order, line):
+        if line.startswith('#') or not line:
+            return
+        parts = line.split(None, 1)
+        if len(parts) < 2:
+            return
+        entity, spec = parts
+        if entity.startswith('Defaults'):
+            # Only global Defaults apply; per-user, per-host and per-command ones are ignored.
+            if entity == 'Defaults':
+                self._compile_defaults(spec)
+            return
+
+        spec = RUNAS_SPEC.sub('', HOST_SPEC.sub('', spec, count=1), count=1)
+        target = self.groups if entity.startswith('%') else self.users
+        rules = target.setdefault(entity.lstrip('%'), RuleSet())
+        nopasswd = False
+        for position, item in enumerate(spec.split(',')):
+            item = item.strip()
+            tag = TAG_SPEC.match(item)
+            while tag:
+                if tag.group(1) in ('NOPASSWD', 'PASSWD'):
+                    nopasswd = tag.group(1) == 'NOPASSWD'
+                item = item[tag.end():]
+                tag = TAG_SPEC.match(item)
+            words = item.split()
+            if words:
+                rules.add(Rule((order, position), os.path.basename(words[0]) or words[0], words[1:], nopasswd))
+
+    def _compile_defaults(self, spec):
+        for setting in spec.split(','):
+            name, _, value = setting.strip().partition('=')
+            if name.strip() == 'timestamp_timeout':
+                try:
+                    self.timestamp_timeout = float(value.strip())
+                except ValueError:
+                    pass
+
+    def decide(self, username, user_groups, command_name, args=()):
+        """The last rule that lets the user run the command, or None."""
+        args_text = ' '.join(args)
+        candidates = [self.users.get(username)] + [self.groups.get(group) for group in user_groups]
+        best = None
+        for rules in candidates:
+            if rules is None:
+                continue
+            rule = rules.last_match(command_name, args_text)
+            if rule is not None and (best is None or rule.order > best.order):
+                best = rule
+        return best
+
 
 class SudoManager:
-    """Manages sudo privileges by parsing the sudoers file."""
+    """
+    Manages sudo privileges from the /etc/sudoers file. The file is compiled
+    into a SudoersPolicy and the policy is reused until the file's content
+    changes, so a check is a dict lookup and a pattern match instead of a
+    re-parse. A timestamp_timeout in Defaults sets how long the users'
+    credential tickets last; without one, the configured lifetime applies.
+    """
     def __init__(self, fs_manager):
         self.fs_manager = fs_manager
         self.sudoers_config = None
         self.SUDOERS_PATH = "/etc/sudoers"
+        self._source = None
+        self._configured_ttl = None
 
     def _parse_sudoers(self):
-        """Parses the /etc/sudoers file to load the current privilege configuration."""
+        """Compiles /etc/sudoers, unless its content is what the current policy was compiled from."""
         sudoers_node = self.fs_manager.get_node(self.SUDOERS_PATH)
-        if not sudoers_node or sudoers_node.get('type') != 'file':
-            self.sudoers_config = {'users': {}, 'groups': {}}
+        content = sudoers_node.get('content', '') if sudoers_node and sudoers_node.get('type') == 'file' else ''
+        if self.sudoers_config is not None and (content is self._source or content == self._source):
+            self._source = content
             return
-
-        content = sudoers_node.get('content', '')
-        lines = content.splitlines()
-        config = {'users': {}, 'groups': {}}
-
-        for line in lines:
-            line = line.strip()
-            if line.startswith('#') or not line:
-                continue
-
-            parts = line.split()
-            if len(parts) < 2:
-                continue
-
-            entity = parts[0]
-            permissions = parts[1:]
-
-            # This implementation supports the 'ALL' keyword for commands.
-            allowed_commands = []
-            all_found = False
-            for part in permissions:
-                if "ALL" in part:
-                    all_found = True
-                    break
-
-            if all_found:
-                allowed_commands = ["ALL"]
-            else:
-                # The final part of the line is treated as a comma-separated list of commands.
-                allowed_commands = permissions[-1].split(',')
-
-
-            if entity.startswith('%'):
-                config['groups'][entity[1:]] = allowed_commands
-            else:
-                config['users'][entity] = allowed_commands
-
-        self.sudoers_config = config
+        self.sudoers_config = SudoersPolicy(content)
+        self._source = content
+        self._apply_timestamp_timeout(self.sudoers_config.timestamp_timeout)
+
+    def _apply_timestamp_timeout(self, minutes):
+        if minutes is None:
+            if self._configured_ttl is not None:
+                user_manager.set_ticket_ttl(self._configured_ttl)
+                self._configured_ttl = None
+            return
+        if self._configured_ttl is None:
+            self._configured_ttl = user_manager.tickets.ttl
+        # As in sudo, a negative timeout means the ticket never expires.
+        user_manager.set_ticket_ttl(float('inf') if minutes < 0 else minutes * 60)
 
     def _get_config(self):
-        """Returns the sudoers config, parsing every time to ensure freshness."""
-        # The configuration is re-parsed on every check to ensure that any
-        # dynamic changes to the /etc/sudoers file are immediately reflected.
+        """Returns the compiled sudoers policy, recompiling it when /etc/sudoers has changed."""
         self._parse_sudoers()
         return self.sudoers_config
 
-    def can_user_run_command(self, username, user_groups, command_to_run):
-        """Checks if a user has permission to run a specific command via sudo."""
+    def authorize(self, username, user_groups, command_to_run, args=None):
+        """
+        Decides whether a user may run a command (with the given arguments)
+        via sudo, and whether they must give their password for it.
+        """
         if username == 'root':
-            return True
-
-        config = self._get_config()
+            return {"allowed": True, "nopasswd": True}
+        user_groups = user_groups.to_py() if hasattr(user_groups, 'to_py') else (user_groups or [])
+        args = args.to_py() if hasattr(args, 'to_py') else (args or [])
+        rule = self._get_config().decide(username, user_groups, command_to_run, args)
+        return {"allowed": rule is not None, "nopasswd": bool(rule and rule.nopasswd)}
 
-        # Check user-specific rules first
-        user_perms = config['users'].get(username)
-        if user_perms:
-            if "ALL" in user_perms or command_to_run in user_perms:
-                return True
-
-        # Check group rules
-        for group in user_groups:
-            group_perms = config['groups'].get(group)
-            if group_perms:
-                if "ALL" in group_perms or command_to_run in group_perms:
-                    return True
-
-        return False
+    def can_user_run_command(self, username, user_groups, command_to_run, args=None):
+        """Checks if a user has permission to run a specific command via sudo."""
+        return self.authorize(username, user_groups, command_to_run, args)["allowed"]
 
 # This manager will be instantiated in the kernel, passing the fs_manager
-sudo_manager = SudoManager(fs_manager)
\ No newline at end of file
+sudo_manager = SudoManager(fs_manager)
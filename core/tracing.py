@@ -0,0 +1,232 @@
+# gem/core/tracing.py
+
+import contextvars
+import functools
+import inspect
+import itertools
+import json
+import time
+from log_segments import RotatingLog
+
+TRACE_PATH = "/var/log/trace.jsonl"
+FLUSH_THRESHOLD = 200
+# The trace file is rotated before it grows past this size (in characters, as the VFS counts file sizes).
+SEGMENT_MAX_SIZE = 256 * 1024
+# Rotated segments kept: trace.jsonl.1 (newest) to trace.jsonl.N (oldest).
+RETAINED_SEGMENTS = 4
+MAX_BUFFERED_SPANS = 10000
+
+# The innermost open span of the current task; new spans become its children.
+_current_span = contextvars.ContextVar('tracing_current_span', default=None)
+
+
+class _NoopSpan:
+    """Stands in for a span while tracing is off, so instrumented code needs no branches."""
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+    def set(self, **attributes):
+        pass
+
+
+_NOOP_SPAN = _NoopSpan()
+
+
+class _Span:
+    """One timed, named operation. Closing it hands it to the tracer's buffer."""
+    def __init__(self, tracer, name, attributes):
+        self.tracer = tracer
+        self.name = name
+        self.attributes = attributes
+        self.span_id = next(tracer._ids)
+        self.parent = None
+        self._token = None
+
+    def set(self, **attributes):
+        self.attributes.update(attributes)
+
+    def __enter__(self):
+        self.parent = _current_span.get()
+        self.trace_id = self.parent.trace_id if self.parent else f"{self.tracer._session}-{self.span_id}"
+        self.start = time.time()
+        self._started = time.perf_counter()
+        self._token = _current_span.set(self)
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        duration_ms = (time.perf_counter() - self._started) * 1000
+        _current_span.reset(self._token)
+        if exc_type is not None:
+            self.attributes["error"] = exc_type.__name__
+        self.tracer._finish(self, duration_ms)
+        return False
+
+
+class Tracer:
+    """
+    Structured tracing for the kernel. While enabled ('trace on' or
+    'set -x'), the syscall handler, the executor, filesystem writes and LLM
+    calls open nested spans. Finished spans are buffered in memory and
+    appended as JSON lines to /var/log/trace.jsonl once a top-level span
+    closes with enough of them queued, or when flushed explicitly. Like the
+    audit log, the file is a RotatingLog: readable by root only, since spans
+    carry every user's command lines, and rotated to trace.jsonl.1 (and so
+    on) as it fills up. While disabled, span() returns a shared no-op
+    context manager.
+    """
+    def __init__(self):
+        self.enabled = False
+        self.buffer = []
+        self.dropped = 0
+        self._ids = itertools.count(1)
+        # Span ids restart with the kernel; the session prefix keeps trace ids
+        # from different page loads apart in the same trace file.
+        self._session = format(int(time.time() * 1000), 'x')
+        self._flushing = False
+        self.segments = RotatingLog(TRACE_PATH, SEGMENT_MAX_SIZE, RETAINED_SEGMENTS)
+
+    def enable(self):
+        self.enabled = True
+
+    def disable(self):
+        self.enabled = False
+
+    def span(self, name, **attributes):
+        if not self.enabled or self._flushing:
+            return _NOOP_SPAN
+        return _Span(self, name, attributes)
+
+    def _finish(self, span, duration_ms):
+        self.buffer.append({
+            "trace_id": span.trace_id, "span_id": span.span_id,
+            "parent_id": span.parent.span_id if span.parent else None,
+            "name": span.name, "start": round(span.start, 6),
+            "duration_ms": round(duration_ms, 3), "attributes": span.attributes
+        })
+        if len(self.buffer) > MAX_BUFFERED_SPANS:
+            overflow = len(self.buffer) - MAX_BUFFERED_SPANS
+            del self.buffer[:overflow]
+            self.dropped += overflow
+        if span.parent is None and len(self.buffer) >= FLUSH_THRESHOLD:
+            self.flush()
+
+    def flush(self):
+        """Appends the buffered spans to the trace file, rotating it as it fills up. Returns {"success", "written"}."""
+        if not self.buffer:
+            return {"success": True, "written": 0}
+        spans, self.buffer = self.buffer, []
+        self._flushing = True
+        try:
+            self.segments.append([json.dumps(span, default=str) + "\n" for span in spans])
+            return {"success": True, "written": len(spans)}
+        except Exception as e:
+            self.buffer = spans + self.buffer
+            return {"success": False, "error": f"Could not write {TRACE_PATH}: {repr(e)}"}
+        finally:
+            self._flushing = False
+
+    def clear(self):
+        """Drops the buffered spans, empties the trace file and deletes its rotated segments."""
+        self.buffer = []
+        self.dropped = 0
+        self._flushing = True
+        try:
+            self.segments.clear()
+        finally:
+            self._flushing = False
+
+    def load(self):
+        """Reads every span in the trace file and its rotated segments, oldest first, skipping lines that do not parse."""
+        spans = []
+        for content in self.segments.contents():
+            for line in content.splitlines():
+                try:
+                    spans.append(json.loads(line))
+                except json.JSONDecodeError:
+                    continue
+        return spans
+
+
+def traced(name, describe=None):
+    """
+    Decorator that wraps a sync or async function in a span while tracing
+    is enabled. 'describe', if given, is called with the function's
+    arguments and returns the span's attributes.
+    """
+    def decorator(func):
+        def open_span(args, kwargs):
+            return tracer.span(name, **(describe(*args, **kwargs) if describe else {}))
+
+        if inspect.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                if not tracer.enabled:
+                    return await func(*args, **kwargs)
+                with open_span(args, kwargs):
+                    return await func(*args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not tracer.enabled:
+                return func(*args, **kwargs)
+            with open_span(args, kwargs):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def build_flame_report(spans):
+    """
+    Folds spans into a call tree keyed by the chain of span names from the
+    root, and renders it as an indented flame-style summary: total time,
+    call count and share of all root time per node, heaviest first. Spans
+    whose parent never reached the file (still open, or dropped) are skipped.
+    """
+    by_id = {(span.get("trace_id"), span.get("span_id")): span for span in spans}
+    tree = {"children": {}}
+
+    def path_of(span):
+        names = []
+        seen = set()
+        while span is not None and id(span) not in seen:
+            seen.add(id(span))
+            names.append(span.get("name", "?"))
+            parent_id = span.get("parent_id")
+            if parent_id is None:
+                return names[::-1]
+            span = by_id.get((span.get("trace_id"), parent_id))
+        return None
+
+    root_total = 0.0
+    folded = 0
+    for span in spans:
+        node = tree
+        path = path_of(span)
+        if path is None:
+            continue
+        folded += 1
+        for name in path:
+            node = node["children"].setdefault(name, {"total_ms": 0.0, "count": 0, "children": {}})
+        node["total_ms"] += span.get("duration_ms", 0.0)
+        node["count"] += 1
+        if len(path) == 1:
+            root_total += span.get("duration_ms", 0.0)
+
+    lines = [f"{'TOTAL ms':>10} {'CALLS':>6} {'SHARE':>6}  SPAN"]
+
+    def render(children, depth):
+        for name, node in sorted(children.items(), key=lambda item: item[1]["total_ms"], reverse=True):
+            share = (node["total_ms"] / root_total * 100) if root_total else 0.0
+            lines.append(f"{node['total_ms']:>10.2f} {node['count']:>6} {share:>5.1f}%  {'  ' * depth}{name}")
+            render(node["children"], depth + 1)
+
+    render(tree["children"], 0)
+    lines.append(f"{root_total:>10.2f} ms across {folded} spans")
+    return "\n".join(lines)
+
+# Instantiate a singleton for the kernel
+tracer = Tracer()
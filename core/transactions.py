@@ -0,0 +1,121 @@
+# gem/core/transactions.py
+
+import contextvars
+from contextlib import ExitStack, contextmanager
+
+# Stands for "the key was absent" in a remembered value, since None is a real value.
+_MISSING = object()
+
+# The journal of the transaction open in the current task, if any:
+# {"open": bool, "undo": [callables], "once": {key: position in "undo"}}.
+# Tasks started inside a transaction share it while it is open; other
+# sessions and jobs are never journaled into it, even across an await.
+_journal = contextvars.ContextVar('transaction_journal', default=None)
+
+
+def _restore(mapping, saved):
+    for key, value in saved.items():
+        if value is _MISSING:
+            mapping.pop(key, None)
+        else:
+            mapping[key] = value
+
+
+class TransactionManager:
+    """
+    An undo journal per task. While a transaction is open, FileSystemManager,
+    UserManager and GroupManager record the inverse of each change they make
+    (the old value of a key, a child to put back, a membership to unlink).
+    If the transaction fails, the journal is replayed newest first, so a
+    rollback costs as much as the work it undoes rather than a copy of the
+    whole VFS and user database. Outside a transaction nothing is recorded.
+
+    Nested transactions are savepoints: a failure inside one undoes its own
+    changes and propagates, and the outer transaction decides what else to
+    undo. Scopes (see add_scope) are entered around the outermost
+    transaction, which lets the filesystem turn every save made during it,
+    including the rollback, into one save at the end.
+    """
+    def __init__(self):
+        self._scopes = []
+
+    @staticmethod
+    def _open_journal():
+        journal = _journal.get()
+        return journal if journal is not None and journal["open"] else None
+
+    @property
+    def active(self):
+        return self._open_journal() is not None
+
+    def add_scope(self, scope_factory):
+        """Registers a context manager factory entered around each outermost transaction."""
+        self._scopes.append(scope_factory)
+
+    def record(self, undo):
+        """Journals a callable that reverses a change. Does nothing outside a transaction."""
+        journal = self._open_journal()
+        if journal is not None:
+            journal["undo"].append(undo)
+
+    def record_once(self, key, undo):
+        """
+        Journals undo unless something was already journaled under key in
+        this transaction, such as the save that follows every rollback.
+        """
+        journal = self._open_journal()
+        if journal is not None and key not in journal["once"]:
+            journal["once"][key] = len(journal["undo"])
+            journal["undo"].append(undo)
+
+    def remember(self, mapping, *keys):
+        """Journals the current values of mapping[key] (or their absence), to be put back on rollback."""
+        journal = self._open_journal()
+        if journal is not None:
+            saved = {key: mapping.get(key, _MISSING) for key in keys}
+            journal["undo"].append(lambda: _restore(mapping, saved))
+
+    def _rollback_to(self, journal, mark):
+        entries = journal["undo"]
+        # Steps journaled once inside the savepoint are undone with it, so they may be journaled again.
+        journal["once"] = {key: position for key, position in journal["once"].items() if position < mark}
+        while len(entries) > mark:
+            undo = entries.pop()
+            try:
+                undo()
+            except Exception as e:
+                print(f"TransactionManager: an undo step failed during rollback: {e!r}")
+
+    @contextmanager
+    def transaction(self):
+        """
+        Runs the block as one transaction: if it raises, every change recorded
+        since it began is undone and the exception propagates.
+        """
+        journal = self._open_journal()
+        if journal is not None:
+            mark = len(journal["undo"])
+            try:
+                yield self
+            except BaseException:
+                self._rollback_to(journal, mark)
+                raise
+            return
+
+        with ExitStack() as scopes:
+            for scope_factory in self._scopes:
+                scopes.enter_context(scope_factory())
+            journal = {"open": True, "undo": [], "once": {}}
+            token = _journal.set(journal)
+            try:
+                yield self
+            except BaseException:
+                self._rollback_to(journal, 0)
+                raise
+            finally:
+                # A task started inside the transaction may outlive it; it must not journal into a closed one.
+                journal["open"] = False
+                _journal.reset(token)
+
+# Instantiate a singleton for the kernel
+transaction_manager = TransactionManager()
@@ -1,15 +1,147 @@
 # gem/core/users.py
 
+import asyncio
 import base64
+import csv
+import hashlib
+import hmac
+import io
+import json
 import os
-from cryptography.fernet import Fernet
-from cryptography.hazmat.primitives import hashes
-from cryptography.hazmat.primitives.kdf.pbkdf2 import PBKDF2HMAC
-import copy # For deepcopy
+import re
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
 
 # We need to import our other managers to collaborate!
 from filesystem import fs_manager
 from groups import group_manager
+from session import session_manager
+from transactions import transaction_manager
+
+# Iteration count for hashes stored before 'iterations' was recorded in passwordData.
+LEGACY_PBKDF2_ITERATIONS = 100000
+DEFAULT_PBKDF2_ITERATIONS = 100000
+DEFAULT_TICKET_TTL_SECONDS = 15 * 60
+# Group lists in a batch file may be separated by ';', ',' (in JSON) or spaces.
+GROUP_LIST_SEPARATOR = re.compile(r'[;,\s]+')
+
+def _pbkdf2(salt, iterations=DEFAULT_PBKDF2_ITERATIONS):
+    """
+    Builds the password KDF. 'cryptography' is imported here, on the first
+    password operation, rather than at kernel start-up.
+    """
+    from cryptography.hazmat.primitives import hashes
+    from cryptography.hazmat.primitives.kdf.pbkdf2 import PBKDF2HMAC
+    return PBKDF2HMAC(
+        algorithm=hashes.SHA256(),
+        length=32,
+        salt=salt,
+        iterations=iterations,
+    )
+
+def _group_list(value):
+    if isinstance(value, str):
+        return [name for name in GROUP_LIST_SEPARATOR.split(value) if name]
+    return [str(name) for name in (value or [])]
+
+def parse_user_batch(text):
+    """
+    Reads a batch of accounts for UserManager.bulk_register, as JSON or CSV,
+    and returns (users, groups). Raises ValueError on a malformed file.
+
+    JSON is either a list of users or an object with "users" and an optional
+    "groups" mapping of group name to members (members may be existing users):
+
+        {"users": [{"username": "alice", "password": "s3cret", "groups": ["devs"]}],
+         "groups": {"devs": ["bob"], "testers": []}}
+
+    CSV has one user per row, with an optional header and '#' comments:
+
+        username,password,groups
+        alice,s3cret,devs;testers
+    """
+    stripped = text.lstrip()
+    if stripped.startswith(('[', '{')):
+        try:
+            data = json.loads(text)
+        except json.JSONDecodeError as e:
+            raise ValueError(f"invalid JSON: {e}")
+        if isinstance(data, list):
+            data = {"users": data}
+        if not isinstance(data, dict) or not isinstance(data.get("users", []), list):
+            raise ValueError("JSON must be a list of users or an object with a 'users' list")
+        users = []
+        for number, entry in enumerate(data.get("users", []), 1):
+            if not isinstance(entry, dict):
+                raise ValueError(f"user {number}: expected an object with 'username' and 'password'")
+            users.append({"username": str(entry.get("username") or ""), "password": entry.get("password"),
+                          "groups": _group_list(entry.get("groups"))})
+        groups = data.get("groups") or {}
+        if isinstance(groups, list):
+            groups = {name: [] for name in groups}
+        if not isinstance(groups, dict):
+            raise ValueError("'groups' must map group names to lists of members")
+        return users, {str(name): _group_list(members) for name, members in groups.items()}
+
+    users = []
+    for number, row in enumerate(csv.reader(io.StringIO(text)), 1):
+        if not row or not ''.join(row).strip() or row[0].lstrip().startswith('#'):
+            continue
+        if not users and row[0].strip().lower() == 'username':
+            continue
+        if len(row) < 2:
+            raise ValueError(f"line {number}: expected 'username,password[,groups]'")
+        users.append({"username": row[0].strip(), "password": row[1],
+                      "groups": _group_list(row[2] if len(row) > 2 else '')})
+    return users, {}
+
+class CredentialTickets:
+    """
+    Sudo-style timestamp tickets. A successful password check gives the
+    session's user a ticket for the account it authenticated as, valid for
+    'ttl' seconds. While it is valid, sudo need not ask again, and the same
+    password is confirmed by comparing a keyed digest instead of rerunning
+    PBKDF2. The digest key is random per kernel, so tickets never outlive
+    the page. Changing an account's password or groups revokes its tickets.
+    """
+    def __init__(self, ttl=DEFAULT_TICKET_TTL_SECONDS):
+        self.ttl = ttl
+        self._key = os.urandom(32)
+        self._tickets = {}
+
+    def _digest(self, username, password):
+        return hmac.new(self._key, f"{username}\0{password}".encode('utf-8'), hashlib.sha256).digest()
+
+    def _valid(self, session_user, username):
+        ticket = self._tickets.get((session_user, username))
+        if ticket and time.monotonic() - ticket[0] < self.ttl:
+            return ticket
+        self._tickets.pop((session_user, username), None)
+        return None
+
+    def grant(self, session_user, username, password):
+        if self.ttl > 0:
+            self._tickets[(session_user, username)] = (time.monotonic(), self._digest(username, password))
+
+    def is_valid(self, session_user, username):
+        return self._valid(session_user, username) is not None
+
+    def refresh(self, session_user, username):
+        ticket = self._valid(session_user, username)
+        if ticket:
+            self._tickets[(session_user, username)] = (time.monotonic(), ticket[1])
+        return ticket is not None
+
+    def confirms(self, session_user, username, password):
+        """True when a valid ticket was granted for exactly this password."""
+        ticket = self._valid(session_user, username)
+        return bool(ticket) and hmac.compare_digest(ticket[1], self._digest(username, password))
+
+    def revoke(self, username):
+        """Drops every ticket for the account, whichever session holds it."""
+        for key in [key for key in self._tickets if key[1] == username]:
+            del self._tickets[key]
 
 class UserManager:
     """Manages user accounts, credentials, and properties."""
@@ -19,6 +151,9 @@ class UserManager:
         self.RESERVED_USERNAMES = ["guest", "root", "admin", "system"]
         self.MIN_USERNAME_LENGTH = 3
         self.MAX_USERNAME_LENGTH = 20
+        # Cost for new hashes; older ones are rehashed to it on the next successful login.
+        self.password_iterations = DEFAULT_PBKDF2_ITERATIONS
+        self.tickets = CredentialTickets()
 
 
     def initialize_defaults(self, default_username):
@@ -38,6 +173,7 @@ class UserManager:
 
     def load_users(self, users_dict):
         """Loads user data from a dictionary (from storage)."""
+        transaction_manager.remember(self.__dict__, 'users')
         self.users = users_dict.to_py() if hasattr(users_dict, 'to_py') else users_dict
 
     def user_exists(self, username):
@@ -56,48 +192,207 @@ class UserManager:
     def _secure_hash_password(self, password):
         """Securely hashes a password using PBKDF2 with a random salt."""
         salt = os.urandom(16)
-        kdf = PBKDF2HMAC(
-            algorithm=hashes.SHA256(),
-            length=32,
-            salt=salt,
-            iterations=100000,
-        )
+        kdf = _pbkdf2(salt, self.password_iterations)
         pwd_hash = kdf.derive(password.encode('utf-8'))
-        return {'salt': salt.hex(), 'hash': pwd_hash.hex()}
+        return {'salt': salt.hex(), 'hash': pwd_hash.hex(), 'iterations': self.password_iterations}
 
-    def _verify_password_with_salt(self, password_attempt, salt_hex, stored_hash_hex):
+    def _verify_password_with_salt(self, password_attempt, salt_hex, stored_hash_hex, iterations=LEGACY_PBKDF2_ITERATIONS):
         """Verifies a password attempt against a stored salt and hash."""
         salt = bytes.fromhex(salt_hex)
-        kdf = PBKDF2HMAC(
-            algorithm=hashes.SHA256(),
-            length=32,
-            salt=salt,
-            iterations=100000,
-        )
+        kdf = _pbkdf2(salt, iterations)
         try:
             kdf.verify(password_attempt.encode('utf-8'), bytes.fromhex(stored_hash_hex))
             return True
         except Exception:
             return False
 
+    def set_password_iterations(self, iterations):
+        """Sets the PBKDF2 cost for new hashes. Existing hashes migrate as their users log in."""
+        iterations = int(iterations)
+        if iterations < 1000:
+            return {"success": False, "error": "PBKDF2 iteration count must be at least 1000."}
+        self.password_iterations = iterations
+        return {"success": True}
+
+    def set_ticket_ttl(self, seconds):
+        """Sets how long a successful authentication is remembered, existing tickets included. 0 turns tickets off."""
+        self.tickets.ttl = max(0, float(seconds))
+        return True
+
+    def has_ticket(self, username, session_user=None):
+        """Whether the session's user authenticated as 'username' within the ticket TTL."""
+        return self.tickets.is_valid(session_user or session_manager.get_current_user(), username)
+
+    def refresh_ticket(self, username, session_user=None):
+        """Restarts the TTL of a valid ticket, as sudo does on each use."""
+        return self.tickets.refresh(session_user or session_manager.get_current_user(), username)
+
+    def invalidate_tickets(self, username):
+        self.tickets.revoke(username)
+        return True
+
     def register_user(self, username, password, primary_group):
         """Creates a new user account."""
         if self.user_exists(username):
             return {"success": False, "error": f"User '{username}' already exists."}
 
         password_data = self._secure_hash_password(password) if password else None
+        return {"success": True, "user_data": self._store_user(username, password_data, primary_group)}
+
+    def _store_user(self, username, password_data, primary_group):
+        transaction_manager.remember(self.users, username)
         self.users[username] = {'passwordData': password_data, 'primaryGroup': primary_group}
-        return {"success": True, "user_data": self.users[username]}
+        return self.users[username]
+
+    async def _hash_passwords(self, passwords, progress=None):
+        """
+        The passwordData of each password, in order. Where threads exist the
+        hashes run in a pool through the event loop, so the kernel keeps
+        serving other requests meanwhile; Pyodide has no threads and hashes
+        one at a time, yielding to the event loop after each. 'progress', if
+        given, is called as progress(done, total) as each hash completes.
+        """
+        total = len(passwords)
+        password_data = [None] * total
+        if sys.platform == 'emscripten' or total < 2:
+            for index, password in enumerate(passwords):
+                password_data[index] = self._secure_hash_password(password)
+                if progress:
+                    progress(index + 1, total)
+                await asyncio.sleep(0)
+            return password_data
+
+        loop = asyncio.get_running_loop()
+        pool = ThreadPoolExecutor(max_workers=min(total, os.cpu_count() or 1))
+
+        async def hash_one(index, password):
+            password_data[index] = await loop.run_in_executor(pool, self._secure_hash_password, password)
+
+        try:
+            for done, finished in enumerate(asyncio.as_completed([hash_one(i, p) for i, p in enumerate(passwords)]), 1):
+                await finished
+                if progress:
+                    progress(done, total)
+        finally:
+            # A cancelled batch must not leave hashes queued behind it.
+            pool.shutdown(wait=False, cancel_futures=True)
+        return password_data
+
+    def validate_batch(self, users, groups=None):
+        """
+        Checks a batch for bulk_register without changing anything, and
+        returns the list of problems found (empty when the batch is valid).
+        """
+        errors = []
+        seen = set()
+        for number, entry in enumerate(users, 1):
+            username = entry.get("username", "")
+            where = f"user {number} ({username})" if username else f"user {number}"
+            checked = self.validate_username_format(username)
+            if not checked["success"]:
+                errors.append(f"{where}: {checked['error']}")
+            elif username in seen:
+                errors.append(f"{where}: listed more than once")
+            elif self.user_exists(username):
+                errors.append(f"{where}: user already exists")
+            elif fs_manager.get_node(f"/home/{username}"):
+                errors.append(f"{where}: '/home/{username}' already exists")
+            seen.add(username)
+            if not isinstance(entry.get("password"), str) or not entry["password"]:
+                errors.append(f"{where}: a password is required")
+            for group_name in entry.get("groups", []):
+                if not group_name or ' ' in group_name:
+                    errors.append(f"{where}: invalid group name '{group_name}'")
+        for group_name, members in (groups or {}).items():
+            if not group_name or ' ' in group_name:
+                errors.append(f"group '{group_name}': group names cannot be empty or contain spaces")
+            for member in members:
+                if member not in seen and not self.user_exists(member):
+                    errors.append(f"group '{group_name}': user '{member}' does not exist")
+        return errors
+
+    async def bulk_register(self, users, groups=None, progress=None):
+        """
+        Creates many accounts at once. 'users' is a list of {"username",
+        "password", "groups"} entries, and 'groups' optionally maps further
+        group names to members (new or existing users); parse_user_batch
+        reads both from a CSV or JSON file. The whole batch is validated
+        first and nothing is created if any entry is invalid.
+
+        Each user gets a primary group of the same name and a home
+        directory, as with useradd. The passwords are hashed first, without
+        blocking the event loop (see _hash_passwords); then everything is
+        created in one transaction, so the VFS is saved once and a failure
+        leaves no partial batch behind. 'progress', if given, is called as
+        progress(stage, done, total) as each password is hashed.
+        """
+        errors = self.validate_batch(users, groups)
+        if errors:
+            return {"success": False, "error": f"{len(errors)} problem(s) in the batch; nothing was created.",
+                    "errors": errors}
+
+        started = time.perf_counter()
+        password_data = await self._hash_passwords(
+            [entry["password"] for entry in users],
+            (lambda done, total: progress("hash", done, total)) if progress else None)
+        hashed = time.perf_counter()
+        # Other sessions kept running while the hashes were computed; check again for names taken meanwhile.
+        errors = self.validate_batch(users, groups)
+        if errors:
+            return {"success": False, "error": f"{len(errors)} problem(s) in the batch; nothing was created.",
+                    "errors": errors}
+        wanted = {}
+        for entry in users:
+            for group_name in [entry["username"]] + entry.get("groups", []):
+                wanted.setdefault(group_name, []).append(entry["username"])
+        for group_name, members in (groups or {}).items():
+            wanted.setdefault(group_name, []).extend(members)
+
+        summary = {"users": len(users), "groups": 0, "memberships": 0, "homes": 0}
+        try:
+            with transaction_manager.transaction():
+                for group_name, members in wanted.items():
+                    if not group_manager.group_exists(group_name):
+                        group_manager.create_group(group_name)
+                        summary["groups"] += 1
+                    for member in members:
+                        if not group_manager.is_member(member, group_name):
+                            group_manager.add_user_to_group(member, group_name)
+                            summary["memberships"] += 1
+
+                if not fs_manager.get_node("/home"):
+                    fs_manager.create_directory("/home", {"name": "root", "group": "root"})
+                for entry in users:
+                    home_path = f"/home/{entry['username']}"
+                    fs_manager.create_directory(home_path, {"name": "root", "group": "root"})
+                    fs_manager.chown(home_path, entry["username"])
+                    fs_manager.chgrp(home_path, entry["username"])
+                    summary["homes"] += 1
+
+                for entry, data in zip(users, password_data):
+                    self._store_user(entry["username"], data, entry["username"])
+        except Exception as e:
+            return {"success": False, "error": f"An error occurred during bulk registration (nothing was created): {e}",
+                    "errors": []}
+        finished = time.perf_counter()
+        summary["seconds"] = round(finished - started, 3)
+        summary["hash_seconds"] = round(hashed - started, 3)
+        return {"success": True, "summary": summary}
 
     def remove_user(self, username):
         """Removes a user account."""
         if self.user_exists(username):
+            transaction_manager.remember(self.users, username)
             del self.users[username]
+            self.tickets.revoke(username)
             return True
         return False
 
-    def verify_password(self, username, password_attempt):
-        """Verifies a user's password."""
+    def _check_password(self, username, password_attempt):
+        """
+        Checks an attempt without PBKDF2. Returns True or False when that
+        settles it, or the stored passwordData when the hash must be checked.
+        """
         user_entry = self.get_user(username)
 
         if not user_entry:
@@ -120,10 +415,60 @@ class UserManager:
         if username == 'root' and not password_data:
             return False
 
-        # Case 4: A password is set, and an attempt was made. Verify it.
-        salt = password_data['salt']
-        stored_hash = password_data['hash']
-        return self._verify_password_with_salt(password_attempt, salt, stored_hash)
+        # Case 4: The same password was verified for this session recently.
+        if self.tickets.confirms(session_manager.get_current_user(), username, password_attempt):
+            return True
+
+        return password_data
+
+    def _verify_hash(self, password_attempt, password_data):
+        return self._verify_password_with_salt(
+            password_attempt, password_data['salt'], password_data['hash'],
+            password_data.get('iterations', LEGACY_PBKDF2_ITERATIONS))
+
+    def _accept(self, username, password_attempt, password_data, rehash=True):
+        """
+        Records a successful hash check: grants a ticket and, when 'rehash' is
+        set and the hash was made with another cost, rehashes it. Returns True
+        if it rehashed.
+        """
+        self.tickets.grant(session_manager.get_current_user(), username, password_attempt)
+        if not rehash or password_data.get('iterations', LEGACY_PBKDF2_ITERATIONS) == self.password_iterations:
+            return False
+        self.users[username]['passwordData'] = self._secure_hash_password(password_attempt)
+        return True
+
+    def verify_password(self, username, password_attempt):
+        """
+        Verifies a user's password. It returns a bare boolean and so has no
+        way to ask for the user records to be saved; hashes made with another
+        cost are left for verify_password_async to upgrade.
+        """
+        outcome = self._check_password(username, password_attempt)
+        if not isinstance(outcome, dict):
+            return outcome
+        if not self._verify_hash(password_attempt, outcome):
+            return False
+        self._accept(username, password_attempt, outcome, rehash=False)
+        return True
+
+    async def verify_password_async(self, username, password_attempt):
+        """
+        verify_password for the frontend. The hash check runs in the event
+        loop's default executor where threads exist, so the kernel keeps
+        serving other requests meanwhile; Pyodide has no threads and runs it
+        inline. 'rehashed' tells the caller to persist the user records.
+        """
+        outcome = self._check_password(username, password_attempt)
+        if not isinstance(outcome, dict):
+            return {"success": True, "data": outcome, "rehashed": False}
+        if sys.platform == 'emscripten':
+            verified = self._verify_hash(password_attempt, outcome)
+        else:
+            verified = await asyncio.get_running_loop().run_in_executor(None, self._verify_hash, password_attempt, outcome)
+        if not verified:
+            return {"success": True, "data": False, "rehashed": False}
+        return {"success": True, "data": True, "rehashed": self._accept(username, password_attempt, outcome)}
 
     def change_password(self, username, new_password):
         """Changes a user's password."""
@@ -131,7 +476,9 @@ class UserManager:
             return False
 
         new_password_data = self._secure_hash_password(new_password)
+        transaction_manager.remember(self.users[username], 'passwordData')
         self.users[username]['passwordData'] = new_password_data
+        self.tickets.revoke(username)
         return True
 
     def validate_username_format(self, username):
@@ -160,77 +507,75 @@ class UserManager:
             return {"success": False, "error": "Cannot remove the root user."}
 
         try:
-            # Remove from all groups
-            group_manager.remove_user_from_all_groups(username)
+            # One transaction: if any step fails, the group and file changes are undone.
+            with transaction_manager.transaction():
+                # Remove from all groups
+                group_manager.remove_user_from_all_groups(username)
 
-            # Remove home directory if requested
-            if remove_home:
-                home_path = f"/home/{username}"
-                if fs_manager.get_node(home_path):
-                    fs_manager.remove(home_path, recursive=True)
+                # Remove home directory if requested
+                if remove_home:
+                    home_path = f"/home/{username}"
+                    if fs_manager.get_node(home_path):
+                        fs_manager.remove(home_path, recursive=True)
 
-            # Finally, remove the user account itself
-            self.remove_user(username)
+                # Finally, remove the user account itself
+                self.remove_user(username)
 
-            # Important: Save the state of the filesystem after potential deletion
-            fs_manager._save_state()
+                # Important: Save the state of the filesystem after potential deletion
+                fs_manager._save_state()
 
             return {"success": True}
         except Exception as e:
-            # In a real system, we'd have a transaction to roll back group/file changes
-            # if the final user deletion failed. For now, we report the error.
-            return {"success": False, "error": f"An error occurred during deletion: {str(e)}"}
+            return {"success": False, "error": f"An error occurred during deletion (nothing was changed): {str(e)}"}
 
     def first_time_setup(self, username, password, root_password):
         """
         Performs the initial system setup in a transactional manner.
         """
-        # Backup state for rollback
-        original_users = copy.deepcopy(self.users)
-        original_groups = copy.deepcopy(group_manager.groups)
-        original_fs_data = copy.deepcopy(fs_manager.fs_data)
-
         try:
-            # 1. Initialize the default filesystem structure
-            fs_manager._initialize_default_filesystem()
-
-            # 2. Ensure root group and user exist before anything else
-            if not group_manager.group_exists('root'):
-                group_manager.create_group('root')
-            if not self.user_exists('root'):
-                self.register_user('root', None, 'root')
-
-            if not group_manager.group_exists('Guest'):
-                group_manager.create_group('Guest')
-            if not self.user_exists('Guest'):
-                self.register_user('Guest', None, 'Guest')
-
-            # 4. Create the new user's group
-            if not group_manager.group_exists(username):
-                group_manager.create_group(username)
-
-            # 5. Register the new user
-            registration_result = self.register_user(username, password, username)
-            if not registration_result["success"]:
-                if "already exists" not in registration_result["error"]:
-                    raise ValueError(registration_result["error"])
-
-            # 6. Add the user to their own primary group
-            group_manager.add_user_to_group(username, username)
-
-            # 7. Create the user's home directory as root
-            home_path = f"/home/{username}"
-            if not fs_manager.get_node(home_path):
-                fs_manager.create_directory(home_path, {"name": "root", "group": "root"})
-                fs_manager.chown(home_path, username)
-                fs_manager.chgrp(home_path, username)
-
-            # 8. Set the root password
-            if not self.change_password('root', root_password):
-                raise ValueError("Failed to set root password during setup.")
-
-            # 9. Persist changes to the filesystem
-            fs_manager._save_state()
+            # Everything below is one transaction: on failure the journal undoes
+            # exactly the changes made so far, and nothing else is copied.
+            with transaction_manager.transaction():
+                # 1. Initialize the default filesystem structure
+                fs_manager._initialize_default_filesystem()
+
+                # 2. Ensure root group and user exist before anything else
+                if not group_manager.group_exists('root'):
+                    group_manager.create_group('root')
+                if not self.user_exists('root'):
+                    self.register_user('root', None, 'root')
+
+                if not group_manager.group_exists('Guest'):
+                    group_manager.create_group('Guest')
+                if not self.user_exists('Guest'):
+                    self.register_user('Guest', None, 'Guest')
+
+                # 4. Create the new user's group
+                if not group_manager.group_exists(username):
+                    group_manager.create_group(username)
+
+                # 5. Register the new user
+                registration_result = self.register_user(username, password, username)
+                if not registration_result["success"]:
+                    if "already exists" not in registration_result["error"]:
+                        raise ValueError(registration_result["error"])
+
+                # 6. Add the user to their own primary group
+                group_manager.add_user_to_group(username, username)
+
+                # 7. Create the user's home directory as root
+                home_path = f"/home/{username}"
+                if not fs_manager.get_node(home_path):
+                    fs_manager.create_directory(home_path, {"name": "root", "group": "root"})
+                    fs_manager.chown(home_path, username)
+                    fs_manager.chgrp(home_path, username)
+
+                # 8. Set the root password
+                if not self.change_password('root', root_password):
+                    raise ValueError("Failed to set root password during setup.")
+
+                # 9. Persist changes to the filesystem
+                fs_manager._save_state()
 
             return {
                 "success": True,
@@ -240,11 +585,6 @@ class UserManager:
                 }
             }
         except Exception as e:
-            # Rollback to original state on any failure
-            self.users = original_users
-            group_manager.groups = original_groups
-            fs_manager.fs_data = original_fs_data
-
             return {"success": False, "error": f"An error occurred during setup: {str(e)}"}
 
 user_manager = UserManager()
\ No newline at end of file
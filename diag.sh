@@ -652,6 +652,20 @@ run ./scope_test.sh
 check_fail -z "echo $CHILD_VAR"
 rm scope_test.sh
 echo "Script sandboxing test complete."
+delay 200
+
+echo "--- Test: Unsetting an inherited variable inside a script ---"
+set PARENT_VAR="inherited value"
+echo 'unset PARENT_VAR' > unset_scope_test.sh
+echo 'check_fail -z "echo $PARENT_VAR"' >> unset_scope_test.sh
+chmod 755 ./unset_scope_test.sh
+run ./unset_scope_test.sh
+# The script's unset must not reach the parent shell.
+echo "Parent still has: $PARENT_VAR"
+unset PARENT_VAR
+check_fail -z "echo $PARENT_VAR"
+rm unset_scope_test.sh
+echo "Inherited unset test complete."
 delay 400
 
 echo "---------------------------------------------------------------------"
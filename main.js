@@ -3,10 +3,6 @@
 // This global variable will be our session's birth certificate!
 window.sessionStartTime = new Date();
 
-// --- Job Management Globals ---
-let backgroundProcessIdCounter = 0;
-const activeJobs = {};
-
 function startOnboardingProcess(dependencies) {
     const { AppLayerManager, OutputManager, TerminalUI } = dependencies;
     OutputManager.clearOutput();
@@ -64,10 +60,13 @@ async function executePythonCommand(rawCommandText, options = {}) {
 
         if (pyResult.success) {
             if (Array.isArray(pyResult.effects)) {
+                if (pyResult.output && isInteractive) {
+                    await OutputManager.appendToOutput(pyResult.output);
+                }
                 for (const eff of pyResult.effects) {
                     await handleEffect(eff, options);
                 }
-                result = { success: true };
+                result = isInteractive ? { success: true } : { success: true, output: pyResult.output };
             } else if (pyResult.effect) {
                 result = await handleEffect(pyResult, options);
             } else if (pyResult.output !== undefined) {
@@ -88,16 +87,22 @@ async function executePythonCommand(rawCommandText, options = {}) {
             // --- END OF THE FIX ---
 
         } else {
+            // Script output produced before the failure is still shown.
+            if (pyResult.output) {
+                await OutputManager.appendToOutput(pyResult.output);
+            }
             // The ErrorHandler will create a standardized error object for us.
             const errorObject = ErrorHandler.createError(pyResult.error);
 
-            // Pass the structured message to the OutputManager.
-            let fullErrorMessage = errorObject.error.message;
-            if (errorObject.error.suggestion) {
-                fullErrorMessage += `\nSuggestion: ${errorObject.error.suggestion}`;
+            // Pass the structured message to the OutputManager. Commands like
+            // 'test' fail without an error message; those stay silent.
+            if (pyResult.error) {
+                let fullErrorMessage = errorObject.error.message;
+                if (errorObject.error.suggestion) {
+                    fullErrorMessage += `\nSuggestion: ${errorObject.error.suggestion}`;
+                }
+                await OutputManager.appendToOutput(fullErrorMessage, { typeClass: Config.CSS_CLASSES.ERROR_MSG });
             }
-
-            await OutputManager.appendToOutput(fullErrorMessage, { typeClass: Config.CSS_CLASSES.ERROR_MSG });
             result = errorObject; // Store the standardized object.
         }
     } catch (e) {
@@ -120,14 +125,23 @@ async function executePythonCommand(rawCommandText, options = {}) {
 // --- Command Execution Wrapper ---
 const CommandExecutor = {
     processSingleCommand: executePythonCommand,
-    getActiveJobs: () => activeJobs,
 };
 
 
 // --- Kernel Context Creation ---
 async function createKernelContext(options = {}) {
     const { asUser = null } = options;
-    const { FileSystemManager, UserManager, GroupManager, StorageManager, Config, SessionManager, AliasManager, HistoryManager } = dependencies;
+    const { FileSystemManager, UserManager, GroupManager, StorageManager, Config } = dependencies;
+
+    // Everything the context needs from the kernel is fetched in one batched
+    // crossing instead of one syscall per user plus several session round-trips.
+    const [currentUserResult, allGroupsResult, sessionStackResult] = await OopisOS_Kernel.syscallBatch([
+        { module: "session", function: "get_current_user" },
+        { module: "groups", function: "get_all_groups" },
+        { module: "session", function: "get_stack" }
+    ]);
+    const allGroups = allGroupsResult.success ? allGroupsResult.data : {};
+    const sessionStack = sessionStackResult.success ? sessionStackResult.data : ["Guest"];
 
     let user;
     let primaryGroup;
@@ -136,7 +150,7 @@ async function createKernelContext(options = {}) {
         user = { name: asUser.name };
         primaryGroup = asUser.primaryGroup;
     } else {
-        user = await UserManager.getCurrentUser();
+        user = { name: currentUserResult.success ? currentUserResult.data : "Guest" };
         primaryGroup = await UserManager.getPrimaryGroupForUser(user.name);
     }
 
@@ -144,31 +158,26 @@ async function createKernelContext(options = {}) {
     const allUsernames = Object.keys(allUsers);
     const userGroupsMap = {};
     for (const username of allUsernames) {
-        userGroupsMap[username] = await GroupManager.getGroupsForUser(username);
+        userGroupsMap[username] = GroupManager.resolveGroupsForUser(username, allUsers, allGroups);
     }
     if (!userGroupsMap['Guest']) {
-        userGroupsMap['Guest'] = await GroupManager.getGroupsForUser('Guest');
+        userGroupsMap['Guest'] = GroupManager.resolveGroupsForUser('Guest', allUsers, allGroups);
     }
     const apiKey = StorageManager.loadItem(Config.STORAGE_KEYS.GEMINI_API_KEY);
 
-    // This syncs the JS-side session state to Python before execution
-    await OopisOS_Kernel.syscall("alias", "load_aliases", [await AliasManager.getAllAliases()]);
-    await OopisOS_Kernel.syscall("history", "set_history", [await HistoryManager.getFullHistory()]);
-
     return JSON.stringify({
         current_path: FileSystemManager.getCurrentPath(),
         user_context: { name: user.name, group: primaryGroup },
         users: allUsers,
         user_groups: userGroupsMap,
-        groups: await GroupManager.getAllGroups(),
-        jobs: activeJobs,
+        groups: allGroups,
         config: {
             MAX_VFS_SIZE: Config.FILESYSTEM.MAX_VFS_SIZE,
             NETWORKING_ENABLED: Config.NETWORKING.NETWORKING_ENABLED, // Pass the flag
         },
         api_key: apiKey,
         session_start_time: window.sessionStartTime.toISOString(),
-        session_stack: await SessionManager.getStack()
+        session_stack: sessionStack
     });
 }
 
@@ -177,7 +186,7 @@ async function handleEffect(result, options) {
     const {
         FileSystemManager, TerminalUI, SoundManager, SessionManager, AppLayerManager,
         UserManager, ErrorHandler, Config, OutputManager, PagerManager, Utils,
-        GroupManager, NetworkManager, MessageBusManager, ModalManager, StorageManager,
+        GroupManager, NetworkManager, ModalManager, StorageManager,
         AuditManager, StorageHAL, SudoManager
     } = dependencies;
 
@@ -185,13 +194,13 @@ async function handleEffect(result, options) {
         case 'sudo_exec': {
             const currentUser = await UserManager.getCurrentUser();
             const executeAsRoot = async () => {
-                SudoManager.updateUserTimestamp(currentUser.name);
+                await SudoManager.updateUserTimestamp(currentUser.name);
                 await AuditManager.log(currentUser.name, 'SUDO_SUCCESS', `Command: ${result.command}`);
                 const execOptions = { ...options, isInteractive: false, asUser: { name: 'root', primaryGroup: 'root' }, isSudoContinuation: true };
                 await CommandExecutor.processSingleCommand(result.command, execOptions);
             };
 
-            if (SudoManager.isUserTimestampValid(currentUser.name)) {
+            if (result.nopasswd || await SudoManager.isUserTimestampValid(currentUser.name)) {
                 await executeAsRoot();
                 break;
             }
@@ -216,8 +225,9 @@ async function handleEffect(result, options) {
                 break;
             }
 
-            const verifyResultJson = await OopisOS_Kernel.syscall("users", "verify_password", [currentUser.name, passwordToTry]);
+            const verifyResultJson = await OopisOS_Kernel.syscall("users", "verify_password_async", [currentUser.name, passwordToTry]);
             const verifyResult = JSON.parse(verifyResultJson);
+            if (verifyResult.rehashed) await UserManager.syncUsersFromKernel();
 
             if (verifyResult.success && verifyResult.data) {
                 await executeAsRoot();
@@ -252,7 +262,43 @@ async function handleEffect(result, options) {
                 options,
             });
             break;
-        case 'execute_script':
+        case 'script_step': {
+            // 'run' executes scripts inside the kernel. It hands control back here
+            // only when a line needs the browser (sudo, su, delay, ...), then
+            // continues from where it paused once the effects are done.
+            const scriptingContext = { isScripting: true, lines: [], currentLineIndex: -1 };
+            const stepOptions = { ...options, isInteractive: false, scriptingContext };
+            let step = result;
+            while (step) {
+                if (step.output) {
+                    await OutputManager.appendToOutput(step.output);
+                }
+                for (const eff of (step.effects || [])) {
+                    const effectResult = await handleEffect(eff, stepOptions);
+                    if (effectResult && effectResult.output) {
+                        await OutputManager.appendToOutput(effectResult.output);
+                    }
+                }
+                if (step.error) {
+                    let errorMessage = step.error.message || step.error;
+                    if (step.error.suggestion) {
+                        errorMessage += `\nSuggestion: ${step.error.suggestion}`;
+                    }
+                    await OutputManager.appendToOutput(errorMessage, { typeClass: Config.CSS_CLASSES.ERROR_MSG });
+                }
+                if (step.script_id === null || step.script_id === undefined) {
+                    break;
+                }
+                const contextJson = await createKernelContext({ asUser: options.asUser });
+                step = JSON.parse(await OopisOS_Kernel.syscall("script", "resume", [step.script_id, contextJson]));
+                if (!step.success) {
+                    await OutputManager.appendToOutput(step.error, { typeClass: Config.CSS_CLASSES.ERROR_MSG });
+                    break;
+                }
+            }
+            break;
+        }
+
         case 'execute_commands': {
             const commandsToRun = result.lines || result.commands;
             const scriptArgs = result.args || [];
@@ -370,28 +416,6 @@ async function handleEffect(result, options) {
             break;
         }
 
-        case 'background_job':
-            const newJobId = ++backgroundProcessIdCounter;
-            const abortController = new AbortController();
-            const jobUser = (await UserManager.getCurrentUser()).name;
-
-            activeJobs[newJobId] = {
-                command: result.command_string, status: 'running', user: jobUser,
-                startTime: new Date().toISOString(), abortController: abortController
-            };
-            MessageBusManager.registerJob(newJobId);
-
-            (async () => {
-                const bgOptions = { ...options, isInteractive: false, suppressOutput: true, signal: abortController.signal };
-                await executePythonCommand(result.command_string, bgOptions);
-                if (activeJobs[newJobId]) {
-                    delete activeJobs[newJobId];
-                    MessageBusManager.unregisterJob(newJobId);
-                }
-            })();
-            await OutputManager.appendToOutput(`[${newJobId}] ${result.command_string}`);
-            break;
-
         case 'login':
 
         case 'su': { // 'su' and 'login' effects are functionally identical
@@ -454,13 +478,6 @@ async function handleEffect(result, options) {
             break;
         }
 
-        case 'signal_job':
-            const signalResult = sendSignalToJob(result.job_id, result.signal);
-            if (!signalResult.success) {
-                await OutputManager.appendToOutput(signalResult.error, { typeClass: Config.CSS_CLASSES.ERROR_MSG });
-            }
-            break;
-
         case 'change_directory':
             await FileSystemManager.setCurrentPath(result.path);
             await TerminalUI.updatePrompt();
@@ -476,6 +493,7 @@ async function handleEffect(result, options) {
 
         case 'reboot':
             await OutputManager.appendToOutput("Rebooting...");
+            OopisOS_Kernel.shutdown();
             setTimeout(() => window.location.reload(), 1000);
             break;
 
@@ -563,16 +581,6 @@ async function handleEffect(result, options) {
             await OutputManager.appendToOutput(output.join('\n'));
             break;
 
-        case 'read_messages':
-            const messages = MessageBusManager.getMessages(result.job_id);
-            // This implicitly becomes the command's output
-            await OutputManager.appendToOutput(messages.join(" "));
-            break;
-
-        case 'post_message':
-            MessageBusManager.postMessage(result.job_id, result.message);
-            break;
-
         case 'play_sound':
             if (!SoundManager.isInitialized) { await SoundManager.initialize(); }
             SoundManager.playNote(result.notes, result.duration);
@@ -660,26 +668,6 @@ async function handleEffect(result, options) {
     }
 }
 
-// --- Job Signal Handler ---
-function sendSignalToJob(jobId, signal) {
-    const job = activeJobs[jobId];
-    if (!job) return { success: false, error: `Job ${jobId} not found.` };
-    switch (signal.toUpperCase()) {
-        case 'KILL': case 'TERM':
-            if (job.abortController) {
-                job.abortController.abort("Killed by user.");
-                delete activeJobs[jobId];
-                dependencies.MessageBusManager.unregisterJob(jobId);
-            }
-            break;
-        case 'STOP': job.status = 'paused'; break;
-        case 'CONT': job.status = 'running'; break;
-        default: return { success: false, error: `Invalid signal '${signal}'.` };
-    }
-    return { success: true, output: `Signal ${signal} sent to job ${jobId}.` };
-}
-
-
 async function finalizeInteractiveModeUI(originalCommandText) {
     const { TerminalUI, AppLayerManager, HistoryManager } = dependencies;
     if (!TerminalUI.isSearchingHistory) {
@@ -692,6 +680,7 @@ async function finalizeInteractiveModeUI(originalCommandText) {
         TerminalUI.focusInput();
     }
     TerminalUI.scrollOutputToEnd();
+    await HistoryManager.sync();
     if (!TerminalUI.getIsNavigatingHistory() && originalCommandText.trim()) {
         await HistoryManager.resetIndex();
     }
@@ -939,6 +928,11 @@ window.onload = async () => {
         }
 
         initializeTerminalEventListeners(domElements, dependencies);
+        // The kernel buffers audit records; write them out before the page goes away.
+        window.addEventListener('pagehide', () => OopisOS_Kernel.shutdown());
+        document.addEventListener('visibilitychange', () => {
+            if (document.visibilityState === 'hidden') OopisOS_Kernel.shutdown();
+        });
 
         await terminalUI.updatePrompt();
         terminalUI.focusInput();
@@ -57,12 +57,14 @@ window.TopManager = class TopManager extends App {
     async _updateProcessList() {
         if (!OopisOS_Kernel || !OopisOS_Kernel.isReady) return;
 
-        const jobs = this.dependencies.CommandExecutor.getActiveJobs();
-        const resultJson = await OopisOS_Kernel.syscall("top", "get_process_list", [jobs]);
-        const result = JSON.parse(resultJson);
+        const [result, recentResult] = await OopisOS_Kernel.syscallBatch([
+            { module: "top", function: "get_process_list" },
+            { module: "top", function: "get_recent_commands", args: [10] }
+        ]);
 
         if (this.ui && result.success) {
             this.ui.render(result.data);
+            this.ui.renderRecentCommands(recentResult.success ? recentResult.data : []);
         } else if (!result.success) {
             console.error("Top App Error:", result.error);
         }
@@ -25,6 +25,8 @@ window.TopUI = class TopUI {
                     Utils.createElement("th", { textContent: "PID" }),
                     Utils.createElement("th", { textContent: "USER" }),
                     Utils.createElement("th", { textContent: "STAT" }),
+                    Utils.createElement("th", { textContent: "CPU (s)" }),
+                    Utils.createElement("th", { textContent: "OUTPUT" }),
                     Utils.createElement("th", { textContent: "COMMAND" }),
                 ])
             ),
@@ -32,6 +34,20 @@ window.TopUI = class TopUI {
         ]);
 
         this.elements.main.appendChild(table);
+
+        this.elements.recentList = Utils.createElement("tbody");
+        const recentTable = Utils.createElement("table", { className: "top-table" }, [
+            Utils.createElement("thead", {},
+                Utils.createElement("tr", {}, [
+                    Utils.createElement("th", { textContent: "TOTAL (ms)" }),
+                    Utils.createElement("th", { textContent: "PARSE (ms)" }),
+                    Utils.createElement("th", { textContent: "STAGES" }),
+                    Utils.createElement("th", { textContent: "RECENT COMMAND" }),
+                ])
+            ),
+            this.elements.recentList
+        ]);
+        this.elements.main.appendChild(recentTable);
     }
 
     render(processes) {
@@ -42,7 +58,7 @@ window.TopUI = class TopUI {
         if (processes.length === 0) {
             const row = this.dependencies.Utils.createElement("tr", {},
                 this.dependencies.Utils.createElement("td", {
-                    colSpan: 4,
+                    colSpan: 6,
                     textContent: "No background processes running.",
                     style: { textAlign: "center", fontStyle: "italic" }
                 })
@@ -57,12 +73,43 @@ window.TopUI = class TopUI {
                 this.dependencies.Utils.createElement("td", { textContent: proc.pid }),
                 this.dependencies.Utils.createElement("td", { textContent: proc.user }),
                 this.dependencies.Utils.createElement("td", { textContent: proc.status }),
+                this.dependencies.Utils.createElement("td", { textContent: proc.cpu_time.toFixed(2) }),
+                this.dependencies.Utils.createElement("td", { textContent: `${proc.output_bytes} B` }),
                 this.dependencies.Utils.createElement("td", { textContent: proc.command }),
             ]);
             fragment.appendChild(row);
         });
         this.elements.processList.appendChild(fragment);
     }
+    renderRecentCommands(records) {
+        if (!this.elements.recentList) return;
+        const { Utils } = this.dependencies;
+
+        this.elements.recentList.innerHTML = "";
+
+        if (records.length === 0) {
+            this.elements.recentList.appendChild(Utils.createElement("tr", {},
+                Utils.createElement("td", {
+                    colSpan: 4,
+                    textContent: "No profiled commands. Run 'perf on' to record them.",
+                    style: { textAlign: "center", fontStyle: "italic" }
+                })
+            ));
+            return;
+        }
+
+        const fragment = document.createDocumentFragment();
+        records.forEach(record => {
+            fragment.appendChild(Utils.createElement("tr", {}, [
+                Utils.createElement("td", { textContent: record.total_ms.toFixed(2) }),
+                Utils.createElement("td", { textContent: record.parse_ms.toFixed(2) }),
+                Utils.createElement("td", { textContent: record.segments }),
+                Utils.createElement("td", { textContent: record.command }),
+            ]));
+        });
+        this.elements.recentList.appendChild(fragment);
+    }
+
     hideAndReset() {
         if (this.elements.container) {
             this.elements.container.remove();
@@ -41,7 +41,8 @@ class ConfigManager {
             },
 
             TERMINAL: {
-                MAX_HISTORY_SIZE: 50,
+                MAX_HISTORY_SIZE: 20000,
+                HISTORY_MAX_CHUNKS: 256,
                 PROMPT_CHAR: ">",
                 PROMPT_SEPARATOR: ":",
                 PROMPT_AT: "@",
@@ -51,6 +52,7 @@ class ConfigManager {
                 ONBOARDING_COMPLETE: "oopisOsOnboardingComplete",
                 USER_CREDENTIALS: "oopisOsUserCredentials",
                 USER_TERMINAL_STATE_PREFIX: "oopisOsUserTerminalState_",
+                USER_HISTORY_PREFIX: "oopisOsUserHistory_",
                 MANUAL_TERMINAL_STATE_PREFIX: "oopisOsManualUserTerminalState_",
                 EDITOR_WORD_WRAP_ENABLED: "oopisOsEditorWordWrapEnabled",
                 ALIAS_DEFINITIONS: "oopisOsAliasDefinitions",
@@ -17,12 +17,19 @@ class GroupManager {
             null
         );
 
-        if (groupsFromStorage) {
-            await OopisOS_Kernel.syscall("groups", "load_groups", [groupsFromStorage]);
-        } else {
-            await OopisOS_Kernel.syscall("groups", "initialize_defaults");
-        }
-        await this._save(); // Save back to storage to ensure consistency
+        // Load (or seed) and read back the groups in a single kernel crossing.
+        const [, allGroupsResult] = await OopisOS_Kernel.syscallBatch([
+            groupsFromStorage
+                ? { module: "groups", function: "load_groups", args: [groupsFromStorage] }
+                : { module: "groups", function: "initialize_defaults" },
+            { module: "groups", function: "get_all_groups" }
+        ]);
+        // Save back to storage to ensure consistency
+        StorageManager.saveItem(
+            Config.STORAGE_KEYS.USER_GROUPS,
+            allGroupsResult.success ? allGroupsResult.data : {},
+            "User Groups"
+        );
         console.log("GroupManager initialized and synced with Python kernel.");
     }
 
@@ -90,8 +97,14 @@ class GroupManager {
             "User list",
             {}
         );
-        const primaryGroup = users[username]?.primaryGroup;
         const allGroups = await this.getAllGroups();
+        return this.resolveGroupsForUser(username, users, allGroups);
+    }
+
+    // Pure helper so callers that already hold the users and groups data
+    // (e.g. a batched syscall) can resolve memberships without another crossing.
+    resolveGroupsForUser(username, users, allGroups) {
+        const primaryGroup = users[username]?.primaryGroup;
         const userGroups = [];
 
         if (primaryGroup && !userGroups.includes(primaryGroup)) {
@@ -27,64 +27,119 @@ class HistoryManager {
     constructor() {
         this.dependencies = {};
         this.historyIndex = 0;
-        this.jsHistoryCache = [];
+        this.historyLength = 0;
+        this.historyOwner = null;
         this.searchIndex = -1; // New: For reverse search
     }
     setDependencies(deps) { this.dependencies = deps; }
-    async _syncCache() {
-        this.jsHistoryCache = await this.getFullHistory();
-        this.historyIndex = this.jsHistoryCache.length;
+
+    // The history lives in the kernel; this side only tracks the length and
+    // the navigation position, and fetches entries one at a time.
+    _setLength(length) {
+        this.historyLength = length;
+        this.historyIndex = length;
     }
     async add(command) {
-        await OopisOS_Kernel.syscall("history", "add", [command]);
-        await this._syncCache();
+        const result = JSON.parse(await OopisOS_Kernel.syscall("history", "add", [command]));
+        if (result.success) this._setLength(result.data);
+    }
+    async _getEntry(position) {
+        const result = JSON.parse(await OopisOS_Kernel.syscall("history", "get_entry", [position]));
+        return result.success ? result.data : null;
     }
-    getPrevious() {
-        if (this.jsHistoryCache.length > 0 && this.historyIndex > 0) {
+    async getPrevious() {
+        if (this.historyLength > 0 && this.historyIndex > 0) {
             this.historyIndex--;
-            return this.jsHistoryCache[this.historyIndex];
+            return await this._getEntry(this.historyIndex);
         }
         return null;
     }
-    getNext() {
-        if (this.historyIndex < this.jsHistoryCache.length - 1) {
+    async getNext() {
+        if (this.historyIndex < this.historyLength - 1) {
             this.historyIndex++;
-            return this.jsHistoryCache[this.historyIndex];
+            return await this._getEntry(this.historyIndex);
         } else {
-            this.historyIndex = this.jsHistoryCache.length;
+            this.historyIndex = this.historyLength;
             return "";
         }
     }
-    resetIndex() { this.historyIndex = this.jsHistoryCache.length; this.searchIndex = -1; }
+    resetIndex() { this.historyIndex = this.historyLength; this.searchIndex = -1; }
     async getFullHistory() {
         const result = JSON.parse(await OopisOS_Kernel.syscall("history", "get_full_history"));
         return result.success ? result.data : [];
     }
     async clearHistory() {
         await OopisOS_Kernel.syscall("history", "clear_history");
-        await this._syncCache();
+        await this.sync();
     }
     async setHistory(newHistory) {
         await OopisOS_Kernel.syscall("history", "set_history", [newHistory]);
-        await this._syncCache();
+        await this.sync();
     }
-    search(query, startFromLast = false) {
-        if (startFromLast || this.searchIndex === -1) {
-            this.searchIndex = this.jsHistoryCache.length - 1;
-        } else {
-            this.searchIndex--;
-        }
-
-        for (let i = this.searchIndex; i >= 0; i--) {
-            if (this.jsHistoryCache[i].toLowerCase().includes(query.toLowerCase())) {
-                this.searchIndex = i;
-                return this.jsHistoryCache[i];
-            }
+    async search(query, startFromLast = false) {
+        const before = (startFromLast || this.searchIndex === -1) ? null : this.searchIndex;
+        const result = JSON.parse(await OopisOS_Kernel.syscall("history", "search_latest", [query, before]));
+        if (result.success && result.data) {
+            this.searchIndex = result.data.position;
+            return result.data.command;
         }
         // If we reach the beginning without a match, reset for the next cycle
         this.searchIndex = -1;
         return null;
     }
+
+    // --- Persistence ---
+    // Each user's history is stored as numbered chunks of deltas under
+    // USER_HISTORY_PREFIX, so saving appends the new commands instead of
+    // rewriting the whole history. A chunk marked 'base' replaces the
+    // ones before it; after HISTORY_MAX_CHUNKS appends the chunks are
+    // compacted into a single base chunk.
+    _storageKey(user) { return `${this.dependencies.Config.STORAGE_KEYS.USER_HISTORY_PREFIX}${user}`; }
+    loadStoredDeltas(user) {
+        const { StorageManager } = this.dependencies;
+        const key = this._storageKey(user);
+        const meta = StorageManager.loadItem(key, `History index for ${user}`, { chunks: 0 });
+        const deltas = [];
+        for (let i = 0; i < meta.chunks; i++) {
+            const chunk = StorageManager.loadItem(`${key}_${i}`, `History for ${user}`);
+            if (chunk) deltas.push(chunk);
+        }
+        return deltas;
+    }
+    _writeChunks(user, chunks, startAt) {
+        const { StorageManager } = this.dependencies;
+        const key = this._storageKey(user);
+        const previous = StorageManager.loadItem(key, `History index for ${user}`, { chunks: 0 });
+        chunks.forEach((chunk, i) => StorageManager.saveItem(`${key}_${startAt + i}`, chunk, `History for ${user}`));
+        const count = startAt + chunks.length;
+        for (let i = count; i < previous.chunks; i++) StorageManager.removeItem(`${key}_${i}`);
+        StorageManager.saveItem(key, { chunks: count }, `History index for ${user}`);
+    }
+    setOwner(user) { this.historyOwner = user; }
+    // Persists what changed since the last sync and refreshes the length.
+    async sync() {
+        const [deltaResult, lengthResult] = await OopisOS_Kernel.syscallBatch([
+            { module: "history", function: "take_delta" },
+            { module: "history", function: "get_length" }
+        ]);
+        if (lengthResult.success) this._setLength(lengthResult.data);
+        if (!deltaResult.success || !this.historyOwner) return;
+        const delta = deltaResult.data;
+        if (!delta.base && delta.entries.length === 0) return;
+
+        const { Config, StorageManager } = this.dependencies;
+        const user = this.historyOwner;
+        if (delta.base) {
+            this._writeChunks(user, [delta], 0);
+            return;
+        }
+        const { chunks } = StorageManager.loadItem(this._storageKey(user), `History index for ${user}`, { chunks: 0 });
+        if (chunks >= Config.TERMINAL.HISTORY_MAX_CHUNKS) {
+            this._writeChunks(user, [{ base: true, entries: await this.getFullHistory() }], 0);
+        } else {
+            this._writeChunks(user, [delta], chunks);
+        }
+    }
 }
 
 class AliasManager {
@@ -152,17 +207,25 @@ class SessionManager {
     }
 
     async loadAutomaticState(username) {
-        const { FileSystemManager, TerminalUI, StorageManager, Config, AliasManager, EnvironmentManager, HistoryManager } = this.dependencies;
+        const { FileSystemManager, TerminalUI, StorageManager, Config, AliasManager, HistoryManager } = this.dependencies;
         const stateKey = this._getAutomaticSessionStateKey(username);
         const loadedState = StorageManager.loadItem(stateKey, `Auto session for ${username}`);
 
+        // Store the outgoing user's last history changes before replacing the history.
+        await HistoryManager.sync();
+        HistoryManager.setOwner(username);
+
         if (loadedState) {
             const sessionPart = {
                 commandHistory: loadedState.commandHistory || [],
+                historyDeltas: HistoryManager.loadStoredDeltas(username),
                 environmentVariables: loadedState.environmentVariables || {},
                 aliases: loadedState.aliases || {},
             };
-            await OopisOS_Kernel.syscall("session", "load_session_state", [JSON.stringify(sessionPart)]);
+            const [, lengthResult] = await OopisOS_Kernel.syscallBatch([
+                { module: "session", function: "load_session_state", args: [JSON.stringify(sessionPart)] },
+                { module: "history", function: "get_length" }
+            ]);
 
             FileSystemManager.setCurrentPath(loadedState.currentPath || Config.FILESYSTEM.ROOT_PATH);
             if (TerminalUI.elements.outputDiv) { TerminalUI.elements.outputDiv.innerHTML = loadedState.outputHTML || ""; }
@@ -170,7 +233,7 @@ class SessionManager {
             await TerminalUI.updatePrompt();
             if (TerminalUI.elements.outputDiv) TerminalUI.elements.outputDiv.scrollTop = TerminalUI.elements.outputDiv.scrollHeight;
 
-            await HistoryManager._syncCache();
+            HistoryManager._setLength(lengthResult.success ? lengthResult.data : 0);
 
             return { success: true, newStateCreated: false };
         } else {
@@ -178,8 +241,11 @@ class SessionManager {
             TerminalUI.setCurrentInputValue("");
 
             await AliasManager.initialize();
-            await EnvironmentManager.initialize({ name: username });
-            await HistoryManager.clearHistory();
+            await OopisOS_Kernel.syscallBatch([
+                { module: "env", function: "initialize_defaults", args: [{ name: username }] },
+                { module: "history", function: "clear_history" }
+            ]);
+            await HistoryManager.sync();
 
             const homePath = `/home/${username}`;
             const homeNodeExists = await FileSystemManager.getNodeByPath(homePath);
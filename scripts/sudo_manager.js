@@ -2,7 +2,6 @@
 
 class SudoManager {
     constructor() {
-        this.userSudoTimestamps = {};
         this.dependencies = {};
         this.config = null;
         this.groupManager = null;
@@ -14,27 +13,19 @@ class SudoManager {
         this.groupManager = groupManager;
     }
 
-    isUserTimestampValid(username) {
-        const timestamp = this.userSudoTimestamps[username];
-        if (!timestamp) return false;
-
-        const timeoutMinutes = this.config.SUDO.DEFAULT_TIMEOUT || 15;
-        if (timeoutMinutes <= 0) return false;
-
-        const now = new Date().getTime();
-        const elapsedMinutes = (now - timestamp) / (1000 * 60);
-
-        return elapsedMinutes < timeoutMinutes;
+    // Timestamps are the kernel's credential tickets, which 'passwd' and
+    // 'usermod' revoke. Their lifetime is set from SUDO.DEFAULT_TIMEOUT.
+    async isUserTimestampValid(username) {
+        const result = JSON.parse(await OopisOS_Kernel.syscall("users", "has_ticket", [username]));
+        return result.success && result.data === true;
     }
 
-    updateUserTimestamp(username) {
-        this.userSudoTimestamps[username] = new Date().getTime();
+    async updateUserTimestamp(username) {
+        await OopisOS_Kernel.syscall("users", "refresh_ticket", [username]);
     }
 
-    clearUserTimestamp(username) {
-        if (this.userSudoTimestamps[username]) {
-            delete this.userSudoTimestamps[username];
-        }
+    async clearUserTimestamp(username) {
+        await OopisOS_Kernel.syscall("users", "invalidate_tickets", [username]);
     }
 
     canUserRunCommand(username, commandToRun) {
@@ -304,7 +304,7 @@ class TerminalUI {
         if (this.isSearchingHistory) {
             // If already searching, cycle to next result
             const { HistoryManager } = this.dependencies;
-            const found = HistoryManager.search(this.historySearchQuery);
+            const found = await HistoryManager.search(this.historySearchQuery);
             if (found) {
                 this.setCurrentInputValue(found);
             }
@@ -325,7 +325,7 @@ class TerminalUI {
             this.historySearchQuery = this.historySearchQuery.slice(0, -1);
         }
         const { HistoryManager } = this.dependencies;
-        const found = HistoryManager.search(this.historySearchQuery, true); // Start from last
+        const found = await HistoryManager.search(this.historySearchQuery, true); // Start from last
         this.setCurrentInputValue(found || "");
         await this.updatePrompt();
     }
@@ -354,8 +354,12 @@ class TerminalUI {
 class TabCompletionManager {
     constructor() {
         this.suggestionsCache = [];
+        this.directoryCache = new Set();
         this.cycleIndex = -1;
         this.lastCompletionInput = null;
+        this.completionSpan = null;
+        this.originalInput = null;
+        this.syncedCommandCount = -1;
         this.dependencies = {};
     }
 
@@ -365,278 +369,103 @@ class TabCompletionManager {
 
     resetCycle() {
         this.suggestionsCache = [];
+        this.directoryCache = new Set();
         this.cycleIndex = -1;
         this.lastCompletionInput = null;
-    }
-
-    findLongestCommonPrefix(strs) {
-        if (!strs || strs.length === 0) return "";
-        if (strs.length === 1) return strs[0];
-        let prefix = strs[0];
-        for (let i = 1; i < strs.length; i++) {
-            while (strs[i].indexOf(prefix) !== 0) {
-                prefix = prefix.substring(0, prefix.length - 1);
-                if (prefix === "") return "";
-            }
+        this.completionSpan = null;
+        this.originalInput = null;
+    }
+
+    // One kernel crossing per Tab: the kernel finds the word under the cursor,
+    // decides what it names (command, variable, user, group or path) and
+    // searches its prefix indexes. Package commands are only known to the
+    // JS side, so the kernel's copy is refreshed whenever the manifest grows.
+    async _requestCompletion(fullInput, cursorPos) {
+        const { Config, FileSystemManager, UserManager } = this.dependencies;
+        const user = await UserManager.getCurrentUser();
+        const context = { name: user.name, group: await UserManager.getPrimaryGroupForUser(user.name) };
+        const requests = [
+            { module: "completion", function: "complete", args: [fullInput, cursorPos, context, FileSystemManager.getCurrentPath()] }
+        ];
+        const commandCount = Config.COMMANDS_MANIFEST.length;
+        if (commandCount !== this.syncedCommandCount) {
+            requests.unshift({ module: "completion", function: "set_external_commands", args: [Config.COMMANDS_MANIFEST] });
         }
-        return prefix;
-    }
-
-    _getCompletionContext(fullInput, cursorPos) {
-        const tokens = fullInput.match(/(?:[^\s"']+|"[^"]*"|'[^']*')+/g) || [];
-        const commandName = tokens.length > 0 ? tokens[0].replace(/["']/g, "") : "";
-        const textBeforeCursor = fullInput.substring(0, cursorPos);
-        let startOfWordIndex = 0;
-        let inQuote = null;
-        for (let i = 0; i < textBeforeCursor.length; i++) {
-            const char = textBeforeCursor[i];
-            if (inQuote && char === inQuote && textBeforeCursor[i - 1] !== "\\") {
-                inQuote = null;
-            } else if (
-                !inQuote &&
-                (char === '"' || char === "'") &&
-                (i === 0 ||
-                    textBeforeCursor[i - 1] === " " ||
-                    textBeforeCursor[i - 1] === undefined)
-            ) {
-                inQuote = char;
-            }
-            if (char === " " && !inQuote) {
-                startOfWordIndex = i + 1;
-            }
+        const results = await OopisOS_Kernel.syscallBatch(requests);
+        const result = results[results.length - 1];
+        if (!result.success) {
+            console.error("Tab completion failed:", result.error);
+            return null;
         }
-        const currentWordWithQuotes = fullInput.substring(
-            startOfWordIndex,
-            cursorPos
-        );
-        const quoteChar = currentWordWithQuotes.startsWith("'")
-            ? "'"
-            : currentWordWithQuotes.startsWith('"')
-                ? '"'
-                : null;
-        const currentWordPrefix = quoteChar
-            ? currentWordWithQuotes.substring(1)
-            : currentWordWithQuotes;
-        const isQuoted = !!quoteChar;
-        const isCompletingCommand =
-            tokens.length === 0 ||
-            (tokens.length === 1 &&
-                !fullInput.substring(0, tokens[0].length).includes(" "));
-        return {
-            commandName,
-            isCompletingCommand,
-            currentWordPrefix,
-            startOfWordIndex,
-            currentWordLength: currentWordWithQuotes.length,
-            isQuoted,
-            quoteChar,
-            tokens
-        };
+        this.syncedCommandCount = commandCount;
+        return result;
     }
 
-    async _getSuggestionsFromProvider(context) {
-        const { currentWordPrefix, isCompletingCommand, commandName, tokens } = context;
-        let suggestions = [];
-
-        const { Config, StorageManager, FileSystemManager, UserManager, GroupManager } = this.dependencies;
-
-        if (isCompletingCommand) {
-            suggestions = Config.COMMANDS_MANIFEST.filter((cmd) =>
-                cmd.toLowerCase().startsWith(currentWordPrefix.toLowerCase())
-            ).sort();
-        } else {
-            // NEW LOGIC: Infer completion type from command name
-            const userCommands = ['su', 'chown', 'usermod', 'removeuser', 'groups', 'passwd', 'login'];
-            const groupCommands = ['chgrp'];
-            const commandCompletingCommands = ['help', 'man', 'alias', 'unalias'];
-
-            let completionType = 'paths'; // Default to paths
-            if (userCommands.includes(commandName)) {
-                completionType = 'users';
-            } else if (groupCommands.includes(commandName) || (commandName === 'usermod' && tokens.includes('-aG'))) {
-                completionType = 'groups';
-            } else if (commandCompletingCommands.includes(commandName)) {
-                completionType = 'commands';
-            }
-
-            if (completionType === "commands") {
-                suggestions = Config.COMMANDS_MANIFEST.filter((cmd) =>
-                    cmd.toLowerCase().startsWith(currentWordPrefix.toLowerCase())
-                ).sort();
-            } else if (completionType === "users") {
-                const users = StorageManager.loadItem(
-                    Config.STORAGE_KEYS.USER_CREDENTIALS,
-                    "User list",
-                    {}
-                );
-                const userNames = Object.keys(users);
-                if (!userNames.includes(Config.USER.DEFAULT_NAME))
-                    userNames.push(Config.USER.DEFAULT_NAME);
-                suggestions = userNames
-                    .filter((name) =>
-                        name.toLowerCase().startsWith(currentWordPrefix.toLowerCase())
-                    )
-                    .sort();
-            } else if (completionType === "groups") {
-                const groups = await GroupManager.getAllGroups();
-                const groupNames = Object.keys(groups);
-                suggestions = groupNames
-                    .filter((name) =>
-                        name.toLowerCase().startsWith(currentWordPrefix.toLowerCase())
-                    )
-                    .sort();
-            } else { // Fallback to 'paths'
-                const lastSlashIndex = currentWordPrefix.lastIndexOf(
-                    Config.FILESYSTEM.PATH_SEPARATOR
-                );
-                const pathPrefixForFS =
-                    lastSlashIndex !== -1
-                        ? currentWordPrefix.substring(0, lastSlashIndex + 1)
-                        : "";
-                const segmentToMatchForFS =
-                    lastSlashIndex !== -1
-                        ? currentWordPrefix.substring(lastSlashIndex + 1)
-                        : currentWordPrefix;
-
-                const effectiveBasePathForFS = FileSystemManager.getAbsolutePath(
-                    pathPrefixForFS,
-                    FileSystemManager.getCurrentPath()
-                );
-
-                const pathValidation = await FileSystemManager.validatePath(effectiveBasePathForFS, {
-                    expectedType: 'directory',
-                    permissions: ['read', 'execute']
-                });
-
-                if (pathValidation.success && pathValidation.data.node) {
-                    const baseNode = pathValidation.data.node;
-                    suggestions = Object.keys(baseNode.children)
-                        .filter((name) =>
-                            name.toLowerCase().startsWith(segmentToMatchForFS.toLowerCase())
-                        )
-                        .map((name) => pathPrefixForFS + name)
-                        .sort();
-                }
-            }
-        }
-        return suggestions;
+    _applyCompletion(fullInput, completion) {
+        const { start, end } = this.completionSpan;
+        const textBefore = fullInput.substring(0, start);
+        let completionText = /\s/.test(completion) ? `'${completion}'` : completion;
+        completionText += this.directoryCache.has(completion) ? "/" : " ";
+        const newText = textBefore + completionText + fullInput.substring(end);
+        return { textToInsert: newText, newCursorPos: (textBefore + completionText).length };
     }
 
     async handleTab(fullInput, cursorPos) {
-        const { FileSystemManager, OutputManager, TerminalUI } = this.dependencies;
+        const { OutputManager, TerminalUI } = this.dependencies;
 
         if (fullInput !== this.lastCompletionInput) {
             this.resetCycle();
         }
 
-        const context = this._getCompletionContext(fullInput, cursorPos);
-
-        const quoteIfNecessary = (text) => {
-            if (/\s/.test(text)) {
-                return `'${text}'`;
-            }
-            return text;
-        };
-
-        if (this.suggestionsCache.length === 0) {
-            const suggestions = await this._getSuggestionsFromProvider(context);
-            if (!suggestions || suggestions.length === 0) {
-                this.resetCycle();
-                return { textToInsert: null };
-            }
-            if (suggestions.length === 1) {
-                const completion = suggestions[0];
-                const completedNode = await FileSystemManager.getNodeByPath(
-                    FileSystemManager.getAbsolutePath(completion)
-                );
-                const isDirectory =
-                    completedNode &&
-                    completedNode.type ===
-                    FileSystemManager.config.FILESYSTEM.DEFAULT_DIRECTORY_TYPE;
-
-                let finalCompletion = quoteIfNecessary(completion);
-                finalCompletion += (isDirectory ? "/" : " ");
-
-                const textBefore = fullInput.substring(0, context.startOfWordIndex);
-                const textAfter = fullInput.substring(cursorPos);
-
-                let newText = textBefore + finalCompletion + textAfter;
-
-                this.resetCycle();
-                return {
-                    textToInsert: newText,
-                    newCursorPos: (textBefore + finalCompletion).length,
-                };
-            }
-
-            const lcp = this.findLongestCommonPrefix(suggestions);
-            if (lcp && lcp.length > context.currentWordPrefix.length) {
-                const textBefore = fullInput.substring(0, context.startOfWordIndex);
-                const textAfter = fullInput.substring(cursorPos);
-                let newText = textBefore + lcp + textAfter;
-
-                this.lastCompletionInput = newText;
-                return {
-                    textToInsert: newText,
-                    newCursorPos: (textBefore + lcp).length,
-                };
-            } else {
-                this.suggestionsCache = suggestions;
-                const promptText = `${TerminalUI.getPromptText()} `;
-                void OutputManager.appendToOutput(`${promptText}${fullInput}`, {
-                    isCompletionSuggestion: true,
-                });
-                void OutputManager.appendToOutput(this.suggestionsCache.join("    "), {
-                    typeClass: "text-subtle",
-                    isCompletionSuggestion: true,
-                });
-                TerminalUI.scrollOutputToEnd();
-
-                this.cycleIndex = 0;
-                const firstSuggestion = this.suggestionsCache[this.cycleIndex];
-                const completedNode = await FileSystemManager.getNodeByPath(
-                    FileSystemManager.getAbsolutePath(firstSuggestion)
-                );
-                const isDirectory =
-                    completedNode &&
-                    completedNode.type ===
-                    FileSystemManager.config.FILESYSTEM.DEFAULT_DIRECTORY_TYPE;
-
-                const textBefore = fullInput.substring(0, context.startOfWordIndex);
-                const textAfter = fullInput.substring(cursorPos);
-                let completionText = quoteIfNecessary(firstSuggestion);
-                completionText += (isDirectory ? "/" : " ");
-                let newText = textBefore + completionText + textAfter;
-
-                this.lastCompletionInput = newText;
-                return {
-                    textToInsert: newText,
-                    newCursorPos: (textBefore + completionText).length,
-                };
-            }
-        } else {
+        if (this.suggestionsCache.length > 0) {
             this.cycleIndex = (this.cycleIndex + 1) % this.suggestionsCache.length;
-            const nextSuggestion = this.suggestionsCache[this.cycleIndex];
-            const completedNode = await FileSystemManager.getNodeByPath(
-                FileSystemManager.getAbsolutePath(nextSuggestion)
-            );
-            const isDirectory =
-                completedNode &&
-                completedNode.type ===
-                FileSystemManager.config.FILESYSTEM.DEFAULT_DIRECTORY_TYPE;
+            const next = this._applyCompletion(this.originalInput, this.suggestionsCache[this.cycleIndex]);
+            this.lastCompletionInput = next.textToInsert;
+            return next;
+        }
+
+        const result = await this._requestCompletion(fullInput, cursorPos);
+        if (!result || result.candidates.length === 0) {
+            this.resetCycle();
+            return { textToInsert: null };
+        }
+        this.completionSpan = { start: result.word_start, end: result.word_end };
+        this.directoryCache = new Set(result.directories);
 
-            const textBefore = fullInput.substring(0, context.startOfWordIndex);
-            const textAfter = fullInput.substring(cursorPos);
-            let completionText = quoteIfNecessary(nextSuggestion);
-            completionText += (isDirectory ? "/" : " ");
-            let newText = textBefore + completionText + textAfter;
+        if (result.candidates.length === 1) {
+            const single = this._applyCompletion(fullInput, result.candidates[0]);
+            this.resetCycle();
+            return single;
+        }
 
+        const typedWord = fullInput.substring(result.word_start, result.word_end).substring(result.quote ? 1 : 0);
+        const lcp = result.common_prefix;
+        if (lcp.length > typedWord.length) {
+            const textBefore = fullInput.substring(0, result.word_start);
+            const newText = textBefore + lcp + fullInput.substring(result.word_end);
+            this.resetCycle();
             this.lastCompletionInput = newText;
-            return {
-                textToInsert: newText,
-                newCursorPos: (textBefore + completionText).length,
-            };
+            return { textToInsert: newText, newCursorPos: (textBefore + lcp).length };
         }
+
+        this.suggestionsCache = result.candidates;
+        this.originalInput = fullInput;
+        const promptText = `${TerminalUI.getPromptText()} `;
+        void OutputManager.appendToOutput(`${promptText}${fullInput}`, {
+            isCompletionSuggestion: true,
+        });
+        const listing = this.suggestionsCache.join("    ");
+        const more = result.total - result.candidates.length;
+        void OutputManager.appendToOutput(more > 0 ? `${listing}    ... (${more} more)` : listing, {
+            typeClass: "text-subtle",
+            isCompletionSuggestion: true,
+        });
+        TerminalUI.scrollOutputToEnd();
+
+        this.cycleIndex = 0;
+        const first = this._applyCompletion(fullInput, this.suggestionsCache[0]);
+        this.lastCompletionInput = first.textToInsert;
+        return first;
     }
 }
 
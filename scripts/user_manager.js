@@ -15,11 +15,14 @@ class UserManager {
     async initializeDefaultUsers() {
         const { StorageManager, Config } = this.dependencies;
         const users = StorageManager.loadItem(Config.STORAGE_KEYS.USER_CREDENTIALS, "User list");
+        const requests = [];
         if (!users) {
-            await OopisOS_Kernel.syscall("users", "initialize_defaults", [Config.USER.DEFAULT_NAME]);
+            requests.push({ module: "users", function: "initialize_defaults", args: [Config.USER.DEFAULT_NAME] });
         }
         const usersFromStorage = StorageManager.loadItem(Config.STORAGE_KEYS.USER_CREDENTIALS, "User list", {});
-        await OopisOS_Kernel.syscall("users", "load_users", [usersFromStorage]);
+        requests.push({ module: "users", function: "load_users", args: [usersFromStorage] });
+        requests.push({ module: "users", function: "set_ticket_ttl", args: [Config.SUDO.DEFAULT_TIMEOUT * 60] });
+        await OopisOS_Kernel.syscallBatch(requests);
     }
 
     async getCurrentUser() {
@@ -69,8 +72,9 @@ class UserManager {
             if (finalPassword === null) return ErrorHandler.createError("Login cancelled.");
         }
 
-        const verifyResultJson = await OopisOS_Kernel.syscall("users", "verify_password", [username, finalPassword]);
+        const verifyResultJson = await OopisOS_Kernel.syscall("users", "verify_password_async", [username, finalPassword]);
         const verifyResult = JSON.parse(verifyResultJson);
+        if (verifyResult.rehashed) await this.syncUsersFromKernel();
 
         if (verifyResult.success && verifyResult.data) {
             await SessionManager.pushUserToStack(username);
@@ -0,0 +1,58 @@
+# tests/support.py
+"""
+Loads the kernel modules under CPython for the tests. Only the browser has
+pyodide, so, as in tools/, an empty pyodide.http module stands in for it.
+
+    python -m unittest discover -s tests
+"""
+
+import asyncio
+import json
+import os
+import sys
+import types
+
+CORE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "core")
+ROOT_CONTEXT = {"name": "root", "group": "root"}
+
+
+def _prepare_imports():
+    if os.path.abspath(CORE_DIR) not in sys.path:
+        sys.path.insert(0, os.path.abspath(CORE_DIR))
+    try:
+        import pyodide.http  # noqa: F401
+    except ImportError:
+        pyodide = types.ModuleType("pyodide")
+        pyodide.http = types.ModuleType("pyodide.http")
+        sys.modules["pyodide"], sys.modules["pyodide.http"] = pyodide, pyodide.http
+
+
+_prepare_imports()
+import kernel  # noqa: E402
+from executor import command_executor  # noqa: E402
+
+kernel.initialize_kernel(lambda state: None)
+
+
+def context_json(user=ROOT_CONTEXT, cwd="/", users=None, user_groups=None, groups=None):
+    """The JSON context the frontend sends with each command line."""
+    name = user["name"]
+    return json.dumps({
+        "current_path": cwd, "user_context": user,
+        "users": users or {"root": {}, name: {}},
+        "user_groups": user_groups or {"root": ["root"], name: [user.get("group", name)]},
+        "groups": groups or {}, "jobs": {},
+        "config": {"MAX_VFS_SIZE": 10 ** 9, "NETWORKING_ENABLED": False},
+        "api_key": None, "session_start_time": "2026-01-01T00:00:00", "session_stack": [name]
+    })
+
+
+async def execute(command, context=None, stdin_data=None, session=None):
+    """Runs a command line through the executor and returns its decoded result."""
+    result = await command_executor.execute(command, context or context_json(), stdin_data, session=session)
+    return json.loads(result)
+
+
+def run(command, context=None, stdin_data=None, session=None):
+    """execute() for synchronous tests."""
+    return asyncio.run(execute(command, context, stdin_data, session))
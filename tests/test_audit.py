@@ -0,0 +1,123 @@
+# tests/test_audit.py
+"""
+The audit query index must return what a linear scan of the retained
+records returns, as records are added and trimmed, and when it is rebuilt
+from the rotated log segments.
+"""
+
+import unittest
+
+from support import ROOT_CONTEXT
+from audit import AuditIndex, AuditManager, _epoch
+from log_segments import RotatingLog
+
+PATH = "/var/log/audit_test.log"
+ACTORS = ("root", "alice", "bob")
+ACTIONS = ("LOGIN", "SUDO_EXEC", "USERADD", "CHMOD")
+START = 1_800_000_000
+
+
+def scanned(records, actor=None, action=None, since=None, until=None, text=None):
+    """search() done the slow way over (epoch, actor, action, details) tuples; positions, newest first."""
+    found = []
+    for position, (epoch, record_actor, record_action, details) in enumerate(records):
+        if actor is not None and record_actor != actor:
+            continue
+        if action is not None and record_action != action:
+            continue
+        if since is not None and epoch < since or until is not None and epoch > until:
+            continue
+        if text and text.lower() not in f"{record_actor} {record_action} {details}".lower():
+            continue
+        found.append(position)
+    return found[::-1]
+
+
+def queries():
+    yield {}
+    for actor in ACTORS + ("nobody",):
+        yield {"actor": actor}
+        for action in ACTIONS:
+            yield {"actor": actor, "action": action}
+    for action in ACTIONS:
+        yield {"action": action, "since": START + 40, "until": START + 90}
+    yield {"since": START + 95}
+    yield {"until": START + 10.5}
+    yield {"text": "file 7"}
+    yield {"actor": "alice", "text": "FILE", "since": START + 50}
+
+
+class AuditIndexTest(unittest.TestCase):
+    def setUp(self):
+        self.index = AuditIndex(capacity=40)
+        self.records = []
+
+    def add(self, count):
+        for _ in range(count):
+            number = len(self.records)
+            record = (START + number, ACTORS[number % 3], ACTIONS[number % 4], f"file {number}")
+            self.records.append(record)
+            self.index.add(f"t{number}", *record)
+
+    def assertMatchesScan(self):
+        retained = self.records[len(self.records) - len(self.index):]
+        for query in queries():
+            self.assertEqual(self.index.search(**query),
+                             [self.index.base + position for position in scanned(retained, **query)], query)
+
+    def test_index_matches_a_scan_as_records_are_added(self):
+        self.add(1)
+        self.assertMatchesScan()
+        self.add(30)
+        self.assertMatchesScan()
+
+    def test_index_matches_a_scan_after_trimming(self):
+        self.add(120)
+        self.assertLess(len(self.index), 120)
+        self.assertGreater(self.index.base, 0)
+        self.assertMatchesScan()
+        # Actors and actions seen only in dropped records have no postings left.
+        record = (START + len(self.records), "carol", "LOGIN", "late")
+        self.records.append(record)
+        self.index.add("t-late", *record)
+        self.add(60)
+        self.assertNotIn("carol", self.index.by_actor)
+        self.assertMatchesScan()
+
+
+class AuditRebuildTest(unittest.TestCase):
+    def setUp(self):
+        self.manager = AuditManager()
+        self.manager.segments = RotatingLog(PATH, 1500, 1)
+        self.addCleanup(self.manager.segments.clear)
+        self.manager.segments.clear()
+
+    def test_rebuilt_index_matches_a_scan_of_the_segments(self):
+        for number in range(60):
+            self.manager.log(ACTORS[number % 3], ACTIONS[number % 4], f"file {number}", ROOT_CONTEXT)
+        self.manager.flush()
+
+        rebuilt = AuditManager()
+        rebuilt.segments = self.manager.segments
+        records = []
+        for content in rebuilt.segments.contents():
+            for line in content.splitlines():
+                timestamp, actor, action, details = line.split(" | ", 3)
+                records.append((_epoch(timestamp), actor.removeprefix("USER: "),
+                                action.removeprefix("ACTION: "), details.removeprefix("DETAILS: ")))
+        # Rotation dropped the oldest records, so the rebuilt index holds fewer than were logged.
+        self.assertLess(len(records), 60)
+        self.assertEqual(records[-1][3], "file 59")
+
+        for actor in ACTORS:
+            for action in (None,) + ACTIONS:
+                result = rebuilt.query(actor=actor, action=action, limit=1000)
+                expected = [records[position][3] for position in scanned(records, actor, action)]
+                self.assertEqual([record["details"] for record in result["records"]], expected)
+                # The live index still has the rotated-out records too.
+                live = self.manager.query(actor=actor, action=action, limit=1000)
+                self.assertEqual([record["details"] for record in live["records"]][:len(expected)], expected)
+
+
+if __name__ == "__main__":
+    unittest.main()
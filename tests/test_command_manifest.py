@@ -0,0 +1,40 @@
+# tests/test_command_manifest.py
+"""
+The committed core/commands_manifest.json matches what the generator
+builds from core/commands, byte for byte.
+"""
+
+import json
+import os
+import sys
+import unittest
+
+import support  # noqa: F401
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "tools"))
+import build_command_manifest  # noqa: E402
+from command_manifest import command_manifest  # noqa: E402
+
+
+class CommandManifestTest(unittest.TestCase):
+    def setUp(self):
+        self.expected = build_command_manifest.build()
+        with open(build_command_manifest.MANIFEST_PATH) as handle:
+            self.committed_text = handle.read()
+
+    def test_committed_manifest_is_up_to_date(self):
+        stale = build_command_manifest.diverging_commands(self.expected, json.loads(self.committed_text))
+        self.assertEqual(stale, [], "run 'python tools/build_command_manifest.py' to regenerate the manifest")
+        self.assertEqual(build_command_manifest.render(self.expected), self.committed_text)
+
+    def test_a_changed_command_is_reported(self):
+        changed = json.loads(self.committed_text)
+        changed["commands"]["trace"]["metadata"] = {}
+        del changed["commands"]["useradd"]
+        self.assertEqual(build_command_manifest.diverging_commands(self.expected, changed), ["trace", "useradd"])
+
+    def test_kernel_reads_the_committed_manifest(self):
+        self.assertEqual(command_manifest.is_async("useradd"), self.expected["commands"]["useradd"]["async"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,95 @@
+# tests/test_completion.py
+"""
+Tab completion answers from cached prefix indexes; after every change to
+what they index they must agree with a plain scan of the source.
+"""
+
+import unittest
+
+from support import ROOT_CONTEXT
+from completion import completion_manager
+from executor import command_executor
+from filesystem import fs_manager
+from session import alias_manager, env_manager
+
+DIRECTORY = "/tmp/completion"
+
+
+def scanned(names, prefix):
+    return sorted(name for name in names if name.startswith(prefix))
+
+
+class CompletionIndexTest(unittest.TestCase):
+    def setUp(self):
+        if fs_manager.get_node(DIRECTORY):
+            fs_manager.remove(DIRECTORY, recursive=True)
+        fs_manager.create_directory(DIRECTORY, ROOT_CONTEXT, parents=True)
+        self.addCleanup(fs_manager.remove, DIRECTORY, recursive=True)
+        completion_manager.reset()
+
+    def complete(self, line):
+        return completion_manager.complete(line, user_context=ROOT_CONTEXT, cwd="/")
+
+    def assertMatchesScan(self, line, names, head=""):
+        """Completes each keystroke of 'line' in turn, as typing it would."""
+        start = len(line) - len(line.split(" ")[-1]) + len(head)
+        for end in range(start, len(line) + 1):
+            result = self.complete(line[:end])
+            prefix = line[start:end]
+            expected = scanned(names, prefix)
+            self.assertEqual(result["candidates"], [head + name for name in expected], line[:end])
+            self.assertEqual(result["total"], len(expected))
+
+    def children(self):
+        return fs_manager.get_node(DIRECTORY)["children"]
+
+    def test_directory_index_follows_creates_removes_and_renames(self):
+        head = DIRECTORY + "/"
+        for name in ("foo", "food", "fob", "bar"):
+            fs_manager.write_file(head + name, "", ROOT_CONTEXT)
+        self.assertMatchesScan(f"cat {head}foo", self.children(), head)
+
+        fs_manager.write_file(head + "fool", "", ROOT_CONTEXT)
+        self.assertMatchesScan(f"cat {head}foo", self.children(), head)
+
+        fs_manager.remove(head + "food")
+        self.assertMatchesScan(f"cat {head}foo", self.children(), head)
+
+        # The same number of children, so only the directory's mtime tells them apart.
+        fs_manager.rename_node(head + "fob", head + "foe")
+        self.assertMatchesScan(f"cat {head}fo", self.children(), head)
+
+    def test_change_between_keystrokes_restarts_the_search(self):
+        head = DIRECTORY + "/"
+        fs_manager.write_file(head + "alpha", "", ROOT_CONTEXT)
+        self.assertEqual(self.complete(f"cat {head}al")["candidates"], [head + "alpha"])
+        fs_manager.write_file(head + "alps", "", ROOT_CONTEXT)
+        self.assertEqual(self.complete(f"cat {head}alp")["candidates"], [head + "alpha", head + "alps"])
+
+    def test_command_trie_follows_aliases(self):
+        def commands():
+            return (set(command_executor.commands) | command_executor.js_native_commands
+                    | completion_manager.external_commands | set(alias_manager.get_all_aliases()))
+
+        self.addCleanup(alias_manager.remove_alias, "zzfirst")
+        self.addCleanup(alias_manager.remove_alias, "zzsecond")
+        alias_manager.set_alias("zzfirst", "ls")
+        self.assertMatchesScan("zzf", commands())
+        # Swapping one alias for another keeps the count but not the names.
+        alias_manager.remove_alias("zzfirst")
+        alias_manager.set_alias("zzsecond", "ls")
+        self.assertMatchesScan("zz", commands())
+        self.assertMatchesScan("ca", commands())
+
+    def test_variable_index_follows_the_environment(self):
+        self.addCleanup(env_manager.unset, "COMPLETION_ONE")
+        self.addCleanup(env_manager.unset, "COMPLETION_TWO")
+        env_manager.set("COMPLETION_ONE", "1")
+        self.assertMatchesScan("echo $COMPLETION_", env_manager.get_all(), "$")
+        env_manager.unset("COMPLETION_ONE")
+        env_manager.set("COMPLETION_TWO", "2")
+        self.assertMatchesScan("echo $COMPLETION_", env_manager.get_all(), "$")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,94 @@
+# tests/test_filesystem.py
+"""
+batch_saves holds back only the saves of the task that opened it, and
+never loses the deferred save.
+"""
+
+import asyncio
+import unittest
+
+from support import ROOT_CONTEXT
+from filesystem import fs_manager
+
+
+class BatchSavesTest(unittest.TestCase):
+    def setUp(self):
+        if not fs_manager.get_node("/tmp"):
+            fs_manager.create_directory("/tmp", ROOT_CONTEXT)
+        self.saves = []
+        saved_function = fs_manager.save_function
+        fs_manager.set_save_function(self.record_save)
+        self.addCleanup(fs_manager.set_save_function, saved_function)
+
+    def record_save(self, state):
+        """Notes which task saved (None outside the event loop)."""
+        try:
+            self.saves.append(asyncio.current_task())
+        except RuntimeError:
+            self.saves.append(None)
+
+    def test_saves_inside_the_block_are_coalesced(self):
+        with fs_manager.batch_saves():
+            with fs_manager.batch_saves():
+                fs_manager.write_file("/tmp/batched_a.txt", "a", ROOT_CONTEXT)
+            fs_manager.write_file("/tmp/batched_b.txt", "b", ROOT_CONTEXT)
+            self.assertEqual(self.saves, [])
+        self.assertEqual(len(self.saves), 1)
+
+    def test_other_tasks_save_while_a_batch_is_open(self):
+        async def batched_run(opened, release):
+            with fs_manager.batch_saves():
+                fs_manager.write_file("/tmp/batched.txt", "batched", ROOT_CONTEXT)
+                opened.set()
+                await release.wait()
+
+        async def scenario():
+            opened, release = asyncio.Event(), asyncio.Event()
+            batched = asyncio.create_task(batched_run(opened, release))
+            await opened.wait()
+            fs_manager.write_file("/tmp/other_session.txt", "other", ROOT_CONTEXT)
+            self.assertEqual(self.saves, [asyncio.current_task()])
+            release.set()
+            await batched
+            self.assertEqual(self.saves[1:], [batched])
+
+        asyncio.run(scenario())
+
+    def test_cancelled_batch_still_saves(self):
+        async def scenario():
+            opened = asyncio.Event()
+
+            async def batched_run():
+                with fs_manager.batch_saves():
+                    fs_manager.write_file("/tmp/cancelled.txt", "kept", ROOT_CONTEXT)
+                    opened.set()
+                    await asyncio.sleep(3600)
+
+            task = asyncio.create_task(batched_run())
+            await opened.wait()
+            task.cancel()
+            with self.assertRaises(asyncio.CancelledError):
+                await task
+            self.assertEqual(self.saves, [task])
+
+        asyncio.run(scenario())
+
+    def test_task_outliving_the_block_saves_directly(self):
+        async def scenario():
+            late_write = asyncio.Event()
+
+            async def job():
+                await late_write.wait()
+                fs_manager.write_file("/tmp/late.txt", "late", ROOT_CONTEXT)
+
+            with fs_manager.batch_saves():
+                started = asyncio.create_task(job())
+            late_write.set()
+            await started
+            self.assertEqual(self.saves, [started])
+
+        asyncio.run(scenario())
+
+
+if __name__ == "__main__":
+    unittest.main()
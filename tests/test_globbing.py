@@ -0,0 +1,52 @@
+# tests/test_globbing.py
+"""
+GlobEngine against the expansions bash 5.2 gives with 'shopt -s globstar'
+on the same tree.
+"""
+
+import unittest
+
+from support import ROOT_CONTEXT
+from filesystem import fs_manager
+from globbing import glob_engine
+
+BASE = "/tmp/globstar"
+DIRECTORIES = ["", "/d", "/d/e", "/.h"]
+FILES = ["/a.md", "/d/b.md", "/d/e/c.md", "/.h/x.md", "/d/.y.md"]
+
+BASH_EXPANSIONS = {
+    "**": ["a.md", "d", "d/b.md", "d/e", "d/e/c.md"],
+    "d/**": ["d/", "d/b.md", "d/e", "d/e/c.md"],
+    "**/": ["d/", "d/e/"],
+    "d/**/": ["d/", "d/e/"],
+    "**/*.md": ["a.md", "d/b.md", "d/e/c.md"],
+    "d/**/*.md": ["d/b.md", "d/e/c.md"],
+    "d/**/e": ["d/e"],
+    ".h/**": [".h/", ".h/x.md"],
+    "a.md/**": [],
+    f"{BASE}/d/**": [f"{BASE}/d/", f"{BASE}/d/b.md", f"{BASE}/d/e", f"{BASE}/d/e/c.md"],
+}
+
+
+class GlobstarTest(unittest.TestCase):
+    def setUp(self):
+        for path in ("/tmp", *(BASE + directory for directory in DIRECTORIES)):
+            if not fs_manager.get_node(path):
+                fs_manager.create_directory(path, ROOT_CONTEXT)
+        for path in FILES:
+            fs_manager.write_file(BASE + path, "", ROOT_CONTEXT)
+        saved_path = fs_manager.current_path
+        fs_manager.current_path = BASE
+        self.addCleanup(setattr, fs_manager, "current_path", saved_path)
+
+    def test_matches_bash_globstar(self):
+        for pattern, expected in BASH_EXPANSIONS.items():
+            self.assertEqual(glob_engine.expand(pattern), expected, pattern)
+
+    def test_repeated_globstar_matches_like_one(self):
+        self.assertEqual(glob_engine.expand("d/**/**"), glob_engine.expand("d/**"))
+        self.assertEqual(glob_engine.expand("**/**/*.md"), glob_engine.expand("**/*.md"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,85 @@
+# tests/test_groups.py
+"""
+GroupManager's user-to-groups index must say what a scan of every
+group's member list says, after each mutation, a reload and a rollback.
+"""
+
+import unittest
+
+import support  # noqa: F401
+from groups import GroupManager
+from transactions import transaction_manager
+
+USERS = ("root", "Guest", "alice", "bob", "carol")
+
+
+class Abort(Exception):
+    pass
+
+
+class GroupIndexTest(unittest.TestCase):
+    def setUp(self):
+        self.manager = GroupManager()
+        self.manager.initialize_defaults()
+
+    def assertIndexMatchesScan(self):
+        groups = self.manager.get_all_groups()
+        for username in USERS:
+            scanned = {name for name, details in groups.items() if username in details["members"]}
+            self.assertEqual(self.manager.get_groups_for_user(username), scanned, username)
+            for group_name in groups:
+                self.assertEqual(self.manager.is_member(username, group_name), group_name in scanned)
+        self.assertEqual(set(self.manager._memberships), {user for details in groups.values() for user in details["members"]})
+
+    def test_membership_changes(self):
+        self.manager.create_group("staff")
+        self.manager.add_user_to_group("alice", "staff")
+        self.manager.add_user_to_group("bob", "staff")
+        self.manager.add_user_to_group("alice", "towncrier")
+        self.assertIndexMatchesScan()
+
+        self.manager.remove_user_from_all_groups("alice")
+        self.assertIndexMatchesScan()
+        self.assertFalse(self.manager.remove_user_from_all_groups("alice"))
+
+    def test_group_removed_then_readded(self):
+        self.manager.create_group("staff")
+        self.manager.add_user_to_group("alice", "staff")
+        self.manager.delete_group("staff")
+        self.assertIndexMatchesScan()
+        self.assertFalse(self.manager.is_member("alice", "staff"))
+
+        # The new group of the same name starts empty.
+        self.manager.create_group("staff")
+        self.assertEqual(self.manager.get_all_groups()["staff"]["members"], [])
+        self.assertIndexMatchesScan()
+        self.manager.add_user_to_group("bob", "staff")
+        self.assertIndexMatchesScan()
+
+    def test_load_groups_rebuilds_the_index(self):
+        self.manager.create_group("staff")
+        self.manager.add_user_to_group("alice", "staff")
+        self.manager.load_groups({"staff": {"members": ["bob", "carol"]}, "ops": {"members": ["carol"]}})
+        self.assertIndexMatchesScan()
+        self.assertEqual(self.manager.get_groups_for_user("carol"), {"staff", "ops"})
+        self.assertEqual(self.manager.get_groups_for_user("alice"), frozenset())
+
+    def test_rollback_restores_the_index(self):
+        self.manager.create_group("staff")
+        self.manager.add_user_to_group("alice", "staff")
+        self.manager.add_user_to_group("bob", "staff")
+        before = self.manager.get_all_groups()
+        with self.assertRaises(Abort):
+            with transaction_manager.transaction():
+                self.manager.delete_group("staff")
+                self.manager.create_group("staff")
+                self.manager.add_user_to_group("carol", "staff")
+                self.manager.remove_user_from_all_groups("Guest")
+                self.assertIndexMatchesScan()
+                raise Abort()
+        self.assertEqual(self.manager.get_all_groups(), before)
+        self.assertIndexMatchesScan()
+
+
+if __name__ == "__main__":
+    unittest.main()
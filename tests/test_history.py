@@ -0,0 +1,77 @@
+# tests/test_history.py
+"""
+The history's word index must find exactly what a scan of the retained
+entries finds, as the ring buffer wraps, evicts, clears and reloads.
+"""
+
+import unittest
+
+import support  # noqa: F401
+from session import HistoryManager
+
+QUERIES = ("", "git", "gi", "commit", "it", "status -v", "echo 1", "ECHO", "x y", "zzz")
+
+
+def scanned(history, query, before=None):
+    """search() done the slow way: every retained entry, newest first."""
+    entries = history.get_full_history()
+    if before is not None:
+        entries = entries[:before]
+    return [command for command in reversed(entries) if query.lower() in command.lower()]
+
+
+class HistoryIndexTest(unittest.TestCase):
+    def setUp(self):
+        self.history = HistoryManager(max_history_size=8)
+
+    def assertMatchesScan(self):
+        for query in QUERIES:
+            found = [command for _, command in self.history.search(query)]
+            self.assertEqual(found, scanned(self.history, query), query)
+            for before in (0, 3, len(self.history)):
+                found = [command for _, command in self.history.search(query, before=before)]
+                self.assertEqual(found, scanned(self.history, query, before), (query, before))
+
+    def add(self, commands):
+        for command in commands:
+            self.history.add(command)
+
+    def test_index_matches_a_scan_past_capacity(self):
+        commands = [f"git commit -m {n}" if n % 3 == 0 else f"echo {n} Status -v" for n in range(30)]
+        self.add(commands[:5])
+        self.assertMatchesScan()
+        self.add(commands[5:])
+        self.assertEqual(len(self.history), 8)
+        self.assertEqual(self.history.get_full_history(), commands[-8:])
+        self.assertMatchesScan()
+        # Words that only the evicted entries had are gone from the index.
+        self.assertEqual(self.history.search("echo 1 "), [])
+
+    def test_reverse_search_keystrokes_across_evictions(self):
+        self.add(f"gitk --all {n}" for n in range(8))
+        for prefix in ("g", "gi", "git"):
+            self.assertEqual(len(self.history.search(prefix)), 8)
+        # Evicting every 'gitk' entry changes the vocabulary between keystrokes.
+        self.add(f"git status {n}" for n in range(8))
+        for prefix in ("gitk", "git", "git s"):
+            self.assertEqual([command for _, command in self.history.search(prefix)], scanned(self.history, prefix))
+
+    def test_clear_set_and_reload(self):
+        self.add(f"echo {n}" for n in range(12))
+        self.history.clear_history()
+        self.assertEqual(self.history.search("echo"), [])
+        self.history.set_history([f"git commit {n}" for n in range(20)])
+        self.assertMatchesScan()
+
+        stored = [self.history.take_delta()]
+        self.add(["git status -v", "echo 1"])
+        stored.append(self.history.take_delta())
+        reloaded = HistoryManager(max_history_size=8)
+        reloaded.load_deltas(stored)
+        self.assertEqual(reloaded.get_full_history(), self.history.get_full_history())
+        self.history = reloaded
+        self.assertMatchesScan()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,217 @@
+# tests/test_jobs.py
+"""
+Background jobs on an event loop the test advances by hand, so that each
+signal lands at a known point of the job's run.
+"""
+
+import asyncio
+import unittest
+
+from support import ROOT_CONTEXT, context_json, execute
+from filesystem import fs_manager
+from jobs import JobManager, job_manager
+
+
+class ControlledLoop:
+    """A private event loop that only runs when step() is called."""
+    def __init__(self):
+        self.loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self.loop)
+
+    def step(self, rounds=1):
+        """Lets every ready task run up to its next await, 'rounds' times over."""
+        for _ in range(rounds):
+            self.loop.run_until_complete(asyncio.sleep(0))
+
+    def run(self, awaitable):
+        return self.loop.run_until_complete(awaitable)
+
+    def close(self):
+        pending = asyncio.all_tasks(self.loop)
+        for task in pending:
+            task.cancel()
+        self.loop.run_until_complete(asyncio.gather(*pending, return_exceptions=True))
+        asyncio.set_event_loop(None)
+        self.loop.close()
+
+
+def counting_runner(progress, rounds, status=0):
+    """A job that checkpoints 'rounds' times, noting each round, then exits with 'status'."""
+    async def runner(job):
+        for number in range(rounds):
+            await job.checkpoint()
+            progress.append(number)
+            job.record_output(f"round {number}")
+        return status
+    return runner
+
+
+class JobManagerTest(unittest.TestCase):
+    def setUp(self):
+        self.controlled = ControlledLoop()
+        self.addCleanup(self.controlled.close)
+        self.manager = JobManager()
+
+    def test_exit_status_and_output_are_captured(self):
+        progress = []
+        job = self.manager.spawn("count", "root", counting_runner(progress, 3, status=3))
+        self.controlled.step(10)
+        self.assertEqual(progress, [0, 1, 2])
+        self.assertEqual((job.status, job.exit_status, job.state_label()), ('done', 3, 'Exit 3'))
+        self.assertEqual(job.output_lines, ["round 0", "round 1", "round 2"])
+        self.assertEqual(job.output_bytes, len("round 0") * 3)
+
+    def test_stop_and_continue(self):
+        progress = []
+        job = self.manager.spawn("count", "root", counting_runner(progress, 50))
+        self.controlled.step(3)
+        self.assertTrue(self.manager.signal(job.id, "STOP")["success"])
+        stopped_at = len(progress)
+        self.controlled.step(20)
+        self.assertEqual(len(progress), stopped_at)
+        self.assertEqual((job.status, job.state_label()), ('paused', 'Stopped'))
+        self.assertEqual(self.manager.get_process_list()[0]["status"], 'T')
+
+        self.assertTrue(self.manager.signal(job.id, "SIGCONT")["success"])
+        self.controlled.step(3)
+        self.assertGreater(len(progress), stopped_at)
+        self.assertEqual(self.manager.get_process_list()[0]["status"], 'R')
+        self.controlled.step(100)
+        self.assertEqual(progress, list(range(50)))
+        self.assertEqual((job.exit_status, job.state_label()), (0, 'Done'))
+
+    def test_kill_while_running_and_while_stopped(self):
+        progress = []
+        running = self.manager.spawn("count", "root", counting_runner(progress, 1000))
+        stopped = self.manager.spawn("count", "root", counting_runner([], 1000))
+        self.controlled.step(3)
+        self.manager.signal(stopped.id, "TSTP")
+        self.controlled.step(3)
+        self.manager.signal(running.id, "KILL")
+        self.manager.signal(stopped.id, "TERM")
+        self.controlled.step(3)
+        self.assertEqual((running.exit_status, running.state_label()), (137, 'Killed'))
+        self.assertEqual((stopped.exit_status, stopped.state_label()), (143, 'Terminated'))
+        self.assertLess(len(progress), 1000)
+        self.assertEqual(self.manager.live_jobs(), [])
+        self.assertFalse(self.manager.signal(running.id, "CONT")["success"])
+
+    def test_failing_runner_exits_1(self):
+        async def runner(job):
+            await job.checkpoint()
+            raise RuntimeError("boom")
+        job = self.manager.spawn("fail", "root", runner)
+        self.controlled.step(3)
+        self.assertEqual(job.exit_status, 1)
+        self.assertIn("boom", job.output_lines[-1])
+
+    def test_invalid_signal_and_unknown_job(self):
+        job = self.manager.spawn("count", "root", counting_runner([], 5))
+        self.assertFalse(self.manager.signal(job.id, "USR1")["success"])
+        self.assertFalse(self.manager.signal(99, "KILL")["success"])
+        self.controlled.step(10)
+
+    def test_report_forgets_finished_jobs(self):
+        done = self.manager.spawn("short", "root", counting_runner([], 1))
+        alive = self.manager.spawn("long", "root", counting_runner([], 1000))
+        self.controlled.step(5)
+        self.assertEqual([job.id for job in self.manager.report()], [done.id, alive.id])
+        self.assertEqual([job.id for job in self.manager.report()], [alive.id])
+
+
+class BackgroundPipelineTest(unittest.TestCase):
+    def setUp(self):
+        self.controlled = ControlledLoop()
+        self.addCleanup(self.controlled.close)
+        for path in ("/srv", "/srv/first", "/srv/second"):
+            if not fs_manager.get_node(path):
+                fs_manager.create_directory(path, ROOT_CONTEXT)
+
+    def spawn(self, command, cwd):
+        result = self.controlled.run(execute(command, context_json(cwd=cwd)))
+        self.assertTrue(result["success"], result)
+        return job_manager.get(result["output"].split("]")[0].lstrip("["))
+
+    def test_job_output_and_status(self):
+        job = self.spawn("echo hello | wc -c &", "/")
+        self.controlled.step(10)
+        self.assertEqual((job.exit_status, job.output_lines), (0, [str(len("hello")).rjust(7)]))
+        failed = self.spawn("cat /srv/missing.txt &", "/")
+        self.controlled.step(10)
+        self.assertEqual(failed.exit_status, 1)
+
+    def test_job_keeps_its_own_directory_and_identity(self):
+        job = self.spawn("pwd &", "/srv/first")
+        job_manager.signal(job.id, "STOP")
+        # A foreground command from another directory and user runs while the job waits.
+        other = context_json(user={"name": "alice", "group": "alice"}, cwd="/srv/second")
+        self.assertEqual(self.controlled.run(execute("pwd", other))["output"], "/srv/second")
+        self.assertEqual(fs_manager.current_path, "/srv/second")
+        job_manager.signal(job.id, "CONT")
+        self.controlled.step(10)
+        self.assertEqual((job.exit_status, job.output_lines, job.user), (0, ["/srv/first"], "root"))
+        self.assertEqual(fs_manager.current_path, "/srv/second")
+
+
+class JobOwnershipTest(unittest.TestCase):
+    def setUp(self):
+        self.controlled = ControlledLoop()
+        self.addCleanup(self.controlled.close)
+        self.guest = context_json(user={"name": "Guest", "group": "Guest"})
+        self.alice = context_json(user={"name": "alice", "group": "alice"})
+
+    def execute(self, command, context=None):
+        return self.controlled.run(execute(command, context))
+
+    def spawn(self, context=None):
+        result = self.execute("delay 60000 &", context)
+        self.assertTrue(result["success"], result)
+        return job_manager.get(result["output"].split("]")[0].lstrip("["))
+
+    def test_other_users_may_not_signal_a_job(self):
+        job = self.spawn()
+        for command in (f"kill %{job.id}", f"kill -STOP {job.id}", f"bg %{job.id}", f"fg %{job.id}"):
+            result = self.execute(command, self.guest)
+            self.assertFalse(result["success"], command)
+            error = result["error"]["message"] if isinstance(result["error"], dict) else result["error"]
+            self.assertIn("Operation not permitted", error)
+        self.assertEqual(job.status, 'running')
+        self.assertTrue(self.execute(f"kill %{job.id}")["success"])
+        self.controlled.step(3)
+        self.assertEqual(job.state_label(), 'Terminated')
+
+    def test_owner_and_root_may_signal_it(self):
+        job = self.spawn(self.alice)
+        self.assertTrue(self.execute(f"kill -STOP %{job.id}", self.alice)["success"])
+        self.assertEqual(job.status, 'paused')
+        self.assertTrue(self.execute(f"bg %{job.id}", self.alice)["success"])
+        self.assertEqual(job.status, 'running')
+        self.assertTrue(self.execute(f"kill -s KILL {job.id}")["success"])
+        self.controlled.step(3)
+        self.assertEqual(job.state_label(), 'Killed')
+
+    def test_interrupting_fg_interrupts_the_job(self):
+        job = self.spawn(self.alice)
+        waiting = self.controlled.loop.create_task(execute(f"fg %{job.id}", self.alice))
+        self.controlled.step(3)
+        self.assertFalse(waiting.done())
+        waiting.cancel()
+        self.controlled.step(3)
+        self.assertTrue(waiting.cancelled())
+        self.assertEqual((job.status, job.term_signal, job.exit_status), ('done', 'INT', 130))
+
+    def test_fg_returns_when_the_job_is_stopped(self):
+        job = self.spawn()
+        waiting = self.controlled.loop.create_task(execute(f"fg %{job.id}"))
+        self.controlled.step(3)
+        job_manager.signal(job.id, "STOP")
+        result = self.controlled.run(asyncio.wait_for(waiting, 5))
+        self.assertFalse(result["success"])
+        self.assertIn("stopped", result["error"])
+        self.assertIs(job_manager.get(job.id), job)
+        job_manager.signal(job.id, "KILL")
+        self.controlled.step(3)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,40 @@
+# tests/test_kernel.py
+"""
+syscall_batch runs requests in order or together, and refuses to combine
+stop_on_error with concurrent.
+"""
+
+import asyncio
+import json
+import unittest
+
+from support import kernel
+
+
+def batch(requests, **options):
+    return json.loads(asyncio.run(kernel.syscall_batch(json.dumps({"requests": requests, **options}))))
+
+
+GOOD = {"module": "filesystem", "function": "get_node", "args": ["/"], "kwargs": {}}
+BAD = {"module": "no_such_module", "function": "nothing", "args": [], "kwargs": {}}
+
+
+class SyscallBatchTest(unittest.TestCase):
+    def test_stop_on_error_skips_the_rest(self):
+        result = batch([GOOD, BAD, GOOD], stop_on_error=True)
+        self.assertTrue(result["success"])
+        self.assertEqual([r.get("skipped", False) for r in result["results"]], [False, False, True])
+
+    def test_concurrent_runs_every_request(self):
+        result = batch([GOOD, BAD, GOOD], concurrent=True)
+        self.assertEqual(len(result["results"]), 3)
+
+    def test_concurrent_with_stop_on_error_is_rejected(self):
+        result = batch([GOOD, BAD], concurrent=True, stop_on_error=True)
+        self.assertFalse(result["success"])
+        self.assertIn("stop_on_error cannot be combined with concurrent", result["error"])
+        self.assertNotIn("results", result)
+
+
+if __name__ == "__main__":
+    unittest.main()
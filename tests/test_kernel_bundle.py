@@ -0,0 +1,45 @@
+# tests/test_kernel_bundle.py
+"""
+The kernel bundle imports under CPython from its bytecode alone, with
+every command the executor knows.
+"""
+
+import os
+import sys
+import tempfile
+import unittest
+import zipfile
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "tools"))
+import build_kernel_bundle  # noqa: E402
+
+
+class KernelBundleTest(unittest.TestCase):
+    def setUp(self):
+        scratch = tempfile.TemporaryDirectory()
+        self.addCleanup(scratch.cleanup)
+        self.output = os.path.join(scratch.name, "kernel_bundle.zip")
+        self.manifest = build_kernel_bundle.build(self.output)
+
+    def test_kernel_imports_from_the_bundled_bytecode(self):
+        self.assertEqual(build_kernel_bundle.verify(self.output, self.manifest), [])
+        with zipfile.ZipFile(self.output) as archive:
+            names = set(archive.namelist())
+        for path in self.manifest["files"]:
+            self.assertIn(path, names)
+        self.assertIn("core/bundle_manifest.json", names)
+
+    def test_missing_bytecode_fails_verification(self):
+        # Without kernel.py's bytecode the tripwired source is all that is left to import.
+        stripped = self.output + ".stripped"
+        with zipfile.ZipFile(self.output) as source, zipfile.ZipFile(stripped, "w") as target:
+            for item in source.infolist():
+                if not (item.filename.startswith("core/__pycache__/kernel.") and item.filename.endswith(".pyc")):
+                    target.writestr(item, source.read(item))
+        problems = build_kernel_bundle.verify(stripped, self.manifest)
+        self.assertEqual(len(problems), 1)
+        self.assertIn("compiled from source instead of the bundled bytecode", problems[0])
+
+
+if __name__ == "__main__":
+    unittest.main()
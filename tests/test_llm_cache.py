@@ -0,0 +1,61 @@
+# tests/test_llm_cache.py
+"""
+LLM answers are cached, and in-flight fetches shared, per user of the
+session a request runs in.
+"""
+
+import asyncio
+import unittest
+
+import support  # noqa: F401
+from ai_manager import AIManager
+from executor import command_executor
+from filesystem import fs_manager
+from llm_cache import llm_cache
+from session import Session, use_session
+
+ALICE = {"name": "alice", "group": "alice"}
+BOB = {"name": "bob", "group": "bob"}
+CONVERSATION = [{"role": "user", "parts": [{"text": "what changed today?"}]}]
+
+
+class SharedFetchTest(unittest.TestCase):
+    def setUp(self):
+        self.manager = AIManager(fs_manager, command_executor)
+        self.fetches = []
+        self.addCleanup(llm_cache.clear, "alice")
+        self.addCleanup(llm_cache.clear, "bob")
+
+    async def fake_fetch(self, provider, model, conversation, api_key, system_prompt=None):
+        self.fetches.append(api_key)
+        await asyncio.sleep(0.01)
+        return {"success": True, "answer": f"answer for {api_key}"}
+
+    async def ask(self, user, api_key):
+        session = Session(f"{user['name']}-session")
+        session.user_context = user
+        with use_session(session):
+            return await self.manager._call_llm_api("ollama", None, CONVERSATION, api_key, "stub")
+
+    def run_requests(self, *requests):
+        self.manager._fetch_llm_response = self.fake_fetch
+
+        async def scenario():
+            return await asyncio.gather(*(self.ask(user, api_key) for user, api_key in requests))
+
+        return asyncio.run(scenario())
+
+    def test_one_user_shares_a_fetch(self):
+        results = self.run_requests((ALICE, "alice-key"), (ALICE, "alice-key"))
+        self.assertEqual(self.fetches, ["alice-key"])
+        self.assertEqual({result["answer"] for result in results}, {"answer for alice-key"})
+
+    def test_users_do_not_share_a_fetch(self):
+        alice, bob = self.run_requests((ALICE, "alice-key"), (BOB, "bob-key"))
+        self.assertEqual(sorted(self.fetches), ["alice-key", "bob-key"])
+        self.assertEqual(alice["answer"], "answer for alice-key")
+        self.assertEqual(bob["answer"], "answer for bob-key")
+
+
+if __name__ == "__main__":
+    unittest.main()
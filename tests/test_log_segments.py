@@ -0,0 +1,70 @@
+# tests/test_log_segments.py
+"""
+RotatingLog keeps a root-only log in capped segments; the audit log and
+the trace file both write through it.
+"""
+
+import unittest
+
+from support import ROOT_CONTEXT
+from audit import LOG_PATH, audit_manager
+from filesystem import fs_manager
+from log_segments import RotatingLog
+from tracing import tracer
+
+PATH = "/var/log/segments_test.log"
+
+
+class RotatingLogTest(unittest.TestCase):
+    def setUp(self):
+        self.log = RotatingLog(PATH, 100, 2)
+        self.addCleanup(self.log.clear)
+
+    def test_appends_rotate_and_keep_the_newest_lines(self):
+        lines = [f"line {number:02d} " + "x" * 20 + "\n" for number in range(20)]
+        for start in range(0, 20, 3):
+            self.log.append(lines[start:start + 3])
+        for number in range(3):
+            node = fs_manager.get_node(self.log.segment_path(number))
+            self.assertLessEqual(len(node["content"]), 100)
+            self.assertEqual((node["owner"], node["group"], node["mode"]), ("root", "root", 0o640))
+        self.assertIsNone(fs_manager.get_node(self.log.segment_path(3)))
+        kept = "".join(self.log.contents())
+        self.assertTrue(lines[-1] in kept and lines[0] not in kept)
+        self.assertTrue("".join(lines).endswith(kept))
+
+    def test_clear_leaves_one_empty_segment(self):
+        self.log.append(["a" * 60 + "\n", "b" * 60 + "\n"])
+        self.log.clear()
+        self.assertEqual(list(self.log.contents()), [""])
+
+    def test_existing_file_is_made_private(self):
+        fs_manager.write_file(PATH, "old\n", ROOT_CONTEXT)
+        fs_manager.chown(PATH, "Guest")
+        fs_manager.chmod(PATH, "666")
+        self.log.append(["new\n"])
+        node = fs_manager.get_node(PATH)
+        self.assertEqual((node["owner"], node["group"], node["mode"]), ("root", "root", 0o640))
+        self.assertEqual(node["content"], "old\nnew\n")
+
+
+class SharedWriterTest(unittest.TestCase):
+    def test_audit_and_trace_use_the_shared_writer(self):
+        self.assertIsInstance(audit_manager.segments, RotatingLog)
+        self.assertIsInstance(tracer.segments, RotatingLog)
+        self.assertEqual(audit_manager.segments.path, LOG_PATH)
+
+    def test_audit_configure_reaches_the_writer(self):
+        saved = (audit_manager.segments.segment_max_size, audit_manager.segments.retained_segments)
+        self.addCleanup(audit_manager.configure, *(None, None), *saved)
+        self.assertTrue(audit_manager.configure(segment_max_size=500, retained_segments=1)["success"])
+        self.assertEqual((audit_manager.segments.segment_max_size, audit_manager.segments.retained_segments), (500, 1))
+        for number in range(30):
+            audit_manager.log("root", "SEGMENT_TEST", f"record {number}", ROOT_CONTEXT)
+        self.assertTrue(audit_manager.flush()["success"])
+        self.assertLessEqual(len(fs_manager.get_node(LOG_PATH)["content"]), 500)
+        self.assertIsNone(fs_manager.get_node(LOG_PATH + ".2"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,95 @@
+# tests/test_pipeline_fusion.py
+"""
+The fused pipelines must print exactly what the stages they replace print.
+Each case runs the same command line on random input with PIPELINE_FUSION
+off and then on, and compares the results byte for byte.
+"""
+
+import random
+import unittest
+from unittest import mock
+
+from support import ROOT_CONTEXT, run
+from filesystem import fs_manager
+from pipeline_fusion import FUSION_SWITCH, FusedStage
+from session import env_manager
+
+INPUT_PATH = "/tmp/fusion_input.txt"
+WORDS = ["", "a", "A", "b", "ab", "apple", "Apple", "banana", "a.b", "x y", "  a", "b  ", "10", "9", "-1", "zz"]
+PATTERNS = ["a", "A", "^a", "b$", "a.b", "an+", "x y", "[0-9]", "^$", "zz|ab", "nomatch"]
+CASES = 150
+
+
+def random_text(rng):
+    lines = [rng.choice(WORDS) for _ in range(rng.randint(0, 40))]
+    text = "\n".join(lines)
+    return text + "\n" if lines and rng.random() < 0.5 else text
+
+
+def random_grep(rng):
+    flags = rng.choice(["", "-i ", "-v ", "-i -v "])
+    return f"grep {flags}'{rng.choice(PATTERNS)}'"
+
+
+class PipelineFusionEquivalenceTest(unittest.TestCase):
+    def setUp(self):
+        self.rng = random.Random(35)
+        if not fs_manager.get_node("/tmp"):
+            fs_manager.create_directory("/tmp", ROOT_CONTEXT)
+        self.addCleanup(env_manager.unset, FUSION_SWITCH)
+
+    def run_both_ways(self, command, stdin_data=None):
+        """The results with fusion off and on, and how many fused stages ran."""
+        env_manager.set(FUSION_SWITCH, "off")
+        unfused = run(command, stdin_data=stdin_data)
+        env_manager.set(FUSION_SWITCH, "on")
+        with mock.patch.object(FusedStage, "run", autospec=True, side_effect=FusedStage.run) as fused_run:
+            fused = run(command, stdin_data=stdin_data)
+        return unfused, fused, fused_run.call_count
+
+    def check(self, command_for, source="file"):
+        fused_cases = 0
+        for case in range(CASES):
+            text = random_text(self.rng)
+            command = command_for(self.rng)
+            stdin_data = None
+            if source == "file":
+                fs_manager.write_file(INPUT_PATH, text, ROOT_CONTEXT)
+            else:
+                stdin_data = text
+            unfused, fused, fused_runs = self.run_both_ways(command, stdin_data)
+            self.assertEqual(unfused, fused, f"case {case}: {command!r} on {text!r}")
+            fused_cases += bool(fused_runs)
+        # Every case must have gone through the fused path, or the comparison proves nothing.
+        self.assertEqual(fused_cases, CASES)
+
+    def test_top_counts_from_stdin(self):
+        self.check(lambda rng: "sort | uniq -c | sort -nr", source="stdin")
+
+    def test_top_counts_with_head(self):
+        self.check(lambda rng: f"cat {INPUT_PATH} | sort | uniq -c | sort -nr | head -n {rng.randint(0, 12)}")
+
+    def test_top_counts_with_default_head(self):
+        self.check(lambda rng: f"cat {INPUT_PATH} | sort | uniq -c | sort -nr | head")
+
+    def test_grep_count_from_stdin(self):
+        self.check(lambda rng: f"{random_grep(rng)} | wc -l", source="stdin")
+
+    def test_grep_count_from_cat(self):
+        self.check(lambda rng: f"cat {INPUT_PATH} | {random_grep(rng)} | wc -l")
+
+    def test_grep_count_from_file_argument(self):
+        self.check(lambda rng: f"{random_grep(rng)} {INPUT_PATH} | wc -l")
+
+    def test_cat_into_grep(self):
+        self.check(lambda rng: f"cat {INPUT_PATH} | grep '{rng.choice(PATTERNS)}'")
+
+    def test_errors_are_reported_as_before(self):
+        for command in ("cat /tmp/missing.txt | grep a", "cat /tmp/missing.txt | grep a | wc -l",
+                        "cat /tmp | grep a", "grep a /tmp/missing.txt | wc -l"):
+            unfused, fused, _ = self.run_both_ways(command)
+            self.assertEqual(unfused, fused, command)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,85 @@
+# tests/test_redirection.py
+"""
+Redirection operators are recognized only when written unquoted, and each
+one applies to the pipeline stage it is written on.
+"""
+
+import random
+import shlex
+import unittest
+
+from support import ROOT_CONTEXT, run
+from executor import ShellOperator, split_words
+from filesystem import fs_manager
+
+INPUT_PATH = "/tmp/redirect_input.txt"
+
+
+class SplitWordsTest(unittest.TestCase):
+    def test_matches_shlex_split(self):
+        rng = random.Random(34)
+        alphabet = ['a', ' ', '\t', '\n', '\\', "'", '"', '<', '>', '|', '&', '#', '$', '\\"']
+        for _ in range(20000):
+            text = ''.join(rng.choice(alphabet) for _ in range(rng.randint(0, 12)))
+            try:
+                expected = shlex.split(text)
+            except ValueError:
+                self.assertRaises(ValueError, split_words, text)
+                continue
+            self.assertEqual(split_words(text), expected, repr(text))
+
+    def test_only_unquoted_operators_are_marked(self):
+        words = split_words("""cat < f "<" '<<<' \\| | x >> y "&&" &&""")
+        self.assertEqual(words, ['cat', '<', 'f', '<', '<<<', '|', '|', 'x', '>>', 'y', '&&', '&&'])
+        self.assertEqual([isinstance(word, ShellOperator) for word in words],
+                         [False, True, False, False, False, False, True, False, True, False, False, True])
+
+
+class RedirectionTest(unittest.TestCase):
+    def setUp(self):
+        if not fs_manager.get_node("/tmp"):
+            fs_manager.create_directory("/tmp", ROOT_CONTEXT)
+        fs_manager.write_file(INPUT_PATH, "b\na\nb\n", ROOT_CONTEXT)
+
+    def output(self, command):
+        result = run(command)
+        self.assertTrue(result.get("success"), result)
+        return result["output"]
+
+    def test_quoted_operators_are_arguments(self):
+        self.assertEqual(self.output('echo "<" foo'), "< foo")
+        self.assertEqual(self.output("""echo '<<' "<<<" \\> "|" '&&' x"""), "<< <<< > | && x")
+
+    def test_input_redirection_applies_to_its_own_stage(self):
+        self.assertEqual(self.output(f"cat < {INPUT_PATH}"), "b\na\nb\n")
+        self.assertEqual(self.output(f"sort < {INPUT_PATH} | uniq -c"), "      1 a\n      2 b")
+        # A later stage's input redirection replaces the pipe, as in sh.
+        self.assertEqual(self.output(f"echo piped | cat < {INPUT_PATH}"), "b\na\nb\n")
+        self.assertEqual(self.output("echo piped | cat <<< here"), "here")
+
+    def test_output_redirection_applies_to_its_own_stage(self):
+        self.assertEqual(self.output(f"cat {INPUT_PATH} > /tmp/first.txt | wc -l"), "      0")
+        self.assertEqual(self.output("cat /tmp/first.txt"), "b\na\nb\n")
+        self.assertEqual(self.output(f"sort {INPUT_PATH} | uniq -c > /tmp/counts.txt | sort -nr"), "")
+        self.assertEqual(self.output("cat /tmp/counts.txt"), "      1 a\n      2 b")
+
+    def test_redirections_around_a_fused_chain(self):
+        command = f"sort < {INPUT_PATH} | uniq -c | sort -nr | head -n 1 > /tmp/top.txt"
+        self.assertEqual(self.output(command), "")
+        self.assertEqual(self.output("cat /tmp/top.txt"), "      2 b")
+
+    def test_bare_redirections(self):
+        fs_manager.write_file("/tmp/kept.txt", "kept", ROOT_CONTEXT)
+        self.assertEqual(self.output("> /tmp/empty.txt; >> /tmp/kept.txt; cat /tmp/empty.txt"), "")
+        self.assertEqual(self.output("cat /tmp/kept.txt"), "kept")
+        self.assertFalse(run("< /tmp/missing.txt")["success"])
+
+    def test_missing_target_is_a_syntax_error(self):
+        for command in ("cat <", "cat < | wc -l", "echo a >"):
+            result = run(command)
+            self.assertFalse(result["success"])
+            self.assertIn("no file for redirection operator", result["error"])
+
+
+if __name__ == "__main__":
+    unittest.main()
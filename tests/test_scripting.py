@@ -0,0 +1,148 @@
+# tests/test_scripting.py
+"""
+Scripts run by 'run' are interpreted inside the kernel: control flow, the
+script's own forked session, pausing for frontend effects and the cache of
+compiled scripts.
+"""
+
+import asyncio
+import unittest
+
+from support import ROOT_CONTEXT, context_json, execute, run
+from filesystem import fs_manager
+from scripting import compile_script, script_manager
+from session import Session, env_manager, use_session
+
+SCRIPT_PATH = "/tmp/scripting_test.sh"
+
+
+def write_script(content):
+    if not fs_manager.get_node("/tmp"):
+        fs_manager.create_directory("/tmp", ROOT_CONTEXT, parents=True)
+    fs_manager.write_file(SCRIPT_PATH, content, ROOT_CONTEXT)
+    fs_manager.chmod(SCRIPT_PATH, "755")
+
+
+class ControlFlowTest(unittest.TestCase):
+    def run_script(self, content, *args):
+        write_script(content)
+        result = run(" ".join(["run", SCRIPT_PATH] + list(args)))
+        self.assertTrue(result["success"], result)
+        return result["output"].split("\n")
+
+    def test_if_elif_else(self):
+        script = "\n".join([
+            "if test $1 = a; then",
+            "  echo first",
+            "elif test $1 = b; then",
+            "  echo second",
+            "else",
+            "  echo other",
+            "fi",
+        ])
+        self.assertEqual(self.run_script(script, "a"), ["first"])
+        self.assertEqual(self.run_script(script, "b"), ["second"])
+        self.assertEqual(self.run_script(script, "c"), ["other"])
+
+    def test_while_and_until_loops(self):
+        script = "\n".join([
+            "N=0",
+            "while test $N != 3; do N=$(expr $N + 1); echo up$N; done",
+            "until test $N = 0; do N=$(expr $N - 1); echo down$N; done",
+        ])
+        self.assertEqual(self.run_script(script), ["up1", "up2", "up3", "down2", "down1", "down0"])
+
+    def test_for_with_break_and_continue(self):
+        script = "\n".join([
+            "for word in a skip b stop c; do",
+            "  if test $word = skip; then continue; fi",
+            "  if test $word = stop; then break; fi",
+            "  echo $word",
+            "done",
+            "for arg; do echo arg:$arg; done",
+        ])
+        self.assertEqual(self.run_script(script, "x", "y"), ["a", "b", "arg:x", "arg:y"])
+
+    def test_unbalanced_blocks_are_a_syntax_error(self):
+        write_script("if true; then\n  echo never\n")
+        result = run(f"run {SCRIPT_PATH}")
+        self.assertFalse(result["success"])
+        self.assertIn("Syntax error", result["error"]["message"])
+
+
+class PausedScriptTest(unittest.TestCase):
+    """A script that needs the frontend pauses with a script_step and is resumed by JS."""
+    def setUp(self):
+        self.session = Session("caller")
+        self.session.env.set("SHARED", "outer")
+
+    def test_pause_and_resume_across_script_step(self):
+        async def scenario():
+            with use_session(self.session):
+                step = await script_manager.start("echo before\ndelay 5\necho after", "/t.sh", [], context_json())
+                self.assertEqual(step["effect"], "script_step")
+                self.assertEqual(step["output"], "before")
+                self.assertEqual([effect["effect"] for effect in step["effects"]], ["delay"])
+                self.assertIsNotNone(step["script_id"])
+
+                finished = await script_manager.resume(step["script_id"], context_json())
+                self.assertIsNone(finished["script_id"])
+                self.assertEqual((finished["output"], finished["effects"]), ("after", []))
+                self.assertFalse((await script_manager.resume(step["script_id"], context_json()))["success"])
+
+        asyncio.run(scenario())
+
+    def test_variables_stay_in_the_scripts_forked_session(self):
+        script = "\n".join([
+            "echo seen:$SHARED",
+            "SHARED=inner",
+            "ADDED=1",
+            "delay 5",
+            "echo kept:$SHARED:$ADDED",
+        ])
+
+        async def scenario():
+            with use_session(self.session):
+                step = await script_manager.start(script, "/t.sh", [], context_json())
+                self.assertEqual(step["output"], "seen:outer")
+                # The caller carries on while the script waits for the frontend.
+                self.assertEqual(env_manager.get("SHARED"), "outer")
+                self.assertNotIn("ADDED", env_manager.get_all())
+                await execute("SHARED=changed", session=self.session)
+
+                finished = await script_manager.resume(step["script_id"], context_json())
+                self.assertEqual(finished["output"], "kept:inner:1")
+                self.assertEqual(env_manager.get("SHARED"), "changed")
+                self.assertNotIn("ADDED", env_manager.get_all())
+
+        asyncio.run(scenario())
+
+    def test_cancel_abandons_a_paused_script(self):
+        async def scenario():
+            with use_session(self.session):
+                step = await script_manager.start("delay 5\nADDED=1", "/t.sh", [], context_json())
+                self.assertTrue(script_manager.cancel(step["script_id"]))
+                await asyncio.sleep(0)
+                self.assertFalse(script_manager.cancel(step["script_id"]))
+                self.assertNotIn("ADDED", env_manager.get_all())
+
+        asyncio.run(scenario())
+
+
+class CompiledScriptCacheTest(unittest.TestCase):
+    def test_same_content_reuses_the_compiled_program(self):
+        content = "echo cached\n"
+        self.assertIs(script_manager.compile(content), script_manager.compile(content))
+        self.assertEqual(script_manager.compile(content), compile_script(content))
+
+    def test_edited_script_is_recompiled(self):
+        write_script("echo first version\n")
+        self.assertEqual(run(f"run {SCRIPT_PATH}")["output"], "first version")
+        write_script("echo second version\n")
+        self.assertEqual(run(f"run {SCRIPT_PATH}")["output"], "second version")
+        write_script("echo first version\n")
+        self.assertEqual(run(f"run {SCRIPT_PATH}")["output"], "first version")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,153 @@
+# tests/test_session.py
+"""
+Two sessions interleaved on one event loop must each keep their own
+working directory, identity and environment; each environment's layers
+push, pop, unset, load and save correctly.
+"""
+
+import asyncio
+import json
+import unittest
+
+from support import ROOT_CONTEXT, context_json, execute
+from executor import command_executor
+from filesystem import fs_manager
+from session import EnvironmentManager, Session, default_session, env_manager, session_manager, use_session
+
+ALICE = {"name": "alice", "group": "alice"}
+BOB = {"name": "bob", "group": "bob"}
+
+
+class InterleavedSessionsTest(unittest.TestCase):
+    def setUp(self):
+        for path in ("/srv", "/srv/alice", "/srv/bob"):
+            if not fs_manager.get_node(path):
+                fs_manager.create_directory(path, ROOT_CONTEXT)
+
+    async def shell(self, session, user, steps, log):
+        """
+        Changes into the user's directory and sets WHO, then alternately
+        yields to the other session and checks that nothing moved.
+        """
+        home = f"/srv/{user['name']}"
+        with use_session(session):
+            result = await execute(f"cd {home}", context_json(user=user))
+            effect = result["effects"][0]
+            self.assertEqual(effect["effect"], "change_directory", result)
+            # The frontend applies the effect and sends the new directory with the next line.
+            context = context_json(user=user, cwd=effect["path"])
+            result = await execute(f"WHO={user['name']}", context)
+            self.assertTrue(result["success"], result)
+            for step in range(steps):
+                await asyncio.sleep(0)
+                log.append((user["name"], step))
+                self.assertEqual(fs_manager.current_path, home)
+                self.assertEqual(command_executor.user_context["name"], user["name"])
+                self.assertEqual(env_manager.get("WHO"), user["name"])
+                outputs = [(await execute(command, context))["output"] for command in ("pwd", "whoami", "echo $WHO")]
+                self.assertEqual(outputs, [home, user["name"], user["name"]])
+
+    def test_two_sessions_keep_their_own_state(self):
+        log = []
+        alice, bob = Session("alice"), Session("bob")
+
+        async def main():
+            await asyncio.gather(self.shell(alice, ALICE, 5, log), self.shell(bob, BOB, 5, log))
+
+        asyncio.run(main())
+        # The sessions really took turns rather than running one after the other.
+        self.assertNotEqual([name for name, _ in log], sorted(name for name, _ in log))
+        self.assertEqual((alice.cwd, bob.cwd), ("/srv/alice", "/srv/bob"))
+        self.assertEqual((alice.env.get("WHO"), bob.env.get("WHO")), ("alice", "bob"))
+        self.assertNotEqual(default_session.env.get("WHO"), "alice")
+        self.assertNotEqual(default_session.env.get("WHO"), "bob")
+
+    def test_fork_shares_history_but_not_environment(self):
+        parent = Session("parent")
+        parent.env.set("SHELL_LEVEL", "1")
+        child = parent.fork("child")
+        child.env.set("SHELL_LEVEL", "2")
+        child.cwd = "/srv"
+        child.history.add("ls")
+        self.assertEqual(parent.env.get("SHELL_LEVEL"), "1")
+        self.assertEqual(parent.cwd, "/")
+        self.assertEqual(parent.history.get_full_history(), ["ls"])
+
+
+class EnvironmentManagerTest(unittest.TestCase):
+    def setUp(self):
+        self.env = EnvironmentManager()
+        self.env.initialize_defaults({"name": "alice"})
+        self.env.set("EDITOR", "vi")
+
+    def assertConsistent(self):
+        """The flattened view must match resolving the ChainMap layer by layer, tombstones hidden."""
+        resolved = {name: value for name, value in self.env.env_stack.items() if isinstance(value, str)}
+        self.assertEqual(self.env.get_all(), resolved)
+
+    def test_unset_of_an_inherited_variable_is_undone_by_pop(self):
+        self.env.push()
+        self.env.unset("EDITOR")
+        self.assertEqual(self.env.get("EDITOR"), "")
+        self.assertNotIn("EDITOR", self.env.get_all())
+        self.assertConsistent()
+        self.env.pop()
+        self.assertEqual(self.env.get("EDITOR"), "vi")
+        self.assertConsistent()
+
+    def test_nested_push_and_pop(self):
+        self.env.push()
+        self.env.set("EDITOR", "nano")
+        self.env.set("DEPTH", "1")
+        self.env.push()
+        self.env.set("DEPTH", "2")
+        self.env.unset("EDITOR")
+        self.env.set("EDITOR", "ed")
+        self.env.unset("USER")
+        self.assertEqual((self.env.get("EDITOR"), self.env.get("DEPTH"), self.env.get("USER")), ("ed", "2", ""))
+        self.assertConsistent()
+        self.env.pop()
+        self.assertEqual((self.env.get("EDITOR"), self.env.get("DEPTH"), self.env.get("USER")), ("nano", "1", "alice"))
+        self.assertConsistent()
+        self.env.pop()
+        self.assertEqual((self.env.get("EDITOR"), self.env.get("DEPTH")), ("vi", ""))
+        self.assertConsistent()
+        # Popping the base layer is a no-op.
+        self.env.pop()
+        self.assertEqual(self.env.get("USER"), "alice")
+
+    def test_load_replaces_the_base_layer(self):
+        self.env.load({"ONLY": "this"})
+        self.assertEqual(self.env.get_all(), {"ONLY": "this"})
+        self.assertEqual(len(self.env.env_stack.maps), 1)
+        self.assertConsistent()
+
+    def test_load_inside_a_scope_hides_outer_variables_until_pop(self):
+        self.env.push()
+        self.env.load({"ONLY": "this"})
+        self.assertEqual(self.env.get_all(), {"ONLY": "this"})
+        self.assertConsistent()
+        self.env.pop()
+        self.assertEqual(self.env.get("EDITOR"), "vi")
+        self.assertNotIn("ONLY", self.env.get_all())
+        self.assertConsistent()
+
+    def test_saved_state_has_no_tombstones(self):
+        session = Session("saver", env=self.env)
+        self.env.push()
+        self.env.unset("EDITOR")
+        self.env.unset("HOME")
+        with use_session(session):
+            saved = json.loads(session_manager.get_session_state_for_saving())
+        variables = saved["environmentVariables"]
+        self.assertNotIn("EDITOR", variables)
+        self.assertNotIn("HOME", variables)
+        self.assertTrue(all(isinstance(value, str) for value in variables.values()))
+
+        restored = EnvironmentManager()
+        restored.load(variables)
+        self.assertEqual(restored.get_all(), self.env.get_all())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,128 @@
+# tests/test_sudo.py
+"""
+The compiled, cached sudoers policy must decide what a line-by-line
+reading of the file decides, and be recompiled whenever the file changes.
+"""
+
+import fnmatch
+import os
+import unittest
+
+from support import ROOT_CONTEXT
+from filesystem import fs_manager
+from sudo import SudoManager
+from users import user_manager
+
+SUDOERS_PATH = "/tmp/sudoers_test"
+USERS = {"alice": ["wheel"], "bob": [], "carol": ["ops", "wheel"]}
+COMMANDS = [("ls", []), ("cat", ["/var/log/audit.log"]), ("cat", ["/etc/shadow"]), ("cat", []),
+            ("useradd", ["dave"]), ("reboot", []), ("/bin/ls", ["-l"]), ("chmod", ["755", "x"])]
+
+SUDOERS = """\
+# sample policy
+Defaults timestamp_timeout=5
+alice ALL=(ALL) NOPASSWD: ls, cat /var/log/*
+bob ls,cat ""
+%wheel ALL=(ALL:ALL) useradd, ch*
+%ops ALL=(root) NOPASSWD: reboot, PASSWD: cat
+carol ALL=(ALL) ALL
+"""
+
+
+def scanned_decision(content, username, groups, command, args):
+    """What the file allows, read line by line with the last matching command winning."""
+    decision = (False, False)
+    entities = {username} | {f"%{group}" for group in groups}
+    for line in content.splitlines():
+        line = line.strip()
+        if not line or line.startswith("#") or line.startswith("Defaults"):
+            continue
+        entity, _, spec = line.partition(" ")
+        if entity not in entities:
+            continue
+        spec = spec.strip()
+        if "=" in spec.split()[0]:
+            spec = spec.split("=", 1)[1].strip()
+        if spec.startswith("("):
+            spec = spec.split(")", 1)[1].strip()
+        nopasswd = False
+        for item in spec.split(","):
+            item = item.strip()
+            for tag in ("NOPASSWD:", "PASSWD:"):
+                if item.startswith(tag):
+                    nopasswd, item = tag == "NOPASSWD:", item[len(tag):].strip()
+            words = item.split()
+            name = os.path.basename(words[0])
+            if name != "ALL" and not fnmatch.fnmatchcase(os.path.basename(command), name):
+                continue
+            if len(words) > 1:
+                pattern = "" if words[1:] == ['""'] else " ".join(words[1:])
+                if not fnmatch.fnmatchcase(" ".join(args), pattern):
+                    continue
+            decision = (True, nopasswd)
+    return decision
+
+
+class SudoersPolicyCacheTest(unittest.TestCase):
+    def setUp(self):
+        self.sudo = SudoManager(fs_manager)
+        self.sudo.SUDOERS_PATH = SUDOERS_PATH
+        saved_ttl = user_manager.tickets.ttl
+        self.addCleanup(user_manager.set_ticket_ttl, saved_ttl)
+        self.addCleanup(lambda: fs_manager.get_node(SUDOERS_PATH) and fs_manager.remove(SUDOERS_PATH))
+        self.write(SUDOERS)
+
+    def write(self, content):
+        fs_manager.write_file(SUDOERS_PATH, content, ROOT_CONTEXT)
+        self.content = content
+
+    def assertMatchesScan(self):
+        for username, groups in USERS.items():
+            for command, args in COMMANDS:
+                decision = self.sudo.authorize(username, groups, os.path.basename(command), args)
+                self.assertEqual((decision["allowed"], decision["nopasswd"]),
+                                 scanned_decision(self.content, username, groups, command, args),
+                                 (username, command, args))
+
+    def test_policy_matches_a_scan_of_the_file(self):
+        self.assertMatchesScan()
+        self.assertEqual(user_manager.tickets.ttl, 300)
+
+    def test_unchanged_file_reuses_the_policy(self):
+        self.assertMatchesScan()
+        policy = self.sudo._get_config()
+        self.write(SUDOERS)
+        self.assertIs(self.sudo._get_config(), policy)
+
+    def test_edited_file_is_recompiled(self):
+        self.assertMatchesScan()
+        policy = self.sudo._get_config()
+        # Edited in place: bob may now cat anything but no longer ls.
+        self.write(SUDOERS.replace('bob ls,cat ""', 'bob lx,cat *'))
+        self.assertMatchesScan()
+        self.assertIsNot(self.sudo._get_config(), policy)
+        self.assertTrue(self.sudo.can_user_run_command("bob", [], "cat", ["/etc/shadow"]))
+
+        self.write(SUDOERS.replace("Defaults timestamp_timeout=5\n", "") + "%wheel ALL=(ALL) NOPASSWD: ls\n")
+        self.assertMatchesScan()
+
+    def test_timeout_is_restored_when_defaults_go(self):
+        saved_ttl = user_manager.tickets.ttl
+        user_manager.set_ticket_ttl(42)
+        self.addCleanup(user_manager.set_ticket_ttl, saved_ttl)
+        self.sudo._get_config()
+        self.assertEqual(user_manager.tickets.ttl, 300)
+        self.write(SUDOERS.replace("Defaults timestamp_timeout=5\n", ""))
+        self.sudo._get_config()
+        self.assertEqual(user_manager.tickets.ttl, 42)
+
+    def test_removed_file_denies_everything(self):
+        self.assertMatchesScan()
+        fs_manager.remove(SUDOERS_PATH)
+        self.content = ""
+        self.assertMatchesScan()
+        self.assertFalse(self.sudo.can_user_run_command("carol", ["wheel"], "ls"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,91 @@
+# tests/test_tracing.py
+"""
+The trace file is private to root and rotated like the audit log, so a
+flush never copies more than one segment.
+"""
+
+import unittest
+
+from support import ROOT_CONTEXT, context_json, run
+from filesystem import fs_manager
+from tracing import TRACE_PATH, tracer
+
+
+class TraceFileTest(unittest.TestCase):
+    def setUp(self):
+        saved = (tracer.segments.segment_max_size, tracer.segments.retained_segments)
+        self.addCleanup(self.restore, saved)
+        tracer.segments.segment_max_size, tracer.segments.retained_segments = 2000, 2
+        tracer.clear()
+
+    def restore(self, saved):
+        tracer.segments.segment_max_size, tracer.segments.retained_segments = saved
+        tracer.disable()
+        tracer.clear()
+
+    def record(self, count):
+        tracer.enable()
+        for number in range(count):
+            with tracer.span("step", number=number):
+                pass
+        tracer.disable()
+        self.assertTrue(tracer.flush()["success"])
+
+    def test_file_is_created_private_to_root(self):
+        self.record(1)
+        node = fs_manager.get_node(TRACE_PATH)
+        self.assertEqual((node["owner"], node["group"], node["mode"]), ("root", "root", 0o640))
+
+    def test_existing_world_readable_file_is_fixed_up(self):
+        fs_manager.write_file(TRACE_PATH, "", ROOT_CONTEXT)
+        fs_manager.chmod(TRACE_PATH, "644")
+        self.record(1)
+        self.assertEqual(fs_manager.get_node(TRACE_PATH)["mode"], 0o640)
+
+    def test_segments_are_capped_and_rotated(self):
+        self.record(10)
+        self.assertIsNone(fs_manager.get_node(TRACE_PATH + ".1"))
+        self.assertEqual([span["attributes"]["number"] for span in tracer.load()], list(range(10)))
+
+        self.record(200)
+        for number in range(tracer.segments.retained_segments + 1):
+            node = fs_manager.get_node(TRACE_PATH + (f".{number}" if number else ""))
+            self.assertLessEqual(len(node["content"]), tracer.segments.segment_max_size)
+            self.assertEqual(node["mode"], 0o640)
+        self.assertIsNone(fs_manager.get_node(f"{TRACE_PATH}.{tracer.segments.retained_segments + 1}"))
+        numbers = [span["attributes"]["number"] for span in tracer.load()]
+        # The oldest spans went with the dropped segments; what is left is the newest, in order.
+        self.assertEqual(numbers, list(range(200 - len(numbers), 200)))
+
+    def test_clear_removes_rotated_segments(self):
+        self.record(200)
+        tracer.clear()
+        self.assertIsNone(fs_manager.get_node(TRACE_PATH + ".1"))
+        self.assertEqual(tracer.load(), [])
+
+
+class TraceCommandTest(unittest.TestCase):
+    def setUp(self):
+        tracer.clear()
+        self.addCleanup(tracer.clear)
+        tracer.enable()
+        with tracer.span("secret"):
+            pass
+        tracer.disable()
+        tracer.flush()
+
+    def test_only_root_may_use_it(self):
+        guest = context_json(user={"name": "Guest", "group": "Guest"})
+        for action in ("report", "clear", "on", "status"):
+            result = run(f"trace {action}", guest)
+            self.assertFalse(result["success"], action)
+            self.assertIn("permission denied", result["error"])
+        self.assertEqual([span["name"] for span in tracer.load()], ["secret"])
+
+        report = run("trace report")
+        self.assertTrue(report["success"], report)
+        self.assertIn("secret", report["output"])
+
+
+if __name__ == "__main__":
+    unittest.main()
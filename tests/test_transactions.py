@@ -0,0 +1,100 @@
+# tests/test_transactions.py
+"""
+Each task journals into its own transaction, so a rollback never undoes
+another task's writes, and the filesystem save is journaled once.
+"""
+
+import asyncio
+import unittest
+
+from support import ROOT_CONTEXT
+from filesystem import fs_manager
+from transactions import _journal, transaction_manager
+
+
+class Abort(Exception):
+    pass
+
+
+class TransactionJournalTest(unittest.TestCase):
+    def setUp(self):
+        if not fs_manager.get_node("/tmp/tx"):
+            fs_manager.create_directory("/tmp/tx", ROOT_CONTEXT, parents=True)
+        for name in list(fs_manager.get_node("/tmp/tx")["children"]):
+            fs_manager.remove(f"/tmp/tx/{name}")
+
+    def exists(self, name):
+        return fs_manager.get_node(f"/tmp/tx/{name}") is not None
+
+    def test_rollback_keeps_other_tasks_writes(self):
+        async def failing(opened, release):
+            with self.assertRaises(Abort):
+                with transaction_manager.transaction():
+                    fs_manager.write_file("/tmp/tx/mine.txt", "a", ROOT_CONTEXT)
+                    opened.set()
+                    await release.wait()
+                    raise Abort()
+
+        async def committing():
+            with transaction_manager.transaction():
+                fs_manager.write_file("/tmp/tx/committed.txt", "b", ROOT_CONTEXT)
+                await asyncio.sleep(0)
+
+        async def scenario():
+            opened, release = asyncio.Event(), asyncio.Event()
+            first = asyncio.create_task(failing(opened, release))
+            await opened.wait()
+            self.assertFalse(transaction_manager.active)
+            fs_manager.write_file("/tmp/tx/outside.txt", "c", ROOT_CONTEXT)
+            await committing()
+            release.set()
+            await first
+
+        asyncio.run(scenario())
+        self.assertFalse(self.exists("mine.txt"))
+        self.assertTrue(self.exists("outside.txt"))
+        self.assertTrue(self.exists("committed.txt"))
+
+    def test_save_is_journaled_once(self):
+        with self.assertRaises(Abort):
+            with transaction_manager.transaction():
+                for number in range(5):
+                    fs_manager.write_file(f"/tmp/tx/f{number}.txt", "x", ROOT_CONTEXT)
+                undo = _journal.get()["undo"]
+                self.assertEqual(undo.count(fs_manager._save_state), 1)
+                self.assertGreater(len(undo), 5)
+                raise Abort()
+        self.assertFalse(any(self.exists(f"f{number}.txt") for number in range(5)))
+
+    def test_savepoint_rollback_lets_the_save_be_journaled_again(self):
+        with transaction_manager.transaction():
+            with self.assertRaises(Abort):
+                with transaction_manager.transaction():
+                    fs_manager.write_file("/tmp/tx/inner.txt", "x", ROOT_CONTEXT)
+                    raise Abort()
+            self.assertEqual(_journal.get()["undo"], [])
+            fs_manager.write_file("/tmp/tx/outer.txt", "x", ROOT_CONTEXT)
+            self.assertEqual(_journal.get()["undo"].count(fs_manager._save_state), 1)
+        self.assertFalse(self.exists("inner.txt"))
+        self.assertTrue(self.exists("outer.txt"))
+
+    def test_task_outliving_the_transaction_is_not_journaled(self):
+        async def scenario():
+            release = asyncio.Event()
+
+            async def late_writer():
+                await release.wait()
+                self.assertFalse(transaction_manager.active)
+                fs_manager.write_file("/tmp/tx/late.txt", "x", ROOT_CONTEXT)
+
+            with transaction_manager.transaction():
+                writer = asyncio.create_task(late_writer())
+            release.set()
+            await writer
+
+        asyncio.run(scenario())
+        self.assertTrue(self.exists("late.txt"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,103 @@
+# tests/test_useradd.py
+"""
+'useradd --batch' hashes the passwords before opening its transaction,
+without blocking the event loop, and reports progress as each hash
+completes.
+"""
+
+import asyncio
+import unittest
+
+from support import ROOT_CONTEXT, run
+from filesystem import fs_manager
+from groups import group_manager
+from transactions import transaction_manager
+from users import user_manager
+
+BATCH_PATH = "/tmp/useradd_batch.csv"
+
+
+class BulkRegisterTest(unittest.TestCase):
+    def setUp(self):
+        saved_iterations = user_manager.password_iterations
+        user_manager.set_password_iterations(2000)
+        self.addCleanup(user_manager.set_password_iterations, saved_iterations)
+        self.prefix = f"bulk{id(self) % 100000}"
+        self.addCleanup(self.remove_users)
+
+    def remove_users(self):
+        for username in list(user_manager.get_all_users()):
+            if username.startswith(self.prefix):
+                user_manager.remove_user(username)
+                group_manager.delete_group(username)
+                if fs_manager.get_node(f"/home/{username}"):
+                    fs_manager.remove(f"/home/{username}", recursive=True)
+
+    def batch(self, count):
+        return [{"username": f"{self.prefix}u{number}", "password": f"pw{number}", "groups": []}
+                for number in range(count)]
+
+    def test_hashing_finishes_before_the_transaction_and_lets_the_loop_run(self):
+        events = []
+        transaction = transaction_manager.transaction
+
+        def recording_transaction():
+            events.append("transaction")
+            return transaction()
+
+        async def ticker(stop):
+            while not stop.is_set():
+                events.append("tick")
+                await asyncio.sleep(0)
+
+        async def scenario():
+            stop = asyncio.Event()
+            ticking = asyncio.create_task(ticker(stop))
+            result = await user_manager.bulk_register(
+                self.batch(8), progress=lambda stage, done, total: events.append(f"hashed {done}/{total}"))
+            stop.set()
+            await ticking
+            return result
+
+        transaction_manager.transaction = recording_transaction
+        try:
+            result = asyncio.run(scenario())
+        finally:
+            transaction_manager.transaction = transaction
+        self.assertTrue(result["success"], result)
+
+        hashed = [event for event in events if event.startswith("hashed")]
+        self.assertEqual(hashed, [f"hashed {done}/8" for done in range(1, 9)])
+        self.assertLess(events.index("hashed 8/8"), events.index("transaction"))
+        # Other tasks ran while the passwords were being hashed.
+        self.assertIn("tick", events[:events.index("hashed 8/8")])
+
+    def test_names_taken_while_hashing_are_caught(self):
+        batch = self.batch(3)
+
+        async def scenario():
+            registering = asyncio.create_task(user_manager.bulk_register(batch))
+            await asyncio.sleep(0)
+            user_manager.register_user(batch[1]["username"], None, batch[1]["username"])
+            return await registering
+
+        result = asyncio.run(scenario())
+        self.assertFalse(result["success"])
+        self.assertEqual(result["errors"], [f"user 2 ({batch[1]['username']}): user already exists"])
+        self.assertFalse(user_manager.user_exists(batch[0]["username"]))
+
+    def test_useradd_batch_reports_progress(self):
+        if not fs_manager.get_node("/tmp"):
+            fs_manager.create_directory("/tmp", ROOT_CONTEXT)
+        rows = "\n".join(f"{entry['username']},{entry['password']}" for entry in self.batch(20))
+        fs_manager.write_file(BATCH_PATH, rows + "\n", ROOT_CONTEXT)
+        result = run(f"useradd --batch {BATCH_PATH}")
+        self.assertTrue(result["success"], result)
+        lines = result["effects"][0]["output"].splitlines()
+        self.assertEqual([line.split(" (")[0].strip() for line in lines if "hashed" in line],
+                         [f"hashed {done}/20 passwords" for done in range(2, 21, 2)])
+        self.assertTrue(lines[-1].startswith("useradd: created 20 user(s)"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,45 @@
+# tests/test_users.py
+"""
+A hash made with an older PBKDF2 cost is upgraded only on the path that
+tells the frontend to save the user records.
+"""
+
+import asyncio
+import unittest
+
+from users import user_manager
+
+USERNAME = "rehashtest"
+
+
+class PasswordRehashTest(unittest.TestCase):
+    def setUp(self):
+        saved_iterations = user_manager.password_iterations
+        self.addCleanup(user_manager.set_password_iterations, saved_iterations)
+        self.addCleanup(user_manager.remove_user, USERNAME)
+        user_manager.set_password_iterations(1000)
+        self.assertTrue(user_manager.register_user(USERNAME, "secret", USERNAME)["success"])
+        user_manager.set_password_iterations(2000)
+
+    def iterations(self):
+        return user_manager.users[USERNAME]["passwordData"]["iterations"]
+
+    def test_sync_verify_does_not_rehash(self):
+        self.assertTrue(user_manager.verify_password(USERNAME, "secret"))
+        self.assertEqual(self.iterations(), 1000)
+        self.assertFalse(user_manager.verify_password(USERNAME, "wrong"))
+
+    def test_async_verify_rehashes_and_says_so(self):
+        user_manager.invalidate_tickets(USERNAME)
+        result = asyncio.run(user_manager.verify_password_async(USERNAME, "secret"))
+        self.assertEqual((result["data"], result["rehashed"]), (True, True))
+        self.assertEqual(self.iterations(), 2000)
+
+        user_manager.invalidate_tickets(USERNAME)
+        result = asyncio.run(user_manager.verify_password_async(USERNAME, "secret"))
+        self.assertEqual((result["data"], result["rehashed"]), (True, False))
+        self.assertTrue(user_manager.verify_password(USERNAME, "secret"))
+
+
+if __name__ == "__main__":
+    unittest.main()
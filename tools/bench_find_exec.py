@@ -0,0 +1,127 @@
+# tools/bench_find_exec.py
+"""
+Times find -exec inside the kernel against one execute() per match.
+
+    python tools/bench_find_exec.py [--files 5000] [--dirs 50] [--other-files 1000] [--baseline-writes 500]
+
+--files Markdown files of a few lines each are spread over --dirs
+directories under /docs, next to --other-files .txt files that the
+search must skip. Then 'find / -name '*.md' -exec wc -l {} +' (batched)
+and '... -exec wc -l {} \\;' (one invocation per match) each run as a
+single command line. The baseline is what the old execute_commands
+effect cost on the kernel side: a separate execute() of 'wc -l PATH'
+for every match, each with its own context load and parse. The JS
+bridge crossing each of those also paid is not counted. All three runs
+must count the same lines for every file. The same comparison with
+'touch', which writes, shows the filesystem saves each way makes; its
+baseline touches only the first --baseline-writes matches, since every
+separate write serializes the whole filesystem for its save.
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+import types
+
+CORE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "core")
+ROOT_CONTEXT = {"name": "root", "group": "root"}
+
+
+def _prepare_imports():
+    sys.path.insert(0, os.path.abspath(CORE_DIR))
+    try:
+        import pyodide.http  # noqa: F401
+    except ImportError:
+        # Only the browser has pyodide; the kernel modules just need it importable.
+        pyodide = types.ModuleType("pyodide")
+        pyodide.http = types.ModuleType("pyodide.http")
+        sys.modules["pyodide"], sys.modules["pyodide.http"] = pyodide, pyodide.http
+
+
+def per_file_counts(output):
+    """{path: line count} from wc -l output, leaving out the 'total' lines of batched runs."""
+    counts = {}
+    for line in output.splitlines():
+        fields = line.split()
+        if len(fields) == 2 and fields[1] != "total":
+            counts[fields[1]] = int(fields[0])
+    return counts
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--files", type=int, default=5000)
+    parser.add_argument("--dirs", type=int, default=50)
+    parser.add_argument("--other-files", type=int, default=1000)
+    parser.add_argument("--baseline-writes", type=int, default=500)
+    options = parser.parse_args()
+
+    _prepare_imports()
+    import asyncio
+    from filesystem import fs_manager
+    from executor import command_executor
+
+    saves = [0]
+
+    def save(state):
+        saves[0] += 1
+
+    fs_manager.set_save_function(save)
+    context = json.dumps({
+        "current_path": "/", "user_context": ROOT_CONTEXT, "users": {"root": {}},
+        "user_groups": {"root": ["root"]}, "groups": {}, "jobs": {},
+        "config": {"MAX_VFS_SIZE": 10 ** 9}, "api_key": None,
+        "session_start_time": "2026-01-01T00:00:00", "session_stack": ["root"]
+    })
+    fs_manager.create_directory("/docs", ROOT_CONTEXT)
+    for number in range(options.dirs):
+        fs_manager.create_directory(f"/docs/d{number:03d}", ROOT_CONTEXT)
+    for number in range(options.files + options.other_files):
+        directory = fs_manager.get_node(f"/docs/d{number % options.dirs:03d}")["children"]
+        name = f"note{number:05d}.md" if number < options.files else f"data{number:05d}.txt"
+        directory[name] = {"type": "file", "content": "line\n" * (1 + number % 7), "owner": "root",
+                           "group": "root", "mode": 0o644, "mtime": "2026-01-01T00:00:00Z"}
+
+    async def execute(line):
+        result = json.loads(await command_executor.execute(line, context))
+        if not result.get("success"):
+            sys.exit(f"error: '{line}' failed: {result.get('error')}")
+        return result.get("output", "")
+
+    async def timed(coroutine):
+        saves[0] = 0
+        started = time.perf_counter()
+        output = await coroutine
+        return output, time.perf_counter() - started, saves[0]
+
+    async def one_call_per_match(command, limit=None):
+        paths = (await execute("find / -name '*.md'")).splitlines()[:limit]
+        outputs = [await execute(f"{command} {path}") for path in paths]
+        return "\n".join(outputs)
+
+    async def bench():
+        runs = []
+        for command in ("wc -l", "touch"):
+            runs.append(await timed(execute(f"find / -name '*.md' -exec {command} {{}} +")))
+            runs.append(await timed(execute(f"find / -name '*.md' -exec {command} {{}} \\;")))
+            limit = options.baseline_writes if command == "touch" else None
+            runs.append(await timed(one_call_per_match(command, limit)))
+        return runs
+
+    runs = asyncio.run(bench())
+    counts = [per_file_counts(output) for output, _, _ in runs[:3]]
+    if len(counts[0]) != options.files or any(other != counts[0] for other in counts[1:]):
+        sys.exit(f"error: the runs counted different lines ({', '.join(str(len(c)) for c in counts)} files)")
+
+    print(f"{options.files} .md files (and {options.other_files} others) in {options.dirs} directories")
+    labels = [f"{form} ({command})" for command in ("wc -l", "touch")
+              for form in ("find -exec {} +", "find -exec {} \\;", "execute() per match")]
+    labels[-1] += f", first {min(options.baseline_writes, options.files)}"
+    for label, (_, seconds, save_count) in zip(labels, runs):
+        print(f"  {label:<42}{seconds * 1000:9.1f} ms   {save_count} save(s)")
+
+
+if __name__ == "__main__":
+    main()
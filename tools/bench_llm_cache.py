@@ -0,0 +1,176 @@
+# tools/bench_llm_cache.py
+"""
+Times the LLM response cache against a local stub standing in for Ollama.
+
+    python tools/bench_llm_cache.py [--latency 0.25] [--concurrent 20] [--capacity 5]
+
+A small HTTP server on 127.0.0.1 answers POST /api/generate the way Ollama
+does, after --latency seconds, and counts the requests it gets. The kernel's
+AIManager is pointed at it; outside the browser, pyodide.http.pyfetch is
+provided by a urllib stand-in. The run checks, and times:
+
+  - a first request (fetched) and the same request again (cached),
+  - --concurrent identical requests at once (one fetch between them),
+  - a fresh cache reading the answers back from ~/.cache/llm_responses.json,
+  - --no-cache (always fetched), expiry after the TTL, and LRU eviction
+    once more than --capacity answers are cached.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import threading
+import time
+import types
+import urllib.request
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+CORE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "core")
+USER = {"name": "alice", "group": "alice"}
+
+
+class StubOllama(BaseHTTPRequestHandler):
+    latency = 0.0
+    requests = 0
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))))
+        StubOllama.requests += 1
+        time.sleep(StubOllama.latency)
+        reply = json.dumps({"model": body.get("model"), "response": f"answer #{StubOllama.requests}", "done": True})
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.end_headers()
+        self.wfile.write(reply.encode("utf-8"))
+
+    def log_message(self, *args):
+        pass
+
+
+class _Response:
+    def __init__(self, status, body):
+        self.status = status
+        self._body = body
+
+    async def json(self):
+        return json.loads(self._body)
+
+
+async def _pyfetch(url, method="GET", headers=None, body=None, timeout=None, **kwargs):
+    """pyodide.http.pyfetch for CPython: the request runs in a thread so the event loop keeps going."""
+    def send():
+        request = urllib.request.Request(url, data=body.encode("utf-8") if body else None,
+                                         headers=headers or {}, method=method)
+        with urllib.request.urlopen(request, timeout=timeout) as response:
+            return response.status, response.read()
+    status, data = await asyncio.get_running_loop().run_in_executor(None, send)
+    return _Response(status, data)
+
+
+def _prepare_imports():
+    sys.path.insert(0, os.path.abspath(CORE_DIR))
+    pyodide = types.ModuleType("pyodide")
+    pyodide.http = types.ModuleType("pyodide.http")
+    pyodide.http.pyfetch = _pyfetch
+    sys.modules["pyodide"], sys.modules["pyodide.http"] = pyodide, pyodide.http
+
+
+def check(condition, message):
+    if not condition:
+        sys.exit(f"error: {message}")
+
+
+async def scenario(options, url):
+    from filesystem import fs_manager
+    from executor import command_executor
+    from ai_manager import AIManager
+    import llm_cache as cache_module
+
+    fs_manager.set_save_function(lambda state: None)
+    fs_manager.create_directory("/home/alice", {"name": "root", "group": "root"})
+    fs_manager.chown("/home/alice", "alice")
+    command_executor.user_context = USER
+    manager = AIManager(fs_manager, command_executor)
+    manager.provider_config["ollama"]["url"] = url
+    cache = cache_module.llm_cache
+    cache.configure(capacity=options.capacity)
+
+    def ask(text, **kwargs):
+        conversation = [{"role": "user", "parts": [{"text": text}]}]
+        return manager._call_llm_api("ollama", None, conversation, None, "You are a stub.", **kwargs)
+
+    async def timed(awaitable):
+        started = time.perf_counter()
+        result = await awaitable
+        return result, (time.perf_counter() - started) * 1000
+
+    first, first_ms = await timed(ask("summarize README"))
+    again, again_ms = await timed(ask("summarize README\r\n  "))
+    check(first["success"] and again.get("cached") and again["answer"] == first["answer"],
+          f"a repeated request was not answered from the cache: {again}")
+    check(StubOllama.requests == 1, f"expected 1 request, the stub got {StubOllama.requests}")
+    print(f"  first request   {first_ms:8.1f} ms   (fetched)")
+    print(f"  same request    {again_ms:8.3f} ms   (cached; line endings and trailing space ignored)")
+
+    before = StubOllama.requests
+    results, burst_ms = await timed(asyncio.gather(*(ask("what changed today?") for _ in range(options.concurrent))))
+    check(StubOllama.requests - before == 1, f"{options.concurrent} concurrent requests made {StubOllama.requests - before} fetches")
+    check(len({result["answer"] for result in results}) == 1, "concurrent requests got different answers")
+    print(f"  {options.concurrent} concurrent   {burst_ms:8.1f} ms   (1 fetch shared)")
+
+    path = "/home/alice/.cache/llm_responses.json"
+    node = fs_manager.get_node(path)
+    check(node and node["owner"] == "alice" and node["mode"] == 0o600, f"cache file missing or not private: {node}")
+    reloaded = cache_module.LLMResponseCache(capacity=options.capacity)
+    cache_module.llm_cache = reloaded
+    import ai_manager as ai_module
+    ai_module.llm_cache = reloaded
+    before = StubOllama.requests
+    restored, restored_ms = await timed(ask("summarize README"))
+    check(restored.get("cached") and StubOllama.requests == before, "answers were not read back from the cache file")
+    print(f"  after reload    {restored_ms:8.3f} ms   (read from {path})")
+
+    bypass, bypass_ms = await timed(ask("summarize README", use_cache=False))
+    check(not bypass.get("cached") and StubOllama.requests == before + 1, "use_cache=False did not fetch")
+    print(f"  --no-cache      {bypass_ms:8.1f} ms   (fetched)")
+
+    reloaded.configure(ttl=0.05)
+    await asyncio.sleep(0.1)
+    expired = await ask("summarize README")
+    check(not expired.get("cached"), "an expired answer was served")
+    reloaded.configure(ttl=3600)
+
+    for number in range(options.capacity + 1):
+        await ask(f"question {number}")
+    before = StubOllama.requests
+    await ask("question 0")
+    check(StubOllama.requests == before + 1, "the least recently used answer was not evicted")
+    check(len(reloaded._entries["alice"]) == options.capacity, "the cache holds more than its capacity")
+    print(f"  TTL expiry and LRU eviction at {options.capacity} entries: ok")
+    print(f"  stub requests   {StubOllama.requests}, cache stats {reloaded.stats}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--latency", type=float, default=0.25)
+    parser.add_argument("--concurrent", type=int, default=20)
+    parser.add_argument("--capacity", type=int, default=5)
+    options = parser.parse_args()
+
+    StubOllama.latency = options.latency
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubOllama)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_address[1]}/api/generate"
+    print(f"stub Ollama at {url}, {options.latency * 1000:.0f} ms per answer")
+
+    _prepare_imports()
+    try:
+        asyncio.run(scenario(options, url))
+    finally:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+# tools/bench_run_loop.py
+"""
+Times a looping 'run' script against the line-by-line execution it replaced.
+
+    python tools/bench_run_loop.py [--iterations 1000] [--baseline-iterations 1000] [--repeat 3]
+
+The script counts to --iterations in a while loop, with i=$(expr $i + 1)
+as its body, and echoes the result. It is run with 'run' in one kernel
+call, first cold (parsed) and then --repeat times warm (the compiled
+script comes from the cache). Before, 'run' returned the script's lines
+to JavaScript, which sent each one back through execute() and had no
+loops. The baseline therefore executes the same commands unrolled (the
+test and the increment of each of --baseline-iterations iterations),
+one execute() per line, and leaves out the JS bridge crossing that each
+of those lines also cost. Both runs must print the count they reached.
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+import types
+
+CORE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "core")
+ROOT_CONTEXT = {"name": "root", "group": "root"}
+SCRIPT_PATH = "/tmp/bench_loop.sh"
+
+
+def _prepare_imports():
+    sys.path.insert(0, os.path.abspath(CORE_DIR))
+    try:
+        import pyodide.http  # noqa: F401
+    except ImportError:
+        # Only the browser has pyodide; the kernel modules just need it importable.
+        pyodide = types.ModuleType("pyodide")
+        pyodide.http = types.ModuleType("pyodide.http")
+        sys.modules["pyodide"], sys.modules["pyodide.http"] = pyodide, pyodide.http
+
+
+def loop_script(iterations):
+    return f"i=0\nwhile [ $i -lt {iterations} ]; do\n  i=$(expr $i + 1)\ndone\necho $i\n"
+
+
+def unrolled_lines(iterations):
+    """The commands the loop runs, in order: each iteration's test and increment, then the final test."""
+    check = f"[ $i -lt {iterations} ] || echo done"
+    return ["i=0"] + [check, "i=$(expr $i + 1)"] * iterations + [check, "echo $i"]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=1000)
+    parser.add_argument("--baseline-iterations", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=3)
+    options = parser.parse_args()
+
+    _prepare_imports()
+    import asyncio
+    from filesystem import fs_manager
+    from executor import command_executor
+    from scripting import script_manager
+
+    fs_manager.set_save_function(lambda state: None)
+    context = json.dumps({
+        "current_path": "/", "user_context": ROOT_CONTEXT, "users": {"root": {}},
+        "user_groups": {"root": ["root"]}, "groups": {}, "jobs": {},
+        "config": {"MAX_VFS_SIZE": 10 ** 9}, "api_key": None,
+        "session_start_time": "2026-01-01T00:00:00", "session_stack": ["root"]
+    })
+    if not fs_manager.get_node("/tmp"):
+        fs_manager.create_directory("/tmp", ROOT_CONTEXT)
+    fs_manager.write_file(SCRIPT_PATH, loop_script(options.iterations), ROOT_CONTEXT)
+    fs_manager.chmod(SCRIPT_PATH, "755")
+
+    async def execute(line):
+        result = json.loads(await command_executor.execute(line, context))
+        if not result.get("success"):
+            sys.exit(f"error: '{line}' failed: {result.get('error')}")
+        return result.get("output")
+
+    async def timed(coroutine):
+        started = time.perf_counter()
+        output = await coroutine
+        return output, time.perf_counter() - started
+
+    async def run_unrolled(lines):
+        output = None
+        for line in lines:
+            output = await execute(line)
+        return output
+
+    async def bench():
+        script_manager._compiled.clear()
+        cold_output, cold = await timed(execute(f"run {SCRIPT_PATH}"))
+        warm = []
+        for _ in range(options.repeat):
+            warm_output, seconds = await timed(execute(f"run {SCRIPT_PATH}"))
+            warm.append(seconds)
+        lines = unrolled_lines(options.baseline_iterations)
+        baseline_output, baseline = await timed(run_unrolled(lines))
+        return cold_output, cold, warm_output, min(warm) if warm else None, baseline_output, baseline, len(lines)
+
+    cold_output, cold, warm_output, warm, baseline_output, baseline, line_count = asyncio.run(bench())
+    if cold_output.strip() != str(options.iterations) or (warm is not None and warm_output != cold_output):
+        sys.exit(f"error: the loop script printed {cold_output!r}, expected {options.iterations}")
+    if baseline_output.strip() != str(options.baseline_iterations):
+        sys.exit(f"error: the unrolled script printed {baseline_output!r}, expected {options.baseline_iterations}")
+
+    print(f"while loop of {options.iterations} iterations, i=$(expr $i + 1)")
+    print(f"  run, cold        {cold * 1000:9.1f} ms   {cold / options.iterations * 1000:6.3f} ms/iteration   1 kernel call")
+    if warm is not None:
+        print(f"  run, cached      {warm * 1000:9.1f} ms   {warm / options.iterations * 1000:6.3f} ms/iteration"
+              f"   (best of {options.repeat})")
+    print(f"  line by line     {baseline * 1000:9.1f} ms   {baseline / options.baseline_iterations * 1000:6.3f} ms/iteration"
+          f"   {line_count + 1} kernel calls ({options.baseline_iterations} iterations unrolled, bridge not counted)")
+
+
+if __name__ == "__main__":
+    main()
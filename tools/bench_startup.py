@@ -0,0 +1,76 @@
+# tools/bench_startup.py
+"""
+Measures how long 'import kernel' takes under CPython and how much memory
+it allocates at peak, and lists the heavy modules that the import pulls in.
+
+    python tools/bench_startup.py [--runs N] [--eager]
+
+Every run starts a fresh interpreter so the numbers include the whole
+import graph. With --eager, each lazily loaded kernel module is resolved
+right after the import, which shows what a fully loaded kernel costs.
+'pyodide.http' only exists in the browser; when it is missing, an empty
+stand-in module is registered so that the kernel can be imported here.
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+CORE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "core")
+HEAVY_MODULES = ("cryptography", "pyodide.http", "ai_manager", "audit",
+                 "apps.editor", "apps.paint", "apps.adventure", "apps.top", "apps.log", "apps.basic")
+
+PROBE = r"""
+import json, sys, time, tracemalloc, types
+sys.path.insert(0, CORE_DIR)
+try:
+    import pyodide.http
+except ImportError:
+    pyodide = types.ModuleType("pyodide")
+    pyodide.http = types.ModuleType("pyodide.http")
+    sys.modules["pyodide"], sys.modules["pyodide.http"] = pyodide, pyodide.http
+baseline = set(sys.modules)
+if TRACE_MEMORY:
+    tracemalloc.start()
+started = time.perf_counter()
+import kernel
+if EAGER:
+    for module in kernel.MODULE_DISPATCHER.values():
+        getattr(module, "resolve", lambda: None)()
+elapsed = time.perf_counter() - started
+_, peak = tracemalloc.get_traced_memory() if TRACE_MEMORY else (0, 0)
+loaded = [name for name in HEAVY_MODULES if name in sys.modules and name not in baseline]
+print(json.dumps({"seconds": elapsed, "peak_bytes": peak, "modules": len(set(sys.modules) - baseline), "heavy": loaded}))
+"""
+
+
+def run_once(eager, trace_memory):
+    code = (PROBE.replace("CORE_DIR", repr(os.path.abspath(CORE_DIR)))
+            .replace("EAGER", repr(eager)).replace("TRACE_MEMORY", repr(trace_memory))
+            .replace("HEAVY_MODULES", repr(HEAVY_MODULES)))
+    completed = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--eager", action="store_true")
+    options = parser.parse_args()
+
+    # tracemalloc slows imports down a lot, so time and memory are measured in separate runs.
+    samples = [run_once(options.eager, False) for _ in range(options.runs)]
+    seconds = [sample["seconds"] * 1000 for sample in samples]
+    peaks = [run_once(options.eager, True)["peak_bytes"] / 1024 for _ in range(options.runs)]
+    print(f"import kernel ({'eager' if options.eager else 'lazy'}, {options.runs} runs)")
+    print(f"  time      median {statistics.median(seconds):8.1f} ms   min {min(seconds):8.1f} ms")
+    print(f"  peak mem  median {statistics.median(peaks):8.1f} KiB")
+    print(f"  modules   {samples[-1]['modules']} newly imported")
+    print(f"  heavy     {', '.join(samples[-1]['heavy']) or '(none)'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+# tools/bench_sudo.py
+"""
+Times sudo authorization checks against a generated /etc/sudoers.
+
+    python tools/bench_sudo.py [--lines 500] [--checks 10000] [--baseline-checks 500] [--seed 1]
+
+The sudoers file mixes user and %group entries, exact commands, command
+globs, argument patterns, NOPASSWD tags and a Defaults line. Each check
+asks SudoManager.authorize() about a random user, their groups and a
+random command line, the way the 'sudo' command does. The first
+--baseline-checks of them are then run against a policy compiled afresh
+for every check, which is what re-reading the file on each check costs,
+and both runs must agree.
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+import types
+
+CORE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "core")
+COMMANDS = ["ls", "cat", "grep", "rm", "cp", "mv", "chmod", "chown", "useradd", "backup", "top", "df"]
+
+
+def _prepare_imports():
+    sys.path.insert(0, os.path.abspath(CORE_DIR))
+    try:
+        import pyodide.http  # noqa: F401
+    except ImportError:
+        # Only the browser has pyodide; the kernel modules just need it importable.
+        pyodide = types.ModuleType("pyodide")
+        pyodide.http = types.ModuleType("pyodide.http")
+        sys.modules["pyodide"], sys.modules["pyodide.http"] = pyodide, pyodide.http
+
+
+def generate_sudoers(lines, rng):
+    entries = ["# /etc/sudoers (generated)", "Defaults env_reset, timestamp_timeout=10",
+               "root ALL=(ALL) ALL", "%root ALL=(ALL) ALL"]
+    while len(entries) < lines:
+        entity = f"%group{rng.randrange(100)}" if rng.random() < 0.3 else f"user{rng.randrange(300)}"
+        kind = rng.random()
+        if kind < 0.05:
+            spec = "ALL"
+        elif kind < 0.5:
+            spec = ",".join(rng.sample(COMMANDS, 3))
+        elif kind < 0.7:
+            spec = f"{rng.choice(['c*', 'ch*', 'g?ep', '[lr]*'])}"
+        else:
+            spec = f"{rng.choice(COMMANDS)} /var/log/*, {rng.choice(COMMANDS)} \"\""
+        tag = "NOPASSWD: " if rng.random() < 0.2 else ""
+        entries.append(f"{entity} ALL=(ALL) {tag}{spec}")
+    return "\n".join(entries) + "\n"
+
+
+def generate_checks(count, rng):
+    checks = []
+    for _ in range(count):
+        username = f"user{rng.randrange(400)}"
+        groups = [f"group{rng.randrange(150)}" for _ in range(rng.randrange(4))]
+        args = rng.choice([[], ["/var/log/sudo.log"], ["-l", "/home"]])
+        checks.append((username, groups, rng.choice(COMMANDS), args))
+    return checks
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--lines", type=int, default=500)
+    parser.add_argument("--checks", type=int, default=10000)
+    parser.add_argument("--baseline-checks", type=int, default=500)
+    parser.add_argument("--seed", type=int, default=1)
+    options = parser.parse_args()
+
+    _prepare_imports()
+    from filesystem import fs_manager
+    from sudo import SudoManager, SudoersPolicy
+
+    rng = random.Random(options.seed)
+    content = generate_sudoers(options.lines, rng)
+    checks = generate_checks(options.checks, rng)
+    fs_manager.fs_data = {'/': {'type': 'directory', 'children': {'etc': {'type': 'directory', 'children': {
+        'sudoers': {'type': 'file', 'content': content}}}}}}
+    manager = SudoManager(fs_manager)
+
+    started = time.perf_counter()
+    cached = [manager.authorize(*check) for check in checks]
+    cached_seconds = time.perf_counter() - started
+
+    started = time.perf_counter()
+    fresh = []
+    baseline = checks[:options.baseline_checks]
+    for username, groups, command, args in baseline:
+        rule = SudoersPolicy(content).decide(username, groups, command, args)
+        fresh.append({"allowed": rule is not None, "nopasswd": bool(rule and rule.nopasswd)})
+    fresh_seconds = time.perf_counter() - started
+
+    if cached[:len(fresh)] != fresh:
+        sys.exit("error: the cached policy and a freshly compiled one disagree")
+    allowed = sum(decision["allowed"] for decision in cached)
+    print(f"{len(checks)} checks against {options.lines} sudoers lines ({allowed} allowed)")
+    print(f"  cached policy    {cached_seconds * 1000:8.1f} ms   {cached_seconds / len(checks) * 1e6:7.2f} us/check")
+    if baseline:
+        print(f"  compiled each    {fresh_seconds * 1000:8.1f} ms   {fresh_seconds / len(baseline) * 1e6:7.2f} us/check"
+              f"   ({len(baseline)} checks)")
+
+
+if __name__ == "__main__":
+    main()
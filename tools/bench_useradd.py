@@ -0,0 +1,128 @@
+# tools/bench_useradd.py
+"""
+Times bulk account creation against one useradd per account.
+
+    python tools/bench_useradd.py [--users 1000] [--baseline-users 100] [--iterations N] [--vfs-files 2000] [--seed 1]
+
+A generated batch of --users accounts (each in one to three of twenty
+shared groups) is created with UserManager.bulk_register, as 'useradd
+--batch' does. Then the first --baseline-users of them are created on a
+fresh system the old way: for each one the kernel reloads users and groups
+from the session context and runs 'useradd' and then a 'usermod -aG' per
+extra group. Every VFS save serializes the whole filesystem, as the browser
+save does, so both runs start from a filesystem holding --vfs-files files
+of 1 KiB. --iterations sets the PBKDF2 cost for both runs (default: the
+kernel's).
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import time
+import types
+
+CORE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "core")
+ROOT_CONTEXT = {"name": "root", "group": "root"}
+
+
+def _prepare_imports():
+    sys.path.insert(0, os.path.abspath(CORE_DIR))
+    try:
+        import pyodide.http  # noqa: F401
+    except ImportError:
+        # Only the browser has pyodide; the kernel modules just need it importable.
+        pyodide = types.ModuleType("pyodide")
+        pyodide.http = types.ModuleType("pyodide.http")
+        sys.modules["pyodide"], sys.modules["pyodide.http"] = pyodide, pyodide.http
+
+
+def generate_batch(count, rng):
+    return [{"username": f"student{number:04d}", "password": f"pw-{rng.getrandbits(48):x}",
+             "groups": rng.sample([f"class{group:02d}" for group in range(20)], rng.randint(1, 3))}
+            for number in range(count)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--baseline-users", type=int, default=100)
+    parser.add_argument("--iterations", type=int, default=None)
+    parser.add_argument("--vfs-files", type=int, default=2000)
+    parser.add_argument("--seed", type=int, default=1)
+    options = parser.parse_args()
+
+    _prepare_imports()
+    import asyncio
+    from filesystem import fs_manager
+    from groups import group_manager
+    from users import user_manager
+    from commands import useradd, usermod
+
+    if options.iterations:
+        user_manager.set_password_iterations(options.iterations)
+    batch = generate_batch(options.users, random.Random(options.seed))
+    saves = [0]
+
+    def save(state):
+        saves[0] += 1
+
+    def fresh_system():
+        fs_manager.fs_data = {}
+        fs_manager.set_save_function(save)
+        fs_manager._initialize_default_filesystem()
+        fs_manager.create_directory("/srv", ROOT_CONTEXT)
+        files = fs_manager.get_node("/srv")["children"]
+        for number in range(options.vfs_files):
+            files[f"file{number}"] = {"type": "file", "content": "x" * 1024, "owner": "root",
+                                      "group": "root", "mode": 0o644, "mtime": "2026-01-01T00:00:00Z"}
+        user_manager.load_users({"root": {"passwordData": None, "primaryGroup": "root"}})
+        group_manager.load_groups({})
+        saves[0] = 0
+
+    fresh_system()
+    started = time.perf_counter()
+    result = asyncio.run(user_manager.bulk_register(batch))
+    bulk_seconds = time.perf_counter() - started
+    if not result["success"]:
+        sys.exit(f"error: {result['error']} {result['errors'][:5]}")
+    bulk_saves = saves[0]
+    bulk_memberships = {entry["username"]: group_manager.get_groups_for_user(entry["username"]) for entry in batch}
+
+    fresh_system()
+    baseline = batch[:options.baseline_users]
+
+    async def one_by_one():
+        for entry in baseline:
+            user_manager.load_users(json.loads(json.dumps(user_manager.get_all_users())))
+            group_manager.load_groups(json.loads(json.dumps(group_manager.get_all_groups())))
+            outcomes = [await useradd.run([entry["username"]], {}, ROOT_CONTEXT,
+                                          stdin_data=f"{entry['password']}\n{entry['password']}")]
+            for group_name in entry["groups"]:
+                if not group_manager.group_exists(group_name):
+                    group_manager.create_group(group_name)
+                outcomes.append(usermod.run([entry["username"]], {"append-groups": group_name}, ROOT_CONTEXT))
+            failed = [outcome for outcome in outcomes if not outcome.get("success")]
+            if failed:
+                sys.exit(f"error: baseline run failed: {failed[0]}")
+
+    started = time.perf_counter()
+    asyncio.run(one_by_one())
+    baseline_seconds = time.perf_counter() - started
+
+    if any(group_manager.get_groups_for_user(entry["username"]) != bulk_memberships[entry["username"]]
+           for entry in baseline):
+        sys.exit("error: bulk and one-by-one runs made different memberships")
+
+    print(f"{len(batch)} users in {len({g for e in batch for g in e['groups']})} shared groups, "
+          f"{options.vfs_files} files in the VFS, PBKDF2 iterations {user_manager.password_iterations}, {os.cpu_count()} CPU(s)")
+    print(f"  bulk_register     {bulk_seconds:8.2f} s   {bulk_seconds / len(batch) * 1000:7.2f} ms/user"
+          f"   {bulk_saves} save(s)   hashing {result['summary']['hash_seconds']:.2f} s")
+    if baseline:
+        print(f"  useradd each      {baseline_seconds:8.2f} s   {baseline_seconds / len(baseline) * 1000:7.2f} ms/user"
+              f"   {saves[0]} save(s)   ({len(baseline)} users)")
+
+
+if __name__ == "__main__":
+    main()
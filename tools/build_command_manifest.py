@@ -0,0 +1,121 @@
+# tools/build_command_manifest.py
+"""
+Generates core/commands_manifest.json from the command modules in
+core/commands: each command's flag definitions and metadata, whether its
+run() is async, and its one-line help and full man text. The kernel reads
+the manifest so that it only imports a command module to run it.
+
+    python tools/build_command_manifest.py          regenerate the manifest
+    python tools/build_command_manifest.py --check  fail if it is out of date
+
+Run --check before committing changes to a command. It exits non-zero
+and names every command whose module and manifest entry disagree.
+"""
+
+import argparse
+import inspect
+import json
+import os
+import sys
+import types
+from importlib import import_module
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+CORE_DIR = os.path.join(REPO_ROOT, "core")
+MANIFEST_PATH = os.path.join(CORE_DIR, "commands_manifest.json")
+SAMPLE_CONTEXT = {"name": "Guest", "group": "Guest"}
+
+
+def _prepare_imports():
+    sys.path.insert(0, CORE_DIR)
+    try:
+        import pyodide.http  # noqa: F401
+    except ImportError:
+        # Only the browser has pyodide; the command modules just need it importable.
+        pyodide = types.ModuleType("pyodide")
+        pyodide.http = types.ModuleType("pyodide.http")
+        sys.modules["pyodide"], sys.modules["pyodide.http"] = pyodide, pyodide.http
+
+
+def _static_text(func):
+    """
+    Calls a help/man function the way 'help' and 'man' do. Returns its text,
+    or raises LookupError when the text changes with the arguments (or the
+    call fails), since such text cannot be stored.
+    """
+    try:
+        texts = {func([], {}, SAMPLE_CONTEXT), func(["sample"], {}, SAMPLE_CONTEXT)}
+    except Exception as e:
+        raise LookupError(repr(e))
+    if len(texts) != 1 or not isinstance(next(iter(texts)), str):
+        raise LookupError("text depends on the arguments")
+    return texts.pop()
+
+
+def describe(command_name):
+    module = import_module(f"commands.{command_name}")
+    define_flags = getattr(module, "define_flags", None)
+    definitions = define_flags() if callable(define_flags) else {}
+    if isinstance(definitions, list):
+        definitions = {"flags": definitions}
+    entry = {
+        "flags": definitions.get("flags", []),
+        "metadata": definitions.get("metadata", {}),
+        "async": inspect.iscoroutinefunction(getattr(module, "run", None))
+    }
+    for key in ("help", "man"):
+        func = getattr(module, key, None)
+        if not callable(func):
+            entry[key] = None
+            continue
+        try:
+            entry[key] = _static_text(func)
+        except LookupError:
+            pass
+    return entry
+
+
+def build():
+    command_dir = os.path.join(CORE_DIR, "commands")
+    names = sorted(name[:-3] for name in os.listdir(command_dir) if name.endswith(".py") and not name.startswith("__"))
+    return {"format": 1, "commands": {name: describe(name) for name in names}}
+
+
+def render(manifest):
+    return json.dumps(manifest, indent=1, sort_keys=True) + "\n"
+
+
+def diverging_commands(expected, actual):
+    """The names of commands that are new, gone, or described differently."""
+    expected_commands, actual_commands = expected["commands"], actual.get("commands", {})
+    return sorted(name for name in set(expected_commands) | set(actual_commands)
+                  if expected_commands.get(name) != actual_commands.get(name))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--check", action="store_true")
+    options = parser.parse_args()
+
+    _prepare_imports()
+    manifest = build()
+    if not options.check:
+        with open(MANIFEST_PATH, "w") as handle:
+            handle.write(render(manifest))
+        print(f"wrote {MANIFEST_PATH}: {len(manifest['commands'])} commands")
+        return
+
+    try:
+        with open(MANIFEST_PATH) as handle:
+            current = json.load(handle)
+    except (OSError, ValueError) as e:
+        sys.exit(f"error: cannot read {MANIFEST_PATH}: {e}")
+    stale = diverging_commands(manifest, current)
+    if stale:
+        sys.exit(f"error: commands_manifest.json is out of date for: {', '.join(stale)}\n"
+                 f"Run 'python tools/build_command_manifest.py' to regenerate it.")
+    print(f"{MANIFEST_PATH} matches {len(manifest['commands'])} command modules")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,150 @@
+# tools/build_kernel_bundle.py
+"""
+Packs core/ into a single zip that bridge.js unpacks into the Pyodide
+filesystem in one step, instead of fetching every module separately.
+
+    python tools/build_kernel_bundle.py [--output dist/kernel_bundle.zip] [--verify]
+
+The archive holds every core/ source file, its bytecode precompiled into
+__pycache__ as an unchecked-hash .pyc, and core/bundle_manifest.json,
+which lists the files and the commands for CommandExecutor. Unchecked
+.pyc files are used without comparing them to the source's timestamp,
+which unpacking does not preserve. Run this with the same Python version
+as the Pyodide runtime. Under any other version the bytecode is simply
+ignored and the sources are compiled as before.
+
+--verify unpacks the archive into a temporary directory and imports the
+kernel and every command from it in a fresh interpreter. Every unpacked
+source file is first made to raise on import, so the imports only succeed
+from the bundled bytecode. It also checks the manifest's command list
+against core/commands.
+"""
+
+import argparse
+import importlib.util
+import json
+import os
+import py_compile
+import subprocess
+import sys
+import tempfile
+import zipfile
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+CORE_DIR = os.path.join(REPO_ROOT, "core")
+DEFAULT_OUTPUT = os.path.join(REPO_ROOT, "dist", "kernel_bundle.zip")
+MANIFEST_NAME = "bundle_manifest.json"
+BUNDLED_EXTENSIONS = (".py", ".json")
+
+VERIFY_PROBE = r"""
+import json, sys, types
+sys.path.insert(0, CORE_DIR)
+try:
+    import pyodide.http
+except ImportError:
+    pyodide = types.ModuleType("pyodide")
+    pyodide.http = types.ModuleType("pyodide.http")
+    sys.modules["pyodide"], sys.modules["pyodide.http"] = pyodide, pyodide.http
+import kernel
+from importlib import import_module
+from executor import command_executor
+for name in command_executor.commands:
+    import_module(f"commands.{name}")
+modules = [module for module in list(sys.modules.values()) if (getattr(module, "__file__", None) or "").startswith(CORE_DIR)]
+print(json.dumps({"modules": len(modules), "commands": command_executor.commands}))
+"""
+# Appended to every unpacked source file: if the kernel still imports, the bytecode was used.
+SOURCE_TRIPWIRE = "\nraise ImportError('compiled from source instead of the bundled bytecode')\n"
+
+
+def collect_files():
+    """Every bundled file under core/, as paths relative to the repository root, in a stable order."""
+    files = []
+    for directory, subdirectories, names in os.walk(CORE_DIR):
+        subdirectories[:] = sorted(name for name in subdirectories if name != "__pycache__")
+        for name in sorted(names):
+            if name.endswith(BUNDLED_EXTENSIONS) and name != MANIFEST_NAME:
+                files.append(os.path.relpath(os.path.join(directory, name), REPO_ROOT).replace(os.sep, "/"))
+    return files
+
+
+def compile_bytecode(source_path):
+    """Compiles one module to an unchecked-hash .pyc and returns (archive name, bytes)."""
+    with tempfile.TemporaryDirectory() as scratch:
+        target = os.path.join(scratch, "module.pyc")
+        py_compile.compile(os.path.join(REPO_ROOT, source_path), cfile=target, dfile="/" + source_path,
+                           doraise=True, invalidation_mode=py_compile.PycInvalidationMode.UNCHECKED_HASH)
+        with open(target, "rb") as handle:
+            bytecode = handle.read()
+    return importlib.util.cache_from_source(source_path), bytecode
+
+
+def build(output):
+    files = collect_files()
+    commands = sorted(
+        os.path.splitext(os.path.basename(path))[0] for path in files
+        if path.startswith("core/commands/") and path.endswith(".py") and not os.path.basename(path).startswith("__")
+    )
+    manifest = {
+        "format": 1,
+        "cache_tag": sys.implementation.cache_tag,
+        "magic": importlib.util.MAGIC_NUMBER.hex(),
+        "files": files,
+        "commands": commands
+    }
+    os.makedirs(os.path.dirname(output), exist_ok=True)
+    with zipfile.ZipFile(output, "w", zipfile.ZIP_DEFLATED) as archive:
+        for path in files:
+            archive.write(os.path.join(REPO_ROOT, path), path)
+            if path.endswith(".py"):
+                archive.writestr(*compile_bytecode(path))
+        archive.writestr(f"core/{MANIFEST_NAME}", json.dumps(manifest, indent=2))
+    return manifest
+
+
+def verify(output, manifest):
+    """Imports the kernel from an unpacked copy of the bundle. Returns a list of problems."""
+    with tempfile.TemporaryDirectory() as scratch:
+        with zipfile.ZipFile(output) as archive:
+            archive.extractall(scratch)
+        for path in manifest["files"]:
+            if path.endswith(".py"):
+                with open(os.path.join(scratch, path), "a") as handle:
+                    handle.write(SOURCE_TRIPWIRE)
+        core_dir = os.path.join(scratch, "core")
+        code = VERIFY_PROBE.replace("CORE_DIR", repr(core_dir))
+        completed = subprocess.run([sys.executable, "-B", "-c", code], capture_output=True, text=True, cwd=scratch)
+        if completed.returncode != 0:
+            return [f"importing the kernel from the bundle failed:\n{completed.stderr}"]
+        report = json.loads(completed.stdout.strip().splitlines()[-1])
+
+    problems = []
+    if report["commands"] != manifest["commands"]:
+        problems.append("the executor's command list does not match the manifest")
+    on_disk = sorted(name[:-3] for name in os.listdir(os.path.join(CORE_DIR, "commands"))
+                     if name.endswith(".py") and not name.startswith("__"))
+    if on_disk != manifest["commands"]:
+        problems.append("the manifest's command list does not match core/commands")
+    if not problems:
+        print(f"verified: {report['modules']} modules imported from bytecode, {len(report['commands'])} commands")
+    return problems
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--output", default=DEFAULT_OUTPUT)
+    parser.add_argument("--verify", action="store_true")
+    options = parser.parse_args()
+
+    manifest = build(options.output)
+    size = os.path.getsize(options.output)
+    print(f"wrote {options.output}: {len(manifest['files'])} files, {size / 1024:.1f} KiB ({manifest['cache_tag']})")
+    if options.verify:
+        problems = verify(options.output, manifest)
+        for problem in problems:
+            print(f"error: {problem}", file=sys.stderr)
+        sys.exit(1 if problems else 0)
+
+
+if __name__ == "__main__":
+    main()